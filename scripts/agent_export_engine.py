@@ -0,0 +1,1019 @@
+#!/usr/bin/env python3
+"""Shared in-process export engine for the Codex, Claude, and Copilot adapters.
+
+The runtime exporters used to carry private copies of the canonical frontmatter
+parser, the Markdown compactor, and the orchestrator ``minify_*`` family.  This
+module owns those pieces once.  A :class:`SourceModel` parses ``agents/*.md``
+a single time and memoizes each minified runtime body, so one interpreter can
+render every runtime target from the same in-memory model.
+
+Runtime-specific adapters, frontmatter, and output layout stay in the
+individual ``export-*-agents.py`` scripts.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Pattern, Sequence, Set, Tuple
+
+from agent_model_profiles import (
+    RuntimeModelSetting,
+    load_model_set,
+    load_profile,
+    resolve_agent_model_settings,
+)
+from path_safety import is_linklike
+
+
+FRONTMATTER_BOUNDARY = re.compile(r"^\s*---\s*$")
+TOP_LEVEL_KEY_RE = re.compile(r"^([A-Za-z0-9_-]+)\s*:\s*(.*)$")
+TOOL_ENTRY_RE = re.compile(r"^  ([A-Za-z0-9_-]+)\s*:\s*(true|false)\s*$")
+AGENT_REF_RE = re.compile(r"@([a-z0-9][a-z0-9-]*(?:\*)?)")
+REPO_MANAGED_REF_RE = re.compile(
+    r"(?<![A-Za-z0-9_./:-])((?:agents|protocols|scripts|skills|tools)/[A-Za-z0-9_./-]+)"
+)
+DOT_RELATIVE_REPO_MANAGED_REF_RE = re.compile(
+    r"(?<![A-Za-z0-9_./:-])((?:\./)?(?:agents|protocols|scripts|skills|tools)/[A-Za-z0-9_./-]+)"
+)
+FORMAL_CODEX_MODE_ENTRY_RE = re.compile(
+    r"\$run-([a-z0-9][a-z0-9-]*)(?![A-Za-z0-9_-])"
+)
+SAFE_MODE_TOKEN_RE = re.compile(r"^[a-z0-9][a-z0-9-]*$")
+NODE_TOOL_REF_RE = re.compile(
+    r"\bnode\s+[\"']?(?:\./)?tools/(status-event|reasoning-policy|capability-recovery|codex-child-trace)\.js[\"']?"
+)
+FENCE_RE = re.compile(r"^[ \t]{0,3}(`{3,}|~{3,})(.*)$")
+HANDOFF_PROTOCOL_RE = re.compile(
+    r"(?ms)^# HANDOFF PROTOCOL \(GLOBAL\)\n.*?(?=^## AGENT RESPONSIBILITY MATRIX|^# )"
+)
+GENERAL_HANDOFF_RULES_RE = re.compile(
+    r"(?m)^## General Handoff Rules\n\n(?P<bullets>(?:- [^\n]+\n)+)"
+)
+RESPONSIBILITY_MATRIX_RE = re.compile(
+    r"(?ms)^## AGENT RESPONSIBILITY MATRIX\n\n"
+    r"\| Agent \| Primary Responsibility \| Forbidden Actions \|\n"
+    r"\|[-| ]+\|\n"
+    r"(?P<rows>(?:\|.*\|\n)+)"
+)
+FLAG_PARSING_INTRO_RE = re.compile(
+    r"(?ms)^(?P<heading>#{1,2} FLAG PARSING PROTOCOL(?: \([^)]+\))?)\n\n"
+    r"Parse the workflow invocation input\.\n\n"
+    r"Parse `raw_input`: tokens before the first `--\*` flag form `main_task_prompt`; `--\*` tokens are flags\.(?P<resume> If `main_task_prompt` is empty and `resume_mode = true`, treat as resume-only invocation\.)?\n"
+)
+RESPONSE_MODE_RE = re.compile(
+    r"(?ms)^(?P<heading>#{1,2} RESPONSE MODE \(DEFAULT\))\n\n"
+    r"(?P<bullets>(?:- [^\n]+\n)+)"
+)
+CONFIRM_VERBOSE_RE = re.compile(
+    r"(?ms)^(?P<heading>#{1,2} CONFIRM / VERBOSE PROTOCOL)\n\n"
+    r"(?P<bullets>(?:- [^\n]+\n)+)"
+)
+CHECKPOINT_PROTOCOL_RE = re.compile(
+    r"(?ms)^(?P<heading>#{1,2} CHECKPOINT PROTOCOL)\n\n(?P<body>.*?)(?=^#{1,2} |\Z)"
+)
+RUN_STATUS_PROTOCOL_RE = re.compile(
+    r"(?ms)^(?P<heading>#{1,2} (?:RUN STATUS PROTOCOL|STATUS ARTIFACT PROTOCOL))\n\n(?P<body>.*?)(?=^#{1,2} |\Z)"
+)
+
+KNOWN_SOURCE_FRONTMATTER_KEYS = {
+    "name",
+    "description",
+    "kind",
+}
+
+SCALAR_FRONTMATTER_KEYS = {
+    "name",
+    "description",
+    "kind",
+}
+
+UNSUPPORTED_VALUE_PREFIXES = ("[", "{", "|", ">")
+
+ORCHESTRATOR_PREFIX = "orchestrator-"
+HOST_RESERVED_MODE_ALIASES = frozenset({"goal"})
+SUPPORT_MARKER_FILENAME = ".agents-pipeline-support.json"
+SUPPORT_MARKER_TOOL = "agents_pipeline.sync-runtime-support"
+
+# Codex always installs the neutral status writer beside its roles.  Tier 2
+# runtimes may run without it, so their minified protocol text keeps the
+# explicit "when available" fallback wording.
+CHECKPOINT_SUMMARY = {
+    False: (
+        "After each successful stage, run `node tools/status-event.js --event stage.completed --payload-json '<json>'` so the runtime-neutral writer updates `<run_output_dir>/checkpoint.json` (schema: `protocols/schemas/checkpoint.schema.json`). Use `checkpoint.updated` with a non-empty `flags` delta when a derived flag must be persisted without marking the current stage complete.\n\n"
+    ),
+    True: (
+        "After each successful stage, when `tools/status-event.js` is available in the execution workspace, emit the checkpoint event with `node tools/status-event.js --event stage.completed --payload-json '<json>'` so the runtime-neutral status writer updates `<run_output_dir>/checkpoint.json` (schema: `protocols/schemas/checkpoint.schema.json`). Use `checkpoint.updated` with a non-empty `flags` delta when a derived flag must be persisted without marking the current stage complete. If the writer is unavailable, report that persistence is unsupported instead of claiming a checkpoint write.\n\n"
+    ),
+}
+STAGE3_STATUS_LINES = {
+    False: (
+        "- Emit updates with `node tools/status-event.js --event <event> --payload-json '<json>'` for `<run_output_dir>/status/run-status.json` per `protocols/PIPELINE_PROTOCOL.md`; preserve `working_project_dir` unchanged when present.",
+        "- Use expanded status files from Stage 3: `tasks/<task_id>.json` and `agents/<agent_id>.json`.",
+        "- Event vocabulary: `run.started`/`run.resumed`, conditional `checkpoint.updated`, `stage.completed`, `tasks.registered`, `task.updated`, `agent.started`/`agent.heartbeat`/`agent.finished`, and `run.finished`.",
+        "- Prefer `--event batch` for related same-run deltas; keep standalone heartbeats coarse and skip redundant ones.",
+    ),
+    True: (
+        "- When the neutral writer is available, emit status updates through `node tools/status-event.js --event <event> --payload-json '<json>'` for `<run_output_dir>/status/run-status.json` per `protocols/PIPELINE_PROTOCOL.md`; preserve `working_project_dir` unchanged when present. Otherwise report that persisted status is unsupported.",
+        "- Use expanded status files from Stage 3: `tasks/<task_id>.json` and `agents/<agent_id>.json`.",
+        "- Event vocabulary: `run.started`/`run.resumed`, conditional `checkpoint.updated`, `stage.completed`, `tasks.registered`, `task.updated`, `agent.started`/`agent.heartbeat`/`agent.finished`, and `run.finished`.",
+        '- Prefer `event = "batch"` for related same-run deltas; keep standalone heartbeats coarse and skip redundant ones.',
+    ),
+}
+STAGE2_STATUS_LINES = {
+    False: (
+        "- Emit updates with `node tools/status-event.js --event <event> --payload-json '<json>'` for `<run_output_dir>/status/run-status.json` per `protocols/PIPELINE_PROTOCOL.md`; prefer `--event batch` for same-run task/agent deltas.",
+        "- Preserve `working_project_dir` unchanged when provided; if the runtime cannot honor a required delegated worktree, stop instead of silently using the caller repo.",
+        "- Use expanded status files after Stage 2 creates the task list.",
+        "- Event vocabulary: `run.started`/`run.resumed`, conditional `checkpoint.updated`, `stage.completed`, `tasks.registered`, `task.updated`, `agent.started`/`agent.heartbeat`/`agent.finished`, and `run.finished`. Keep standalone heartbeats coarse unless an earlier semantic change makes one useful.",
+    ),
+    True: (
+        "- When the neutral writer is available, emit status updates through `node tools/status-event.js --event <event> --payload-json '<json>'` for `<run_output_dir>/status/run-status.json` per `protocols/PIPELINE_PROTOCOL.md`; prefer `--event batch` for same-run task/agent deltas. Otherwise report that persisted status is unsupported.",
+        "- Preserve `working_project_dir` unchanged when provided; if the runtime cannot honor a required delegated worktree, stop instead of silently using the caller repo.",
+        "- Use expanded status files after Stage 2 creates the task list.",
+        "- Event vocabulary: `run.started`/`run.resumed`, conditional `checkpoint.updated`, `stage.completed`, `tasks.registered`, `task.updated`, `agent.started`/`agent.heartbeat`/`agent.finished`, and `run.finished`. Keep standalone heartbeats coarse unless an earlier semantic change makes one useful.",
+    ),
+}
+MODERNIZE_STATUS_LINES = {
+    False: (
+        "- Emit updates with `node tools/status-event.js --event <event> --payload-json '<json>'` for `<run_output_dir>/status/run-status.json` (`layout = run-only`) per `protocols/PIPELINE_PROTOCOL.md`.",
+        "- Keep modernization-planning status/checkpoint writes anchored to the source-project run root; do not pass `target_project_dir` as `working_project_dir` for planning events.",
+        "- When the current/main agent transitions into the Pipeline workflow, preserve `working_project_dir` so target-local status/checkpoint files land in the target repo; do not spawn another primary orchestrator.",
+    ),
+    True: (
+        "- When the neutral writer is available, emit status updates through `node tools/status-event.js --event <event> --payload-json '<json>'` for `<run_output_dir>/status/run-status.json` (`layout = run-only`) per `protocols/PIPELINE_PROTOCOL.md`. Otherwise report that persisted status is unsupported.",
+        "- Keep modernization-planning status/checkpoint writes anchored to the source-project run root; do not pass `target_project_dir` as `working_project_dir` for planning events.",
+        "- When the current/main agent transitions into the Pipeline workflow, preserve `working_project_dir` so target-local status/checkpoint files land in the target repo; do not spawn another primary orchestrator.",
+    ),
+}
+RUN_ONLY_STATUS_SUMMARY = {
+    False: (
+        "Emit updates with `node tools/status-event.js --event <event> --payload-json '<json>'` for `<run_output_dir>/status/run-status.json` (`layout = run-only`) per `protocols/PIPELINE_PROTOCOL.md`.\n\n"
+    ),
+    True: (
+        "When the neutral writer is available, emit status updates through `node tools/status-event.js --event <event> --payload-json '<json>'` for `<run_output_dir>/status/run-status.json` (`layout = run-only`) per `protocols/PIPELINE_PROTOCOL.md`; otherwise report that persisted status is unsupported.\n\n"
+    ),
+}
+
+
+@dataclass
+class AgentSource:
+    path: Path
+    file_stem: str
+    name: str
+    description: str
+    body: str
+    fm_keys: Set[str]
+    kind: str = "subagent"
+    tools: Dict[str, bool] = field(default_factory=dict)
+
+
+def read_text(path: Path) -> str:
+    return path.read_text(encoding="utf-8")
+
+
+def strip_quotes(value: str) -> str:
+    if len(value) >= 2 and (
+        (value[0] == value[-1] == '"') or (value[0] == value[-1] == "'")
+    ):
+        return value[1:-1]
+    return value
+
+
+def ordered_unique(values: Sequence[str]) -> List[str]:
+    seen: Set[str] = set()
+    out: List[str] = []
+    for value in values:
+        if value in seen:
+            continue
+        seen.add(value)
+        out.append(value)
+    return out
+
+
+def parse_scalar_frontmatter_value(path: Path, key: str, raw_value: str) -> str:
+    value = raw_value.strip()
+    if not value:
+        raise ValueError(
+            f"{path.as_posix()}: frontmatter key '{key}' must use a single-line scalar value"
+        )
+    if value.startswith(UNSUPPORTED_VALUE_PREFIXES):
+        raise ValueError(
+            f"{path.as_posix()}: frontmatter key '{key}' uses unsupported structured value '{value}'"
+        )
+    return strip_quotes(value)
+
+
+def parse_frontmatter(
+    content: str, path: Path
+) -> Tuple[Dict[str, str], Dict[str, bool], str]:
+    lines = content.splitlines()
+    if not lines or not FRONTMATTER_BOUNDARY.match(lines[0]):
+        raise ValueError(f"{path.as_posix()}: missing frontmatter block")
+
+    end_idx: Optional[int] = None
+    for idx in range(1, len(lines)):
+        if FRONTMATTER_BOUNDARY.match(lines[idx]):
+            end_idx = idx
+            break
+    if end_idx is None:
+        raise ValueError(f"{path.as_posix()}: unterminated frontmatter block")
+
+    fm: Dict[str, str] = {}
+    tools: Dict[str, bool] = {}
+    saw_tools = False
+    frontmatter_lines = lines[1:end_idx]
+    idx = 0
+    while idx < len(frontmatter_lines):
+        line = frontmatter_lines[idx]
+        if not line.strip():
+            raise ValueError(
+                f"{path.as_posix()}: blank lines are not allowed inside frontmatter"
+            )
+        if line[:1].isspace():
+            raise ValueError(
+                f"{path.as_posix()}: unexpected indented frontmatter line '{line}'"
+            )
+
+        match = TOP_LEVEL_KEY_RE.match(line)
+        if match is None:
+            raise ValueError(f"{path.as_posix()}: malformed frontmatter line '{line}'")
+
+        key = match.group(1).strip()
+        raw_value = match.group(2).strip()
+        if key in {"model", "provider"}:
+            raise ValueError(
+                f"{path.as_posix()}: frontmatter key '{key}' is not supported; configure model/provider in runtime config instead"
+            )
+        if key not in KNOWN_SOURCE_FRONTMATTER_KEYS:
+            raise ValueError(f"{path.as_posix()}: unsupported frontmatter key '{key}'")
+        if key in fm or (key == "tools" and saw_tools):
+            raise ValueError(f"{path.as_posix()}: duplicate frontmatter key '{key}'")
+
+        if key == "tools":
+            saw_tools = True
+            if raw_value:
+                raise ValueError(
+                    f"{path.as_posix()}: frontmatter key 'tools' must not have an inline value"
+                )
+            idx += 1
+            if idx >= len(frontmatter_lines) or not frontmatter_lines[idx].startswith(
+                "  "
+            ):
+                raise ValueError(
+                    f"{path.as_posix()}: frontmatter key 'tools' must contain indented boolean entries"
+                )
+            while idx < len(frontmatter_lines) and frontmatter_lines[idx].startswith(
+                "  "
+            ):
+                tool_line = frontmatter_lines[idx]
+                tool_match = TOOL_ENTRY_RE.match(tool_line)
+                if tool_match is None:
+                    raise ValueError(
+                        f"{path.as_posix()}: malformed tools entry '{tool_line}'"
+                    )
+                tool_name = tool_match.group(1)
+                if tool_name in tools:
+                    raise ValueError(
+                        f"{path.as_posix()}: duplicate tools entry '{tool_name}'"
+                    )
+                tools[tool_name] = tool_match.group(2) == "true"
+                idx += 1
+            continue
+
+        if key not in SCALAR_FRONTMATTER_KEYS:
+            raise ValueError(
+                f"{path.as_posix()}: frontmatter key '{key}' is not supported in this exporter"
+            )
+        fm[key] = parse_scalar_frontmatter_value(path, key, raw_value)
+        idx += 1
+
+    body = "\n".join(lines[end_idx + 1 :])
+    if content.endswith("\n"):
+        body += "\n"
+    return fm, tools, body
+
+
+def parse_agent_source(path: Path) -> AgentSource:
+    """Parse one canonical agent without applying runtime-specific kind rules."""
+
+    fm, tools, body = parse_frontmatter(read_text(path), path)
+    name = fm.get("name", "").strip()
+    description = fm.get("description", "").strip()
+    if not name:
+        raise ValueError(f"{path.as_posix()}: missing required frontmatter key 'name'")
+    if not description:
+        raise ValueError(
+            f"{path.as_posix()}: missing required frontmatter key 'description'"
+        )
+    return AgentSource(
+        path=path,
+        file_stem=path.stem,
+        name=name,
+        description=description,
+        body=body,
+        fm_keys=set(fm.keys()) | ({"tools"} if tools else set()),
+        kind=fm.get("kind", "").strip(),
+        tools=tools,
+    )
+
+
+def parse_source_agents(source_agents_dir: Path) -> List[AgentSource]:
+    return [parse_agent_source(path) for path in sorted(source_agents_dir.glob("*.md"))]
+
+
+def validate_agent_kinds(agents: Sequence[AgentSource]) -> None:
+    for agent in agents:
+        if agent.kind not in {"primary", "subagent"}:
+            raise ValueError(
+                f"{agent.path.as_posix()}: frontmatter key 'kind' must be 'primary' or 'subagent'"
+            )
+
+
+def parse_catalog_agents(catalog_path: Path) -> Set[str]:
+    if not catalog_path.exists():
+        return set()
+    rows = read_text(catalog_path).splitlines()
+    agents: Set[str] = set()
+    for line in rows:
+        stripped = line.strip()
+        if not stripped.startswith("|"):
+            continue
+        parts = [part.strip() for part in stripped.split("|")]
+        if len(parts) < 3:
+            continue
+        agent = parts[1]
+        if agent in {"", "Agent"}:
+            continue
+        if set(agent) <= {"-"}:
+            continue
+        agents.add(agent)
+    return agents
+
+
+def compact_markdown(text: str) -> str:
+    lines = text.splitlines()
+    compacted: List[str] = []
+    pending_blank = False
+    in_fence = False
+    fence_token = ""
+
+    for line in lines:
+        fence_match = FENCE_RE.match(line)
+        if in_fence:
+            compacted.append(line)
+            if fence_match and line.strip() == fence_token:
+                in_fence = False
+                fence_token = ""
+            continue
+
+        if fence_match:
+            if pending_blank and compacted:
+                compacted.append("")
+                pending_blank = False
+            compacted.append(line)
+            in_fence = True
+            fence_token = fence_match.group(1)
+            continue
+
+        stripped = line.rstrip()
+        if not stripped:
+            pending_blank = True
+            continue
+
+        if pending_blank and compacted:
+            compacted.append("")
+            pending_blank = False
+        compacted.append(stripped)
+
+    out = "\n".join(compacted)
+    if text.endswith("\n"):
+        out += "\n"
+    return out
+
+
+def ensure_sentence(text: str) -> str:
+    return text if text.endswith((".", "!", "?")) else f"{text}."
+
+
+def minify_handoff_protocol(text: str) -> str:
+    match = HANDOFF_PROTOCOL_RE.search(text)
+    if not match:
+        return text
+
+    section = match.group(0)
+    general_match = GENERAL_HANDOFF_RULES_RE.search(section)
+    if not general_match:
+        return text
+
+    lines = ["# HANDOFF PROTOCOL (GLOBAL)", ""]
+    lines.extend(line.rstrip() for line in general_match.group("bullets").strip().splitlines())
+    lines.append(
+        "- Orchestrator -> subagent: selected for specialization; stay within scope; satisfy the provided Definition of Done exactly."
+    )
+
+    if "## EXECUTOR -> REVIEWER HANDOFF" in section:
+        lines.append(
+            "- Executor -> reviewer: only the scoped DoD and required evidence count; adequate targeted evidence is sufficient, and broader proof needs a concrete uncovered path."
+        )
+    if "## REVIEWER -> ORCHESTRATOR HANDOFF" in section:
+        lines.append(
+            "- Reviewer -> orchestrator: a failed review is evidence, not automatic edit authorization. If `status = fail` and `test_only = false`, apply the materiality gate to each followup and route only admitted `required_followups` through the narrowest repair, up to `max_retry_rounds`; if `test_only = true`, skip retries; stop and report blockers when failure persists."
+        )
+
+    replacement = "\n".join(lines) + "\n\n"
+    return text[: match.start()] + replacement + text[match.end() :]
+
+
+def minify_agent_responsibility_matrix(text: str) -> str:
+    def repl(match: re.Match[str]) -> str:
+        bullets: List[str] = []
+        for raw_row in match.group("rows").strip().splitlines():
+            cells = [cell.strip() for cell in raw_row.strip().strip("|").split("|")]
+            if len(cells) != 3 or not all(cells):
+                return match.group(0)
+            bullets.append(
+                f"- `{cells[0]}`: {ensure_sentence(cells[1])} Forbidden: {ensure_sentence(cells[2])}"
+            )
+        return "## AGENT RESPONSIBILITY MATRIX\n\n" + "\n".join(bullets) + "\n"
+
+    return RESPONSIBILITY_MATRIX_RE.sub(repl, text, count=1)
+
+
+def minify_flag_parsing_intro(text: str) -> str:
+    def repl(match: re.Match[str]) -> str:
+        resume = match.group("resume") or ""
+        return (
+            f"{match.group('heading')}\n\n"
+            "Parse `raw_input`: tokens before the first `--*` flag form `main_task_prompt`; `--*` tokens are flags."
+            f"{resume}\n"
+        )
+
+    return FLAG_PARSING_INTRO_RE.sub(repl, text, count=1)
+
+
+def minify_response_mode(text: str) -> str:
+    def repl(match: re.Match[str]) -> str:
+        section = match.group("bullets")
+        autopilot_clause = " and `autopilot_mode = false`" if "autopilot_mode = false" in section else ""
+        return (
+            f"{match.group('heading')}\n\n"
+            "- Default to concise final-only reporting: outcome, key deliverables, blockers/errors. Emit stage-by-stage progress only when `--confirm` or `--verbose` requires it"
+            f"{autopilot_clause}.\n"
+        )
+
+    return RESPONSE_MODE_RE.sub(repl, text, count=1)
+
+
+def minify_confirm_verbose_protocol(text: str) -> str:
+    def repl(match: re.Match[str]) -> str:
+        bullets = [line.strip()[2:] for line in match.group("bullets").strip().splitlines()]
+        if len(bullets) < 2:
+            return match.group(0)
+
+        confirm_line = bullets[0]
+        verbose_line = bullets[1]
+        if "Proceed? [yes / feedback / abort]" not in confirm_line or "On abort: checkpoint and stop." not in confirm_line:
+            return match.group(0)
+
+        confirm_label = "`confirm_mode` (when not autopilot)" if "when not autopilot" in confirm_line else "`confirm_mode`"
+        waiting_clause = "update status to `waiting_for_user` and " if "waiting_for_user" in confirm_line else ""
+        verbose_line = verbose_line.replace("`verbose_mode` (implies confirm): also ", "`verbose_mode` (implies confirm): ")
+
+        return (
+            f"{match.group('heading')}\n\n"
+            f"- {confirm_label}: after each stage, {waiting_clause}pause with `Proceed? [yes / feedback / abort]`; on abort checkpoint and stop.\n"
+            f"- {verbose_line}\n"
+        )
+
+    return CONFIRM_VERBOSE_RE.sub(repl, text, count=1)
+
+
+def minify_checkpoint_protocol(text: str, *, optional_status_writer: bool = False) -> str:
+    def repl(match: re.Match[str]) -> str:
+        body = match.group("body")
+        if (
+            "<run_output_dir>/checkpoint.json" not in body
+            or "checkpoint.schema.json" not in body
+        ):
+            return match.group(0)
+        return f"{match.group('heading')}\n\n" + CHECKPOINT_SUMMARY[optional_status_writer]
+
+    return CHECKPOINT_PROTOCOL_RE.sub(repl, text, count=1)
+
+
+def minify_run_status_protocol(text: str, *, optional_status_writer: bool = False) -> str:
+    def repl(match: re.Match[str]) -> str:
+        body = match.group("body")
+        heading = match.group("heading")
+        if (
+            "<run_output_dir>/status/run-status.json" not in body
+            or "PIPELINE_PROTOCOL.md" not in body
+        ):
+            return match.group(0)
+
+        if "Use the expanded status layout (`tasks/<task_id>.json`, `agents/<agent_id>.json`) once task decomposition begins at Stage 3." in body:
+            lines = [heading, "", *STAGE3_STATUS_LINES[optional_status_writer]]
+            return "\n".join(lines) + "\n\n"
+
+        if "Use the expanded status layout once Stage 2 creates the task list." in body:
+            lines = [heading, "", *STAGE2_STATUS_LINES[optional_status_writer]]
+            return "\n".join(lines) + "\n\n"
+
+        if "target_project_dir" in body and "working_project_dir" in body:
+            lines = [heading, "", *MODERNIZE_STATUS_LINES[optional_status_writer]]
+            return "\n".join(lines) + "\n\n"
+
+        if "(`layout = run-only`)" in body:
+            return f"{heading}\n\n" + RUN_ONLY_STATUS_SUMMARY[optional_status_writer]
+
+        return match.group(0)
+
+    return RUN_STATUS_PROTOCOL_RE.sub(repl, text, count=1)
+
+
+# Orchestrator rewrites in application order; the flag marks transforms whose
+# output depends on whether the status writer is optional (Tier 2 runtimes).
+ORCHESTRATOR_MINIFY_STEPS = (
+    (minify_handoff_protocol, False),
+    (minify_agent_responsibility_matrix, False),
+    (minify_flag_parsing_intro, False),
+    (minify_response_mode, False),
+    (minify_checkpoint_protocol, True),
+    (minify_run_status_protocol, True),
+    (minify_confirm_verbose_protocol, False),
+)
+
+
+def iter_orchestrator_minify_steps(
+    agent_name: str, text: str, *, optional_status_writer: bool = False
+) -> Iterator[Tuple[str, str]]:
+    """Yield ``(transform name, text after it)`` for each orchestrator rewrite."""
+
+    if not agent_name.startswith(ORCHESTRATOR_PREFIX):
+        return
+    for step, status_writer_aware in ORCHESTRATOR_MINIFY_STEPS:
+        if status_writer_aware:
+            text = step(text, optional_status_writer=optional_status_writer)
+        else:
+            text = step(text)
+        yield step.__name__, text
+
+
+def minify_orchestrator_runtime_body(
+    agent_name: str, text: str, *, optional_status_writer: bool = False
+) -> str:
+    for _, text in iter_orchestrator_minify_steps(
+        agent_name, text, optional_status_writer=optional_status_writer
+    ):
+        pass
+    return text
+
+
+def prepare_runtime_body(
+    agent_name: str, original_body: str, *, optional_status_writer: bool = False
+) -> str:
+    """Apply the runtime-neutral body rewrites shared by every exporter."""
+
+    body = original_body.replace("$ARGUMENTS", "raw_input")
+    return minify_orchestrator_runtime_body(
+        agent_name, body, optional_status_writer=optional_status_writer
+    )
+
+
+def rewrite_formal_mode_entries(text: str) -> str:
+    """Map formal Codex ``$run-<mode>`` entries to slash aliases for Tier 2 hosts."""
+
+    return FORMAL_CODEX_MODE_ENTRY_RE.sub(r"/run-\1", text)
+
+
+def expand_ref_token(
+    token: str, available_agents: Set[str], *, require_known_executor: bool = False
+) -> Tuple[List[str], List[str]]:
+    if token == "executor-*":
+        if require_known_executor and "executor" not in available_agents:
+            return [], ["executor"]
+        return ["executor"], []
+    if token.endswith("*"):
+        return [], [token]
+    if token in available_agents:
+        return [token], []
+    return [], [token]
+
+
+def extract_subagents(
+    body: str, available_agents: Set[str], *, require_known_executor: bool = False
+) -> Tuple[List[str], List[str]]:
+    resolved: List[str] = []
+    unresolved: List[str] = []
+    for match in AGENT_REF_RE.finditer(body):
+        token = match.group(1)
+        expanded, unknown = expand_ref_token(
+            token, available_agents, require_known_executor=require_known_executor
+        )
+        resolved.extend(expanded)
+        unresolved.extend(unknown)
+    return ordered_unique(resolved), ordered_unique(unresolved)
+
+
+def load_mode_aliases(path: Path) -> Dict[str, List[str]]:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError as exc:
+        raise ValueError(f"Mode manifest not found: {path.as_posix()}") from exc
+    except json.JSONDecodeError as exc:
+        raise ValueError(
+            f"{path.as_posix()}: invalid JSON at line {exc.lineno}, column {exc.colno}: {exc.msg}"
+        ) from exc
+
+    if (
+        not isinstance(payload, dict)
+        or type(payload.get("version")) is not int
+        or payload.get("version") != 1
+    ):
+        raise ValueError(f"{path.as_posix()}: mode manifest version must be 1")
+    modes = payload.get("modes")
+    if not isinstance(modes, list) or not modes:
+        raise ValueError(f"{path.as_posix()}: 'modes' must be a non-empty array")
+
+    aliases_by_agent: Dict[str, List[str]] = {}
+    seen_names: Set[str] = set()
+    seen_aliases: Set[str] = set()
+    for index, entry in enumerate(modes):
+        context = f"{path.as_posix()}: modes[{index}]"
+        if not isinstance(entry, dict):
+            raise ValueError(f"{context} must be an object")
+        name = entry.get("name")
+        agent = entry.get("agent")
+        aliases = entry.get("aliases")
+        if not isinstance(name, str) or SAFE_MODE_TOKEN_RE.fullmatch(name) is None:
+            raise ValueError(f"{context}.name must be a safe mode token")
+        if name.removeprefix("run-") in HOST_RESERVED_MODE_ALIASES:
+            raise ValueError(f"{context}.name is reserved for host-runtime behavior")
+        if name in seen_names:
+            raise ValueError(f"{context}.name duplicates mode '{name}'")
+        seen_names.add(name)
+        if (
+            not isinstance(agent, str)
+            or not agent.startswith(ORCHESTRATOR_PREFIX)
+            or SAFE_MODE_TOKEN_RE.fullmatch(agent) is None
+        ):
+            raise ValueError(f"{context}.agent must name an orchestrator agent")
+        if agent in aliases_by_agent:
+            raise ValueError(f"{context}.agent duplicates '{agent}'")
+        if not isinstance(aliases, list) or not aliases:
+            raise ValueError(f"{context}.aliases must be a non-empty array")
+
+        validated_aliases: List[str] = []
+        for alias_index, alias in enumerate(aliases):
+            if not isinstance(alias, str) or SAFE_MODE_TOKEN_RE.fullmatch(alias) is None:
+                raise ValueError(
+                    f"{context}.aliases[{alias_index}] must be a safe alias token"
+                )
+            if alias.removeprefix("run-") in HOST_RESERVED_MODE_ALIASES:
+                raise ValueError(
+                    f"{context}.aliases[{alias_index}] is reserved for host-runtime behavior"
+                )
+            if alias in seen_aliases:
+                raise ValueError(f"{context}.aliases duplicates alias '{alias}'")
+            seen_aliases.add(alias)
+            validated_aliases.append(alias)
+        if name not in validated_aliases:
+            raise ValueError(f"{context}.aliases must include canonical name '{name}'")
+        aliases_by_agent[agent] = validated_aliases
+
+    return aliases_by_agent
+
+
+def make_slash_input_adapter(runtime_label: str, aliases: Sequence[str]) -> str:
+    adapter = (
+        f"## {runtime_label} Input Adapter\n\n"
+        "Use the user's latest message as `raw_input`.\n"
+    )
+    if aliases:
+        alias_tokens = ", ".join(f"`/{alias}`" for alias in aliases)
+        adapter += (
+            f"If it starts with any manifest alias ({alias_tokens}), strip that first token, "
+            "then apply the existing flag parsing unchanged.\n"
+        )
+    return adapter
+
+
+def detect_installed_support_root(source_agents_dir: Path) -> Optional[str]:
+    support_root = source_agents_dir.resolve().parent
+    marker_path = support_root / SUPPORT_MARKER_FILENAME
+    try:
+        marker = json.loads(marker_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        return None
+    if not isinstance(marker, dict) or marker.get("tool") != SUPPORT_MARKER_TOOL:
+        return None
+    if type(marker.get("version")) is not int or marker.get("version") not in (1, 2, 3):
+        return None
+    if marker.get("version") == 3 and isinstance(marker.get("installed_root"), str):
+        return Path(marker["installed_root"]).expanduser().resolve().as_posix()
+    return support_root.as_posix()
+
+
+def rewrite_neutral_refs(
+    text: str,
+    support_root_ref: Optional[str],
+    source_support_root_ref: Optional[str] = None,
+    *,
+    ref_re: Pattern[str] = REPO_MANAGED_REF_RE,
+) -> str:
+    if not support_root_ref:
+        return text
+
+    normalized_root = support_root_ref.rstrip("/\\")
+    if source_support_root_ref:
+        text = text.replace(source_support_root_ref.rstrip("/\\"), normalized_root)
+    text = NODE_TOOL_REF_RE.sub(
+        lambda match: f'node "{normalized_root}/tools/{match.group(1)}.js"',
+        text,
+    )
+
+    def repl(match: re.Match[str]) -> str:
+        relative_path = match.group(1).removeprefix("./")
+        return f"{normalized_root}/{relative_path}"
+
+    return ref_re.sub(repl, text)
+
+
+def yaml_quote(value: str) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def resolve_runtime_model_settings(
+    agent_names: Sequence[str], args: argparse.Namespace, *, runtime: str
+) -> Dict[str, RuntimeModelSetting]:
+    if (
+        args.uniform_model is None
+        and (args.agent_profile or args.model_set)
+        and not (args.agent_profile and args.model_set)
+    ):
+        raise ValueError(
+            "--agent-profile and --model-set must be supplied together unless --uniform-model is used"
+        )
+
+    profile = (
+        load_profile(args.agent_profile, args.profile_dir, runtime)
+        if args.agent_profile
+        else None
+    )
+    model_set = (
+        load_model_set(args.model_set, args.model_set_dir, runtime)
+        if args.model_set
+        else None
+    )
+    return resolve_agent_model_settings(
+        agent_names,
+        profile,
+        model_set,
+        uniform_model=args.uniform_model,
+        runtime=runtime,
+    )
+
+
+def validate_managed_output_leaf(path: Path) -> None:
+    if is_linklike(path):
+        raise ValueError(f"Managed output must not be a symbolic link: {path}")
+    if path.exists() and not path.is_file():
+        raise ValueError(f"Managed output must be a regular file: {path}")
+
+
+def write_text(path: Path, content: str) -> bool:
+    """Atomically write ``content``; return ``False`` when the bytes already match."""
+
+    validate_managed_output_leaf(path)
+    if path.is_file():
+        try:
+            if path.read_bytes() == content.encode("utf-8"):
+                return False
+        except OSError:
+            pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    mode = path.stat().st_mode & 0o777 if path.exists() else 0o644
+    temp_path: Optional[Path] = None
+    try:
+        with tempfile.NamedTemporaryFile(
+            mode="w",
+            encoding="utf-8",
+            newline="\n",
+            dir=path.parent,
+            prefix=f".{path.name}.",
+            suffix=".tmp",
+            delete=False,
+        ) as handle:
+            temp_path = Path(handle.name)
+            handle.write(content)
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+        temp_path = None
+    finally:
+        if temp_path is not None:
+            temp_path.unlink(missing_ok=True)
+    return True
+
+
+class SourceModel:
+    """Canonical agents parsed once and shared by every runtime renderer.
+
+    Runtime bodies are memoized per agent file and status-writer variant, so
+    Claude and Copilot (and Copilot's ``-solo`` fallbacks) reuse the same
+    minified text instead of re-running the ``minify_*`` passes.
+    """
+
+    def __init__(self, source_agents_dir: Path, agents: Sequence[AgentSource]) -> None:
+        self.source_agents_dir = source_agents_dir
+        self.agents: List[AgentSource] = list(agents)
+        self._runtime_bodies: Dict[Tuple[str, bool], str] = {}
+
+    def matches(self, source_agents_dir: Path) -> bool:
+        return self.source_agents_dir.resolve() == source_agents_dir.resolve()
+
+    def rebased(self, source_agents_dir: Path) -> "SourceModel":
+        """Return a view whose agent paths use ``source_agents_dir`` spelling.
+
+        Generated headers embed ``agent.path``, so a caller that reached the
+        same directory through another path must not inherit this spelling.
+        The memoized runtime bodies are shared with the view.
+        """
+
+        if source_agents_dir == self.source_agents_dir:
+            return self
+        view = SourceModel(
+            source_agents_dir,
+            [
+                replace(agent, path=source_agents_dir / agent.path.name)
+                for agent in self.agents
+            ],
+        )
+        view._runtime_bodies = self._runtime_bodies
+        return view
+
+    def runtime_body(
+        self, agent: AgentSource, *, optional_status_writer: bool = False
+    ) -> str:
+        key = (agent.file_stem, optional_status_writer)
+        body = self._runtime_bodies.get(key)
+        if body is None:
+            body = prepare_runtime_body(
+                agent.name,
+                agent.body,
+                optional_status_writer=optional_status_writer,
+            )
+            self._runtime_bodies[key] = body
+        return body
+
+
+def load_source_model(source_agents_dir: Path) -> SourceModel:
+    return SourceModel(source_agents_dir, parse_source_agents(source_agents_dir))
+
+
+def resolve_source_model(
+    source_agents_dir: Path, source_model: Optional[SourceModel] = None
+) -> SourceModel:
+    """Reuse ``source_model`` for the same directory, otherwise parse afresh."""
+
+    if source_model is not None and source_model.matches(source_agents_dir):
+        return source_model.rebased(source_agents_dir)
+    return load_source_model(source_agents_dir)
+
+
+RENDER_CACHE_DIRNAME = ".agents-pipeline-render-cache"
+RENDER_CACHE_VERSION = 1
+# Sibling modules the exporters import to render roles; editing any of them
+# must invalidate every cached render.
+RENDER_HELPER_MODULES = (
+    "agent_export_engine.py",
+    "agent_model_profiles.py",
+    "codex_mode_aliases.py",
+    "path_safety.py",
+)
+
+
+def render_key(*parts: object) -> str:
+    payload = json.dumps(
+        parts, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """Per-agent rendered outputs addressed by a hash of every render input.
+
+    Entries live as ``<key>.json`` under ``root`` and map output paths relative
+    to the target directory to their content.  A key covers the exporter
+    source and every ``RENDER_HELPER_MODULES`` source, the parsed agent, and
+    whatever per-agent inputs the caller passes (model setting, mode aliases,
+    resolved references, support roots), so an unchanged agent is served
+    without re-minifying or re-rendering.
+    ``root=None`` disables the cache; lookups then always miss.
+    """
+
+    def __init__(self, root: Optional[Path], *, renderer: Optional[Path] = None) -> None:
+        self.root = root
+        self.hits = 0
+        self._renderer = renderer
+        self._fingerprint: Optional[str] = None
+        self._used: Set[str] = set()
+        self._pending: Dict[str, Dict[str, str]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None
+
+    def agent_key(self, agent: AgentSource, *parts: object) -> str:
+        if self.root is None:
+            return ""
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            if self._renderer is not None:
+                digest.update(self._renderer.read_bytes())
+                digest.update(b"\0")
+            helper_dir = Path(__file__).resolve().parent
+            for name in RENDER_HELPER_MODULES:
+                # Non-Codex support trees may not ship every helper.
+                path = helper_dir / name
+                digest.update(path.read_bytes() if path.is_file() else b"absent")
+                digest.update(b"\0")
+            self._fingerprint = digest.hexdigest()
+        return render_key(
+            RENDER_CACHE_VERSION,
+            self._fingerprint,
+            agent.path.as_posix(),
+            agent.name,
+            agent.description,
+            agent.kind,
+            sorted(agent.tools.items()),
+            agent.body,
+            *parts,
+        )
+
+    def lookup(self, key: str) -> Optional[Dict[str, str]]:
+        if self.root is None or not key:
+            return None
+        self._used.add(key)
+        path = self.root / f"{key}.json"
+        if is_linklike(path) or not path.is_file():
+            return None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError):
+            return None
+        outputs = data.get("outputs") if isinstance(data, dict) else None
+        if (
+            not isinstance(outputs, dict)
+            or data.get("version") != RENDER_CACHE_VERSION
+            or not all(
+                isinstance(name, str) and isinstance(content, str)
+                for name, content in outputs.items()
+            )
+        ):
+            return None
+        self.hits += 1
+        return outputs
+
+    def store(self, key: str, outputs: Dict[str, str]) -> None:
+        if self.root is None or not key:
+            return
+        self._used.add(key)
+        self._pending[key] = dict(outputs)
+
+    def save(self) -> None:
+        """Persist new entries and drop entries this run no longer produced."""
+
+        if self.root is None:
+            return
+        if is_linklike(self.root) or (self.root.exists() and not self.root.is_dir()):
+            raise ValueError(f"Render cache must be a real directory: {self.root}")
+        self.root.mkdir(parents=True, exist_ok=True)
+        for key, outputs in self._pending.items():
+            write_text(
+                self.root / f"{key}.json",
+                json.dumps(
+                    {"outputs": outputs, "version": RENDER_CACHE_VERSION},
+                    ensure_ascii=False,
+                    sort_keys=True,
+                )
+                + "\n",
+            )
+        self._pending.clear()
+        for path in self.root.glob("*.json"):
+            if path.stem not in self._used and path.is_file() and not is_linklike(path):
+                path.unlink()
+
+
+def open_render_cache(
+    target_dir: Path, *, enabled: bool, renderer: Path
+) -> RenderCache:
+    """Return the target's render cache, or a disabled cache when not requested."""
+
+    return RenderCache(
+        target_dir / RENDER_CACHE_DIRNAME if enabled else None, renderer=renderer
+    )
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""Precomputed agent profile and model-set catalog for fast listings.
+
+``tools/agent-profile.py list`` reports every neutral agent profile and the
+runtime model sets.  Rather than globbing and parsing each JSON file per call,
+the support-tree sync writes the same listing once, at install time, to
+``tools/agent-profile-catalog.json``.  The catalog is stamped with the
+pipeline ``VERSION`` and the name, size, modification time, and inode of
+every installed file it summarizes; a reader trusts it only while that stamp
+matches the installed files and otherwise falls back to a scan.
+
+``tools/agent-profile.py`` answers a plain ``list --runtime <name>`` from this
+module alone, before importing the profile manager, so it sticks to ``os.path``
+and ``json``: ``pathlib`` and ``typing`` would roughly double that call's
+startup cost.  Directories may be given as strings or path objects.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+
+
+CATALOG_RELATIVE_PATH = "tools/agent-profile-catalog.json"
+CATALOG_TOOL = "agents_pipeline.agent-profile-catalog"
+CATALOG_VERSION = 1
+PROFILE_DIR_RELATIVE = "tools/agent-profiles"
+CATALOG_RUNTIMES = ("codex", "claude", "copilot")
+REQUIRED_MODEL_TIERS = ("mini", "standard", "strong")
+
+# Annotation-only alias; annotations are never evaluated here.
+StrPath = "str | os.PathLike[str]"
+
+
+class CatalogError(ValueError):
+    """An agent profile or runtime model set that cannot be listed."""
+
+
+def default_model_set_dir(asset_root: StrPath, runtime: str) -> str:
+    return os.path.join(asset_root, "runtimes", runtime, "model-sets")
+
+
+def _join(directory: StrPath, relative: str) -> str:
+    return os.path.join(directory, *relative.split("/"))
+
+
+def _posix(path: str) -> str:
+    return path if os.sep == "/" else path.replace(os.sep, "/")
+
+
+def _same_path(left: StrPath, right: StrPath) -> bool:
+    return os.path.normcase(os.path.normpath(left)) == os.path.normcase(os.path.normpath(right))
+
+
+def _read_text(path: str) -> str:
+    with open(path, encoding="utf-8") as handle:
+        return handle.read()
+
+
+def _json_paths(directory: StrPath) -> list[str]:
+    directory = os.fspath(directory)
+    return [
+        os.path.join(directory, name)
+        for name in sorted(os.listdir(directory), key=os.path.normcase)
+        if name.endswith(".json")
+    ]
+
+
+def _load_json_object(path: str, label: str) -> dict[str, object]:
+    if os.path.islink(path):
+        raise CatalogError(f"{label} must not be a symbolic link: {path}")
+    if not os.path.isfile(path):
+        raise CatalogError(f"{label} not found: {path}")
+    try:
+        value = json.loads(_read_text(path))
+    except json.JSONDecodeError as exc:
+        raise CatalogError(
+            f"Invalid JSON in {label.lower()} {path} at line {exc.lineno}, column {exc.colno}: {exc.msg}"
+        ) from exc
+    except (OSError, UnicodeDecodeError) as exc:
+        raise CatalogError(f"Unable to read {label.lower()} as UTF-8: {path}") from exc
+    if not isinstance(value, dict):
+        raise CatalogError(f"{label} JSON must be an object: {path}")
+    return value
+
+
+def scan_profiles(profile_dir: StrPath) -> list[dict[str, object]]:
+    """Parse every neutral profile in ``profile_dir``, sorted by file name."""
+
+    if not os.path.isdir(profile_dir):
+        raise CatalogError(f"Profile directory not found: {profile_dir}")
+    profiles: list[dict[str, object]] = []
+    for path in _json_paths(profile_dir):
+        value = _load_json_object(path, "Agent profile")
+        if value.get("runtime") != "neutral":
+            raise CatalogError(f"Profile runtime must be 'neutral': {path}")
+        name = value.get("name")
+        models = value.get("models")
+        if not isinstance(name, str) or not name or not isinstance(models, dict) or not models:
+            raise CatalogError(f"Invalid neutral profile shape: {path}")
+        profiles.append(
+            {
+                "name": name,
+                "description": value.get("description") or "",
+                "agent_count": len(models),
+                "path": _posix(path),
+            }
+        )
+    return profiles
+
+
+def scan_model_sets(runtime: str, model_set_dir: StrPath) -> list[dict[str, object]]:
+    """Parse every ``runtime`` model set in ``model_set_dir``, sorted by file name."""
+
+    if not os.path.isdir(model_set_dir):
+        raise CatalogError(f"Model-set directory not found for {runtime}: {model_set_dir}")
+    model_sets: list[dict[str, object]] = []
+    for path in _json_paths(model_set_dir):
+        value = _load_json_object(path, "Runtime model set")
+        if value.get("runtime") != runtime:
+            raise CatalogError(f"Model-set runtime must be '{runtime}': {path}")
+        name = value.get("name")
+        tiers = value.get("tiers")
+        if not isinstance(name, str) or not name or not isinstance(tiers, dict):
+            raise CatalogError(f"Invalid runtime model-set shape: {path}")
+        missing = [tier for tier in REQUIRED_MODEL_TIERS if tier not in tiers]
+        if missing:
+            raise CatalogError(f"Model set is missing tiers {', '.join(missing)}: {path}")
+        model_sets.append(
+            {
+                "name": name,
+                "description": value.get("description") or "",
+                "tiers": tiers,
+                "path": _posix(path),
+            }
+        )
+    return model_sets
+
+
+def is_catalogued(relative: str) -> bool:
+    """Whether the support-tree path ``relative`` is summarized by the catalog."""
+
+    parent, _, name = relative.rpartition("/")
+    return name.endswith(".json") and parent in {
+        PROFILE_DIR_RELATIVE,
+        *(f"runtimes/{runtime}/model-sets" for runtime in CATALOG_RUNTIMES),
+    }
+
+
+def _json_file_stamps(directory: StrPath) -> dict[str, list[int]]:
+    """The stamp of one catalog section: each ``*.json`` entry's identity.
+
+    Every name maps to ``[size, mtime_ns, inode]``, so an edit that keeps a
+    file's size, or a replacement by rename, still invalidates the section.
+    """
+
+    stamps: dict[str, list[int]] = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.endswith(".json"):
+                info = entry.stat(follow_symlinks=False)
+                stamps[entry.name] = [info.st_size, info.st_mtime_ns, entry.inode()]
+    return stamps
+
+
+def _section(directory: StrPath, entries: list[dict[str, object]]) -> dict[str, object]:
+    return {
+        "files": _json_file_stamps(directory),
+        "entries": [
+            {
+                **{key: value for key, value in entry.items() if key != "path"},
+                "file": entry["path"].rpartition("/")[2],
+            }
+            for entry in entries
+        ],
+    }
+
+
+def catalog_text(asset_root: StrPath) -> str | None:
+    """Render the catalog for ``asset_root``, or None when a scan would fail.
+
+    The stamp describes the files as they sit under ``asset_root``, so the
+    catalog is rendered from the tree that will be installed, after its
+    files are in place.  Without a catalog, listings rescan and report the
+    underlying problem.
+    """
+
+    try:
+        profile_dir = _join(asset_root, PROFILE_DIR_RELATIVE)
+        payload = {
+            "tool": CATALOG_TOOL,
+            "version": CATALOG_VERSION,
+            "profiles": _section(profile_dir, scan_profiles(profile_dir)),
+            "model_sets": {
+                runtime: _section(
+                    default_model_set_dir(asset_root, runtime),
+                    scan_model_sets(runtime, default_model_set_dir(asset_root, runtime)),
+                )
+                for runtime in CATALOG_RUNTIMES
+            },
+        }
+        payload["pipeline_version"] = _read_text(os.path.join(asset_root, "VERSION")).strip()
+    except (CatalogError, OSError, UnicodeError):
+        return None
+    return json.dumps(payload, indent=2, sort_keys=True, ensure_ascii=False) + "\n"
+
+
+def _current_entries(section: object, directory: StrPath) -> list[dict[str, object]]:
+    if not isinstance(section, dict) or section.get("files") != _json_file_stamps(directory):
+        raise CatalogError(f"Catalog section is stale: {directory}")
+    return [
+        {
+            **{key: value for key, value in entry.items() if key != "file"},
+            "path": _posix(os.path.join(directory, entry["file"])),
+        }
+        for entry in section["entries"]
+    ]
+
+
+def load_catalog_listing(
+    asset_root: StrPath, runtime: str, profile_dir: StrPath, model_set_dir: StrPath
+) -> tuple[list[dict[str, object]], list[dict[str, object]]] | None:
+    """Return ``(profiles, model_sets)`` from a current catalog, else None.
+
+    Only the default profile and model-set directories of ``asset_root`` are
+    catalogued; a missing, stale, or malformed catalog means "scan instead".
+    """
+
+    if not _same_path(profile_dir, _join(asset_root, PROFILE_DIR_RELATIVE)) or not _same_path(
+        model_set_dir, default_model_set_dir(asset_root, runtime)
+    ):
+        return None
+    path = _join(asset_root, CATALOG_RELATIVE_PATH)
+    try:
+        if os.path.islink(path):
+            return None
+        data = json.loads(_read_text(path))
+        if (
+            not isinstance(data, dict)
+            or data.get("tool") != CATALOG_TOOL
+            or data.get("version") != CATALOG_VERSION
+            or data.get("pipeline_version")
+            != _read_text(os.path.join(asset_root, "VERSION")).strip()
+            or not isinstance(data.get("model_sets"), dict)
+        ):
+            return None
+        return (
+            _current_entries(data.get("profiles"), profile_dir),
+            _current_entries(data["model_sets"].get(runtime), model_set_dir),
+        )
+    except (OSError, UnicodeError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def catalog_is_current(asset_root: StrPath) -> bool:
+    """Whether the installed catalog is current for every runtime."""
+
+    return all(
+        load_catalog_listing(
+            asset_root,
+            runtime,
+            _join(asset_root, PROFILE_DIR_RELATIVE),
+            default_model_set_dir(asset_root, runtime),
+        )
+        is not None
+        for runtime in CATALOG_RUNTIMES
+    )
+
+
+def render_listing(
+    runtime: str,
+    profiles: list[dict[str, object]],
+    model_sets: list[dict[str, object]],
+    *,
+    as_json: bool,
+) -> str:
+    """The ``list`` output for ``runtime``, as JSON or as readable text."""
+
+    if as_json:
+        payload = {"runtime": runtime, "profiles": profiles, "model_sets": model_sets}
+        return json.dumps(payload, indent=2, sort_keys=True, ensure_ascii=False) + "\n"
+    lines = [f"Runtime: {runtime}", "Profiles:"]
+    lines.extend(
+        f"- {profile['name']}: {profile['agent_count']} agents. {profile['description']}"
+        for profile in profiles
+    )
+    lines.append("- uniform: apply one model to every generated agent")
+    lines.append("Model sets:")
+    lines.extend(
+        f"- {model_set['name']}: {json.dumps(model_set['tiers'], sort_keys=True, ensure_ascii=False)}"
+        for model_set in model_sets
+    )
+    return "\n".join(lines) + "\n"
+
+
+def quick_listing(asset_root: StrPath, argv: list[str]) -> str | None:
+    """Render a plain ``list`` from a current catalog, else None.
+
+    Only ``list --runtime <name>`` with an optional ``--json`` against the
+    default asset root qualifies; any other argument, or a missing or stale
+    catalog, leaves the request to the full profile manager.
+    """
+
+    if not argv or argv[0] != "list" or os.environ.get("AGENTS_PIPELINE_ASSET_ROOT"):
+        return None
+    runtime: str | None = None
+    as_json = False
+    options = iter(argv[1:])
+    for option in options:
+        if option in ("--json", "-Json") and not as_json:
+            as_json = True
+        elif option in ("--runtime", "-Runtime") and runtime is None:
+            runtime = next(options, "").lower()
+        elif option.startswith("--runtime=") and runtime is None:
+            runtime = option.partition("=")[2].lower()
+        else:
+            return None
+    if runtime not in CATALOG_RUNTIMES:
+        return None
+    asset_root = os.path.realpath(asset_root)
+    listing = load_catalog_listing(
+        asset_root,
+        runtime,
+        os.path.realpath(_join(asset_root, PROFILE_DIR_RELATIVE)),
+        os.path.realpath(default_model_set_dir(asset_root, runtime)),
+    )
+    if listing is None:
+        return None
+    return render_listing(runtime, *listing, as_json=as_json)
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""Measure exported agent prompt sizes and gate growth against a baseline.
+
+Runs the Codex, Claude Code, and Copilot exporters in one process over a
+source agent set, records bytes, lines, and estimated tokens for every
+generated file, and reports what each orchestrator ``minify_*`` transform
+saves.  Sizes are compared with a stored baseline; any generated file whose
+estimated tokens grow by more than ``--max-growth-percent`` fails the run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import math
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPT_DIR = REPO_ROOT / "scripts"
+if SCRIPT_DIR.as_posix() not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR.as_posix())
+
+from agent_export_engine import (  # noqa: E402
+    iter_orchestrator_minify_steps,
+    load_source_model,
+)
+
+
+BASELINE_VERSION = 1
+DEFAULT_BASELINE = SCRIPT_DIR / "fixtures" / "prompt-size-baseline.json"
+DEFAULT_MAX_GROWTH_PERCENT = 2.0
+RUNTIMES = ("codex", "claude", "copilot")
+# Codex exports the strict status-writer variant; Claude Code and Copilot use
+# the optional-writer (Tier 2) variant of the orchestrator rewrites.
+TRANSFORM_VARIANTS = (("codex", False), ("tier2", True))
+SOURCE_PLACEHOLDER = "<source-agents>"
+TOKEN_ESTIMATE = "ceil(characters / 4)"
+
+
+def measure(text: str) -> Dict[str, int]:
+    return {
+        "bytes": len(text.encode("utf-8")),
+        "lines": len(text.splitlines()),
+        "tokens": math.ceil(len(text) / 4),
+    }
+
+
+def load_combined_exporter():
+    path = SCRIPT_DIR / "export-runtime-agents.py"
+    spec = importlib.util.spec_from_file_location("agents_pipeline_export_runtime", path)
+    if spec is None or spec.loader is None:
+        raise ValueError(f"Unable to load exporter: {path.as_posix()}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def transform_report(source_agents: Path) -> Dict[str, Any]:
+    """Size each orchestrator body before and after every minify transform."""
+
+    model = load_source_model(source_agents)
+    report: Dict[str, Any] = {}
+    for agent in model.agents:
+        body = agent.body.replace("$ARGUMENTS", "raw_input")
+        variants: Dict[str, Any] = {}
+        for variant, optional_status_writer in TRANSFORM_VARIANTS:
+            before = measure(body)
+            steps: List[Dict[str, Any]] = []
+            previous = before
+            for name, text in iter_orchestrator_minify_steps(
+                agent.name, body, optional_status_writer=optional_status_writer
+            ):
+                current = measure(text)
+                steps.append(
+                    {"transform": name, **current, "saved_tokens": previous["tokens"] - current["tokens"]}
+                )
+                previous = current
+            if steps:
+                variants[variant] = {"before": before, "after": previous, "steps": steps}
+        if variants:
+            report[agent.name] = variants
+    return report
+
+
+def export_sizes(source_agents: Path) -> Dict[str, Dict[str, Dict[str, int]]]:
+    """Export every runtime into a temp tree and size each generated file."""
+
+    exporter = load_combined_exporter()
+    source_text = source_agents.resolve().as_posix()
+    sizes: Dict[str, Dict[str, Dict[str, int]]] = {}
+    with tempfile.TemporaryDirectory(prefix="prompt-size-") as temp_name:
+        temp_root = Path(temp_name)
+        argv = ["--source-agents", source_agents.as_posix()]
+        for runtime in RUNTIMES:
+            argv.extend([f"--{runtime}-target-dir", (temp_root / runtime).as_posix()])
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            status = exporter.main(argv)
+        if status != 0:
+            raise ValueError(f"Export failed with exit code {status}: {stderr.getvalue().strip()}")
+        for runtime in RUNTIMES:
+            target = temp_root / runtime
+            sizes[runtime] = {
+                path.relative_to(target).as_posix(): measure(
+                    # Headers name the absolute source path; keep sizes checkout-independent.
+                    path.read_text(encoding="utf-8").replace(source_text, SOURCE_PLACEHOLDER)
+                )
+                for path in sorted(target.rglob("*"))
+                if path.is_file()
+            }
+    return sizes
+
+
+def totals(sizes: Dict[str, Dict[str, Dict[str, int]]]) -> Dict[str, Dict[str, int]]:
+    return {
+        runtime: {
+            key: sum(entry[key] for entry in files.values()) for key in ("bytes", "lines", "tokens")
+        }
+        for runtime, files in sizes.items()
+    }
+
+
+def compare(
+    baseline: Dict[str, Any], sizes: Dict[str, Dict[str, Dict[str, int]]], max_growth_percent: float
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Classify per-file differences from the baseline."""
+
+    result: Dict[str, List[Dict[str, Any]]] = {
+        "regressions": [],
+        "changed": [],
+        "added": [],
+        "removed": [],
+    }
+    previous = baseline.get("outputs", {})
+    for runtime in RUNTIMES:
+        before_files = previous.get(runtime, {})
+        after_files = sizes.get(runtime, {})
+        for name in sorted(set(before_files) | set(after_files)):
+            before = before_files.get(name)
+            after = after_files.get(name)
+            entry: Dict[str, Any] = {"runtime": runtime, "file": name}
+            if before is None:
+                result["added"].append({**entry, **after})
+                continue
+            if after is None:
+                result["removed"].append({**entry, **before})
+                continue
+            delta = after["tokens"] - before["tokens"]
+            if delta == 0 and after["bytes"] == before["bytes"]:
+                continue
+            percent = (delta / before["tokens"] * 100) if before["tokens"] else math.inf
+            entry.update(
+                before_tokens=before["tokens"],
+                after_tokens=after["tokens"],
+                delta_tokens=delta,
+                delta_percent=round(percent, 2),
+            )
+            result["changed"].append(entry)
+            if percent > max_growth_percent:
+                result["regressions"].append(entry)
+    return result
+
+
+def render_baseline(sizes: Dict[str, Dict[str, Dict[str, int]]]) -> str:
+    payload = {
+        "version": BASELINE_VERSION,
+        "token_estimate": TOKEN_ESTIMATE,
+        "totals": totals(sizes),
+        "outputs": sizes,
+    }
+    return json.dumps(payload, indent=2) + "\n"
+
+
+def print_report(
+    sizes: Dict[str, Dict[str, Dict[str, int]]],
+    transforms: Dict[str, Any],
+    diff: Optional[Dict[str, List[Dict[str, Any]]]],
+    max_growth_percent: float,
+) -> None:
+    print("Runtime totals (estimated tokens = " + TOKEN_ESTIMATE + "):")
+    for runtime, total in totals(sizes).items():
+        print(
+            f"  {runtime:<8} {len(sizes[runtime]):>3} files  {total['bytes']:>9} bytes  "
+            f"{total['lines']:>7} lines  {total['tokens']:>8} tokens"
+        )
+    print("Orchestrator minify transforms (codex variant, tokens before -> after):")
+    for agent, variants in transforms.items():
+        codex = variants.get("codex")
+        if codex is None:
+            continue
+        saved = [
+            f"{step['transform'].replace('minify_', '')} {-step['saved_tokens']:+d}"
+            for step in codex["steps"]
+            if step["saved_tokens"]
+        ]
+        print(
+            f"  {agent}: {codex['before']['tokens']} -> {codex['after']['tokens']}"
+            + (f" ({', '.join(saved)})" if saved else "")
+        )
+    if diff is None:
+        return
+    for entry in diff["changed"]:
+        marker = "FAIL" if entry in diff["regressions"] else "    "
+        print(
+            f"{marker} {entry['runtime']}/{entry['file']}: {entry['before_tokens']} -> "
+            f"{entry['after_tokens']} tokens ({entry['delta_percent']:+.2f}%)"
+        )
+    for entry in diff["added"]:
+        print(f"new  {entry['runtime']}/{entry['file']}: {entry['tokens']} tokens")
+    for entry in diff["removed"]:
+        print(f"gone {entry['runtime']}/{entry['file']}: {entry['tokens']} tokens")
+    if diff["regressions"]:
+        print(
+            f"{len(diff['regressions'])} generated file(s) grew by more than "
+            f"{max_growth_percent:g}% over the baseline; refresh with --update-baseline "
+            "if the growth is intended.",
+            file=sys.stderr,
+        )
+    else:
+        print(f"No generated file grew by more than {max_growth_percent:g}% over the baseline.")
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Measure exported agent prompt sizes and fail on growth over a baseline."
+    )
+    parser.add_argument(
+        "--source-agents",
+        default=(REPO_ROOT / "agents").as_posix(),
+        help="Directory containing the source agent markdown fixture set.",
+    )
+    parser.add_argument(
+        "--baseline",
+        default=DEFAULT_BASELINE.as_posix(),
+        help="Stored size baseline JSON.",
+    )
+    parser.add_argument(
+        "--max-growth-percent",
+        type=float,
+        default=DEFAULT_MAX_GROWTH_PERCENT,
+        help=f"Fail when a generated file's estimated tokens grow by more than this (default: {DEFAULT_MAX_GROWTH_PERCENT:g}).",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write the current sizes to --baseline instead of comparing.",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    source_agents = Path(args.source_agents).expanduser()
+    baseline_path = Path(args.baseline).expanduser()
+    if not source_agents.is_dir():
+        print(f"Source directory not found: {source_agents}", file=sys.stderr)
+        return 2
+    try:
+        sizes = export_sizes(source_agents)
+        transforms = transform_report(source_agents)
+    except ValueError as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(render_baseline(sizes), encoding="utf-8")
+        print(f"Updated baseline: {baseline_path}")
+        return 0
+
+    diff = None
+    if baseline_path.exists():
+        try:
+            baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        except ValueError as exc:
+            print(f"{baseline_path}: invalid JSON: {exc}", file=sys.stderr)
+            return 2
+        if not isinstance(baseline, dict) or baseline.get("version") != BASELINE_VERSION:
+            print(f"{baseline_path}: baseline version must be {BASELINE_VERSION}", file=sys.stderr)
+            return 2
+        diff = compare(baseline, sizes, args.max_growth_percent)
+    else:
+        print(f"Baseline not found: {baseline_path}; reporting sizes only.", file=sys.stderr)
+
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "token_estimate": TOKEN_ESTIMATE,
+                    "totals": totals(sizes),
+                    "outputs": sizes,
+                    "transforms": transforms,
+                    "baseline_diff": diff,
+                },
+                indent=2,
+            )
+        )
+    else:
+        print_report(sizes, transforms, diff, args.max_growth_percent)
+    return 1 if diff and diff["regressions"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -279,6 +279,10 @@ try {
             "tools/capability-recovery.js"
         )
     }
+    # v0.35.x and older bundles predate the shared in-process export engine.
+    if ((ConvertTo-NeutralBundleVersion -ReleaseTag $releaseTag) -ge [version]"0.36.0") {
+        $requiredBundlePaths += "scripts/agent_export_engine.py"
+    }
     foreach ($requiredPath in $requiredBundlePaths) {
         $resolvedRequiredPath = Join-Path $bundleDir.FullName $requiredPath
         if (-not (Test-Path -LiteralPath $resolvedRequiredPath)) {
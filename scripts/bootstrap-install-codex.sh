@@ -498,6 +498,10 @@ if release_at_least "${RELEASE_TAG}" "v0.35.0"; then
     "tools/capability-recovery.js"
   )
 fi
+# v0.35.x and older bundles predate the shared in-process export engine.
+if release_at_least "${RELEASE_TAG}" "v0.36.0"; then
+  REQUIRED_BUNDLE_PATHS+=("scripts/agent_export_engine.py")
+fi
 for required_path in "${REQUIRED_BUNDLE_PATHS[@]}"; do
   if [[ ! -e "${BUNDLE_DIR}/${required_path}" ]]; then
     echo "Codex bundle layout is incomplete; missing: ${required_path}" >&2
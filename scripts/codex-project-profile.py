@@ -4,7 +4,11 @@
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
+import contextlib
+import errno
 import hashlib
+import importlib.util
 import json
 import os
 import re
@@ -13,19 +17,27 @@ import stat
 import subprocess
 import sys
 import tempfile
+import time
 from pathlib import Path
-from typing import Any, Mapping, Sequence
+from types import ModuleType
+from typing import Any, Callable, Iterator, Mapping, Sequence
 
 try:  # Python 3.11+ is required for safe TOML validation.
     import tomllib
 except ImportError:  # pragma: no cover - exercised only on Python 3.10.
     tomllib = None  # type: ignore[assignment]
 
+try:  # Advisory locks are POSIX-only; Windows keeps the unlocked behavior.
+    import fcntl
+except ImportError:  # pragma: no cover - exercised only on Windows.
+    fcntl = None  # type: ignore[assignment]
+
 from codex_skill_catalog import (
     MANAGED_SKILL_NAMES,
     SKILL_MARKER_VERSION,
     SKILL_SYNC_STATE_PENDING,
     SKILL_SYNC_STATE_READY,
+    SkillDigestIndex,
     skill_collection_issues,
 )
 from agent_model_profiles import (
@@ -33,16 +45,38 @@ from agent_model_profiles import (
     load_profile,
     resolve_recovery_model_setting,
 )
+from object_pool import ObjectPool, ObjectPoolError, open_object_pool
 
 
+SCRIPT_DIR = Path(__file__).resolve().parent
+CODEX_EXPORTER_MODULE = "agents_pipeline_codex_project_exporter"
 PROJECT_MANIFEST_FILENAME = ".agents-pipeline-project-profile.json"
 CACHE_MANIFEST_FILENAME = ".agents-pipeline-profile-cache.json"
 GLOBAL_MANIFEST_FILENAME = ".agents-pipeline-codex-manifest.json"
 SUPPORT_MARKER_FILENAME = ".agents-pipeline-support.json"
+DIGEST_INDEX_FILENAME = ".agents-pipeline-digest-index.json"
+WORKSPACE_REGISTRY_FILENAME = ".agents-pipeline-workspaces.json"
+WORKSPACE_REGISTRY_LOCK_FILENAME = ".agents-pipeline-workspaces.lock"
+PROJECT_LOCK_FILENAME = ".agents-pipeline-project-profile.lock"
 PROJECT_MANIFEST_TOOL = "agents_pipeline.codex-project-profile"
 CACHE_MANIFEST_TOOL = "agents_pipeline.codex-profile-cache"
 GLOBAL_MANIFEST_TOOL = "agents_pipeline.install-codex-config"
 SUPPORT_MARKER_TOOL = "agents_pipeline.sync-runtime-support"
+DIGEST_INDEX_TOOL = "agents_pipeline.codex-project-profile-digest-index"
+WORKSPACE_REGISTRY_TOOL = "agents_pipeline.codex-project-profile-workspaces"
+WORKSPACE_REGISTRY_VERSION = 1
+DEFAULT_CACHE_MAX_ENTRIES = 16
+# Staging and backup siblings younger than this may belong to a running export.
+CACHE_LEFTOVER_GRACE_SECONDS = 3600
+LOCK_TIMEOUT_ENV = "AGENTS_PIPELINE_LOCK_TIMEOUT"
+DEFAULT_LOCK_TIMEOUT_SECONDS = 60.0
+LOCK_POLL_SECONDS = 0.05
+DIGEST_INDEX_VERSION = 1
+DIGEST_INDEX_MAX_FILES = 4096
+DIGEST_INDEX_MAX_DIGESTS = 256
+# Files modified this recently are hashed but never recorded: a same-size
+# rewrite inside the filesystem's timestamp granularity must not hit.
+DIGEST_INDEX_SETTLE_NS = 2_000_000_000
 PROJECT_MANIFEST_VERSION = 2
 SUPPORTED_PROJECT_MANIFEST_VERSIONS = (1, PROJECT_MANIFEST_VERSION)
 CACHE_MANIFEST_VERSION = 2
@@ -68,7 +102,11 @@ SUPPORT_COMMON_REQUIRED_FILES = (
     "protocols/capability-recovery-policy.json",
     "scripts/agent-profile.sh",
     "scripts/agent-profile.ps1",
+    "scripts/agent_export_engine.py",
     "scripts/agent_model_profiles.py",
+    "scripts/agent_profile_catalog.py",
+    "scripts/agent_profile_manager.py",
+    "scripts/object_pool.py",
     "scripts/path_safety.py",
     "scripts/sync-runtime-support.py",
     "tools/agent-profile.py",
@@ -207,6 +245,91 @@ def _atomic_json(path: Path, payload: Mapping[str, Any]) -> None:
     )
 
 
+def _lock_timeout() -> float:
+    raw = os.environ.get(LOCK_TIMEOUT_ENV)
+    if raw is None or not raw.strip():
+        return DEFAULT_LOCK_TIMEOUT_SECONDS
+    try:
+        value = float(raw)
+    except ValueError:
+        value = -1.0
+    if not value >= 0:
+        raise ProjectProfileError(f"{LOCK_TIMEOUT_ENV} must be a number of seconds >= 0.")
+    return value
+
+
+@contextlib.contextmanager
+def _advisory_lock(
+    path: Path, *, shared: bool, timeout: float | None = None, persistent: bool = False
+) -> Iterator[None]:
+    """Hold an advisory ``flock`` on ``path`` for the duration of the block.
+
+    Readers take shared locks and writers exclusive ones.  Readers of a
+    ``persistent`` lock file create it too, so they always hold a real lock;
+    otherwise a reader whose lock file does not exist proceeds unlocked.
+    Either way a reader proceeds unlocked when the lock's directory is
+    missing, since no writer can hold it.  A lock file removed while waiting
+    is noticed by its replaced inode and reopened.  Waits are bounded by
+    ``timeout`` (default: ``AGENTS_PIPELINE_LOCK_TIMEOUT`` seconds) and raise
+    ProjectProfileError.
+    """
+
+    if fcntl is None:
+        yield
+        return
+    _validate_leaf(path, "Profile lock file")
+    wait = _lock_timeout() if timeout is None else timeout
+    deadline = time.monotonic() + wait
+    flags = getattr(os, "O_NOFOLLOW", 0) | getattr(os, "O_CLOEXEC", 0)
+    flags |= os.O_RDONLY if shared else os.O_RDWR
+    if persistent or not shared:
+        flags |= os.O_CREAT
+    operation = (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB
+    fd: int | None = None
+    while fd is None:
+        if not shared:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            fd = os.open(path, flags, 0o644)
+        except FileNotFoundError:
+            if not shared:
+                raise
+            break
+        except OSError as exc:
+            if shared and flags & os.O_CREAT and exc.errno in (errno.EACCES, errno.EROFS):
+                # A read-only workspace: share an existing lock file, if any.
+                flags &= ~os.O_CREAT
+                continue
+            raise ProjectProfileError(f"Unable to open profile lock file: {path}") from exc
+        try:
+            fcntl.flock(fd, operation)
+            opened = os.fstat(fd)
+            current = os.stat(path, follow_symlinks=False)
+            if (opened.st_dev, opened.st_ino) != (current.st_dev, current.st_ino):
+                raise FileNotFoundError(path)
+        except (BlockingIOError, FileNotFoundError) as exc:
+            # Busy, or the holder removed the file while we waited on it.
+            os.close(fd)
+            fd = None
+            if time.monotonic() >= deadline:
+                mode = "shared" if shared else "exclusive"
+                raise ProjectProfileError(
+                    f"Timed out after {wait:g}s waiting for a {mode} profile lock: {path}; "
+                    "another profile operation is still running."
+                ) from exc
+            time.sleep(LOCK_POLL_SECONDS)
+    try:
+        yield
+    finally:
+        if fd is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+
+def _cache_lock_path(cache_dir: Path) -> Path:
+    return cache_dir.parent / f".{cache_dir.name}.lock"
+
+
 def _safe_agent_names(value: Any, *, label: str) -> list[str]:
     if not isinstance(value, list) or not all(
         isinstance(item, str) and AGENT_NAME_RE.fullmatch(item) for item in value
@@ -231,6 +354,174 @@ def _sha256_file(path: Path) -> str:
     return digest.hexdigest()
 
 
+StatKey = list[int]
+
+
+def _stat_key(stat_result: os.stat_result) -> StatKey:
+    return [stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino]
+
+
+class DigestIndex:
+    """Persisted SHA-256 results keyed by path, size, ``mtime_ns``, and inode.
+
+    The index lives beside the global profile caches and is purely advisory:
+    a missing, stale, or unreadable index only costs a re-hash.  With
+    ``verify=True`` recorded entries are ignored and every input is hashed
+    again, refreshing the index as it goes.
+    """
+
+    def __init__(
+        self,
+        path: Path | None,
+        *,
+        root: Path | None = None,
+        verify: bool = False,
+        files: Mapping[str, list[Any]] | None = None,
+        digests: Mapping[str, list[Any]] | None = None,
+    ) -> None:
+        self.path = path
+        self.root = root
+        self.verify = verify
+        self._files: dict[str, list[Any]] = dict(files or {})
+        self._digests: dict[str, list[Any]] = dict(digests or {})
+        self._skill_indexes: dict[Path, SkillDigestIndex] = {}
+        self._dirty = False
+
+    @classmethod
+    def load(cls, global_target: Path, *, verify: bool = False) -> "DigestIndex":
+        path = _cache_root(global_target) / DIGEST_INDEX_FILENAME
+        files: dict[str, list[Any]] = {}
+        digests: dict[str, list[Any]] = {}
+        try:
+            _validate_directory_chain(global_target, path.parent, "Profile digest index")
+            data = _load_json(path, "Profile digest index") if path.is_file() else {}
+        except ProjectProfileError:
+            data = {}
+        if (
+            data.get("tool") == DIGEST_INDEX_TOOL
+            and data.get("version") == DIGEST_INDEX_VERSION
+        ):
+            for section, target in (("files", files), ("digests", digests)):
+                entries = data.get(section)
+                if not isinstance(entries, dict):
+                    continue
+                for key, entry in entries.items():
+                    if (
+                        isinstance(entry, list)
+                        and len(entry) == 4
+                        and all(isinstance(item, int) for item in entry[:3])
+                        and isinstance(entry[3], str)
+                    ):
+                        target[key] = entry
+        return cls(path, root=global_target, verify=verify, files=files, digests=digests)
+
+    @staticmethod
+    def _settled(stat_result: os.stat_result) -> bool:
+        return time.time_ns() - stat_result.st_mtime_ns >= DIGEST_INDEX_SETTLE_NS
+
+    def _lookup(self, table: dict[str, list[Any]], key: str, stat_key: StatKey) -> str | None:
+        entry = table.get(key)
+        if self.verify or entry is None or entry[:3] != stat_key:
+            return None
+        # Re-insert so the least recently used entries are trimmed first.
+        table[key] = table.pop(key)
+        return entry[3]
+
+    def _record(
+        self, table: dict[str, list[Any]], key: str, stat_key: StatKey, digest: str
+    ) -> None:
+        entry = [*stat_key, digest]
+        if table.get(key) != entry:
+            self._dirty = True
+        table.pop(key, None)
+        table[key] = entry
+
+    def sha256_file(self, path: Path) -> str:
+        stat_result = path.stat()
+        key = str(path)
+        stat_key = _stat_key(stat_result)
+        cached = self._lookup(self._files, key, stat_key)
+        if cached is not None:
+            return cached
+        digest = _sha256_file(path)
+        if self._settled(stat_result):
+            self._record(self._files, key, stat_key, digest)
+        return digest
+
+    def combined_digest(
+        self,
+        signature: Sequence[Any],
+        stats: Sequence[os.stat_result],
+        compute: Callable[[], str],
+    ) -> str:
+        """Reuse ``compute()`` while every input keeps its recorded stat key."""
+
+        key = hashlib.sha256(
+            json.dumps(
+                [signature, [_stat_key(item) for item in stats]],
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode("utf-8")
+        ).hexdigest()
+        # The combined entry is addressed by every input's stat key, so its own
+        # stat slot only records how many inputs it covers.
+        stat_key = [len(stats), 0, 0]
+        cached = self._lookup(self._digests, key, stat_key)
+        if cached is not None:
+            return cached
+        digest = compute()
+        if all(self._settled(item) for item in stats):
+            self._record(self._digests, key, stat_key, digest)
+        return digest
+
+    def skill_index(self, user_skills_root: Path) -> SkillDigestIndex | None:
+        """Return the tree-digest index kept beside a managed skill root."""
+
+        if self.verify:
+            return None
+        if user_skills_root not in self._skill_indexes:
+            self._skill_indexes[user_skills_root] = SkillDigestIndex.for_skill_root(
+                user_skills_root
+            )
+        return self._skill_indexes[user_skills_root]
+
+    def save(self) -> None:
+        """Best-effort persist; an unwritable index never fails the command."""
+
+        for skill_index in self._skill_indexes.values():
+            skill_index.save()
+        if not self._dirty or self.path is None or self.root is None:
+            return
+        files = dict(list(self._files.items())[-DIGEST_INDEX_MAX_FILES:])
+        digests = dict(list(self._digests.items())[-DIGEST_INDEX_MAX_DIGESTS:])
+        try:
+            # Workspace commands must not create state in the global install, so
+            # the index only lives beside profile caches that already exist.
+            if not self.path.parent.is_dir():
+                return
+            _validate_directory_chain(self.root, self.path.parent, "Profile digest index")
+            # Entry order is the LRU order, so the index is not key-sorted.
+            payload = {
+                "tool": DIGEST_INDEX_TOOL,
+                "version": DIGEST_INDEX_VERSION,
+                "files": files,
+                "digests": digests,
+            }
+            _atomic_write(
+                self.path,
+                json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n",
+            )
+        except (OSError, ProjectProfileError):
+            return
+        self._dirty = False
+
+
+def _sha256_with_index(path: Path, digest_index: DigestIndex | None) -> str:
+    if digest_index is None:
+        return _sha256_file(path)
+    return digest_index.sha256_file(path)
+
+
 def _cache_agent_hashes(value: Any, agent_names: Sequence[str]) -> dict[str, str] | None:
     if not isinstance(value, dict) or set(value) != set(agent_names):
         return None
@@ -395,14 +686,20 @@ def _asset_digest(
     model_set: str | None,
     uniform_model: str | None,
     version_override: str | None = None,
+    digest_index: DigestIndex | None = None,
 ) -> str:
-    """Fingerprint every input that can change generated Codex role files."""
+    """Fingerprint every input that can change generated Codex role files.
+
+    With a ``digest_index`` the fingerprint is reused while every input keeps
+    its recorded size, ``mtime_ns``, and inode, so no asset is re-read.
+    """
 
     relative_paths = [
         Path("VERSION"),
         Path("AGENTS.md"),
         Path("modes.json"),
         Path("scripts/export-codex-agents.py"),
+        Path("scripts/agent_export_engine.py"),
         Path("scripts/agent_model_profiles.py"),
         Path("scripts/codex_mode_aliases.py"),
     ]
@@ -419,27 +716,45 @@ def _asset_digest(
             ]
         )
 
-    digest = hashlib.sha256()
-    digest.update((uniform_model or "").encode("utf-8"))
-    digest.update(b"\0")
+    stats: list[os.stat_result] = []
     for relative in relative_paths:
         path = asset_root / relative
         if not path.is_file() or _is_linklike(path):
             raise ProjectProfileError(f"Profile cache input is missing or unsafe: {path}")
-        digest.update(relative.as_posix().encode("utf-8"))
-        digest.update(b"\0")
-        content = (
-            f"{version_override}\n".encode("ascii")
-            if relative == Path("VERSION") and version_override is not None
-            else path.read_bytes()
-        )
-        digest.update(content)
+        stats.append(path.stat())
+
+    def compute() -> str:
+        digest = hashlib.sha256()
+        digest.update((uniform_model or "").encode("utf-8"))
         digest.update(b"\0")
-    return digest.hexdigest()
+        for relative in relative_paths:
+            digest.update(relative.as_posix().encode("utf-8"))
+            digest.update(b"\0")
+            content = (
+                f"{version_override}\n".encode("ascii")
+                if relative == Path("VERSION") and version_override is not None
+                else (asset_root / relative).read_bytes()
+            )
+            digest.update(content)
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    if digest_index is None:
+        return compute()
+    signature = [
+        str(asset_root),
+        uniform_model,
+        version_override,
+        [relative.as_posix() for relative in relative_paths],
+    ]
+    return digest_index.combined_digest(signature, stats, compute)
 
 
 def validate_global_install(
-    global_target: Path, *, allow_pending_skill_sync: bool = False
+    global_target: Path,
+    *,
+    allow_pending_skill_sync: bool = False,
+    digest_index: DigestIndex | None = None,
 ) -> list[str]:
     manifest_path = global_target / GLOBAL_MANIFEST_FILENAME
     data = _load_json(manifest_path, "Global Codex installer manifest")
@@ -489,8 +804,11 @@ def validate_global_install(
                 "Global Codex skill metadata is missing or invalid; rerun the global bootstrap."
             )
         else:
+            skill_root = _canonical(raw_skill_root)
             skill_issues = skill_collection_issues(
-                _canonical(raw_skill_root), raw_skill_names
+                skill_root,
+                raw_skill_names,
+                digest_index=digest_index.skill_index(skill_root) if digest_index else None,
             )
             if skill_issues:
                 raise ProjectProfileError(
@@ -573,6 +891,10 @@ def validate_global_install(
     return names
 
 
+def _cache_root(global_target: Path) -> Path:
+    return global_target / "agents-pipeline-profiles"
+
+
 def _cache_identity(
     *, version: str, profile: str | None, model_set: str | None, uniform_model: str | None
 ) -> tuple[Path, str]:
@@ -621,6 +943,7 @@ def _cache_is_reusable(
     source_version: str,
     asset_digest: str,
     agent_names: Sequence[str],
+    digest_index: DigestIndex | None = None,
 ) -> bool:
     if not path.exists():
         return False
@@ -655,7 +978,7 @@ def _cache_is_reusable(
         role_path = agents_dir / f"{name}.toml"
         if _is_linklike(role_path) or not role_path.is_file():
             return False
-        if _sha256_file(role_path) != hashes[name]:
+        if _sha256_with_index(role_path, digest_index) != hashes[name]:
             return False
     return True
 
@@ -724,6 +1047,106 @@ def _top_level_marker_indexes(lines: Sequence[str], marker: str) -> list[int]:
     return indexes
 
 
+def _codex_exporter_argv(
+    *,
+    asset_root: Path,
+    global_target: Path,
+    profile: str | None,
+    model_set: str | None,
+    uniform_model: str | None,
+) -> list[str]:
+    argv = [
+        "--source-agents",
+        str(asset_root / "agents"),
+        "--modes-file",
+        str(asset_root / "modes.json"),
+        "--catalog",
+        str(asset_root / "AGENTS.md"),
+        "--resolve-support-refs-to",
+        str(global_target / "agents-pipeline"),
+        "--strict",
+        "--profile-dir",
+        str(asset_root / "tools/agent-profiles"),
+        "--model-set-dir",
+        str(asset_root / "runtimes/codex/model-sets"),
+    ]
+    if uniform_model:
+        argv.extend(["--uniform-model", uniform_model])
+    else:
+        argv.extend(["--agent-profile", str(profile), "--model-set", str(model_set)])
+    return argv
+
+
+def _load_sibling_exporter(exporter: Path) -> ModuleType | None:
+    """Import the Codex exporter in-process when it ships beside this script.
+
+    An exporter from another asset tree keeps running in its own interpreter so
+    it always pairs with its own helper modules.
+    """
+
+    if exporter.resolve().parent != SCRIPT_DIR:
+        return None
+    module = sys.modules.get(CODEX_EXPORTER_MODULE)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(CODEX_EXPORTER_MODULE, exporter)
+        if spec is None or spec.loader is None:
+            return None
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[CODEX_EXPORTER_MODULE] = module
+        try:
+            spec.loader.exec_module(module)
+        except Exception:
+            sys.modules.pop(CODEX_EXPORTER_MODULE, None)
+            raise
+    if not callable(getattr(module, "render_role_configs", None)):
+        return None
+    return module
+
+
+def _export_codex_roles(
+    exporter: Path,
+    *,
+    asset_root: Path,
+    global_target: Path,
+    profile: str | None,
+    model_set: str | None,
+    uniform_model: str | None,
+    failure_label: str,
+) -> dict[str, str]:
+    """Render role TOMLs keyed by role name without touching the target tree."""
+
+    argv = _codex_exporter_argv(
+        asset_root=asset_root,
+        global_target=global_target,
+        profile=profile,
+        model_set=model_set,
+        uniform_model=uniform_model,
+    )
+    module = _load_sibling_exporter(exporter)
+    if module is not None:
+        try:
+            return dict(module.render_role_configs(argv))
+        except ValueError as exc:
+            raise ProjectProfileError(f"{failure_label}: {exc}") from exc
+
+    contents: dict[str, str] = {}
+    with tempfile.TemporaryDirectory(prefix="agents-pipeline-codex-roles-") as temp_name:
+        staging = Path(temp_name)
+        command = [sys.executable, str(exporter), *argv, "--target-dir", str(staging)]
+        completed = subprocess.run(command, capture_output=True, text=True, check=False)
+        if completed.returncode != 0:
+            detail = completed.stderr.strip() or completed.stdout.strip()
+            raise ProjectProfileError(f"{failure_label}: {detail}")
+        for path in sorted((staging / "agents").glob("*.toml")):
+            if _is_linklike(path) or not path.is_file():
+                raise ProjectProfileError(f"Generated Codex role is missing or unsafe: {path}")
+            try:
+                contents[path.stem] = path.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError) as exc:
+                raise ProjectProfileError(f"Unable to read generated Codex role: {path}") from exc
+    return contents
+
+
 def generate_cache(
     *,
     asset_root: Path,
@@ -733,6 +1156,9 @@ def generate_cache(
     uniform_model: str | None,
     global_agent_names: Sequence[str],
     dry_run: bool,
+    digest_index: DigestIndex | None = None,
+    max_caches: int | None = DEFAULT_CACHE_MAX_ENTRIES,
+    max_bytes: int | None = None,
 ) -> tuple[Path, list[str], str]:
     version = _asset_version(asset_root)
     relative_cache, identity = _cache_identity(
@@ -746,70 +1172,138 @@ def generate_cache(
         profile=profile,
         model_set=model_set,
         uniform_model=uniform_model,
+        digest_index=digest_index,
     )
-    cache_root = global_target / "agents-pipeline-profiles"
-    cache_dir = cache_root / relative_cache
+    cache_dir = _cache_root(global_target) / relative_cache
     names = sorted(global_agent_names)
     _validate_directory_chain(global_target, cache_dir, "Global profile cache")
-    reusable = _cache_is_reusable(
-        cache_dir,
-        identity=identity,
-        source_version=version,
-        asset_digest=asset_digest,
-        agent_names=names,
-    )
-    if reusable:
-        return cache_dir, names, version
-    if dry_run:
+    lock_path = _cache_lock_path(cache_dir)
+    with _advisory_lock(lock_path, shared=True):
+        reusable = _cache_is_reusable(
+            cache_dir,
+            identity=identity,
+            source_version=version,
+            asset_digest=asset_digest,
+            agent_names=names,
+            digest_index=digest_index,
+        )
+        if reusable and not dry_run:
+            os.utime(cache_dir / CACHE_MANIFEST_FILENAME)
+    if reusable or dry_run:
         return cache_dir, names, version
 
     exporter = asset_root / "scripts" / "export-codex-agents.py"
     if not exporter.is_file():
         raise ProjectProfileError(f"Codex exporter not found in global support assets: {exporter}")
+    with _advisory_lock(lock_path, shared=False):
+        # Another writer may have published this selection while we waited.
+        if _cache_is_reusable(
+            cache_dir,
+            identity=identity,
+            source_version=version,
+            asset_digest=asset_digest,
+            agent_names=names,
+            digest_index=digest_index,
+        ):
+            os.utime(cache_dir / CACHE_MANIFEST_FILENAME)
+            return cache_dir, names, version
+        _publish_cache(
+            cache_dir,
+            exporter=exporter,
+            asset_root=asset_root,
+            global_target=global_target,
+            profile=profile,
+            model_set=model_set,
+            uniform_model=uniform_model,
+            names=names,
+            identity=identity,
+            version=version,
+            asset_digest=asset_digest,
+        )
+    try:
+        collect_cache_garbage(
+            global_target=global_target,
+            max_caches=max_caches,
+            max_bytes=max_bytes,
+            keep=[cache_dir],
+            dry_run=False,
+        )
+    except (OSError, ProjectProfileError):
+        pass  # Eviction is housekeeping; the fresh cache is already in place.
+    return cache_dir, names, version
+
+
+def _cache_object_pool(global_target: Path) -> ObjectPool | None:
+    """Return the object pool the global install selected, if any.
+
+    Cached roles are byte-identical across many profile selections, so they
+    follow the copy strategy recorded in the global installer manifest.  A
+    missing or unusable pool falls back to plain writes.
+    """
+
+    try:
+        data = _load_json(
+            global_target / GLOBAL_MANIFEST_FILENAME, "Global Codex installer manifest"
+        )
+    except ProjectProfileError:
+        return None
+    selection = data.get("copy_strategy")
+    if not isinstance(selection, dict):
+        return None
+    try:
+        return open_object_pool(selection.get("object_pool"), selection.get("strategy"))
+    except ObjectPoolError:
+        return None
+
+
+def _publish_cache(
+    cache_dir: Path,
+    *,
+    exporter: Path,
+    asset_root: Path,
+    global_target: Path,
+    profile: str | None,
+    model_set: str | None,
+    uniform_model: str | None,
+    names: list[str],
+    identity: str,
+    version: str,
+    asset_digest: str,
+) -> None:
+    """Export a selection into staging and swap it into ``cache_dir``."""
+
     cache_dir.parent.mkdir(parents=True, exist_ok=True)
     staging = Path(
         tempfile.mkdtemp(prefix=f".{cache_dir.name}.staging-", dir=cache_dir.parent)
     )
     backup: Path | None = None
     try:
-        command = [
-            sys.executable,
-            str(exporter),
-            "--source-agents",
-            str(asset_root / "agents"),
-            "--modes-file",
-            str(asset_root / "modes.json"),
-            "--catalog",
-            str(asset_root / "AGENTS.md"),
-            "--target-dir",
-            str(staging),
-            "--resolve-support-refs-to",
-            str(global_target / "agents-pipeline"),
-            "--strict",
-            "--profile-dir",
-            str(asset_root / "tools/agent-profiles"),
-            "--model-set-dir",
-            str(asset_root / "runtimes/codex/model-sets"),
-        ]
-        if uniform_model:
-            command.extend(["--uniform-model", uniform_model])
-        else:
-            command.extend(["--agent-profile", str(profile), "--model-set", str(model_set)])
-        completed = subprocess.run(command, capture_output=True, text=True, check=False)
-        if completed.returncode != 0:
-            detail = completed.stderr.strip() or completed.stdout.strip()
-            raise ProjectProfileError(f"Codex profile cache export failed: {detail}")
-
-        generated_names = sorted(path.stem for path in (staging / "agents").glob("*.toml"))
-        if generated_names != names:
+        roles = _export_codex_roles(
+            exporter,
+            asset_root=asset_root,
+            global_target=global_target,
+            profile=profile,
+            model_set=model_set,
+            uniform_model=uniform_model,
+            failure_label="Codex profile cache export failed",
+        )
+        if sorted(roles) != names:
             raise ProjectProfileError(
                 "Global install and selected profile assets contain different agent catalogs; "
                 "rerun the global bootstrap before setting a project profile."
             )
+        pool = _cache_object_pool(global_target)
+        for name in names:
+            role_path = staging / "agents" / f"{name}.toml"
+            if pool is None:
+                _atomic_write(role_path, roles[name])
+            else:
+                role_path.parent.mkdir(parents=True, exist_ok=True)
+                pool.install_bytes(roles[name].encode("utf-8"), role_path)
         payload = {
             "agent_names": names,
             "agent_sha256": {
-                name: _sha256_file(staging / "agents" / f"{name}.toml")
+                name: hashlib.sha256(roles[name].encode("utf-8")).hexdigest()
                 for name in names
             },
             "asset_digest": asset_digest,
@@ -823,13 +1317,25 @@ def generate_cache(
         }
         _atomic_json(staging / CACHE_MANIFEST_FILENAME, payload)
 
-        if cache_dir.exists():
-            backup = Path(
-                tempfile.mkdtemp(prefix=f".{cache_dir.name}.backup-", dir=cache_dir.parent)
-            )
-            backup.rmdir()
-            os.replace(cache_dir, backup)
-        os.replace(staging, cache_dir)
+        try:
+            if cache_dir.exists():
+                backup = Path(
+                    tempfile.mkdtemp(prefix=f".{cache_dir.name}.backup-", dir=cache_dir.parent)
+                )
+                backup.rmdir()
+                os.replace(cache_dir, backup)
+            os.replace(staging, cache_dir)
+        except OSError:
+            # Without advisory locks (Windows), a concurrent run may have
+            # published the same selection before the swap; keep its copy.
+            if backup is not None or not _cache_is_reusable(
+                cache_dir,
+                identity=identity,
+                source_version=version,
+                asset_digest=asset_digest,
+                agent_names=names,
+            ):
+                raise
         if backup is not None:
             shutil.rmtree(backup)
             backup = None
@@ -843,7 +1349,445 @@ def generate_cache(
             shutil.rmtree(staging)
         if backup is not None and backup.exists():
             shutil.rmtree(backup)
-    return cache_dir, names, version
+
+
+def _real_subdirs(path: Path) -> list[Path]:
+    try:
+        entries = sorted(path.iterdir())
+    except OSError:
+        return []
+    return [entry for entry in entries if not _is_linklike(entry) and entry.is_dir()]
+
+
+def _tree_bytes(path: Path) -> int:
+    total = 0
+    for dirpath, _dirnames, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, filename)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def _load_workspace_registry(global_target: Path) -> list[str]:
+    path = _cache_root(global_target) / WORKSPACE_REGISTRY_FILENAME
+    try:
+        _validate_directory_chain(global_target, path.parent, "Workspace registry")
+        data = _load_json(path, "Workspace registry") if path.is_file() else {}
+    except ProjectProfileError:
+        return []
+    workspaces = data.get("workspaces")
+    if (
+        data.get("tool") != WORKSPACE_REGISTRY_TOOL
+        or data.get("version") != WORKSPACE_REGISTRY_VERSION
+        or not isinstance(workspaces, list)
+    ):
+        return []
+    return sorted({item for item in workspaces if isinstance(item, str) and item})
+
+
+def _workspace_registry_lock(
+    global_target: Path, *, shared: bool
+) -> contextlib.AbstractContextManager[None]:
+    """Serialize registry updates with each other and with cache eviction."""
+
+    return _advisory_lock(
+        _cache_root(global_target) / WORKSPACE_REGISTRY_LOCK_FILENAME,
+        shared=shared,
+        persistent=True,
+    )
+
+
+def _store_workspace_registry(
+    global_target: Path, current: list[str], updated: set[str]
+) -> None:
+    """Write ``updated`` over ``current``; the caller holds the registry lock."""
+
+    if sorted(updated) == current:
+        return
+    _atomic_json(
+        _cache_root(global_target) / WORKSPACE_REGISTRY_FILENAME,
+        {
+            "tool": WORKSPACE_REGISTRY_TOOL,
+            "version": WORKSPACE_REGISTRY_VERSION,
+            "workspaces": sorted(updated),
+        },
+    )
+
+
+def _update_workspace_registry(
+    global_target: Path, *workspaces: Path, registered: bool
+) -> None:
+    """Best-effort record of workspaces whose profile may reference global caches."""
+
+    cache_root = _cache_root(global_target)
+    try:
+        # Without a cache root there is nothing to protect, and workspace
+        # commands must not create state in the global install.
+        if not cache_root.is_dir():
+            return
+        _validate_directory_chain(global_target, cache_root, "Workspace registry")
+        with _workspace_registry_lock(global_target, shared=False):
+            current = _load_workspace_registry(global_target)
+            updated = set(current)
+            if registered:
+                updated.update(str(workspace) for workspace in workspaces)
+            else:
+                updated.difference_update(str(workspace) for workspace in workspaces)
+            _store_workspace_registry(global_target, current, updated)
+    except (OSError, ProjectProfileError):
+        return
+
+
+def _workspace_cache_references(
+    global_target: Path, workspace: Path
+) -> tuple[set[Path], bool]:
+    """Return cache directories a registered workspace may rely on.
+
+    The cache for the workspace's recorded selection and source version is
+    protected, as is any cache holding a ``config_file`` named by the project's
+    managed block (the legacy layout pointed roles into the global cache).
+    The flag is ``False`` when the registration is gone and can be dropped.
+    """
+
+    cache_root = _cache_root(global_target)
+    loaded = _read_project_manifest(workspace)
+    if loaded is None:
+        return set(), False
+    _manifest_path, data = loaded
+    referenced: set[Path] = set()
+    profile, model_set, uniform_model = _selection_from_manifest(
+        data, label="Project profile manifest"
+    )
+    source_version = data.get("source_version")
+    if isinstance(source_version, str) and source_version:
+        relative, _identity = _cache_identity(
+            version=source_version,
+            profile=profile,
+            model_set=model_set,
+            uniform_model=uniform_model,
+        )
+        referenced.add(cache_root / relative)
+    config_path = _validated_project_dir(workspace) / "config.toml"
+    if config_path.is_file():
+        try:
+            _remaining, block = _remove_managed_block(config_path.read_text(encoding="utf-8"))
+        except (OSError, UnicodeDecodeError) as exc:
+            raise ProjectProfileError(f"Unable to read project Codex config: {config_path}") from exc
+        for raw in re.findall(r'^config_file = (".*")$', block or "", flags=re.MULTILINE):
+            try:
+                role_path = Path(json.loads(raw))
+                relative_role = role_path.relative_to(cache_root)
+            except (ValueError, json.JSONDecodeError):
+                continue
+            if len(relative_role.parts) > 4:
+                referenced.add(cache_root.joinpath(*relative_role.parts[:4]))
+    return referenced, True
+
+
+def collect_cache_garbage(
+    *,
+    global_target: Path,
+    max_caches: int | None = DEFAULT_CACHE_MAX_ENTRIES,
+    max_bytes: int | None = None,
+    keep: Sequence[Path] = (),
+    dry_run: bool,
+) -> dict[str, Any]:
+    """Evict least recently used profile caches and crash leftovers.
+
+    Caches are ordered by the modification time of their marker, which
+    ``generate_cache`` refreshes on every reuse.  Caches referenced by a
+    registered workspace, caches in ``keep``, caches whose lock is held by a
+    running operation, and directories without this tool's marker are never
+    removed.  Eviction is skipped entirely when a
+    registered workspace cannot be read, since its references are unknown.
+    The workspace registry lock is held from reading the registry until
+    eviction ends, so a concurrent registration is never lost or missed.
+    """
+
+    if max_caches is not None and max_caches < 0:
+        raise ProjectProfileError("--max-caches must be >= 0.")
+    if max_bytes is not None and max_bytes < 0:
+        raise ProjectProfileError("--max-bytes must be >= 0.")
+    cache_root = _cache_root(global_target)
+    result: dict[str, Any] = {
+        "cache_bytes": 0,
+        "cache_count": 0,
+        "cache_root": str(cache_root),
+        "dry_run": dry_run,
+        "evicted": [],
+        "freed_bytes": 0,
+        "kept": [],
+        "protected": [],
+        "removed_leftovers": [],
+        "unowned": [],
+        "unreadable_workspaces": [],
+    }
+    if not cache_root.exists():
+        return result
+    _validate_directory_chain(global_target, cache_root, "Global profile cache")
+    if not cache_root.is_dir():
+        raise ProjectProfileError(f"Profile cache root must be a real directory: {cache_root}")
+
+    # Registrations cannot change between reading the registry and evicting.
+    with _workspace_registry_lock(global_target, shared=dry_run):
+        protected = {path for path in keep}
+        registered = _load_workspace_registry(global_target)
+        unregistered: set[str] = set()
+        for raw in registered:
+            workspace = Path(raw)
+            try:
+                references, still_registered = _workspace_cache_references(
+                    global_target, workspace
+                )
+            except (OSError, ProjectProfileError):
+                result["unreadable_workspaces"].append(raw)
+                continue
+            protected.update(references)
+            if not still_registered:
+                unregistered.add(raw)
+        if unregistered and not dry_run:
+            try:
+                _store_workspace_registry(
+                    global_target, registered, set(registered) - unregistered
+                )
+            except (OSError, ProjectProfileError):
+                pass  # Pruning is housekeeping; the workspaces stay protected.
+
+        now = time.time()
+        caches: list[tuple[float, Path, int]] = []
+        for version_dir in _real_subdirs(cache_root):
+            for runtime_dir in _real_subdirs(version_dir):
+                for group_dir in _real_subdirs(runtime_dir):
+                    for entry in _real_subdirs(group_dir):
+                        if entry.name.startswith(".") and (
+                            ".staging-" in entry.name or ".backup-" in entry.name
+                        ):
+                            try:
+                                age = now - entry.stat().st_mtime
+                            except OSError:
+                                continue
+                            if age >= CACHE_LEFTOVER_GRACE_SECONDS:
+                                result["removed_leftovers"].append(str(entry))
+                                if not dry_run:
+                                    shutil.rmtree(entry, ignore_errors=True)
+                            continue
+                        marker_path = entry / CACHE_MANIFEST_FILENAME
+                        try:
+                            marker = _load_json(marker_path, "Profile cache marker")
+                        except ProjectProfileError:
+                            marker = {}
+                        if marker.get("tool") != CACHE_MANIFEST_TOOL:
+                            result["unowned"].append(str(entry))
+                            continue
+                        caches.append((marker_path.stat().st_mtime, entry, _tree_bytes(entry)))
+
+        caches.sort(key=lambda item: (item[0], str(item[1])))
+        count = len(caches)
+        total = sum(size for _mtime, _path, size in caches)
+        for _mtime, path, size in caches:
+            over_count = max_caches is not None and count > max_caches
+            over_bytes = max_bytes is not None and total > max_bytes
+            if path in protected:
+                result["protected"].append(str(path))
+                continue
+            if result["unreadable_workspaces"] or not (over_count or over_bytes):
+                result["kept"].append(str(path))
+                continue
+            if not dry_run:
+                lock_path = _cache_lock_path(path)
+                try:
+                    with _advisory_lock(lock_path, shared=False, timeout=0):
+                        shutil.rmtree(path)
+                        lock_path.unlink(missing_ok=True)
+                except ProjectProfileError:
+                    # A running cache or prewarm holds it; retry on a later pass.
+                    result["kept"].append(str(path))
+                    continue
+            result["evicted"].append(str(path))
+            result["freed_bytes"] += size
+            count -= 1
+            total -= size
+        result["cache_count"] = count
+        result["cache_bytes"] = total
+    if not dry_run:
+        for group_dir in (
+            Path(item).parent for item in [*result["evicted"], *result["removed_leftovers"]]
+        ):
+            for empty in (group_dir, group_dir.parent, group_dir.parent.parent):
+                try:
+                    empty.rmdir()
+                except OSError:
+                    break
+    return result
+
+
+def _prewarm_selection(
+    asset_root: Path,
+    global_target: Path,
+    profile: str,
+    model_set: str,
+    global_agent_names: Sequence[str],
+) -> str:
+    """Build one profile cache; runs inside a prewarm worker process."""
+
+    cache_dir, _names, _version = generate_cache(
+        asset_root=asset_root,
+        global_target=global_target,
+        profile=profile,
+        model_set=model_set,
+        uniform_model=None,
+        global_agent_names=global_agent_names,
+        dry_run=False,
+        max_caches=None,
+    )
+    return str(cache_dir)
+
+
+def _prewarm_selections(asset_root: Path, combinations: Sequence[str]) -> list[tuple[str, str]]:
+    if combinations:
+        selections: list[tuple[str, str]] = []
+        for raw in combinations:
+            profile, separator, model_set = raw.partition(":")
+            if not separator or not profile or not model_set:
+                raise ProjectProfileError(
+                    f"--combination must be PROFILE:MODEL_SET, got {raw!r}."
+                )
+            selections.append(
+                (_safe_component(profile, "profile"), _safe_component(model_set, "model set"))
+            )
+        return sorted(set(selections))
+    profiles = sorted(
+        path.stem for path in (asset_root / "tools/agent-profiles").glob("*.json")
+    )
+    model_sets = sorted(
+        path.stem for path in (asset_root / "runtimes/codex/model-sets").glob("*.json")
+    )
+    return [(profile, model_set) for profile in profiles for model_set in model_sets]
+
+
+def prewarm_caches(
+    *,
+    asset_root: Path,
+    global_target: Path,
+    combinations: Sequence[str] = (),
+    jobs: int | None = None,
+    max_caches: int | None = DEFAULT_CACHE_MAX_ENTRIES,
+    max_bytes: int | None = None,
+    dry_run: bool,
+    digest_index: DigestIndex | None = None,
+) -> dict[str, Any]:
+    """Build every missing profile cache for the selected combinations.
+
+    Without ``combinations`` every ``tools/agent-profiles/*.json`` profile is
+    paired with every Codex model set.  Missing caches are exported in a
+    process pool; each worker goes through ``generate_cache`` and its
+    staging/atomic-swap protocol, so concurrent prewarms and ``cache`` runs
+    converge on one published copy.  Eviction runs once at the end and keeps
+    every cache this call covered.
+    """
+
+    if jobs is not None and jobs < 1:
+        raise ProjectProfileError("--jobs must be >= 1.")
+    names = validate_global_install(
+        global_target, allow_pending_skill_sync=True, digest_index=digest_index
+    )
+    selections = _prewarm_selections(asset_root, combinations)
+    version = _asset_version(asset_root)
+    result: dict[str, Any] = {
+        "built": [],
+        "current": [],
+        "dry_run": dry_run,
+        "failed": [],
+        "planned": [],
+    }
+    missing: list[tuple[str, str]] = []
+    covered: list[Path] = []
+    for profile, model_set in selections:
+        try:
+            relative_cache, identity = _cache_identity(
+                version=version, profile=profile, model_set=model_set, uniform_model=None
+            )
+            cache_dir = _cache_root(global_target) / relative_cache
+            _validate_directory_chain(global_target, cache_dir, "Global profile cache")
+            reusable = _cache_is_reusable(
+                cache_dir,
+                identity=identity,
+                source_version=version,
+                asset_digest=_asset_digest(
+                    asset_root,
+                    profile=profile,
+                    model_set=model_set,
+                    uniform_model=None,
+                    digest_index=digest_index,
+                ),
+                agent_names=names,
+                digest_index=digest_index,
+            )
+        except ProjectProfileError as exc:
+            result["failed"].append(
+                {"error": str(exc), "model_set": model_set, "profile": profile}
+            )
+            continue
+        covered.append(cache_dir)
+        entry = {"cache_dir": str(cache_dir), "model_set": model_set, "profile": profile}
+        if reusable:
+            result["current"].append(entry)
+        else:
+            result["planned"].append(entry)
+            missing.append((profile, model_set))
+    if dry_run or not missing:
+        return result
+
+    def record(profile: str, model_set: str, outcome: str | BaseException) -> None:
+        if isinstance(outcome, BaseException):
+            result["failed"].append(
+                {"error": str(outcome), "model_set": model_set, "profile": profile}
+            )
+        else:
+            result["built"].append(
+                {"cache_dir": outcome, "model_set": model_set, "profile": profile}
+            )
+
+    workers = min(jobs or os.cpu_count() or 1, len(missing))
+    if workers == 1:
+        for profile, model_set in missing:
+            try:
+                outcome: str | BaseException = _prewarm_selection(
+                    asset_root, global_target, profile, model_set, names
+                )
+            except (OSError, ProjectProfileError) as exc:
+                outcome = exc
+            record(profile, model_set, outcome)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(
+                    _prewarm_selection, asset_root, global_target, profile, model_set, names
+                ): (profile, model_set)
+                for profile, model_set in missing
+            }
+            for future in concurrent.futures.as_completed(futures):
+                profile, model_set = futures[future]
+                try:
+                    outcome = future.result()
+                except (OSError, ProjectProfileError) as exc:
+                    outcome = exc
+                record(profile, model_set, outcome)
+    for key in ("built", "failed"):
+        result[key].sort(key=lambda item: (item["profile"], item["model_set"]))
+    try:
+        collect_cache_garbage(
+            global_target=global_target,
+            max_caches=max_caches,
+            max_bytes=max_bytes,
+            keep=covered,
+            dry_run=False,
+        )
+    except (OSError, ProjectProfileError):
+        pass
+    return result
 
 
 def _remove_managed_block(text: str) -> tuple[str, str | None]:
@@ -1014,6 +1958,7 @@ def _render_workspace_roles(
     model_set: str | None,
     uniform_model: str | None,
     global_agent_names: Sequence[str],
+    digest_index: DigestIndex | None = None,
 ) -> tuple[dict[str, str], str, str]:
     """Render role TOMLs without writing either the workspace or global install."""
 
@@ -1023,59 +1968,36 @@ def _render_workspace_roles(
         profile=profile,
         model_set=model_set,
         uniform_model=uniform_model,
+        digest_index=digest_index,
     )
     exporter = asset_root / "scripts" / "export-codex-agents.py"
     if not exporter.is_file() or _is_linklike(exporter):
         raise ProjectProfileError(f"Codex exporter is missing or unsafe: {exporter}")
-    with tempfile.TemporaryDirectory(prefix="agents-pipeline-workspace-profile-") as temp_name:
-        staging = Path(temp_name)
-        command = [
-            sys.executable,
-            str(exporter),
-            "--source-agents",
-            str(asset_root / "agents"),
-            "--modes-file",
-            str(asset_root / "modes.json"),
-            "--catalog",
-            str(asset_root / "AGENTS.md"),
-            "--target-dir",
-            str(staging),
-            "--resolve-support-refs-to",
-            str(global_target / "agents-pipeline"),
-            "--strict",
-            "--profile-dir",
-            str(asset_root / "tools/agent-profiles"),
-            "--model-set-dir",
-            str(asset_root / "runtimes/codex/model-sets"),
-        ]
-        if uniform_model:
-            command.extend(["--uniform-model", uniform_model])
-        else:
-            command.extend(["--agent-profile", str(profile), "--model-set", str(model_set)])
-        completed = subprocess.run(command, capture_output=True, text=True, check=False)
-        if completed.returncode != 0:
-            detail = completed.stderr.strip() or completed.stdout.strip()
-            raise ProjectProfileError(f"Codex workspace profile export failed: {detail}")
-        generated = sorted((staging / "agents").glob("*.toml"))
-        generated_names = [path.stem for path in generated]
-        expected_names = sorted(global_agent_names)
-        if generated_names != expected_names:
+    generated = _export_codex_roles(
+        exporter,
+        asset_root=asset_root,
+        global_target=global_target,
+        profile=profile,
+        model_set=model_set,
+        uniform_model=uniform_model,
+        failure_label="Codex workspace profile export failed",
+    )
+    expected_names = sorted(global_agent_names)
+    if sorted(generated) != expected_names:
+        raise ProjectProfileError(
+            "Global install and selected profile assets contain different agent catalogs; "
+            "rerun the global bootstrap before setting a project profile."
+        )
+    contents: dict[str, str] = {}
+    for name in expected_names:
+        content = generated[name]
+        try:
+            tomllib.loads(content)
+        except tomllib.TOMLDecodeError as exc:
             raise ProjectProfileError(
-                "Global install and selected profile assets contain different agent catalogs; "
-                "rerun the global bootstrap before setting a project profile."
-            )
-        contents: dict[str, str] = {}
-        for path in generated:
-            if _is_linklike(path) or not path.is_file():
-                raise ProjectProfileError(f"Generated Codex role is missing or unsafe: {path}")
-            try:
-                content = path.read_text(encoding="utf-8")
-                tomllib.loads(content)
-            except (OSError, UnicodeDecodeError) as exc:
-                raise ProjectProfileError(f"Unable to read generated Codex role: {path}") from exc
-            except tomllib.TOMLDecodeError as exc:
-                raise ProjectProfileError(f"Generated Codex role is invalid TOML: {path}: {exc}") from exc
-            contents[path.stem] = content
+                f"Generated Codex role is invalid TOML: {name}.toml: {exc}"
+            ) from exc
+        contents[name] = content
     return contents, source_version, asset_digest
 
 
@@ -1119,8 +2041,9 @@ def set_profile(
     model_set: str | None,
     uniform_model: str | None,
     dry_run: bool,
+    digest_index: DigestIndex | None = None,
 ) -> dict[str, Any]:
-    global_names = validate_global_install(global_target)
+    global_names = validate_global_install(global_target, digest_index=digest_index)
     role_contents, source_version, asset_digest = _render_workspace_roles(
         asset_root=asset_root,
         global_target=global_target,
@@ -1128,7 +2051,35 @@ def set_profile(
         model_set=model_set,
         uniform_model=uniform_model,
         global_agent_names=global_names,
+        digest_index=digest_index,
+    )
+    return _apply_workspace_profile(
+        workspace=workspace,
+        global_target=global_target,
+        role_contents=role_contents,
+        source_version=source_version,
+        asset_digest=asset_digest,
+        profile=profile,
+        model_set=model_set,
+        uniform_model=uniform_model,
+        dry_run=dry_run,
     )
+
+
+def _apply_workspace_profile(
+    *,
+    workspace: Path,
+    global_target: Path,
+    role_contents: Mapping[str, str],
+    source_version: str,
+    asset_digest: str,
+    profile: str | None,
+    model_set: str | None,
+    uniform_model: str | None,
+    dry_run: bool,
+) -> dict[str, Any]:
+    """Write already rendered roles, config block, and manifest into one workspace."""
+
     names = sorted(role_contents)
     project_dir = _validated_project_dir(workspace)
     agents_dir = _validate_project_agents_dir(project_dir)
@@ -1136,93 +2087,225 @@ def set_profile(
     manifest_path = project_dir / PROJECT_MANIFEST_FILENAME
     _validate_leaf(config_path, "Project Codex config")
     _validate_leaf(manifest_path, "Project profile manifest")
+    lock_path = project_dir / PROJECT_LOCK_FILENAME
+    created_dirs = [path for path in (workspace, project_dir, agents_dir) if not path.exists()]
+    # Writers hold the project lock from the first read to the last write.
     try:
-        existing = config_path.read_text(encoding="utf-8") if config_path.exists() else ""
-    except (OSError, UnicodeDecodeError) as exc:
-        raise ProjectProfileError(f"Unable to read project Codex config: {config_path}") from exc
-    remaining, _old_block = _remove_managed_block(existing)
-    _validate_no_agent_conflicts(remaining, names)
-    loaded = _read_project_manifest(workspace)
-    old_owned_files: list[str] = []
-    if loaded is not None and loaded[1].get("version") == PROJECT_MANIFEST_VERSION:
-        _old_names, old_owned_files, _old_hashes = _validate_project_manifest_v2(
-            loaded[1], workspace=workspace
-        )
-    old_owned = set(old_owned_files)
-    managed_files = [f"agents/{name}.toml" for name in names]
-    for relative in managed_files:
-        target = project_dir / relative
-        _validate_leaf(target, "Project-local Codex role")
-        if target.exists() and relative not in old_owned:
-            raise ProjectProfileError(
-                f"Refusing to overwrite an unowned project-local Codex role: {target}"
+        with _advisory_lock(lock_path, shared=dry_run, persistent=True):
+            try:
+                existing = config_path.read_text(encoding="utf-8") if config_path.exists() else ""
+            except (OSError, UnicodeDecodeError) as exc:
+                raise ProjectProfileError(
+                    f"Unable to read project Codex config: {config_path}"
+                ) from exc
+            remaining, _old_block = _remove_managed_block(existing)
+            _validate_no_agent_conflicts(remaining, names)
+            loaded = _read_project_manifest(workspace)
+            old_owned_files: list[str] = []
+            if loaded is not None and loaded[1].get("version") == PROJECT_MANIFEST_VERSION:
+                _old_names, old_owned_files, _old_hashes = _validate_project_manifest_v2(
+                    loaded[1], workspace=workspace
+                )
+            old_owned = set(old_owned_files)
+            managed_files = [f"agents/{name}.toml" for name in names]
+            for relative in managed_files:
+                target = project_dir / relative
+                _validate_leaf(target, "Project-local Codex role")
+                if target.exists() and relative not in old_owned:
+                    raise ProjectProfileError(
+                        f"Refusing to overwrite an unowned project-local Codex role: {target}"
+                    )
+            block = _build_block(
+                agents_dir=agents_dir,
+                agent_names=names,
+                profile=profile,
+                model_set=model_set,
+                uniform_model=uniform_model,
             )
-    block = _build_block(
-        agents_dir=agents_dir,
-        agent_names=names,
+            merged = remaining.rstrip() + ("\n\n" if remaining.strip() else "") + block
+            _validate_merged_config(merged)
+            agent_hashes = {
+                name: hashlib.sha256(role_contents[name].encode("utf-8")).hexdigest()
+                for name in names
+            }
+            payload = {
+                "agent_names": names,
+                "agent_sha256": agent_hashes,
+                "asset_digest": asset_digest,
+                "config_file": str(config_path),
+                "global_target": str(global_target),
+                "managed_agent_files": managed_files,
+                "mode": "uniform" if uniform_model else "profile",
+                "model_set": model_set,
+                "profile": profile or ("uniform" if uniform_model else None),
+                "roles_dir": str(agents_dir),
+                "runtime": "codex",
+                "source_version": source_version,
+                "tool": PROJECT_MANIFEST_TOOL,
+                "uniform_model": uniform_model,
+                "version": PROJECT_MANIFEST_VERSION,
+                "workspace": str(workspace),
+            }
+            if not dry_run:
+                affected = [
+                    *(
+                        project_dir / relative
+                        for relative in sorted(set(managed_files) | old_owned)
+                    ),
+                    config_path,
+                    manifest_path,
+                ]
+                snapshots = {path: _snapshot_file(path) for path in affected}
+                try:
+                    agents_dir.mkdir(parents=True, exist_ok=True)
+                    for name in names:
+                        _atomic_write(agents_dir / f"{name}.toml", role_contents[name])
+                    for relative in sorted(old_owned - set(managed_files)):
+                        (project_dir / relative).unlink(missing_ok=True)
+                    _atomic_write(config_path, merged)
+                    _atomic_json(manifest_path, payload)
+                except Exception:
+                    _rollback_files(snapshots)
+                    raise
+    except Exception:
+        for path in reversed(created_dirs):
+            try:
+                path.rmdir()
+            except OSError:
+                pass
+        raise
+    return {
+        "dry_run": dry_run,
+        **payload,
+        **_eligibility_metadata(global_target, workspace, configured=True),
+    }
+
+
+def _read_workspace_list(source: str) -> list[Path]:
+    """Read one workspace path per line from a file or ``-`` (stdin)."""
+
+    try:
+        if source == "-":
+            text = sys.stdin.read()
+        else:
+            text = Path(source).expanduser().read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError) as exc:
+        raise ProjectProfileError(f"Unable to read workspace list: {source}") from exc
+    workspaces: list[Path] = []
+    for line in text.splitlines():
+        entry = line.strip()
+        if not entry or entry.startswith("#"):
+            continue
+        workspace = _canonical(entry)
+        if workspace not in workspaces:
+            workspaces.append(workspace)
+    if not workspaces:
+        raise ProjectProfileError(f"Workspace list is empty: {source}")
+    return workspaces
+
+
+def set_profiles(
+    *,
+    workspaces: Sequence[Path],
+    global_target: Path,
+    asset_root: Path,
+    profile: str | None,
+    model_set: str | None,
+    uniform_model: str | None,
+    dry_run: bool,
+    jobs: int | None = None,
+    digest_index: DigestIndex | None = None,
+) -> dict[str, Any]:
+    """Apply one profile to many workspaces, validating and rendering once.
+
+    Each workspace is written under its own project lock and rolls back on
+    its own failure; a failed workspace is reported without stopping the
+    others.  Writes are I/O bound, so a thread pool bounds the parallelism.
+    """
+
+    if jobs is not None and jobs < 1:
+        raise ProjectProfileError("--jobs must be >= 1.")
+    global_names = validate_global_install(global_target, digest_index=digest_index)
+    role_contents, source_version, asset_digest = _render_workspace_roles(
+        asset_root=asset_root,
+        global_target=global_target,
         profile=profile,
         model_set=model_set,
         uniform_model=uniform_model,
+        global_agent_names=global_names,
+        digest_index=digest_index,
     )
-    merged = remaining.rstrip() + ("\n\n" if remaining.strip() else "") + block
-    _validate_merged_config(merged)
-    agent_hashes = {
-        name: hashlib.sha256(role_contents[name].encode("utf-8")).hexdigest()
-        for name in names
-    }
-    payload = {
-        "agent_names": names,
-        "agent_sha256": agent_hashes,
+
+    def apply(workspace: Path) -> dict[str, Any]:
+        return _apply_workspace_profile(
+            workspace=workspace,
+            global_target=global_target,
+            role_contents=role_contents,
+            source_version=source_version,
+            asset_digest=asset_digest,
+            profile=profile,
+            model_set=model_set,
+            uniform_model=uniform_model,
+            dry_run=dry_run,
+        )
+
+    outcomes: dict[Path, dict[str, Any] | BaseException] = {}
+    workers = min(jobs or os.cpu_count() or 1, len(workspaces)) or 1
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(apply, workspace): workspace for workspace in workspaces}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                outcomes[futures[future]] = future.result()
+            except (OSError, ProjectProfileError) as exc:
+                outcomes[futures[future]] = exc
+    result: dict[str, Any] = {
+        "applied": [],
         "asset_digest": asset_digest,
-        "config_file": str(config_path),
-        "global_target": str(global_target),
-        "managed_agent_files": managed_files,
-        "mode": "uniform" if uniform_model else "profile",
+        "dry_run": dry_run,
+        "failed": [],
         "model_set": model_set,
         "profile": profile or ("uniform" if uniform_model else None),
-        "roles_dir": str(agents_dir),
-        "runtime": "codex",
         "source_version": source_version,
-        "tool": PROJECT_MANIFEST_TOOL,
         "uniform_model": uniform_model,
-        "version": PROJECT_MANIFEST_VERSION,
-        "workspace": str(workspace),
-    }
-    if not dry_run:
-        affected = [
-            *(project_dir / relative for relative in sorted(set(managed_files) | old_owned)),
-            config_path,
-            manifest_path,
-        ]
-        snapshots = {path: _snapshot_file(path) for path in affected}
-        created_dirs = [
-            path for path in (workspace, project_dir, agents_dir) if not path.exists()
-        ]
-        try:
-            agents_dir.mkdir(parents=True, exist_ok=True)
-            for name in names:
-                _atomic_write(agents_dir / f"{name}.toml", role_contents[name])
-            for relative in sorted(old_owned - set(managed_files)):
-                (project_dir / relative).unlink(missing_ok=True)
-            _atomic_write(config_path, merged)
-            _atomic_json(manifest_path, payload)
-        except Exception:
-            _rollback_files(snapshots)
-            for path in reversed(created_dirs):
-                try:
-                    path.rmdir()
-                except OSError:
-                    pass
-            raise
-    return {
-        "dry_run": dry_run,
-        **payload,
-        **_eligibility_metadata(global_target, workspace, configured=True),
     }
+    for workspace in workspaces:
+        outcome = outcomes[workspace]
+        if isinstance(outcome, BaseException):
+            result["failed"].append({"error": str(outcome), "workspace": str(workspace)})
+        else:
+            result["applied"].append(
+                {
+                    "profile_eligibility": outcome.get("profile_eligibility"),
+                    "project_trust": outcome.get("project_trust"),
+                    "workspace": str(workspace),
+                }
+            )
+    return result
 
 
 def read_status(
-    workspace: Path, *, global_target: Path, asset_root: Path
+    workspace: Path,
+    *,
+    global_target: Path,
+    asset_root: Path,
+    digest_index: DigestIndex | None = None,
+) -> dict[str, Any]:
+    lock_path = _validated_project_dir(workspace) / PROJECT_LOCK_FILENAME
+    with _advisory_lock(lock_path, shared=True, persistent=True):
+        return _read_status(
+            workspace,
+            global_target=global_target,
+            asset_root=asset_root,
+            digest_index=digest_index,
+        )
+
+
+def _read_status(
+    workspace: Path,
+    *,
+    global_target: Path,
+    asset_root: Path,
+    digest_index: DigestIndex | None = None,
 ) -> dict[str, Any]:
     loaded = _read_project_manifest(workspace)
     project_dir = _validated_project_dir(workspace)
@@ -1242,7 +2325,7 @@ def read_status(
                     "Project Codex config contains a managed profile block without its "
                     "manifest; rerun 'set' or remove the block manually."
                 )
-        validate_global_install(global_target)
+        validate_global_install(global_target, digest_index=digest_index)
         return {
             "catalog_state": "inherit",
             "configured": False,
@@ -1277,7 +2360,7 @@ def read_status(
             "Project profile points to a different Codex global installation; "
             "rerun 'set' for the current CODEX_HOME."
         )
-    global_names = validate_global_install(global_target)
+    global_names = validate_global_install(global_target, digest_index=digest_index)
     source_version = data.get("source_version")
     if (
         not isinstance(source_version, str)
@@ -1319,13 +2402,14 @@ def read_status(
             role = agents_dir / f"{name}.toml"
             if _is_linklike(role) or not role.is_file():
                 missing.append(f"agents/{name}.toml")
-            elif _sha256_file(role) != hashes[name]:
+            elif _sha256_with_index(role, digest_index) != hashes[name]:
                 missing.append(f"agents/{name}.toml:sha256")
     expected_asset_digest = _asset_digest(
         asset_root,
         profile=profile,
         model_set=model_set,
         uniform_model=uniform_model,
+        digest_index=digest_index,
     )
     profile_inputs_current = data.get("asset_digest") == expected_asset_digest
     if not profile_inputs_current and source_version != current_source_version:
@@ -1335,6 +2419,7 @@ def read_status(
             model_set=model_set,
             uniform_model=uniform_model,
             version_override=source_version,
+            digest_index=digest_index,
         )
         profile_inputs_current = data.get("asset_digest") == recorded_version_digest
     if source_version == current_source_version and not profile_inputs_current:
@@ -1389,6 +2474,27 @@ def read_status(
 
 
 def clear_profile(*, workspace: Path, dry_run: bool) -> dict[str, Any]:
+    project_dir = _validated_project_dir(workspace)
+    if not project_dir.is_dir():
+        # Nothing to clear; do not create the directory just to lock it.
+        return _clear_profile(workspace=workspace, dry_run=dry_run)
+    lock_path = project_dir / PROJECT_LOCK_FILENAME
+    with _advisory_lock(lock_path, shared=dry_run, persistent=True):
+        result = _clear_profile(workspace=workspace, dry_run=dry_run)
+        if result["changed"] and not dry_run:
+            # The cleared project keeps no lock file; anyone waiting on it
+            # notices the removed inode and reopens a fresh one.
+            with contextlib.suppress(OSError):
+                lock_path.unlink()
+    if result["changed"] and not dry_run:
+        try:
+            project_dir.rmdir()
+        except OSError:
+            pass
+    return result
+
+
+def _clear_profile(*, workspace: Path, dry_run: bool) -> dict[str, Any]:
     loaded = _read_project_manifest(workspace)
     project_dir = _validated_project_dir(workspace)
     config_path = project_dir / "config.toml"
@@ -1445,10 +2551,6 @@ def clear_profile(*, workspace: Path, dry_run: bool) -> dict[str, Any]:
             agents_dir.rmdir()
         except OSError:
             pass
-        try:
-            project_dir.rmdir()
-        except OSError:
-            pass
     return {
         "changed": True,
         "dry_run": dry_run,
@@ -1464,6 +2566,7 @@ def resolve_recovery(
     asset_root: Path,
     agent: str,
     requested_tier: str,
+    digest_index: DigestIndex | None = None,
 ) -> dict[str, Any]:
     """Resolve a bounded recovery model from a healthy workspace overlay."""
 
@@ -1471,6 +2574,7 @@ def resolve_recovery(
         workspace,
         global_target=global_target,
         asset_root=asset_root,
+        digest_index=digest_index,
     )
     if not status.get("configured") or status.get("mode") == "inherit":
         raise ProjectProfileError(
@@ -1535,8 +2639,16 @@ def resolve_recovery(
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description=__doc__)
-    parser.add_argument("action", choices=("cache", "set", "status", "clear", "resolve-recovery"))
+    parser.add_argument(
+        "action",
+        choices=("cache", "set", "status", "clear", "resolve-recovery", "gc", "prewarm"),
+    )
     parser.add_argument("--workspace")
+    parser.add_argument(
+        "--workspaces-from",
+        metavar="FILE",
+        help="Apply set to every workspace listed one per line in FILE ('-' reads stdin).",
+    )
     parser.add_argument("--global-target")
     parser.add_argument("--asset-root")
     parser.add_argument("--profile")
@@ -1546,6 +2658,35 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--model-tier", choices=("mini", "standard", "strong"))
     parser.add_argument("--dry-run", action="store_true")
     parser.add_argument("--json", action="store_true")
+    parser.add_argument(
+        "--combination",
+        action="append",
+        default=[],
+        help="PROFILE:MODEL_SET to prewarm; repeatable. Defaults to every profile and model set.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Workers for prewarm or set --workspaces-from (default: CPU count).",
+    )
+    parser.add_argument(
+        "--max-caches",
+        type=int,
+        default=None,
+        help=f"Keep at most this many global profile caches (default {DEFAULT_CACHE_MAX_ENTRIES}).",
+    )
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        default=None,
+        help="Evict least recently used global profile caches above this total size.",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Re-hash every profile input instead of trusting the stat-keyed digest index.",
+    )
     return parser
 
 
@@ -1579,6 +2720,7 @@ def main(argv: Sequence[str] | None = None) -> int:
                 "Project profiles must use the support assets owned by the selected "
                 f"global Codex installation: {expected_asset_root}"
             )
+        digest_index = DigestIndex.load(global_target, verify=args.verify)
         if args.action in ("cache", "set"):
             if args.uniform_model and (args.profile or args.model_set):
                 raise ProjectProfileError(
@@ -1603,9 +2745,52 @@ def main(argv: Sequence[str] | None = None) -> int:
             raise ProjectProfileError(
                 "--agent and --model-tier are only valid with resolve-recovery."
             )
-        if args.action == "cache":
+        if args.action not in ("cache", "gc", "prewarm") and (
+            args.max_caches is not None or args.max_bytes is not None
+        ):
+            raise ProjectProfileError(
+                "--max-caches and --max-bytes are only valid with cache, gc, or prewarm."
+            )
+        if args.action != "prewarm" and args.combination:
+            raise ProjectProfileError("--combination is only valid with prewarm.")
+        if args.workspaces_from and args.action != "set":
+            raise ProjectProfileError("--workspaces-from is only valid with set.")
+        if args.workspaces_from and args.workspace:
+            raise ProjectProfileError("--workspaces-from cannot be combined with --workspace.")
+        batch = args.action == "set" and bool(args.workspaces_from)
+        if args.jobs is not None and not (args.action == "prewarm" or batch):
+            raise ProjectProfileError(
+                "--jobs is only valid with prewarm or set --workspaces-from."
+            )
+        if args.action == "prewarm" and (args.profile or args.model_set or args.uniform_model):
+            raise ProjectProfileError(
+                "prewarm selects profiles with --combination PROFILE:MODEL_SET; do not pass "
+                "--profile, --model-set, or --uniform-model."
+            )
+        max_caches = (
+            DEFAULT_CACHE_MAX_ENTRIES if args.max_caches is None else args.max_caches
+        )
+        if args.action == "prewarm":
+            result = prewarm_caches(
+                asset_root=asset_root,
+                global_target=global_target,
+                combinations=args.combination,
+                jobs=args.jobs,
+                max_caches=max_caches,
+                max_bytes=args.max_bytes,
+                dry_run=args.dry_run,
+                digest_index=digest_index,
+            )
+        elif args.action == "gc":
+            result = collect_cache_garbage(
+                global_target=global_target,
+                max_caches=max_caches,
+                max_bytes=args.max_bytes,
+                dry_run=args.dry_run,
+            )
+        elif args.action == "cache":
             names = validate_global_install(
-                global_target, allow_pending_skill_sync=True
+                global_target, allow_pending_skill_sync=True, digest_index=digest_index
             )
             cache_dir, _names, source_version = generate_cache(
                 asset_root=asset_root,
@@ -1615,17 +2800,32 @@ def main(argv: Sequence[str] | None = None) -> int:
                 uniform_model=args.uniform_model,
                 global_agent_names=names,
                 dry_run=args.dry_run,
+                digest_index=digest_index,
+                max_caches=max_caches,
+                max_bytes=args.max_bytes,
             )
             result = {
                 "cache_dir": str(cache_dir),
                 "dry_run": args.dry_run,
                 "source_version": source_version,
             }
+        elif batch:
+            result = set_profiles(
+                workspaces=_read_workspace_list(args.workspaces_from),
+                global_target=global_target,
+                asset_root=asset_root,
+                profile=args.profile,
+                model_set=args.model_set,
+                uniform_model=args.uniform_model,
+                dry_run=args.dry_run,
+                jobs=args.jobs,
+                digest_index=digest_index,
+            )
         else:
             if not args.workspace:
                 raise ProjectProfileError(f"{args.action} requires --workspace.")
             workspace = _canonical(args.workspace)
-        if args.action == "set":
+        if args.action == "set" and not batch:
             result = set_profile(
                 workspace=workspace,
                 global_target=global_target,
@@ -1634,12 +2834,14 @@ def main(argv: Sequence[str] | None = None) -> int:
                 model_set=args.model_set,
                 uniform_model=args.uniform_model,
                 dry_run=args.dry_run,
+                digest_index=digest_index,
             )
         elif args.action == "status":
             result = read_status(
                 workspace,
                 global_target=global_target,
                 asset_root=asset_root,
+                digest_index=digest_index,
             )
         elif args.action == "clear":
             result = clear_profile(workspace=workspace, dry_run=args.dry_run)
@@ -1650,7 +2852,20 @@ def main(argv: Sequence[str] | None = None) -> int:
                 asset_root=asset_root,
                 agent=args.agent,
                 requested_tier=args.model_tier,
+                digest_index=digest_index,
             )
+        if not args.dry_run:
+            digest_index.save()
+            if batch:
+                _update_workspace_registry(
+                    global_target,
+                    *(Path(item["workspace"]) for item in result["applied"]),
+                    registered=True,
+                )
+            elif args.action in ("set", "status") and result.get("configured", True):
+                _update_workspace_registry(global_target, workspace, registered=True)
+            elif args.action == "clear" and result.get("changed"):
+                _update_workspace_registry(global_target, workspace, registered=False)
         if args.json or args.action == "resolve-recovery":
             print(json.dumps(result, indent=2, sort_keys=True, ensure_ascii=False))
         else:
@@ -1659,6 +2874,48 @@ def main(argv: Sequence[str] | None = None) -> int:
                     ("Would generate" if args.dry_run else "Generated")
                     + f" global profile cache: {result['cache_dir']}"
                 )
+            elif args.action == "prewarm":
+                if args.dry_run:
+                    print(
+                        f"Would prewarm {len(result['planned'])} global profile cache(s); "
+                        f"{len(result['current'])} already current"
+                    )
+                else:
+                    print(
+                        f"Prewarmed {len(result['built'])} global profile cache(s); "
+                        f"{len(result['current'])} already current"
+                    )
+                for failure in result["failed"]:
+                    print(
+                        f"Failed to prewarm {failure['profile']}:{failure['model_set']}: "
+                        f"{failure['error']}",
+                        file=sys.stderr,
+                    )
+            elif batch:
+                print(
+                    ("Would set" if args.dry_run else "Set")
+                    + f" project profile overlay in {len(result['applied'])} workspace(s); "
+                    f"{len(result['failed'])} failed"
+                )
+                for failure in result["failed"]:
+                    print(
+                        f"Failed to set project profile overlay: {failure['workspace']}: "
+                        f"{failure['error']}",
+                        file=sys.stderr,
+                    )
+            elif args.action == "gc":
+                print(
+                    ("Would evict" if args.dry_run else "Evicted")
+                    + f" {len(result['evicted'])} global profile cache(s), "
+                    f"{result['freed_bytes']} bytes; kept {result['cache_count']} "
+                    f"({len(result['protected'])} referenced by registered workspaces)"
+                )
+                for workspace_path in result["unreadable_workspaces"]:
+                    print(
+                        "Warning: eviction skipped; registered workspace could not be read: "
+                        f"{workspace_path}",
+                        file=sys.stderr,
+                    )
             elif args.action == "status" and not result.get("configured"):
                 print(f"Project profile: inherit global ({workspace})")
             elif args.action == "status":
@@ -1681,8 +2938,15 @@ def main(argv: Sequence[str] | None = None) -> int:
                     ("Would set" if args.dry_run else "Set")
                     + f" project profile overlay: {workspace}"
                 )
-        if args.action in ("set", "status") and result.get("configured", True):
+        if batch:
+            for applied in result["applied"]:
+                _print_eligibility_warning(applied)
+        elif args.action in ("set", "status") and result.get("configured", True):
             _print_eligibility_warning(result)
+        if args.action == "prewarm" and result["failed"]:
+            return 2
+        if batch and result["failed"]:
+            return 2
         return 0
     except (OSError, ProjectProfileError) as exc:
         print(f"codex-project-profile: {exc}", file=sys.stderr)
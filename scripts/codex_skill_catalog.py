@@ -5,9 +5,13 @@ from __future__ import annotations
 
 import hashlib
 import json
+import os
 import stat
+import tempfile
+import threading
+import time
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Iterable
 
 
 WORKFLOW_SKILL_NAMES = (
@@ -40,6 +44,14 @@ SKILL_MARKER_VERSION = 2
 SUPPORTED_SKILL_MARKER_VERSIONS = (1, SKILL_MARKER_VERSION)
 SKILL_SYNC_STATE_PENDING = "pending"
 SKILL_SYNC_STATE_READY = "ready"
+SKILL_DIGEST_INDEX_TOOL = "agents_pipeline.codex-skill-digest-index"
+SKILL_DIGEST_INDEX_VERSION = 1
+SKILL_DIGEST_INDEX_MAX_TREES = 64
+# Trees with a file modified this recently are hashed but never recorded: a
+# same-size rewrite inside the filesystem's timestamp granularity must not hit.
+SKILL_DIGEST_INDEX_SETTLE_NS = 2_000_000_000
+SKILL_HASH_CHUNK_BYTES = 1 << 20
+SKILL_HASH_MAX_WORKERS = 8
 
 
 def is_linklike(path: Path) -> bool:
@@ -60,16 +72,116 @@ def is_linklike(path: Path) -> bool:
     )
 
 
-def skill_tree_digest(root: Path) -> str:
+class SkillDigestIndex:
+    """Skill tree digests keyed by each file's relative path, size, and mtime_ns.
+
+    A hit skips reading the tree's contents; any added, removed, resized, or
+    touched file changes the signature and forces a full streamed hash.  The
+    index is advisory: unreadable files are ignored and saving is best-effort.
+    """
+
+    def __init__(self, path: Path, trees: dict[str, dict[str, Any]] | None = None) -> None:
+        self.path = path
+        self._trees = dict(trees or {})
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_skill_root(cls, user_skills_root: Path) -> "SkillDigestIndex":
+        """Load the index kept beside ``user_skills_root``, outside the collection."""
+
+        return cls.load(
+            user_skills_root.parent
+            / f".{user_skills_root.name}.agents-pipeline-digest-index.json"
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "SkillDigestIndex":
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, UnicodeError, json.JSONDecodeError):
+            return cls(path)
+        if not isinstance(data, dict):
+            return cls(path)
+        trees = data.get("trees")
+        if (
+            data.get("tool") != SKILL_DIGEST_INDEX_TOOL
+            or data.get("version") != SKILL_DIGEST_INDEX_VERSION
+            or not isinstance(trees, dict)
+        ):
+            return cls(path)
+        return cls(path, {
+            key: value
+            for key, value in trees.items()
+            if isinstance(value, dict) and isinstance(value.get("sha256"), str)
+        })
+
+    def knows(self, roots: Iterable[Path]) -> bool:
+        """Return whether every tree in ``roots`` has a recorded digest."""
+
+        with self._lock:
+            return all(root.as_posix() in self._trees for root in roots)
+
+    def lookup(self, root: Path, signature: list[list[Any]]) -> str | None:
+        with self._lock:
+            entry = self._trees.get(root.as_posix())
+        if entry is not None and entry.get("files") == signature:
+            return entry["sha256"]
+        return None
+
+    def record(self, root: Path, signature: list[list[Any]], digest: str) -> None:
+        with self._lock:
+            key = root.as_posix()
+            self._trees.pop(key, None)
+            self._trees[key] = {"files": signature, "sha256": digest}
+            while len(self._trees) > SKILL_DIGEST_INDEX_MAX_TREES:
+                self._trees.pop(next(iter(self._trees)))
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps(
+                {
+                    "tool": SKILL_DIGEST_INDEX_TOOL,
+                    "trees": self._trees,
+                    "version": SKILL_DIGEST_INDEX_VERSION,
+                },
+                separators=(",", ":"),
+            )
+            self._dirty = False
+        if is_linklike(self.path) or not self.path.parent.is_dir():
+            return
+        try:
+            fd, temp_name = tempfile.mkstemp(
+                prefix=f".{self.path.name}.", suffix=".tmp", dir=self.path.parent
+            )
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(payload + "\n")
+            os.replace(temp_name, self.path)
+        except OSError:
+            try:
+                os.unlink(temp_name)
+            except OSError:
+                pass
+
+
+def skill_tree_digest(root: Path, *, digest_index: SkillDigestIndex | None = None) -> str:
     """Hash every regular installed skill file except its ownership marker."""
 
-    digest = hashlib.sha256()
     marker_path = root / SKILL_MARKER_FILENAME
     paths = sorted(
         path
         for path in root.rglob("*")
         if path != marker_path
     )
+    files: list[tuple[str, Path]] = []
+    signature: list[list[Any]] = []
+    newest_ns = 0
     for path in paths:
         if is_linklike(path):
             raise ValueError(f"Skill tree contains a link or reparse point: {path}")
@@ -78,11 +190,31 @@ def skill_tree_digest(root: Path) -> str:
         if not path.is_file():
             raise ValueError(f"Skill tree contains a non-regular entry: {path}")
         relative = path.relative_to(root).as_posix()
+        files.append((relative, path))
+        if digest_index is not None:
+            info = path.stat()
+            signature.append([relative, info.st_size, info.st_mtime_ns])
+            newest_ns = max(newest_ns, info.st_mtime_ns)
+    if digest_index is not None:
+        cached = digest_index.lookup(root, signature)
+        if cached is not None:
+            return cached
+
+    digest = hashlib.sha256()
+    for relative, path in files:
         digest.update(relative.encode("utf-8"))
         digest.update(b"\0")
-        digest.update(path.read_bytes())
+        with path.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(SKILL_HASH_CHUNK_BYTES), b""):
+                digest.update(chunk)
         digest.update(b"\0")
-    return digest.hexdigest()
+    result = digest.hexdigest()
+    if (
+        digest_index is not None
+        and time.time_ns() - newest_ns >= SKILL_DIGEST_INDEX_SETTLE_NS
+    ):
+        digest_index.record(root, signature, result)
+    return result
 
 
 def expected_skill_marker(
@@ -90,10 +222,11 @@ def expected_skill_marker(
     skill_name: str,
     *,
     installed_root: Path | None = None,
+    digest_index: SkillDigestIndex | None = None,
 ) -> dict[str, object]:
     target = installed_root or content_root
     return {
-        "content_sha256": skill_tree_digest(content_root),
+        "content_sha256": skill_tree_digest(content_root, digest_index=digest_index),
         "installed_root": target.resolve(strict=False).as_posix(),
         "skill_name": skill_name,
         "tool": SKILL_MARKER_TOOL,
@@ -101,35 +234,61 @@ def expected_skill_marker(
     }
 
 
+def _skill_issue(
+    user_skills_root: Path, skill_name: str, digest_index: SkillDigestIndex | None
+) -> str | None:
+    target = user_skills_root / skill_name
+    prefix = f"skills:{skill_name}"
+    if is_linklike(target) or not target.is_dir():
+        return prefix
+    skill_md = target / "SKILL.md"
+    if is_linklike(skill_md) or not skill_md.is_file():
+        return f"{prefix}/SKILL.md"
+    marker_path = target / SKILL_MARKER_FILENAME
+    if is_linklike(marker_path) or not marker_path.is_file():
+        return f"{prefix}/marker"
+    try:
+        marker = json.loads(marker_path.read_text(encoding="utf-8"))
+        expected = expected_skill_marker(target, skill_name, digest_index=digest_index)
+    except (json.JSONDecodeError, OSError, UnicodeError, ValueError):
+        return f"{prefix}/integrity"
+    if marker != expected:
+        return f"{prefix}/integrity"
+    return None
+
+
 def skill_collection_issues(
-    user_skills_root: Path, skill_names: Iterable[str]
+    user_skills_root: Path,
+    skill_names: Iterable[str],
+    *,
+    digest_index: SkillDigestIndex | None = None,
 ) -> list[str]:
-    """Return stable issue tokens for a marker-owned installed skill collection."""
+    """Return stable issue tokens for a marker-owned installed skill collection.
+
+    Skills are verified concurrently on a small thread pool; pass a
+    ``SkillDigestIndex`` to skip re-reading skills whose files are unchanged.
+    When the index already knows every skill, the checks are expected to be
+    stat-only and run inline, since starting the pool would cost more.
+    """
 
     if is_linklike(user_skills_root) or not user_skills_root.is_dir():
         return ["skills:root"]
 
-    issues: list[str] = []
-    for skill_name in skill_names:
-        target = user_skills_root / skill_name
-        prefix = f"skills:{skill_name}"
-        if is_linklike(target) or not target.is_dir():
-            issues.append(prefix)
-            continue
-        skill_md = target / "SKILL.md"
-        if is_linklike(skill_md) or not skill_md.is_file():
-            issues.append(f"{prefix}/SKILL.md")
-            continue
-        marker_path = target / SKILL_MARKER_FILENAME
-        if is_linklike(marker_path) or not marker_path.is_file():
-            issues.append(f"{prefix}/marker")
-            continue
-        try:
-            marker = json.loads(marker_path.read_text(encoding="utf-8"))
-            expected = expected_skill_marker(target, skill_name)
-        except (json.JSONDecodeError, OSError, UnicodeError, ValueError):
-            issues.append(f"{prefix}/integrity")
-            continue
-        if marker != expected:
-            issues.append(f"{prefix}/integrity")
-    return issues
+    names = list(skill_names)
+    if digest_index is not None and digest_index.knows(
+        user_skills_root / name for name in names
+    ):
+        results = [
+            _skill_issue(user_skills_root, skill_name, digest_index) for skill_name in names
+        ]
+        return [issue for issue in results if issue is not None]
+
+    import concurrent.futures
+
+    workers = max(1, min(SKILL_HASH_MAX_WORKERS, len(names)))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(
+            lambda skill_name: _skill_issue(user_skills_root, skill_name, digest_index),
+            names,
+        )
+        return [issue for issue in results if issue is not None]
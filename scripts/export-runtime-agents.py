@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Export Codex, Claude Code, and Copilot agents from one parsed source model.
+
+Each selected runtime is rendered in-process by its own exporter, so the
+canonical ``agents/*.md`` files are parsed and minified once per invocation
+instead of once per runtime subprocess.
+"""
+
+import argparse
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, List, Optional, Sequence
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if SCRIPT_DIR.as_posix() not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR.as_posix())
+
+from agent_export_engine import load_source_model  # noqa: E402
+
+
+RUNTIME_EXPORTERS = {
+    "codex": "export-codex-agents.py",
+    "claude": "export-claude-agents.py",
+    "copilot": "export-copilot-agents.py",
+}
+SHARED_VALUE_FLAGS = (
+    ("modes_file", "--modes-file"),
+    ("catalog", "--catalog"),
+    ("resolve_support_refs_to", "--resolve-support-refs-to"),
+    ("agent_profile", "--agent-profile"),
+    ("profile_dir", "--profile-dir"),
+)
+SHARED_SWITCH_FLAGS = (
+    ("strict", "--strict"),
+    ("dry_run", "--dry-run"),
+    ("incremental", "--incremental"),
+)
+
+
+def load_exporter(runtime: str) -> ModuleType:
+    path = SCRIPT_DIR / RUNTIME_EXPORTERS[runtime]
+    module_name = f"agents_pipeline_export_{runtime}"
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    if spec is None or spec.loader is None:
+        raise ValueError(f"Unable to load exporter: {path.as_posix()}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Export canonical agents into several runtime formats in one process, "
+            "sharing a single parsed source model."
+        )
+    )
+    parser.add_argument(
+        "--source-agents",
+        default="agents",
+        help="Directory containing canonical source agent markdown files.",
+    )
+    for runtime in RUNTIME_EXPORTERS:
+        parser.add_argument(
+            f"--{runtime}-target-dir",
+            default=None,
+            help=f"Target directory for {runtime} output; the runtime is skipped when omitted.",
+        )
+        parser.add_argument(
+            f"--{runtime}-model-set",
+            default=None,
+            help=f"Runtime model-set name or JSON path for {runtime}, used with --agent-profile.",
+        )
+    parser.add_argument("--modes-file", default=None, help="Neutral mode manifest.")
+    parser.add_argument(
+        "--catalog",
+        default=None,
+        help="Optional AGENTS catalog used for strict all-agent coverage checks.",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Print actions without writing files."
+    )
+    parser.add_argument(
+        "--strict", action="store_true", help="Fail on unresolved refs or unknown keys."
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse per-agent renders cached under each target directory for unchanged agents.",
+    )
+    parser.add_argument(
+        "--resolve-support-refs-to",
+        default=None,
+        help="Rewrite neutral agents/protocols/skills/tools references to this support root.",
+    )
+    parser.add_argument(
+        "--agent-profile",
+        default=None,
+        help="Opt-in agent model profile name or JSON path.",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default=None,
+        help="Directory containing agent model profiles.",
+    )
+    parser.add_argument(
+        "--claude-md",
+        default=None,
+        help="Path to CLAUDE.md where the Claude Code runner protocol section will be injected.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Allow the Codex exporter to overwrite non-generated existing files.",
+    )
+    return parser
+
+
+def runtime_argv(runtime: str, args: argparse.Namespace) -> List[str]:
+    argv = [
+        "--source-agents",
+        args.source_agents,
+        "--target-dir",
+        getattr(args, f"{runtime}_target_dir"),
+    ]
+    for attr, flag in SHARED_VALUE_FLAGS:
+        value = getattr(args, attr)
+        if value is not None:
+            argv.extend([flag, value])
+    for attr, flag in SHARED_SWITCH_FLAGS:
+        if getattr(args, attr):
+            argv.append(flag)
+    model_set = getattr(args, f"{runtime}_model_set")
+    if model_set is not None:
+        argv.extend(["--model-set", model_set])
+    if runtime == "claude" and args.claude_md:
+        argv.extend(["--claude-md", args.claude_md])
+    if runtime == "codex" and args.force:
+        argv.append("--force")
+    return argv
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    runtimes = [
+        runtime
+        for runtime in RUNTIME_EXPORTERS
+        if getattr(args, f"{runtime}_target_dir") is not None
+    ]
+    if not runtimes:
+        print(
+            "At least one of --codex-target-dir, --claude-target-dir, or --copilot-target-dir is required",
+            file=sys.stderr,
+        )
+        return 2
+
+    # Each exporter resolves --source-agents itself (Codex maps the default to
+    # the repo beside this script); a runtime that lands on a different
+    # directory simply re-parses instead of reusing the shared model.
+    source_agents_dir = Path(args.source_agents).expanduser()
+    if not source_agents_dir.exists():
+        print(f"Source directory not found: {source_agents_dir}", file=sys.stderr)
+        return 2
+
+    try:
+        source_model = load_source_model(source_agents_dir)
+        exporters: Dict[str, ModuleType] = {
+            runtime: load_exporter(runtime) for runtime in runtimes
+        }
+    except ValueError as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+
+    status = 0
+    for runtime in runtimes:
+        exporter = exporters[runtime]
+        runtime_args = exporter.build_parser().parse_args(
+            runtime_argv(runtime, args)
+        )
+        result = exporter.export_agents(runtime_args, source_model=source_model)
+        if result != 0:
+            print(f"{runtime} export failed with exit code {result}", file=sys.stderr)
+            status = result
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -208,7 +208,8 @@ if ($DryRun) {
 $supportArgs = @(
     $supportSyncScript,
     "--source-root", $assetRoot,
-    "--target-root", $supportRoot
+    "--target-root", $supportRoot,
+    "--delta"
 )
 if ($DryRun) {
     $supportArgs += "--dry-run"
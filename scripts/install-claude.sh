@@ -310,6 +310,7 @@ SUPPORT_CMD=(
   "${PYTHON_BIN}" "${SUPPORT_SYNC_SCRIPT}"
   --source-root "${ASSET_ROOT}"
   --target-root "${SUPPORT_DIR}"
+  --delta
 )
 if [[ ${DRY_RUN} -eq 1 ]]; then
   SUPPORT_CMD+=(--dry-run)
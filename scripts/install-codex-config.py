@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 import argparse
+import concurrent.futures
+import hashlib
 import json
 import os
 import re
@@ -7,9 +9,9 @@ import shutil
 import subprocess
 import sys
 import tempfile
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence
+from typing import Dict, List, Optional, Sequence, Set, Tuple
 
 try:  # Python 3.11+
     import tomllib
@@ -29,7 +31,17 @@ from codex_skill_catalog import (
     SKILL_SYNC_STATE_READY,
     skill_collection_issues,
 )
-from path_safety import is_linklike, validate_generated_shell_path
+from object_pool import (
+    COPY_STRATEGIES,
+    DEFAULT_COPY_STRATEGY,
+    ObjectPoolError,
+    open_object_pool,
+)
+from path_safety import (
+    is_linklike,
+    normalized_path_text,
+    validate_generated_shell_path,
+)
 
 
 GENERATED_ROLE_MARKER = "# Generated by scripts/export-codex-agents.py"
@@ -53,6 +65,13 @@ SUPPORT_TREE_DIRS = ("agents", "protocols", "runtimes", "scripts", "skills", "to
 SUPPORT_TREE_FILES = ("AGENTS.md", "VERSION", "modes.json")
 SUPPORT_TREE_DIRNAME = "agents-pipeline"
 SUPPORT_SYNC_SCRIPT = SCRIPT_DIR / "sync-runtime-support.py"
+# A multi-target install exports roles once against this support root and
+# substitutes each target's real support tree path afterwards.
+FLEET_SUPPORT_ROOT_PLACEHOLDER = "/.agents-pipeline-fleet-support-root"
+# Fleet installs reflink support files from a run-scoped pool unless another
+# strategy or a persistent --object-pool is selected.
+FLEET_COPY_STRATEGY = "reflink"
+UP_TO_DATE_MESSAGE = "Codex install is already up to date"
 LEGACY_SUPPORT_TREE_DIRNAME = "opencode"
 LEGACY_SUPPORT_TREE_MARKERS = (
     "agents/orchestrator-pipeline.md",
@@ -72,6 +91,25 @@ class Block:
     kind: str
     path: Optional[str]
     lines: List[str]
+    # Per-line "outside a multiline string" flags, computed once per edit.
+    syntax: Optional[List[bool]] = field(default=None, repr=False, compare=False)
+
+    def syntax_flags(self) -> List[bool]:
+        if self.syntax is None or len(self.syntax) != len(self.lines):
+            self.syntax = _syntax_line_flags(self.lines)
+        return self.syntax
+
+    def set_lines(self, lines: List[str], syntax: List[bool]) -> None:
+        self.lines = lines
+        self.syntax = syntax
+
+    def copy(self) -> "Block":
+        return Block(
+            self.kind,
+            self.path,
+            list(self.lines),
+            None if self.syntax is None else list(self.syntax),
+        )
 
 
 @dataclass(frozen=True)
@@ -279,6 +317,8 @@ def resolve_asset_layout(script_path: Path) -> AssetLayout:
 def _scan_multiline_string_state(line: str, state: Optional[str]) -> Optional[str]:
     """Track TOML multiline strings so string contents are never parsed as syntax."""
 
+    if state is None and '"' not in line and "'" not in line:
+        return None
     index = 0
     while index < len(line):
         if state is not None:
@@ -400,6 +440,7 @@ def parse_blocks(text: str) -> List[Block]:
     current_kind = "preamble"
     current_path: Optional[str] = None
     current_lines: List[str] = []
+    current_syntax: List[bool] = []
 
     multiline_state: Optional[str] = None
     for line in text.splitlines():
@@ -409,17 +450,21 @@ def parse_blocks(text: str) -> List[Block]:
         multiline_state = _scan_multiline_string_state(line, multiline_state)
         if array_match or table_match:
             if current_lines or current_kind != "preamble" or not blocks:
-                blocks.append(Block(current_kind, current_path, current_lines))
+                blocks.append(
+                    Block(current_kind, current_path, current_lines, current_syntax)
+                )
             current_kind = "array" if array_match else "table"
             current_path = _canonical_table_path(
                 (array_match or table_match).group(1).strip()
             )
             current_lines = [line]
+            current_syntax = [True]
             continue
         current_lines.append(line)
+        current_syntax.append(syntax_line)
 
     if current_lines or current_kind != "preamble" or not blocks:
-        blocks.append(Block(current_kind, current_path, current_lines))
+        blocks.append(Block(current_kind, current_path, current_lines, current_syntax))
     return blocks
 
 
@@ -437,22 +482,19 @@ def render_blocks(blocks: Sequence[Block]) -> str:
     return "\n\n".join(rendered).rstrip() + "\n"
 
 
-def validate_toml_text(text: str, label: str) -> None:
+def load_toml_text(text: str, label: str) -> Dict[str, object]:
     if tomllib is None:
         raise RuntimeError("Codex installation requires Python 3.11 or newer.")
     if not text.strip():
-        return
+        return {}
     try:
-        tomllib.loads(text)
+        return tomllib.loads(text)
     except tomllib.TOMLDecodeError as exc:
         raise ValueError(f"{label} is not valid TOML: {exc}") from exc
 
 
-def find_block_index(blocks: Sequence[Block], *, kind: str, path: str) -> Optional[int]:
-    for idx, block in enumerate(blocks):
-        if block.kind == kind and block.path == path:
-            return idx
-    return None
+def validate_toml_text(text: str, label: str) -> None:
+    load_toml_text(text, label)
 
 
 def insert_index_before_prefix(blocks: Sequence[Block], prefix: str) -> Optional[int]:
@@ -466,75 +508,122 @@ def insert_index_before_prefix(blocks: Sequence[Block], prefix: str) -> Optional
     return None
 
 
-def ensure_root_table(blocks: List[Block], path: str) -> Block:
-    existing_idx = find_block_index(blocks, kind="table", path=path)
-    if existing_idx is not None:
-        return blocks[existing_idx]
+class ConfigDocument:
+    """A Codex config parsed once into header blocks with a table index.
+
+    Blocks keep their original lines, so comments, quoting, and unmanaged
+    tables survive edits; ``data`` is the ``tomllib`` view of the text the
+    document was parsed from.
+    """
+
+    def __init__(self, blocks: List[Block], data: Dict[str, object]) -> None:
+        if not blocks or blocks[0].kind != "preamble":
+            blocks.insert(0, Block("preamble", None, [], []))
+        self.blocks = blocks
+        self.data = data
+        self._tables: Dict[str, Block] = {}
+        for block in blocks:
+            if block.kind == "table" and block.path is not None:
+                self._tables.setdefault(block.path, block)
+
+    @classmethod
+    def parse(cls, text: str, label: str) -> "ConfigDocument":
+        return cls(parse_blocks(text), load_toml_text(text, label))
+
+    @property
+    def preamble(self) -> Block:
+        return self.blocks[0]
+
+    def table(self, path: str) -> Optional[Block]:
+        return self._tables.get(path)
+
+    def ensure_table(self, path: str) -> Block:
+        existing = self._tables.get(path)
+        if existing is not None:
+            return existing
+
+        child_idx = insert_index_before_prefix(self.blocks, path + ".")
+        insert_idx = 1 if child_idx is None else child_idx
+        block = Block("table", path, [f"[{path}]"], [True])
+        self.blocks.insert(insert_idx, block)
+        self._tables[path] = block
+        return block
+
+    def remove_tables(self, paths: Set[str]) -> None:
+        if not paths & self._tables.keys():
+            return
+        self.blocks = [
+            block
+            for block in self.blocks
+            if not (block.kind == "table" and block.path in paths)
+        ]
+        for path in paths:
+            self._tables.pop(path, None)
 
-    child_idx = insert_index_before_prefix(blocks, path + ".")
-    if child_idx is not None:
-        insert_idx = child_idx
-    elif blocks and blocks[0].kind == "preamble":
-        insert_idx = 1
-    else:
-        insert_idx = len(blocks)
+    def append(self, block: Block) -> None:
+        block = block.copy()
+        self.blocks.append(block)
+        if block.kind == "table" and block.path is not None:
+            self._tables.setdefault(block.path, block)
 
-    block = Block("table", path, [f"[{path}]"])
-    blocks.insert(insert_idx, block)
-    return block
+    def render(self) -> str:
+        return render_blocks(self.blocks)
 
 
 def upsert_assignment(block: Block, key: str, value: str) -> None:
     key_token = rf'(?:{re.escape(key)}|"{re.escape(key)}"|\'{re.escape(key)}\')'
     assign_re = re.compile(rf"^\s*{key_token}\s*=")
     new_line = f"{key} = {value}"
+    syntax_flags = block.syntax_flags()
     output = [block.lines[0]]
+    output_flags = [syntax_flags[0]]
     replaced = False
 
-    syntax_flags = _syntax_line_flags(block.lines)
     for line, syntax_line in zip(block.lines[1:], syntax_flags[1:]):
         if syntax_line and assign_re.match(line) and not line.lstrip().startswith("#"):
             if not replaced:
                 output.append(new_line)
+                output_flags.append(True)
                 replaced = True
             continue
         output.append(line)
+        output_flags.append(syntax_line)
 
     if not replaced:
         while len(output) > 1 and not output[-1].strip():
             output.pop()
+            output_flags.pop()
         output.append(new_line)
+        output_flags.append(True)
 
-    block.lines = output
+    block.set_lines(output, output_flags)
 
 
 def remove_assignment_tree(block: Block, key: str) -> None:
     key_token = rf'(?:{re.escape(key)}|"{re.escape(key)}"|\'{re.escape(key)}\')'
     pattern = re.compile(rf"^\s*{key_token}\s*(?:=|\.)")
-    block.lines = [
-        line
-        for line, syntax_line in zip(block.lines, _syntax_line_flags(block.lines))
-        if not (
-            syntax_line
-            and pattern.match(line)
-            and not line.lstrip().startswith("#")
-        )
-    ]
+    _remove_syntax_lines(block, pattern)
 
 
 def remove_dotted_assignment_tree(block: Block, root: str, key: str) -> None:
     root_token = rf'(?:{re.escape(root)}|"{re.escape(root)}"|\'{re.escape(root)}\')'
     key_token = rf'(?:{re.escape(key)}|"{re.escape(key)}"|\'{re.escape(key)}\')'
     pattern = re.compile(rf"^\s*{root_token}\s*\.\s*{key_token}\s*(?:=|\.)")
-    block.lines = [
-        line
-        for line, syntax_line in zip(block.lines, _syntax_line_flags(block.lines))
-        if not (
-            syntax_line
-            and pattern.match(line)
-            and not line.lstrip().startswith("#")
-        )
-    ]
+    _remove_syntax_lines(block, pattern)
+
+
+def _remove_syntax_lines(block: Block, pattern: re.Pattern[str]) -> bool:
+    output: List[str] = []
+    output_flags: List[bool] = []
+    for line, syntax_line in zip(block.lines, block.syntax_flags()):
+        if syntax_line and pattern.match(line) and not line.lstrip().startswith("#"):
+            continue
+        output.append(line)
+        output_flags.append(syntax_line)
+    removed = len(output) != len(block.lines)
+    if removed:
+        block.set_lines(output, output_flags)
+    return removed
 
 
 def toml_scalar(value: object) -> str:
@@ -550,53 +639,42 @@ def toml_scalar(value: object) -> str:
 
 
 def enable_multi_agent_v2_config(
-    blocks: List[Block], preamble: Block, parsed_features: object
+    document: ConfigDocument, parsed_features: object
 ) -> None:
+    preamble = document.preamble
     configured = (
         parsed_features.get("multi_agent_v2")
         if isinstance(parsed_features, dict)
         else None
     )
-    nested_idx = find_block_index(
-        blocks, kind="table", path="features.multi_agent_v2"
-    )
     if isinstance(configured, dict):
-        if nested_idx is not None:
-            upsert_assignment(blocks[nested_idx], "enabled", "true")
+        nested_block = document.table("features.multi_agent_v2")
+        if nested_block is not None:
+            upsert_assignment(nested_block, "enabled", "true")
             return
 
-        features_idx = find_block_index(blocks, kind="table", path="features")
-        if features_idx is not None:
-            remove_assignment_tree(blocks[features_idx], "multi_agent_v2")
+        features_block = document.table("features")
+        if features_block is not None:
+            remove_assignment_tree(features_block, "multi_agent_v2")
         remove_dotted_assignment_tree(preamble, "features", "multi_agent_v2")
-        feature_block = ensure_root_table(blocks, "features.multi_agent_v2")
+        feature_block = document.ensure_table("features.multi_agent_v2")
         for key, value in configured.items():
             upsert_assignment(feature_block, key, toml_scalar(value))
         upsert_assignment(feature_block, "enabled", "true")
         return
 
-    features_idx = find_block_index(blocks, kind="table", path="features")
-    if features_idx is None and has_dotted_root_assignment(preamble, "features"):
+    if document.table("features") is None and has_dotted_root_assignment(
+        preamble, "features"
+    ):
         upsert_dotted_root_assignment(preamble, "features", "multi_agent_v2", "true")
     else:
-        features_block = ensure_root_table(blocks, "features")
+        features_block = document.ensure_table("features")
         upsert_assignment(features_block, "multi_agent_v2", "true")
 
 
 def remove_assignment_if_value(block: Block, key: str, value: str) -> bool:
     assign_re = re.compile(rf"^\s*{re.escape(key)}\s*=\s*{re.escape(value)}\s*(?:#.*)?$")
-    output = [block.lines[0]]
-    removed = False
-
-    syntax_flags = _syntax_line_flags(block.lines)
-    for line, syntax_line in zip(block.lines[1:], syntax_flags[1:]):
-        if syntax_line and assign_re.match(line) and not line.lstrip().startswith("#"):
-            removed = True
-            continue
-        output.append(line)
-
-    block.lines = output
-    return removed
+    return _remove_syntax_lines(block, assign_re)
 
 
 def _dotted_root_pattern(root: str, key: Optional[str] = None) -> re.Pattern[str]:
@@ -611,7 +689,7 @@ def has_dotted_root_assignment(block: Block, root: str) -> bool:
     pattern = _dotted_root_pattern(root)
     return any(
         syntax_line and pattern.match(line) and not line.lstrip().startswith("#")
-        for line, syntax_line in zip(block.lines, _syntax_line_flags(block.lines))
+        for line, syntax_line in zip(block.lines, block.syntax_flags())
     )
 
 
@@ -621,8 +699,9 @@ def upsert_dotted_root_assignment(
     pattern = _dotted_root_pattern(root, key)
     new_line = f"{root}.{key} = {value}"
     output: List[str] = []
+    output_flags: List[bool] = []
     replaced = False
-    for line, syntax_line in zip(block.lines, _syntax_line_flags(block.lines)):
+    for line, syntax_line in zip(block.lines, block.syntax_flags()):
         if (
             syntax_line
             and pattern.match(line)
@@ -630,14 +709,18 @@ def upsert_dotted_root_assignment(
         ):
             if not replaced:
                 output.append(new_line)
+                output_flags.append(True)
                 replaced = True
             continue
         output.append(line)
+        output_flags.append(syntax_line)
     if not replaced:
         while output and not output[-1].strip():
             output.pop()
+            output_flags.pop()
         output.append(new_line)
-    block.lines = output
+        output_flags.append(True)
+    block.set_lines(output, output_flags)
 
 
 def remove_dotted_root_assignment_if_value(
@@ -645,30 +728,25 @@ def remove_dotted_root_assignment_if_value(
 ) -> bool:
     prefix = _dotted_root_pattern(root, key).pattern.removesuffix("=")
     pattern = re.compile(rf"{prefix}=\s*{re.escape(value)}\s*(?:#.*)?$")
-    output: List[str] = []
-    removed = False
-    for line, syntax_line in zip(block.lines, _syntax_line_flags(block.lines)):
-        if syntax_line and pattern.match(line) and not line.lstrip().startswith("#"):
-            removed = True
-            continue
-        output.append(line)
-    block.lines = output
-    return removed
+    return _remove_syntax_lines(block, pattern)
+
+
+def use_dotted_root(document: ConfigDocument, root: str) -> bool:
+    return document.table(root) is None and has_dotted_root_assignment(
+        document.preamble, root
+    )
 
 
 def configure_agent_runtime_limits(
-    blocks: List[Block],
-    preamble: Block,
+    document: ConfigDocument,
     parsed_agents: object,
     *,
     manage_defaults: bool,
     remove_legacy_managed_limits: bool,
 ) -> None:
-    agents_idx = find_block_index(blocks, kind="table", path="agents")
-    use_dotted_agents = (
-        agents_idx is None and has_dotted_root_assignment(preamble, "agents")
-    )
-    agents_block = None if use_dotted_agents else ensure_root_table(blocks, "agents")
+    preamble = document.preamble
+    use_dotted_agents = use_dotted_root(document, "agents")
+    agents_block = None if use_dotted_agents else document.ensure_table("agents")
 
     if manage_defaults:
         configured_agents = parsed_agents if isinstance(parsed_agents, dict) else {}
@@ -858,6 +936,11 @@ def write_manifest(
     target_dir: Path,
     user_skills_root: Optional[Path] = None,
     defer_skill_sync: bool = False,
+    input_digest: Optional[str] = None,
+    agents_file: Optional[Path] = None,
+    copy_strategy: Optional[Dict[str, str]] = None,
+    agent_sha256: Optional[Dict[str, str]] = None,
+    config_sha256: Optional[str] = None,
 ) -> None:
     mode = "default"
     if uniform_model:
@@ -894,6 +977,23 @@ def write_manifest(
         "managed_agent_names": sorted(agent_names),
         "managed_agent_files": sorted(agent_files),
     }
+    if input_digest is not None:
+        # Outputs are recorded only once the whole install, including any
+        # deferred skill sync, has finished.
+        payload["install_fingerprint"] = {
+            "inputs": input_digest,
+            "agents_file": agents_file.resolve().as_posix() if agents_file else None,
+            "outputs": None,
+        }
+    if copy_strategy is not None:
+        # Profile caches seeded later follow the same strategy and pool.
+        payload["copy_strategy"] = copy_strategy
+    if agent_sha256:
+        payload["managed_agent_sha256"] = dict(sorted(agent_sha256.items()))
+    if config_sha256:
+        # The merged config registers every managed role and the multi-agent
+        # features, so status trusts an unchanged file without parsing it.
+        payload["managed_config_sha256"] = config_sha256
     write_text_atomic(path, json.dumps(payload, indent=2, sort_keys=True) + "\n")
 
 
@@ -917,9 +1017,133 @@ def finalize_managed_skill_sync(path: Path) -> None:
         )
     payload = json.loads(read_text(path))
     payload["managed_skill_sync_state"] = SKILL_SYNC_STATE_READY
+    set_install_outputs(path.parent, payload)
+    write_text_atomic(path, json.dumps(payload, indent=2, sort_keys=True) + "\n")
+
+
+def _stat_listing(root: Path) -> List[str]:
+    """List ``relative-path size mtime_ns`` for every file under ``root``."""
+
+    if not root.is_dir():
+        try:
+            stat = root.stat()
+        except FileNotFoundError:
+            return [f"{root.as_posix()} missing"]
+        return [f"{root.as_posix()} {stat.st_size} {stat.st_mtime_ns}"]
+    entries: List[str] = []
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        with os.scandir(directory) as scan:
+            for entry in scan:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name != "__pycache__":
+                        pending.append(Path(entry.path))
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+                relative = Path(entry.path).relative_to(root).as_posix()
+                entries.append(f"{relative} {stat.st_size} {stat.st_mtime_ns}")
+    entries.sort()
+    return [root.as_posix() + "/", *entries]
+
+
+def _file_sha256(path: Path) -> str:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return "missing"
+
+
+def model_free_role_digests(role_files: Dict[str, str]) -> Dict[str, str]:
+    """SHA-256 of each generated role that parses and sets no model keys.
+
+    ``agent-profile.py status`` re-parses only roles whose bytes no longer
+    match, so its global model policy check stays off the TOML parser.
+    """
+
+    if tomllib is None:
+        return {}
+    digests: Dict[str, str] = {}
+    for relative_path, content in role_files.items():
+        try:
+            role = tomllib.loads(content)
+        except tomllib.TOMLDecodeError:
+            continue
+        if "model" not in role and "model_provider" not in role:
+            digests[relative_path] = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return digests
+
+
+def install_input_digest(settings: Dict[str, object], input_paths: Sequence[Path]) -> str:
+    """Digest installer settings plus a stat listing of every input tree."""
+
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    for path in input_paths:
+        for line in _stat_listing(path):
+            digest.update(line.encode("utf-8") + b"\n")
+    return digest.hexdigest()
+
+
+def install_output_digest(target_dir: Path, payload: Dict[str, object]) -> str:
+    """Digest the managed outputs recorded by a manifest payload.
+
+    Config and AGENTS files are hashed by content so the next run's pre-merge
+    text is compared exactly; role files, the support tree, and managed skills
+    are compared at stat level.
+    """
+
+    fingerprint = payload.get("install_fingerprint")
+    agents_file = fingerprint.get("agents_file") if isinstance(fingerprint, dict) else None
+    lines = [
+        "config.toml " + _file_sha256(target_dir / "config.toml"),
+        f"{agents_file} "
+        + (_file_sha256(Path(agents_file)) if isinstance(agents_file, str) else "none"),
+    ]
+    for relative_path in payload.get("managed_agent_files") or []:
+        lines.extend(_stat_listing(target_dir / str(relative_path)))
+    lines.extend(_stat_listing(target_dir / SUPPORT_TREE_DIRNAME))
+    skills_root = payload.get("managed_user_skills_root")
+    if isinstance(skills_root, str):
+        for name in payload.get("managed_skill_names") or []:
+            lines.extend(_stat_listing(Path(skills_root) / str(name)))
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+def set_install_outputs(target_dir: Path, payload: Dict[str, object]) -> None:
+    fingerprint = payload.get("install_fingerprint")
+    if isinstance(fingerprint, dict):
+        fingerprint["outputs"] = install_output_digest(target_dir, payload)
+
+
+def record_install_outputs(path: Path) -> None:
+    """Mark a finished install as the up-to-date state for its input digest."""
+
+    payload = json.loads(read_text(path))
+    set_install_outputs(path.parent, payload)
     write_text_atomic(path, json.dumps(payload, indent=2, sort_keys=True) + "\n")
 
 
+def install_staleness(path: Path, input_digest: str) -> Optional[str]:
+    """Return why the install at ``path`` must run, or ``None`` when up to date."""
+
+    parsed = parse_manifest(path)
+    if parsed is None:
+        return "no installer manifest"
+    payload = json.loads(read_text(path))
+    fingerprint = payload.get("install_fingerprint")
+    if not isinstance(fingerprint, dict):
+        return "manifest has no install fingerprint"
+    if fingerprint.get("inputs") != input_digest:
+        return "installer inputs or options changed"
+    if parsed["managed_skill_sync_state"] == SKILL_SYNC_STATE_PENDING or not isinstance(
+        fingerprint.get("outputs"), str
+    ):
+        return "the previous install did not finish"
+    if fingerprint["outputs"] != install_output_digest(path.parent, payload):
+        return "managed outputs changed since the last install"
+    return None
+
+
 def is_generated_role_file(path: Path) -> bool:
     if is_linklike(path) or not path.exists() or not path.is_file():
         return False
@@ -1142,10 +1366,9 @@ def run_export(
 
 
 def extract_generated_agent_blocks(config_text: str) -> Dict[str, Block]:
-    validate_toml_text(config_text, "Generated Codex config")
-    blocks = parse_blocks(config_text)
+    document = ConfigDocument.parse(config_text, "Generated Codex config")
     generated: Dict[str, Block] = {}
-    for block in blocks:
+    for block in document.blocks:
         if (
             block.kind != "table"
             or not block.path
@@ -1157,7 +1380,7 @@ def extract_generated_agent_blocks(config_text: str) -> Dict[str, Block]:
         name = block.path[len("agents.") :]
         if "." in name:
             continue
-        generated[name] = Block(block.kind, block.path, list(block.lines))
+        generated[name] = block.copy()
     return generated
 
 
@@ -1170,46 +1393,30 @@ def merge_config_text(
     manage_agent_runtime_limits: bool = False,
     remove_legacy_agent_limits: bool = False,
 ) -> str:
-    validate_toml_text(existing_text, "Existing Codex config")
-    parsed_existing = tomllib.loads(existing_text) if existing_text.strip() else {}
-    blocks = parse_blocks(existing_text)
-    managed_headers = {
-        f"agents.{name}"
-        for name in set(previous_agent_names) | set(current_agent_blocks)
-    }
-    blocks = [
-        block
-        for block in blocks
-        if not (block.kind == "table" and block.path in managed_headers)
-    ]
-    if not blocks or blocks[0].kind != "preamble":
-        blocks.insert(0, Block("preamble", None, []))
-    preamble = blocks[0]
+    document = ConfigDocument.parse(existing_text, "Existing Codex config")
+    document.remove_tables(
+        {
+            f"agents.{name}"
+            for name in set(previous_agent_names) | set(current_agent_blocks)
+        }
+    )
+    preamble = document.preamble
 
-    features_idx = find_block_index(blocks, kind="table", path="features")
-    if features_idx is None and has_dotted_root_assignment(preamble, "features"):
+    if use_dotted_root(document, "features"):
         upsert_dotted_root_assignment(preamble, "features", "multi_agent", "true")
     else:
-        features_block = ensure_root_table(blocks, "features")
+        features_block = document.ensure_table("features")
         upsert_assignment(features_block, "multi_agent", "true")
-    enable_multi_agent_v2_config(
-        blocks,
-        preamble,
-        parsed_existing.get("features"),
-    )
+    enable_multi_agent_v2_config(document, document.data.get("features"))
 
     configure_agent_runtime_limits(
-        blocks,
-        preamble,
-        parsed_existing.get("agents"),
+        document,
+        document.data.get("agents"),
         manage_defaults=manage_agent_runtime_limits,
         remove_legacy_managed_limits=remove_legacy_agent_limits,
     )
-    agents_idx = find_block_index(blocks, kind="table", path="agents")
-    use_dotted_agents = (
-        agents_idx is None and has_dotted_root_assignment(preamble, "agents")
-    )
-    agents_block = None if use_dotted_agents else ensure_root_table(blocks, "agents")
+    use_dotted_agents = use_dotted_root(document, "agents")
+    agents_block = None if use_dotted_agents else document.ensure_table("agents")
     if job_max_runtime_seconds is not None:
         if use_dotted_agents:
             upsert_dotted_root_assignment(
@@ -1227,10 +1434,9 @@ def merge_config_text(
             )
 
     for name in sorted(current_agent_blocks):
-        block = current_agent_blocks[name]
-        blocks.append(Block(block.kind, block.path, list(block.lines)))
+        document.append(current_agent_blocks[name])
 
-    merged = render_blocks(blocks)
+    merged = document.render()
     validate_toml_text(merged, "Merged Codex config")
     return merged
 
@@ -1242,6 +1448,81 @@ def collect_generated_role_files(temp_dir: Path) -> Dict[str, str]:
     return generated
 
 
+def load_staged_export(
+    staged_dir: Path, support_tree_target: Path
+) -> Tuple[str, Dict[str, str]]:
+    """Read a fleet export and point its support refs at one target's tree."""
+
+    placeholder = normalized_path_text(FLEET_SUPPORT_ROOT_PLACEHOLDER)
+    support_root = validate_generated_shell_path(support_tree_target, "Support root")
+    config_text = read_text(staged_dir / "config.toml").replace(placeholder, support_root)
+    role_files = {
+        relative_path: content.replace(placeholder, support_root)
+        for relative_path, content in collect_generated_role_files(staged_dir).items()
+    }
+    return config_text, role_files
+
+
+class InstallRollback:
+    """Remember managed files before an install writes them, for restore."""
+
+    def __init__(self) -> None:
+        self._saved: Dict[Path, Optional[bytes]] = {}
+
+    def track(self, path: Path) -> None:
+        if path not in self._saved:
+            self._saved[path] = path.read_bytes() if path.is_file() else None
+
+    def restore(self) -> None:
+        for path, content in reversed(list(self._saved.items())):
+            try:
+                if content is None:
+                    if path.is_file():
+                        path.unlink()
+                else:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    path.write_bytes(content)
+            except OSError as exc:
+                print(
+                    f"Rollback could not restore {path.as_posix()}: {exc}",
+                    file=sys.stderr,
+                )
+
+
+def read_target_list(source: str) -> List[Tuple[Path, Optional[Path]]]:
+    """Read one ``<target-dir>[<TAB><workspace-root>]`` per line, ``-`` is stdin."""
+
+    try:
+        if source == "-":
+            text = sys.stdin.read()
+        else:
+            text = Path(source).expanduser().read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError) as exc:
+        raise ValueError(f"Unable to read target list: {source}") from exc
+    targets: List[Tuple[Path, Optional[Path]]] = []
+    seen: Set[str] = set()
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        raw_target, _, raw_workspace = line.partition("\t")
+        if not raw_target.strip():
+            raise ValueError(f"{source}:{line_number}: missing target directory")
+        target = Path(validate_generated_shell_path(raw_target.strip(), "Target path"))
+        workspace = (
+            Path(validate_generated_shell_path(raw_workspace.strip(), "Workspace root"))
+            if raw_workspace.strip()
+            else None
+        )
+        key = target.as_posix()
+        if key in seen:
+            raise ValueError(f"{source}:{line_number}: duplicate target {key}")
+        seen.add(key)
+        targets.append((target, workspace))
+    if not targets:
+        raise ValueError(f"Target list is empty: {source}")
+    return targets
+
+
 def remove_file_if_present(path: Path, *, stop_path: Path) -> bool:
     if not path.exists() or not path.is_file():
         return False
@@ -1259,7 +1540,12 @@ def remove_file_if_present(path: Path, *, stop_path: Path) -> bool:
 
 
 def sync_support_tree(
-    source_root: Path, target_root: Path, *, dry_run: bool = False
+    source_root: Path,
+    target_root: Path,
+    *,
+    dry_run: bool = False,
+    copy_strategy: str = DEFAULT_COPY_STRATEGY,
+    object_pool: Optional[Path] = None,
 ) -> None:
     if not SUPPORT_SYNC_SCRIPT.is_file():
         raise RuntimeError(
@@ -1272,9 +1558,14 @@ def sync_support_tree(
         source_root.as_posix(),
         "--target-root",
         target_root.as_posix(),
+        "--delta",
     ]
     if dry_run:
         command.append("--dry-run")
+    if copy_strategy != DEFAULT_COPY_STRATEGY:
+        command.extend(["--copy-strategy", copy_strategy])
+    if object_pool is not None:
+        command.extend(["--object-pool", object_pool.as_posix()])
     result = subprocess.run(
         command,
         text=True,
@@ -1329,6 +1620,173 @@ def seed_builtin_project_profile_caches(asset_root: Path, global_target: Path) -
                 )
 
 
+def install_fleet(
+    args: argparse.Namespace,
+    *,
+    asset_layout: AssetLayout,
+    source_agents_dir: Path,
+    modes_path: Path,
+    catalog_path: Path,
+    temp_root: Path,
+) -> int:
+    """Install into every target of ``--targets-from`` from one export.
+
+    Roles are exported once and verbatim support files go through one object
+    pool; each target is then merged by its own installer process, so it
+    keeps its own validation, manifest, fingerprint, and rollback, and a
+    failed target does not stop the others.
+    """
+
+    incompatible = [
+        flag
+        for flag, value in (
+            ("--target-dir", args.target_dir),
+            ("--workspace-root", args.workspace_root),
+            ("--global-agents-target", args.global_agents_target),
+            ("--user-skills-root", args.user_skills_root),
+            ("--agent-profile", args.agent_profile),
+            ("--model-set", args.model_set),
+            ("--uniform-model", args.uniform_model),
+            ("--check-up-to-date", args.check_up_to_date),
+            ("--defer-project-profile-cache-seed", args.defer_project_profile_cache_seed),
+            ("--seed-project-profile-caches-only", args.seed_project_profile_caches_only),
+        )
+        if value
+    ]
+    if incompatible:
+        print(
+            "--targets-from cannot be combined with " + ", ".join(incompatible),
+            file=sys.stderr,
+        )
+        return 2
+    if args.jobs is not None and args.jobs < 1:
+        print("--jobs must be >= 1", file=sys.stderr)
+        return 2
+    copy_strategy = args.copy_strategy or FLEET_COPY_STRATEGY
+    try:
+        targets = read_target_list(args.targets_from)
+        if args.object_pool is not None or copy_strategy == DEFAULT_COPY_STRATEGY:
+            open_object_pool(args.object_pool, copy_strategy, create=False)
+    except ValueError as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+    if not asset_layout.export_script.exists():
+        print(
+            f"Export script not found: {asset_layout.export_script.as_posix()}",
+            file=sys.stderr,
+        )
+        return 2
+    if not source_agents_dir.exists():
+        print(
+            f"Source directory not found: {source_agents_dir.as_posix()}",
+            file=sys.stderr,
+        )
+        return 2
+
+    def apply(target: Path, workspace_root: Optional[Path]) -> Dict[str, object]:
+        command = [
+            sys.executable,
+            Path(__file__).resolve().as_posix(),
+            "--source-agents",
+            source_agents_dir.as_posix(),
+            "--modes-file",
+            modes_path.as_posix(),
+            "--catalog",
+            catalog_path.as_posix(),
+            "--target-dir",
+            target.as_posix(),
+            "--temp-dir",
+            temp_root.as_posix(),
+            "--staged-export",
+            temp_dir.as_posix(),
+        ]
+        if workspace_root is not None:
+            command.extend(["--workspace-root", workspace_root.as_posix()])
+        command.extend(["--copy-strategy", copy_strategy])
+        if object_pool is not None:
+            command.extend(["--object-pool", object_pool.as_posix()])
+        if run_scoped_pool:
+            command.append("--run-scoped-object-pool")
+        if args.strict:
+            command.append("--strict")
+        if args.job_max_runtime_seconds is not None:
+            command.extend(
+                ["--job-max-runtime-seconds", str(args.job_max_runtime_seconds)]
+            )
+        if args.dry_run:
+            command.append("--dry-run")
+        result = subprocess.run(command, capture_output=True, text=True, check=False)
+        if result.returncode != 0:
+            status = "failed"
+        elif UP_TO_DATE_MESSAGE in result.stdout:
+            status = "up-to-date"
+        else:
+            status = "planned" if args.dry_run else "installed"
+        return {
+            "target_dir": target.as_posix(),
+            "workspace_root": workspace_root.as_posix() if workspace_root else None,
+            "status": status,
+            "exit_code": result.returncode,
+            "output": result.stdout.splitlines(),
+            "error": result.stderr.strip() or None,
+        }
+
+    temp_dir: Optional[Path] = None
+    object_pool = Path(args.object_pool).expanduser() if args.object_pool else None
+    run_scoped_pool = object_pool is None and copy_strategy != DEFAULT_COPY_STRATEGY
+    try:
+        temp_dir = run_export(
+            asset_layout.export_script,
+            source_agents_dir,
+            modes_path,
+            catalog_path,
+            strict=args.strict,
+            job_max_runtime_seconds=args.job_max_runtime_seconds,
+            temp_root=temp_root,
+            resolve_support_refs_to=Path(FLEET_SUPPORT_ROOT_PLACEHOLDER),
+        )
+        if run_scoped_pool:
+            object_pool = temp_dir / "object-pool"
+        if object_pool is not None:
+            # Claim the pool once before the workers share it.
+            open_object_pool(object_pool, copy_strategy, create=not args.dry_run)
+        workers = min(args.jobs or os.cpu_count() or 1, len(targets))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda item: apply(*item), targets))
+    except (RuntimeError, ValueError, OSError) as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    counts: Dict[str, int] = {}
+    for result in results:
+        counts[str(result["status"])] = counts.get(str(result["status"]), 0) + 1
+    report = {
+        "dry_run": args.dry_run,
+        "source_agents": source_agents_dir.resolve().as_posix(),
+        "counts": counts,
+        "targets": results,
+    }
+    rendered = json.dumps(report, indent=2, sort_keys=True) + "\n"
+    if args.report:
+        try:
+            write_text_atomic(Path(args.report).expanduser(), rendered)
+        except (OSError, ValueError) as exc:
+            print(str(exc), file=sys.stderr)
+            return 2
+    else:
+        print(rendered, end="")
+    for result in results:
+        if result["status"] == "failed":
+            print(
+                f"Codex install failed for {result['target_dir']}: {result['error']}",
+                file=sys.stderr,
+            )
+    return 2 if counts.get("failed") else 0
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="Merge generated Codex agent config into an existing target directory."
@@ -1345,9 +1803,29 @@ def main() -> int:
     )
     parser.add_argument(
         "--target-dir",
-        required=True,
+        default=None,
         help="Target `.codex`-style directory where the merged config will be installed.",
     )
+    parser.add_argument(
+        "--targets-from",
+        default=None,
+        help=(
+            "Install into many targets from one export: a file (or `-` for stdin) "
+            "with one `<target-dir>[<TAB><workspace-root>]` per line. Prints a JSON "
+            "report."
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Targets installed concurrently with --targets-from (default: CPU count).",
+    )
+    parser.add_argument(
+        "--report",
+        default=None,
+        help="Write the --targets-from JSON report to this file instead of stdout.",
+    )
     parser.add_argument(
         "--workspace-root",
         default=None,
@@ -1382,6 +1860,14 @@ def main() -> int:
     parser.add_argument(
         "--dry-run", action="store_true", help="Print actions without writing files."
     )
+    parser.add_argument(
+        "--check-up-to-date",
+        action="store_true",
+        help=(
+            "Only compare the manifest install fingerprint with the current inputs "
+            "and managed outputs; exit 0 when up to date and 1 when an install is needed."
+        ),
+    )
     parser.add_argument(
         "--strict", action="store_true", help="Fail on unresolved refs or unknown keys."
     )
@@ -1434,6 +1920,23 @@ def main() -> int:
         action="store_true",
         help=argparse.SUPPRESS,
     )
+    parser.add_argument(
+        "--copy-strategy",
+        choices=COPY_STRATEGIES,
+        default=None,
+        help=(
+            "How byte-identical support, skill, and profile-cache files are placed: "
+            "copy (default), reflink, or hardlink from --object-pool. "
+            f"--targets-from defaults to {FLEET_COPY_STRATEGY} from a run-scoped pool."
+        ),
+    )
+    parser.add_argument(
+        "--object-pool",
+        default=None,
+        help="Shared content-addressed object pool for the reflink and hardlink strategies.",
+    )
+    parser.add_argument("--staged-export", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--run-scoped-object-pool", action="store_true", help=argparse.SUPPRESS)
     args = parser.parse_args()
 
     if (
@@ -1463,6 +1966,43 @@ def main() -> int:
         if args.modes_file
         else asset_layout.asset_root / "modes.json"
     )
+    catalog_path = resolve_catalog_path(args.catalog, asset_root=asset_layout.asset_root)
+    profile_dir = (
+        asset_layout.asset_root / DEFAULT_PROFILE_DIR
+        if args.profile_dir == DEFAULT_PROFILE_DIR
+        else Path(args.profile_dir).expanduser()
+    )
+    model_set_dir = (
+        asset_layout.asset_root / DEFAULT_MODEL_SET_DIR
+        if args.model_set_dir == DEFAULT_MODEL_SET_DIR
+        else Path(args.model_set_dir).expanduser()
+    )
+    temp_root = resolve_temp_root(repo_root=asset_layout.asset_root, temp_dir=args.temp_dir)
+    if args.targets_from is not None:
+        return install_fleet(
+            args,
+            asset_layout=asset_layout,
+            source_agents_dir=source_agents_dir,
+            modes_path=modes_path,
+            catalog_path=catalog_path,
+            temp_root=temp_root,
+        )
+    if args.target_dir is None:
+        print("--target-dir or --targets-from is required", file=sys.stderr)
+        return 2
+    copy_strategy = args.copy_strategy or DEFAULT_COPY_STRATEGY
+    try:
+        open_object_pool(args.object_pool, copy_strategy, create=False)
+    except ObjectPoolError as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+    object_pool = (
+        Path(os.path.abspath(Path(args.object_pool).expanduser()))
+        if args.object_pool
+        else None
+    )
+    # A fleet's run-scoped pool is deleted after the run; never record it.
+    recorded_pool = None if args.run_scoped_object_pool else object_pool
     try:
         target_dir = Path(
             validate_generated_shell_path(args.target_dir, "Target path")
@@ -1534,18 +2074,6 @@ def main() -> int:
             file=sys.stderr,
         )
         return 2
-    catalog_path = resolve_catalog_path(args.catalog, asset_root=asset_layout.asset_root)
-    profile_dir = (
-        asset_layout.asset_root / DEFAULT_PROFILE_DIR
-        if args.profile_dir == DEFAULT_PROFILE_DIR
-        else Path(args.profile_dir).expanduser()
-    )
-    model_set_dir = (
-        asset_layout.asset_root / DEFAULT_MODEL_SET_DIR
-        if args.model_set_dir == DEFAULT_MODEL_SET_DIR
-        else Path(args.model_set_dir).expanduser()
-    )
-    temp_root = resolve_temp_root(repo_root=asset_layout.asset_root, temp_dir=args.temp_dir)
     support_tree_source = asset_layout.support_tree_source
     try:
         support_tree_target = resolve_managed_tree_target(
@@ -1616,25 +2144,87 @@ def main() -> int:
         print(str(exc), file=sys.stderr)
         return 2
 
+    managed_agents_file = global_agents_path or workspace_agents_path
+    install_settings: Dict[str, object] = {
+        "manifest_version": MANIFEST_VERSION,
+        "target_dir": target_dir.expanduser().resolve().as_posix(),
+        "workspace_root": (
+            workspace_root.expanduser().resolve().as_posix() if workspace_root else None
+        ),
+        "global_agents_target": (
+            global_agents_target.expanduser().resolve().as_posix()
+            if global_agents_target
+            else None
+        ),
+        "agents_file": (
+            managed_agents_file.resolve().as_posix() if managed_agents_file else None
+        ),
+        "user_skills_root": user_skills_root.as_posix() if user_skills_root else None,
+        "active_global_target": active_global_target,
+        "strict": args.strict,
+        "job_max_runtime_seconds": args.job_max_runtime_seconds,
+        "agent_profile": args.agent_profile,
+        "model_set": args.model_set,
+        "uniform_model": args.uniform_model,
+        "defer_project_profile_cache_seed": args.defer_project_profile_cache_seed,
+        "copy_strategy": copy_strategy,
+        "object_pool": recorded_pool.as_posix() if recorded_pool else None,
+    }
+    install_inputs = [
+        *(
+            asset_layout.asset_root / name
+            for name in (*SUPPORT_TREE_DIRS, *SUPPORT_TREE_FILES)
+        ),
+        source_agents_dir,
+        modes_path,
+        catalog_path,
+        profile_dir,
+        model_set_dir,
+        *(
+            Path(value).expanduser()
+            for value in (args.agent_profile, args.model_set)
+            if value and Path(value).expanduser().is_file()
+        ),
+    ]
+    try:
+        input_digest = install_input_digest(install_settings, install_inputs)
+        staleness = install_staleness(target_dir / MANIFEST_FILENAME, input_digest)
+    except (ValueError, OSError, json.JSONDecodeError, UnicodeDecodeError) as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+    if staleness is None:
+        prefix = "Dry run: " if args.dry_run and not args.check_up_to_date else ""
+        print(f"{prefix}Codex install is already up to date: {target_dir.as_posix()}")
+        return 0
+    if args.check_up_to_date:
+        print(f"Codex install needs an update ({staleness}): {target_dir.as_posix()}")
+        return 1
+
     temp_dir: Optional[Path] = None
     try:
-        temp_dir = run_export(
-            export_script,
-            source_agents_dir,
-            modes_path,
-            catalog_path,
-            strict=args.strict,
-            job_max_runtime_seconds=args.job_max_runtime_seconds,
-            temp_root=temp_root,
-            resolve_support_refs_to=support_tree_target,
-            agent_profile=args.agent_profile,
-            model_set=args.model_set,
-            profile_dir=profile_dir,
-            model_set_dir=model_set_dir,
-            uniform_model=args.uniform_model,
-        )
-        generated_config = read_text(temp_dir / "config.toml")
-        generated_role_files = collect_generated_role_files(temp_dir)
+        if args.staged_export:
+            # A --targets-from worker: reuse the fleet's single export.
+            generated_config, generated_role_files = load_staged_export(
+                Path(args.staged_export), support_tree_target
+            )
+        else:
+            temp_dir = run_export(
+                export_script,
+                source_agents_dir,
+                modes_path,
+                catalog_path,
+                strict=args.strict,
+                job_max_runtime_seconds=args.job_max_runtime_seconds,
+                temp_root=temp_root,
+                resolve_support_refs_to=support_tree_target,
+                agent_profile=args.agent_profile,
+                model_set=args.model_set,
+                profile_dir=profile_dir,
+                model_set_dir=model_set_dir,
+                uniform_model=args.uniform_model,
+            )
+            generated_config = read_text(temp_dir / "config.toml")
+            generated_role_files = collect_generated_role_files(temp_dir)
         generated_agent_blocks = extract_generated_agent_blocks(generated_config)
 
         previous_manifest = infer_previous_managed(target_dir)
@@ -1709,7 +2299,11 @@ def main() -> int:
 
         if args.dry_run:
             sync_support_tree(
-                support_tree_source, support_tree_target, dry_run=True
+                support_tree_source,
+                support_tree_target,
+                dry_run=True,
+                copy_strategy=copy_strategy,
+                object_pool=object_pool,
             )
             print(f"Dry run: would merge Codex config into {target_dir.as_posix()}")
             print("- set features.multi_agent = true")
@@ -1783,63 +2377,92 @@ def main() -> int:
         # Validate ownership, then replace the namespaced support tree through
         # rollback-capable staged moves before modifying managed roles/config.
         # An unowned same-named directory is preserved.
-        sync_support_tree(support_tree_source, support_tree_target)
-
-        for relative_path in stale_files:
-            stale_path = stale_file_targets[relative_path]
-            validate_generated_role_ownership(stale_path)
-            if remove_file_if_present(
-                stale_path, stop_path=target_dir.expanduser().resolve()
-            ):
-                print(f"Removed stale managed agent file: {stale_path.as_posix()}")
+        sync_support_tree(
+            support_tree_source,
+            support_tree_target,
+            copy_strategy=copy_strategy,
+            object_pool=object_pool,
+        )
 
-        for relative_path, content in generated_role_files.items():
-            validate_generated_role_ownership(current_file_targets[relative_path])
-            write_text_atomic(current_file_targets[relative_path], content)
+        # Restore the previous roles, AGENTS block, config, and manifest if
+        # any of them fails to write; the support tree rolls back on its own.
+        rollback = InstallRollback()
+        try:
+            for relative_path in stale_files:
+                stale_path = stale_file_targets[relative_path]
+                validate_generated_role_ownership(stale_path)
+                rollback.track(stale_path)
+                if remove_file_if_present(
+                    stale_path, stop_path=target_dir.expanduser().resolve()
+                ):
+                    print(f"Removed stale managed agent file: {stale_path.as_posix()}")
+
+            for relative_path, content in generated_role_files.items():
+                validate_generated_role_ownership(current_file_targets[relative_path])
+                rollback.track(current_file_targets[relative_path])
+                write_text_atomic(current_file_targets[relative_path], content)
 
-        if remove_legacy_support:
-            resolved_legacy_support = resolve_managed_tree_target(
-                target_dir, LEGACY_SUPPORT_TREE_DIRNAME
-            )
-            if resolved_legacy_support.is_dir():
-                shutil.rmtree(resolved_legacy_support)
-            else:
-                resolved_legacy_support.unlink()
-            print(
-                "Removed legacy managed support tree: "
-                + resolved_legacy_support.as_posix()
-            )
-        if global_agents_path is not None and merged_global_agents_text is not None:
-            write_text_atomic(
-                global_agents_path,
-                merged_global_agents_text,
-            )
-            print(
-                "Merged managed global AGENTS block into "
-                + global_agents_path.as_posix()
-            )
-        if workspace_agents_path is not None and merged_workspace_agents_text is not None:
-            write_text_atomic(
-                workspace_agents_path,
-                merged_workspace_agents_text,
-            )
-            print(
-                "Merged managed workspace AGENTS block into "
-                + workspace_agents_path.as_posix()
+            if remove_legacy_support:
+                resolved_legacy_support = resolve_managed_tree_target(
+                    target_dir, LEGACY_SUPPORT_TREE_DIRNAME
+                )
+                if resolved_legacy_support.is_dir():
+                    shutil.rmtree(resolved_legacy_support)
+                else:
+                    resolved_legacy_support.unlink()
+                print(
+                    "Removed legacy managed support tree: "
+                    + resolved_legacy_support.as_posix()
+                )
+            if global_agents_path is not None and merged_global_agents_text is not None:
+                rollback.track(global_agents_path)
+                write_text_atomic(
+                    global_agents_path,
+                    merged_global_agents_text,
+                )
+                print(
+                    "Merged managed global AGENTS block into "
+                    + global_agents_path.as_posix()
+                )
+            if workspace_agents_path is not None and merged_workspace_agents_text is not None:
+                rollback.track(workspace_agents_path)
+                write_text_atomic(
+                    workspace_agents_path,
+                    merged_workspace_agents_text,
+                )
+                print(
+                    "Merged managed workspace AGENTS block into "
+                    + workspace_agents_path.as_posix()
+                )
+            rollback.track(config_path)
+            write_text_atomic(config_path, merged_config_text)
+            rollback.track(manifest_path)
+            write_manifest(
+                manifest_path,
+                agent_names=current_names,
+                agent_files=current_files,
+                profile=args.agent_profile,
+                model_set=args.model_set,
+                uniform_model=args.uniform_model,
+                source_agents_dir=source_agents_dir,
+                target_dir=target_dir,
+                user_skills_root=user_skills_root,
+                defer_skill_sync=args.defer_project_profile_cache_seed,
+                input_digest=input_digest,
+                agents_file=managed_agents_file,
+                copy_strategy=(
+                    {"strategy": copy_strategy, "object_pool": recorded_pool.as_posix()}
+                    if recorded_pool is not None
+                    else None
+                ),
+                agent_sha256=model_free_role_digests(generated_role_files),
+                config_sha256=hashlib.sha256(
+                    merged_config_text.encode("utf-8")
+                ).hexdigest(),
             )
-        write_text_atomic(config_path, merged_config_text)
-        write_manifest(
-            manifest_path,
-            agent_names=current_names,
-            agent_files=current_files,
-            profile=args.agent_profile,
-            model_set=args.model_set,
-            uniform_model=args.uniform_model,
-            source_agents_dir=source_agents_dir,
-            target_dir=target_dir,
-            user_skills_root=user_skills_root,
-            defer_skill_sync=args.defer_project_profile_cache_seed,
-        )
+        except BaseException:
+            rollback.restore()
+            raise
         if (
             not workspace_profile_target
             and workspace_root is None
@@ -1848,6 +2471,9 @@ def main() -> int:
             seed_builtin_project_profile_caches(
                 support_tree_target, target_dir.expanduser().resolve()
             )
+        if user_skills_root is None or not args.defer_project_profile_cache_seed:
+            # A deferred skill sync records its outputs when it is finalized.
+            record_install_outputs(manifest_path)
 
         print(f"Merged Codex config into {target_dir.as_posix()}")
         return 0
@@ -6,6 +6,9 @@ param(
     [string]$GlobalAgentsTarget,
     [string]$UserSkillsRoot,
     [switch]$MigrateLegacySkills,
+    [ValidateSet("copy", "reflink", "hardlink")]
+    [string]$CopyStrategy,
+    [string]$ObjectPool,
     [switch]$DryRun,
     [switch]$NoBackup,
     [switch]$Force,
@@ -239,6 +242,55 @@ Write-Host "DryRun: $DryRun"
 Write-Host "Managed merge: preserve non-agent Codex settings"
 Write-Host "Cleanup: stale managed Codex agent outputs"
 
+$exportArgs = @(
+    $mergeScript,
+    "--source-agents", $sourceAgents,
+    "--modes-file", $modesFile,
+    "--target-dir", $targetPath,
+    "--strict"
+)
+if ($DryRun) {
+    $exportArgs += "--dry-run"
+}
+if ($WorkspaceRoot) {
+    $exportArgs += @("--workspace-root", $WorkspaceRoot)
+}
+if ($globalAgentsTargetPath) {
+    $exportArgs += @("--global-agents-target", $globalAgentsTargetPath)
+}
+if ($installUserSkills) {
+    $exportArgs += @("--user-skills-root", $userSkillsRootPath)
+    $exportArgs += "--defer-project-profile-cache-seed"
+}
+if ($AgentProfile) {
+    $exportArgs += @("--agent-profile", $AgentProfile)
+}
+if ($ModelSet) {
+    $exportArgs += @("--model-set", $ModelSet)
+}
+if ($modelFlags) {
+    $exportArgs += @("--profile-dir", $ProfileDir, "--model-set-dir", $ModelSetDir)
+}
+if ($UniformModel) {
+    $exportArgs += @("--uniform-model", $UniformModel)
+}
+$copyStrategyArgs = @()
+if ($CopyStrategy) {
+    $copyStrategyArgs += @("--copy-strategy", $CopyStrategy)
+}
+if ($ObjectPool) {
+    $copyStrategyArgs += @("--object-pool", $ObjectPool)
+}
+$exportArgs += $copyStrategyArgs
+# Repeated installs with unchanged inputs and untouched managed outputs skip
+# the backup, export, merge, and skill sync entirely.
+if (-not $DryRun -and -not $MigrateLegacySkills) {
+    & $pythonCmd @pythonArgs @exportArgs --check-up-to-date
+    if ($LASTEXITCODE -eq 0) {
+        exit 0
+    }
+}
+
 $skillSyncArgs = @()
 if ($installUserSkills) {
     $skillSyncArgs = @(
@@ -250,6 +302,7 @@ if ($installUserSkills) {
     if ($MigrateLegacySkills) {
         $skillSyncArgs += "--migrate-legacy-skills"
     }
+    $skillSyncArgs += $copyStrategyArgs
     & $pythonCmd @pythonArgs @skillSyncArgs --dry-run
     if ($LASTEXITCODE -ne 0) {
         throw "Codex skill sync preflight failed with exit code $LASTEXITCODE."
@@ -337,39 +390,6 @@ if ($DryRun) {
     New-Item -ItemType Directory -Path $targetPath -Force | Out-Null
 }
 
-$exportArgs = @(
-    $mergeScript,
-    "--source-agents", $sourceAgents,
-    "--modes-file", $modesFile,
-    "--target-dir", $targetPath,
-    "--strict"
-)
-if ($DryRun) {
-    $exportArgs += "--dry-run"
-}
-if ($WorkspaceRoot) {
-    $exportArgs += @("--workspace-root", $WorkspaceRoot)
-}
-if ($globalAgentsTargetPath) {
-    $exportArgs += @("--global-agents-target", $globalAgentsTargetPath)
-}
-if ($installUserSkills) {
-    $exportArgs += @("--user-skills-root", $userSkillsRootPath)
-    $exportArgs += "--defer-project-profile-cache-seed"
-}
-if ($AgentProfile) {
-    $exportArgs += @("--agent-profile", $AgentProfile)
-}
-if ($ModelSet) {
-    $exportArgs += @("--model-set", $ModelSet)
-}
-if ($modelFlags) {
-    $exportArgs += @("--profile-dir", $ProfileDir, "--model-set-dir", $ModelSetDir)
-}
-if ($UniformModel) {
-    $exportArgs += @("--uniform-model", $UniformModel)
-}
-
 if (-not $DryRun) {
     & $pythonCmd @pythonArgs @exportArgs --dry-run
     if ($LASTEXITCODE -ne 0) {
@@ -21,7 +21,7 @@ usage() {
 Install Codex multi-agent role config generated from neutral source agents.
 
 Usage:
-  scripts/install-codex.sh [--target <path>] [--workspace-root <path>] [--global-agents-target <path>] [--user-skills-root <path>] [--migrate-legacy-skills] [--dry-run] [--no-backup] [--force] [workspace profile options]
+  scripts/install-codex.sh [--target <path>] [--workspace-root <path>] [--global-agents-target <path>] [--user-skills-root <path>] [--migrate-legacy-skills] [--copy-strategy <copy|reflink|hardlink>] [--object-pool <path>] [--dry-run] [--no-backup] [--force] [workspace profile options]
 
 Options:
   --target <path>  Install destination (default: ~/.codex)
@@ -34,6 +34,11 @@ Options:
                     (default global install: ~/.agents/skills)
   --migrate-legacy-skills
                     Back up and replace known unmarked capability-skill copies
+  --copy-strategy <copy|reflink|hardlink>
+                    Place byte-identical support, skill, and profile-cache files as
+                    copies (default), reflinks, or read-only hard links from --object-pool
+  --object-pool <path>
+                    Shared content-addressed pool used by the reflink and hardlink strategies
   --dry-run        Print actions without writing files
   --no-backup      Skip backup of existing config.toml, agents/*.toml, and managed AGENTS.md files
   --force          Accepted for backward compatibility; merged install is already enabled by default
@@ -96,6 +101,8 @@ GLOBAL_AGENTS_TARGET=""
 USER_SKILLS_ROOT=""
 USER_SKILLS_ROOT_SET=0
 MIGRATE_LEGACY_SKILLS=0
+COPY_STRATEGY=""
+OBJECT_POOL=""
 DRY_RUN=0
 NO_BACKUP=0
 FORCE_OVERWRITE=1
@@ -146,6 +153,22 @@ while [[ $# -gt 0 ]]; do
       MIGRATE_LEGACY_SKILLS=1
       shift
       ;;
+    --copy-strategy)
+      if [[ $# -lt 2 ]]; then
+        echo "Missing value for --copy-strategy" >&2
+        exit 2
+      fi
+      COPY_STRATEGY="$2"
+      shift 2
+      ;;
+    --object-pool)
+      if [[ $# -lt 2 ]]; then
+        echo "Missing value for --object-pool" >&2
+        exit 2
+      fi
+      OBJECT_POOL="$2"
+      shift 2
+      ;;
     --dry-run)
       DRY_RUN=1
       shift
@@ -358,6 +381,50 @@ echo "DryRun: ${DRY_RUN}"
 echo "Managed merge: preserve non-agent Codex settings"
 echo "Cleanup: stale managed Codex agent outputs"
 
+EXPORT_CMD=(
+  "${PYTHON_BIN}" "${MERGE_SCRIPT}"
+  --source-agents "${SOURCE_AGENTS}"
+  --modes-file "${MODES_FILE}"
+  --target-dir "${TARGET_DIR}"
+  --strict
+)
+if [[ ${DRY_RUN} -eq 1 ]]; then
+  EXPORT_CMD+=(--dry-run)
+fi
+if [[ -n "${WORKSPACE_ROOT}" ]]; then
+  EXPORT_CMD+=(--workspace-root "${WORKSPACE_ROOT}")
+fi
+if [[ -n "${GLOBAL_AGENTS_TARGET}" ]]; then
+  EXPORT_CMD+=(--global-agents-target "${GLOBAL_AGENTS_TARGET}")
+fi
+if [[ ${INSTALL_USER_SKILLS} -eq 1 ]]; then
+  EXPORT_CMD+=(--user-skills-root "${USER_SKILLS_ROOT}")
+  EXPORT_CMD+=(--defer-project-profile-cache-seed)
+fi
+if [[ -n "${AGENT_PROFILE}" ]]; then
+  EXPORT_CMD+=(--agent-profile "${AGENT_PROFILE}")
+fi
+if [[ -n "${MODEL_SET}" ]]; then
+  EXPORT_CMD+=(--model-set "${MODEL_SET}")
+fi
+if [[ ${MODEL_FLAGS} -eq 1 ]]; then
+  EXPORT_CMD+=(--profile-dir "${PROFILE_DIR}" --model-set-dir "${MODEL_SET_DIR}")
+fi
+if [[ -n "${COPY_STRATEGY}" ]]; then
+  EXPORT_CMD+=(--copy-strategy "${COPY_STRATEGY}")
+fi
+if [[ -n "${OBJECT_POOL}" ]]; then
+  EXPORT_CMD+=(--object-pool "${OBJECT_POOL}")
+fi
+if [[ -n "${UNIFORM_MODEL}" ]]; then
+  EXPORT_CMD+=(--uniform-model "${UNIFORM_MODEL}")
+fi
+# Repeated installs with unchanged inputs and untouched managed outputs skip
+# the backup, export, merge, and skill sync entirely.
+if [[ ${DRY_RUN} -eq 0 && ${MIGRATE_LEGACY_SKILLS} -eq 0 ]] && "${EXPORT_CMD[@]}" --check-up-to-date; then
+  exit 0
+fi
+
 SKILL_SYNC_CMD=()
 if [[ ${INSTALL_USER_SKILLS} -eq 1 ]]; then
   SKILL_SYNC_CMD=(
@@ -366,6 +433,12 @@ if [[ ${INSTALL_USER_SKILLS} -eq 1 ]]; then
     --user-skills-root "${USER_SKILLS_ROOT}"
     --support-root "${TARGET_DIR}/agents-pipeline"
   )
+  if [[ -n "${COPY_STRATEGY}" ]]; then
+    SKILL_SYNC_CMD+=(--copy-strategy "${COPY_STRATEGY}")
+  fi
+  if [[ -n "${OBJECT_POOL}" ]]; then
+    SKILL_SYNC_CMD+=(--object-pool "${OBJECT_POOL}")
+  fi
   if [[ ${MIGRATE_LEGACY_SKILLS} -eq 1 ]]; then
     SKILL_SYNC_CMD+=(--migrate-legacy-skills)
   fi
@@ -448,38 +521,6 @@ else
   mkdir -p "${TARGET_DIR}"
 fi
 
-EXPORT_CMD=(
-  "${PYTHON_BIN}" "${MERGE_SCRIPT}"
-  --source-agents "${SOURCE_AGENTS}"
-  --modes-file "${MODES_FILE}"
-  --target-dir "${TARGET_DIR}"
-  --strict
-)
-if [[ ${DRY_RUN} -eq 1 ]]; then
-  EXPORT_CMD+=(--dry-run)
-fi
-if [[ -n "${WORKSPACE_ROOT}" ]]; then
-  EXPORT_CMD+=(--workspace-root "${WORKSPACE_ROOT}")
-fi
-if [[ -n "${GLOBAL_AGENTS_TARGET}" ]]; then
-  EXPORT_CMD+=(--global-agents-target "${GLOBAL_AGENTS_TARGET}")
-fi
-if [[ ${INSTALL_USER_SKILLS} -eq 1 ]]; then
-  EXPORT_CMD+=(--user-skills-root "${USER_SKILLS_ROOT}")
-  EXPORT_CMD+=(--defer-project-profile-cache-seed)
-fi
-if [[ -n "${AGENT_PROFILE}" ]]; then
-  EXPORT_CMD+=(--agent-profile "${AGENT_PROFILE}")
-fi
-if [[ -n "${MODEL_SET}" ]]; then
-  EXPORT_CMD+=(--model-set "${MODEL_SET}")
-fi
-if [[ ${MODEL_FLAGS} -eq 1 ]]; then
-  EXPORT_CMD+=(--profile-dir "${PROFILE_DIR}" --model-set-dir "${MODEL_SET_DIR}")
-fi
-if [[ -n "${UNIFORM_MODEL}" ]]; then
-  EXPORT_CMD+=(--uniform-model "${UNIFORM_MODEL}")
-fi
 if [[ ${DRY_RUN} -eq 0 ]]; then
   if ! "${EXPORT_CMD[@]}" --dry-run; then
     echo "Codex role export preflight failed." >&2
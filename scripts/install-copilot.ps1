@@ -184,7 +184,8 @@ if ($DryRun) {
 $supportArgs = @(
     $supportSyncScript,
     "--source-root", $assetRoot,
-    "--target-root", $supportRoot
+    "--target-root", $supportRoot,
+    "--delta"
 )
 if ($DryRun) {
     $supportArgs += "--dry-run"
@@ -0,0 +1,297 @@
+"""Content-addressed object pool behind the installers' copy strategies.
+
+Installers place byte-identical files (everything except rewritten markdown
+and ownership markers) through an ``ObjectPool``.  Each file is stored once
+under ``<pool>/objects/<xx>/<sha256>.<mode>`` with its write bits cleared,
+then installed by the selected strategy:
+
+``copy``
+    A plain physical copy; no pool is used (the default).
+``reflink``
+    A copy-on-write clone of the pooled object (``FICLONE`` on Linux btrfs
+    or XFS).  Installed files stay independent and keep their normal mode.
+``hardlink``
+    A hard link to the pooled object.  Installed files share the read-only
+    object, so they are installed without write permission.
+
+Whenever a reflink or hard link is not possible (another filesystem, no
+support, or a pool this user cannot write) the file is copied instead, with
+the mode the strategy would have produced.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import stat
+import sys
+import tempfile
+from pathlib import Path
+
+try:  # Reflinks are attempted only where fcntl exists (POSIX).
+    import fcntl
+except ImportError:  # pragma: no cover - exercised only on Windows.
+    fcntl = None  # type: ignore[assignment]
+
+from path_safety import is_linklike
+
+
+COPY_STRATEGIES = ("copy", "reflink", "hardlink")
+DEFAULT_COPY_STRATEGY = "copy"
+POOL_MARKER_FILE = ".agents-pipeline-object-pool.json"
+POOL_MARKER_TOOL = "agents_pipeline.object-pool"
+POOL_MARKER_VERSION = 1
+POOL_HASH_CHUNK_BYTES = 1 << 20
+FICLONE = 0x40049409  # Linux ioctl: share extents copy-on-write (btrfs, XFS).
+READ_ONLY_MASK = 0o555
+
+
+class ObjectPoolError(ValueError):
+    """An unusable object pool or copy strategy."""
+
+
+def _pool_marker_text() -> str:
+    return (
+        json.dumps(
+            {"tool": POOL_MARKER_TOOL, "version": POOL_MARKER_VERSION},
+            indent=2,
+            sort_keys=True,
+        )
+        + "\n"
+    )
+
+
+def reflink_file(source: Path, destination: Path) -> bool:
+    """Clone ``source`` into a new ``destination``; False when unsupported."""
+
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+    try:
+        with source.open("rb") as reader, destination.open("xb") as writer:
+            fcntl.ioctl(writer.fileno(), FICLONE, reader.fileno())
+    except OSError:
+        try:
+            destination.unlink()
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(POOL_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ObjectPool:
+    """Place files through a shared, read-only, content-addressed pool."""
+
+    def __init__(self, root: Path, strategy: str) -> None:
+        self.root = root
+        self.strategy = strategy
+        self.objects = root / "objects"
+
+    def installed_mode(self, mode: int) -> int:
+        """Permission bits a file of ``mode`` gets under this strategy."""
+
+        mode = stat.S_IMODE(mode)
+        return mode & READ_ONLY_MASK if self.strategy == "hardlink" else mode
+
+    def object_path(self, digest: str, mode: int) -> Path:
+        mode = stat.S_IMODE(mode) & READ_ONLY_MASK
+        return self.objects / digest[:2] / f"{digest}.{mode:03o}"
+
+    def _valid_object(self, path: Path, digest: str, size: int) -> bool:
+        try:
+            if is_linklike(path):
+                return False
+            info = path.stat()
+            if not stat.S_ISREG(info.st_mode) or info.st_size != size:
+                return False
+            if info.st_mode & 0o222:
+                return False
+            return _file_sha256(path) == digest
+        except OSError:
+            return False
+
+    def _store(self, write, digest: str, size: int, mode: int) -> Path:
+        """Publish an object once; an existing valid object is reused as is."""
+
+        target = self.object_path(digest, mode)
+        if self._valid_object(target, digest, size):
+            return target
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(prefix=".incoming-", dir=target.parent)
+        temp_path = Path(temp_name)
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                write(handle)
+            os.chmod(temp_path, stat.S_IMODE(mode) & READ_ONLY_MASK)
+            try:
+                os.link(temp_path, target)
+            except FileExistsError:
+                # A concurrent install published it first, or the existing
+                # object was altered; replace only an object that fails checks.
+                if not self._valid_object(target, digest, size):
+                    os.replace(temp_path, target)
+        finally:
+            try:
+                temp_path.unlink()
+            except FileNotFoundError:
+                pass
+        return target
+
+    def store_file(self, source: Path, mode: int) -> Path:
+        digest = _file_sha256(source)
+
+        def write(handle) -> None:
+            with source.open("rb") as reader:
+                shutil.copyfileobj(reader, handle, POOL_HASH_CHUNK_BYTES)
+
+        return self._store(write, digest, source.stat().st_size, mode)
+
+    def store_bytes(self, data: bytes, mode: int) -> Path:
+        return self._store(
+            lambda handle: handle.write(data),
+            hashlib.sha256(data).hexdigest(),
+            len(data),
+            mode,
+        )
+
+    def _place(self, stored: Path, destination: Path, mode: int) -> str:
+        if self.strategy == "hardlink":
+            try:
+                os.link(stored, destination)
+                return "hardlink"
+            except OSError:
+                pass  # Another filesystem or no hard links; copy below.
+        elif reflink_file(stored, destination):
+            os.chmod(destination, self.installed_mode(mode))
+            return "reflink"
+        shutil.copyfile(stored, destination)
+        os.chmod(destination, self.installed_mode(mode))
+        return "copy"
+
+    def install_file(
+        self, source: Path, destination: Path, mode: int | None = None
+    ) -> str:
+        """Install ``source`` at the new path ``destination``.
+
+        Returns ``"reflink"``, ``"hardlink"``, or ``"copy"``.
+        """
+
+        if mode is None:
+            mode = source.stat().st_mode
+        try:
+            stored = self.store_file(source, mode)
+        except OSError:
+            shutil.copyfile(source, destination)
+            os.chmod(destination, self.installed_mode(mode))
+            return "copy"
+        return self._place(stored, destination, mode)
+
+    def install_bytes(self, data: bytes, destination: Path, mode: int = 0o644) -> str:
+        """Install ``data`` at the new path ``destination``; see install_file."""
+
+        try:
+            stored = self.store_bytes(data, mode)
+        except OSError:
+            destination.write_bytes(data)
+            os.chmod(destination, self.installed_mode(mode))
+            return "copy"
+        return self._place(stored, destination, mode)
+
+
+def _validate_pool_chain(root: Path) -> None:
+    for candidate in reversed((root, *root.parents)):
+        if candidate == Path(candidate.anchor):
+            continue
+        if is_linklike(candidate):
+            raise ObjectPoolError(
+                "Object pool must not traverse a symbolic link, junction, or "
+                f"reparse point: {candidate}"
+            )
+
+
+def _claim_pool(marker: Path) -> None:
+    """Publish the pool marker atomically; concurrent installers may race."""
+
+    fd, temp_name = tempfile.mkstemp(prefix=f"{marker.name}.", dir=marker.parent)
+    temp_path = Path(temp_name)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as handle:
+            handle.write(_pool_marker_text())
+        os.chmod(temp_path, 0o644)
+        try:
+            os.link(temp_path, marker)
+        except FileExistsError:
+            pass
+    finally:
+        temp_path.unlink()
+
+
+def open_object_pool(
+    root: str | Path | None, strategy: str | None, *, create: bool = True
+) -> ObjectPool | None:
+    """Validate a copy strategy and its pool; ``None`` means plain copies.
+
+    The pool directory is created on first use and claimed with a marker
+    file.  An existing non-empty directory without that marker, a linked
+    path, or a world-writable pool is refused.  With ``create=False`` (dry
+    runs) a missing pool is validated but not created.
+    """
+
+    strategy = strategy or DEFAULT_COPY_STRATEGY
+    if strategy not in COPY_STRATEGIES:
+        raise ObjectPoolError(
+            f"Unknown copy strategy '{strategy}'; expected one of {', '.join(COPY_STRATEGIES)}"
+        )
+    if strategy == "copy":
+        if root is not None:
+            raise ObjectPoolError("--object-pool requires --copy-strategy reflink or hardlink")
+        return None
+    if root is None or not str(root).strip():
+        raise ObjectPoolError(f"--copy-strategy {strategy} requires --object-pool")
+    if strategy == "hardlink" and sys.platform == "win32":
+        raise ObjectPoolError(
+            "The hardlink copy strategy is not supported on Windows, where read-only "
+            "hard-linked files block replacement; use reflink or copy."
+        )
+    pool_root = Path(os.path.abspath(os.fspath(Path(root).expanduser())))
+    _validate_pool_chain(pool_root)
+    if not create and not pool_root.exists():
+        return ObjectPool(pool_root, strategy)
+    try:
+        pool_root.mkdir(parents=True, exist_ok=True, mode=0o755)
+        if is_linklike(pool_root) or not pool_root.is_dir():
+            raise ObjectPoolError(f"Object pool must be a real directory: {pool_root}")
+        if os.name == "posix" and pool_root.stat().st_mode & stat.S_IWOTH:
+            raise ObjectPoolError(f"Object pool must not be world-writable: {pool_root}")
+        marker = pool_root / POOL_MARKER_FILE
+        if is_linklike(marker):
+            raise ObjectPoolError(f"Object pool marker must not be a link: {marker}")
+        if marker.is_file():
+            try:
+                owned = json.loads(marker.read_text(encoding="utf-8")) == json.loads(
+                    _pool_marker_text()
+                )
+            except (UnicodeError, json.JSONDecodeError):
+                owned = False
+            if not owned:
+                raise ObjectPoolError(f"Object pool marker is not recognized: {marker}")
+        elif any(
+            not entry.name.startswith(POOL_MARKER_FILE) for entry in pool_root.iterdir()
+        ):
+            raise ObjectPoolError(
+                f"Object pool must be empty or an existing agents_pipeline pool: {pool_root}"
+            )
+        else:
+            _claim_pool(marker)
+    except OSError as exc:
+        raise ObjectPoolError(f"Unable to open object pool {pool_root}: {exc}") from exc
+    return ObjectPool(pool_root, strategy)
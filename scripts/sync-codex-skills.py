@@ -27,6 +27,13 @@ from codex_skill_catalog import (
     is_linklike,
     skill_collection_issues,
 )
+from object_pool import (
+    COPY_STRATEGIES,
+    DEFAULT_COPY_STRATEGY,
+    ObjectPool,
+    ObjectPoolError,
+    open_object_pool,
+)
 
 
 MARKER_FILE = SKILL_MARKER_FILENAME
@@ -299,12 +306,25 @@ def _rewrite_support_references(staged_skill: Path, support_root: Path) -> None:
                 ) from exc
 
 
+def _skill_copy_function(pool: ObjectPool | None):
+    """Copy markdown (rewritten in staging) directly; pool everything else."""
+
+    def copy(source: str, destination: str) -> str:
+        if pool is None or Path(source).suffix == ".md":
+            return shutil.copy2(source, destination)
+        pool.install_file(Path(source), Path(destination))
+        return destination
+
+    return copy
+
+
 def sync_managed_skills(
     source_skills_root: Path,
     user_skills_root: Path,
     support_root: Path,
     *,
     dry_run: bool,
+    pool: ObjectPool | None = None,
 ) -> None:
     source_skills_root = _absolute_lexical(source_skills_root)
     user_skills_root = _absolute_lexical(user_skills_root)
@@ -379,6 +399,7 @@ def sync_managed_skills(
                 source,
                 staged,
                 ignore=shutil.ignore_patterns("__pycache__", "*.pyc", ".DS_Store"),
+                copy_function=_skill_copy_function(pool),
             )
             _rewrite_support_references(staged, support_root)
             _write_marker(staged, targets[name], name)
@@ -491,6 +512,17 @@ def main() -> int:
     parser.add_argument("--support-root", required=True)
     parser.add_argument("--migrate-legacy-skills", action="store_true")
     parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument(
+        "--copy-strategy",
+        choices=COPY_STRATEGIES,
+        default=DEFAULT_COPY_STRATEGY,
+        help="How non-markdown skill files are placed (reflink and hardlink need --object-pool).",
+    )
+    parser.add_argument(
+        "--object-pool",
+        default=None,
+        help="Shared content-addressed pool for the reflink and hardlink strategies.",
+    )
     args = parser.parse_args()
 
     try:
@@ -499,8 +531,11 @@ def main() -> int:
             Path(args.user_skills_root),
             Path(args.support_root),
             dry_run=args.dry_run,
+            pool=open_object_pool(
+                args.object_pool, args.copy_strategy, create=not args.dry_run
+            ),
         )
-    except (OSError, RuntimeError, SkillSyncError) as exc:
+    except (OSError, RuntimeError, SkillSyncError, ObjectPoolError) as exc:
         print(str(exc), file=sys.stderr)
         return 2
     return 0
@@ -8,6 +8,7 @@ import json
 import os
 import re
 import shutil
+import stat
 import subprocess
 import sys
 import tempfile
@@ -18,6 +19,18 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 if SCRIPT_DIR.as_posix() not in sys.path:
     sys.path.insert(0, SCRIPT_DIR.as_posix())
 
+from agent_profile_catalog import (  # noqa: E402
+    CATALOG_RELATIVE_PATH,
+    catalog_is_current,
+    catalog_text,
+    is_catalogued,
+)
+from object_pool import (  # noqa: E402
+    COPY_STRATEGIES,
+    DEFAULT_COPY_STRATEGY,
+    ObjectPool,
+    open_object_pool,
+)
 from path_safety import is_linklike, validate_generated_shell_path  # noqa: E402
 
 
@@ -27,12 +40,18 @@ MARKER_FILE = ".agents-pipeline-support.json"
 MARKER_TOOL = "agents_pipeline.sync-runtime-support"
 MARKER_VERSION = 3
 SUPPORTED_MARKER_VERSIONS = (1, 2, MARKER_VERSION)
-SUPPORT_REF_RE = re.compile(
-    r"(?<![A-Za-z0-9_./:-])((?:\./)?(?:agents|protocols|skills|tools)/[A-Za-z0-9_./-]+)"
-)
-ROOT_SCRIPT_REF_RE = re.compile(
-    r"(?<![A-Za-z0-9_./:-])((?:\./)?scripts/[A-Za-z0-9_./-]+)"
+IGNORED_SUPPORT_PATTERNS = ("__pycache__", "*.pyc", ".DS_Store")
+REF_BOUNDARY = r"(?<![A-Za-z0-9_./:-])"
+SUPPORT_REF_PATTERN = r"(?:\./)?(?:agents|protocols|skills|tools)/[A-Za-z0-9_./-]+"
+ROOT_SCRIPT_REF_PATTERN = r"(?:\./)?scripts/[A-Za-z0-9_./-]+"
+NODE_TOOL_PATTERN = (
+    r"\bnode\s+[\"']?(?:\./)?tools/"
+    r"(?P<node_tool>status-event|reasoning-policy|capability-recovery|codex-child-trace)"
+    r"\.js[\"']?"
 )
+SUPPORT_REF_RE = re.compile(f"{REF_BOUNDARY}({SUPPORT_REF_PATTERN})")
+ROOT_SCRIPT_REF_RE = re.compile(f"{REF_BOUNDARY}({ROOT_SCRIPT_REF_PATTERN})")
+COPY_CHUNK_BYTES = 1 << 24
 
 
 def resolve_target(raw_target: str) -> Path:
@@ -194,6 +213,53 @@ def validate_nonoverlapping_roots(source_root: Path, target_root: Path) -> None:
         )
 
 
+class SupportRefRewriter:
+    """Rewrite neutral support references for one target in a single regex pass.
+
+    After relocating a previous installed root (a plain substring replace),
+    one alternation absolutizes the ``node tools/*.js`` helpers, replaces
+    ``$ARGUMENTS``, and absolutizes support references (plus script
+    references in the catalog, agents, and protocols).  None of these
+    replacements can produce a match for another, so the result equals
+    applying them one after another.
+    """
+
+    def __init__(self, target_root: Path, *, previous_root: Path | None = None) -> None:
+        self.root = target_root.as_posix().rstrip("/")
+        self.previous = (
+            previous_root.as_posix().rstrip("/") if previous_root is not None else None
+        )
+        alternatives = (
+            f"(?P<node>{NODE_TOOL_PATTERN})",
+            r"(?P<arguments>\$ARGUMENTS)",
+            f"{REF_BOUNDARY}(?P<support>{SUPPORT_REF_PATTERN})",
+        )
+        self._pattern = re.compile("|".join(alternatives))
+        self._rooted_pattern = re.compile(
+            "|".join((*alternatives, f"{REF_BOUNDARY}(?P<script>{ROOT_SCRIPT_REF_PATTERN})"))
+        )
+
+    def _replace(self, match: re.Match[str]) -> str:
+        kind = match.lastgroup
+        if kind == "node":
+            return f'node "{self.root}/tools/{match.group("node_tool")}.js"'
+        if kind == "arguments":
+            return "raw_input"
+        if kind == "script":
+            return f'"{self.root}/{match.group("script").removeprefix("./")}"'
+        return f"{self.root}/{match.group(kind).removeprefix('./')}"
+
+    def rewrite(self, text: str, *, relative_path: Path | None = None) -> str:
+        rooted = relative_path is not None and (
+            relative_path.as_posix() == "AGENTS.md"
+            or (relative_path.parts and relative_path.parts[0] in {"agents", "protocols"})
+        )
+        if self.previous is not None:
+            text = text.replace(self.previous, self.root)
+        pattern = self._rooted_pattern if rooted else self._pattern
+        return pattern.sub(self._replace, text)
+
+
 def rewrite_support_refs(
     text: str,
     target_root: Path,
@@ -201,56 +267,13 @@ def rewrite_support_refs(
     relative_path: Path | None = None,
     previous_root: Path | None = None,
 ) -> str:
-    normalized_root = target_root.as_posix().rstrip("/")
-    if previous_root is not None:
-        text = text.replace(previous_root.as_posix().rstrip("/"), normalized_root)
-    text = re.sub(
-        r"\bnode\s+[\"']?(?:\./)?tools/(status-event|reasoning-policy|capability-recovery|codex-child-trace)\.js[\"']?",
-        lambda match: f'node "{normalized_root}/tools/{match.group(1)}.js"',
-        text,
+    return SupportRefRewriter(target_root, previous_root=previous_root).rewrite(
+        text, relative_path=relative_path
     )
 
-    def repl(match: re.Match[str]) -> str:
-        relative_path = match.group(1).removeprefix("./")
-        return f"{normalized_root}/{relative_path}"
-
-    rewritten = SUPPORT_REF_RE.sub(repl, text.replace("$ARGUMENTS", "raw_input"))
-    if relative_path is not None and (
-        relative_path.as_posix() == "AGENTS.md"
-        or (relative_path.parts and relative_path.parts[0] in {"agents", "protocols"})
-    ):
-        rewritten = ROOT_SCRIPT_REF_RE.sub(
-            lambda match: (
-                f'"{normalized_root}/'
-                f'{match.group(1).removeprefix("./")}"'
-            ),
-            rewritten,
-        )
-    return rewritten
 
-
-def populate_staging(source_root: Path, staging_root: Path, target_root: Path) -> None:
-    previous_root = source_installed_root(source_root)
-    for name in SUPPORT_DIRS:
-        shutil.copytree(
-            source_root / name,
-            staging_root / name,
-            ignore=shutil.ignore_patterns("__pycache__", "*.pyc", ".DS_Store"),
-        )
-    for name in SUPPORT_FILES:
-        shutil.copy2(source_root / name, staging_root / name)
-    for markdown_path in staging_root.rglob("*.md"):
-        markdown_path.write_text(
-            rewrite_support_refs(
-                markdown_path.read_text(encoding="utf-8"),
-                target_root,
-                relative_path=markdown_path.relative_to(staging_root),
-                previous_root=previous_root,
-            ),
-            encoding="utf-8",
-            newline="\n",
-        )
-    (staging_root / MARKER_FILE).write_text(
+def _marker_text(target_root: Path) -> str:
+    return (
         json.dumps(
             {
                 "installed_root": target_root.resolve().as_posix(),
@@ -260,20 +283,259 @@ def populate_staging(source_root: Path, staging_root: Path, target_root: Path) -
             indent=2,
             sort_keys=True,
         )
-        + "\n",
-        encoding="utf-8",
-        newline="\n",
+        + "\n"
     )
 
 
-def sync_support_tree(source_root: Path, target_root: Path, *, dry_run: bool) -> None:
+class SupportEntry:
+    """One file of the installed tree: its source, final bytes, and mode."""
+
+    __slots__ = ("relative", "source", "content", "mode")
+
+    def __init__(
+        self, relative: str, source: Path | None, content: bytes | None, mode: int
+    ) -> None:
+        self.relative = relative
+        self.source = source
+        self.content = content
+        self.mode = mode
+
+
+def plan_support_tree(
+    source_root: Path, target_root: Path
+) -> tuple[list[str], list[SupportEntry]]:
+    """Describe the support tree installed for ``target_root``, without writing it.
+
+    Returns the sorted relative directories and one entry per file.  Markdown
+    entries carry their rewritten bytes; other files are copied from source.
+    The agent profile catalog is never copied from the source, so a source
+    that is itself an installed tree cannot carry a stale one over;
+    materialize_support_tree renders it once the planned files are in place.
+    """
+
+    rewriter = SupportRefRewriter(
+        target_root, previous_root=source_installed_root(source_root)
+    )
+    ignore = shutil.ignore_patterns(*IGNORED_SUPPORT_PATTERNS)
+    directories: list[str] = []
+    entries: list[SupportEntry] = []
+
+    def add_file(path: Path, relative: Path) -> None:
+        mode = stat.S_IMODE(path.stat().st_mode)
+        content: bytes | None = None
+        if path.suffix == ".md":
+            content = rewriter.rewrite(
+                path.read_text(encoding="utf-8"), relative_path=relative
+            ).encode("utf-8")
+        entries.append(SupportEntry(relative.as_posix(), path, content, mode))
+
+    for name in SUPPORT_DIRS:
+        top = source_root / name
+        for dirpath, dirnames, filenames in os.walk(top, followlinks=True):
+            ignored = ignore(dirpath, [*dirnames, *filenames])
+            dirnames[:] = sorted(item for item in dirnames if item not in ignored)
+            current = Path(dirpath)
+            directories.append(current.relative_to(source_root).as_posix())
+            for filename in sorted(filenames):
+                relative = (current / filename).relative_to(source_root)
+                if filename not in ignored and relative.as_posix() != CATALOG_RELATIVE_PATH:
+                    add_file(current / filename, relative)
+    for name in SUPPORT_FILES:
+        add_file(source_root / name, Path(name))
+    entries.append(
+        SupportEntry(MARKER_FILE, None, _marker_text(target_root).encode("utf-8"), 0o644)
+    )
+    return sorted(directories), entries
+
+
+def _owned_installed_files(target_root: Path) -> tuple[set[str], set[str]] | None:
+    """Return the directories and files of an owned current-version target.
+
+    Only a tree carrying this tool's current marker for this exact root is a
+    safe delta base; anything else is restaged in full.  Links anywhere in the
+    tree also disqualify it.
+    """
+
+    marker_path = target_root / MARKER_FILE
+    if is_linklike(target_root) or not target_root.is_dir():
+        return None
+    try:
+        if is_linklike(marker_path) or not marker_path.is_file():
+            return None
+        marker = json.loads(marker_path.read_text(encoding="utf-8"))
+    except (OSError, UnicodeError, json.JSONDecodeError):
+        return None
+    if marker != json.loads(_marker_text(target_root)):
+        return None
+    directories: set[str] = set()
+    files: set[str] = set()
+    for dirpath, dirnames, filenames in os.walk(target_root):
+        current = Path(dirpath)
+        for name in [*dirnames, *filenames]:
+            entry = current / name
+            if is_linklike(entry):
+                return None
+            relative = entry.relative_to(target_root).as_posix()
+            if name in dirnames:
+                directories.add(relative)
+            elif entry.is_file():
+                files.add(relative)
+            else:
+                return None
+    return directories, files
+
+
+def _installed_matches(path: Path, entry: SupportEntry, pool: ObjectPool | None = None) -> bool:
+    try:
+        info = path.stat()
+        if entry.source is not None and stat.S_IMODE(info.st_mode) != (
+            pool.installed_mode(entry.mode)
+            if pool is not None and entry.content is None
+            else entry.mode
+        ):
+            return False
+        if entry.content is not None or entry.source is None:
+            return info.st_size == len(entry.content or b"") and path.read_bytes() == entry.content
+        if info.st_size != entry.source.stat().st_size:
+            return False
+        with path.open("rb") as installed, entry.source.open("rb") as source:
+            while True:
+                chunk = installed.read(1 << 20)
+                if chunk != source.read(1 << 20):
+                    return False
+                if not chunk:
+                    return True
+    except OSError:
+        return False
+
+
+def _copy_file(source: Path, destination: Path) -> None:
+    """Copy file data kernel-side where possible, then metadata like copy2."""
+
+    copied = False
+    if hasattr(os, "copy_file_range"):
+        try:
+            with source.open("rb") as reader, destination.open("wb") as writer:
+                total = 0
+                while count := os.copy_file_range(
+                    reader.fileno(), writer.fileno(), COPY_CHUNK_BYTES
+                ):
+                    total += count
+                # Some filesystems report an early 0 instead of failing.
+                copied = total == os.fstat(reader.fileno()).st_size
+        except OSError:
+            pass  # Cross-device or unsupported filesystem; copyfile uses sendfile.
+    if not copied:
+        shutil.copyfile(source, destination)
+    shutil.copystat(source, destination)
+
+
+def materialize_support_tree(
+    source_root: Path,
+    staging_root: Path,
+    target_root: Path,
+    directories: list[str],
+    entries: list[SupportEntry],
+    unchanged: set[str] = frozenset(),
+    pool: ObjectPool | None = None,
+) -> None:
+    """Write a planned support tree into staging, touching each file once.
+
+    Markdown is written straight from its rewritten bytes and other files are
+    copied kernel-side.  Files listed in ``unchanged`` are hard-linked from the
+    installed target instead, so a delta sync only restages what changed.
+    With an object ``pool``, verbatim files are placed through its copy
+    strategy; rewritten markdown and the marker are always written directly.
+    The agent profile catalog is rendered last, from the staged files, so its
+    stamp matches them once the staging tree is swapped into place.
+    """
+
+    for relative in directories:
+        (staging_root / relative).mkdir(parents=True, exist_ok=True)
+    for entry in entries:
+        destination = staging_root / entry.relative
+        if entry.relative in unchanged:
+            try:
+                os.link(target_root / entry.relative, destination)
+                continue
+            except OSError:
+                pass  # No hard links on this filesystem; write a copy instead.
+        if entry.content is None and entry.source is not None:
+            if pool is None:
+                _copy_file(entry.source, destination)
+            else:
+                pool.install_file(entry.source, destination, entry.mode)
+            continue
+        destination.write_bytes(entry.content or b"")
+        if entry.source is not None:
+            shutil.copymode(entry.source, destination)
+    catalog = catalog_text(staging_root)
+    if catalog is not None:
+        catalog_path = staging_root / CATALOG_RELATIVE_PATH
+        catalog_path.write_text(catalog, encoding="utf-8", newline="\n")
+        os.chmod(catalog_path, 0o644)
+    for relative in reversed(directories):
+        shutil.copystat(source_root / relative, staging_root / relative)
+
+
+def sync_support_tree(
+    source_root: Path,
+    target_root: Path,
+    *,
+    dry_run: bool,
+    delta: bool = False,
+    pool: ObjectPool | None = None,
+) -> None:
     target_root = Path(
         validate_generated_shell_path(target_root, "Support target")
     )
     validate_source(source_root)
     validate_nonoverlapping_roots(source_root, target_root)
     validate_existing_target(target_root)
+    plan: tuple[list[str], list[SupportEntry]] | None = None
+    unchanged: set[str] = set()
+    removed = 0
+    stale_catalog = 0
+    if delta:
+        installed = _owned_installed_files(target_root)
+        if installed is not None:
+            plan = plan_support_tree(source_root, target_root)
+            directories, entries = plan
+            installed_files = installed[1] - {CATALOG_RELATIVE_PATH}
+            unchanged = {
+                entry.relative
+                for entry in entries
+                if entry.relative in installed_files
+                and _installed_matches(target_root / entry.relative, entry, pool)
+            }
+            planned = {entry.relative for entry in entries}
+            removed = len(installed_files - planned)
+            if CATALOG_RELATIVE_PATH in installed[1]:
+                # Unchanged files keep their inodes, so only a catalogued file
+                # that changes or disappears outdates a current catalog.
+                stale_catalog = int(
+                    any(
+                        is_catalogued(relative)
+                        for relative in (planned - unchanged) | (installed_files - planned)
+                    )
+                    or not catalog_is_current(target_root)
+                )
+            else:
+                stale_catalog = int(catalog_text(source_root) is not None)
+            if (
+                len(unchanged) == len(entries) == len(installed_files)
+                and not stale_catalog
+                and set(directories) == installed[0]
+            ):
+                print(f"Neutral support tree already current at {target_root}")
+                return
     if dry_run:
+        if plan is not None:
+            print(
+                f"Dry run: would update {len(plan[1]) - len(unchanged) + stale_catalog} "
+                f"and remove {removed} file(s) in neutral support tree at {target_root}"
+            )
+            return
         print(f"Dry run: would sync neutral support tree to {target_root}")
         return
 
@@ -285,7 +547,11 @@ def sync_support_tree(source_root: Path, target_root: Path, *, dry_run: bool) ->
     moved_old = False
     moved_new = False
     try:
-        populate_staging(source_root, staging_root, target_root)
+        if plan is None:
+            plan = plan_support_tree(source_root, target_root)
+        materialize_support_tree(
+            source_root, staging_root, target_root, *plan, unchanged, pool
+        )
         _reset_windows_acl_inheritance(staging_root)
         if target_root.exists() or target_root.is_symlink():
             backup_root = Path(
@@ -348,12 +614,39 @@ def main() -> int:
     parser.add_argument("--source-root", required=True)
     parser.add_argument("--target-root", required=True)
     parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help=(
+            "Reuse unchanged files from an owned installed tree and skip the swap "
+            "entirely when nothing changed."
+        ),
+    )
+    parser.add_argument(
+        "--copy-strategy",
+        choices=COPY_STRATEGIES,
+        default=DEFAULT_COPY_STRATEGY,
+        help="How verbatim support files are placed (reflink and hardlink need --object-pool).",
+    )
+    parser.add_argument(
+        "--object-pool",
+        default=None,
+        help="Shared content-addressed pool for the reflink and hardlink strategies.",
+    )
     args = parser.parse_args()
 
     try:
         source_root = Path(args.source_root).expanduser().resolve()
         target_root = resolve_target(args.target_root)
-        sync_support_tree(source_root, target_root, dry_run=args.dry_run)
+        sync_support_tree(
+            source_root,
+            target_root,
+            dry_run=args.dry_run,
+            delta=args.delta,
+            pool=open_object_pool(
+                args.object_pool, args.copy_strategy, create=not args.dry_run
+            ),
+        )
     except (OSError, RuntimeError, ValueError) as exc:
         print(str(exc), file=sys.stderr)
         return 2
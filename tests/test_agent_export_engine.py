@@ -0,0 +1,267 @@
+import importlib.util
+import contextlib
+import io
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = REPO_ROOT / "scripts"
+
+
+def load_module(relative_path: str, module_name: str):
+    spec = importlib.util.spec_from_file_location(module_name, REPO_ROOT / relative_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+CODEX = load_module("scripts/export-codex-agents.py", "export_codex_agents_engine")
+CLAUDE = load_module("scripts/export-claude-agents.py", "export_claude_agents_engine")
+COPILOT = load_module("scripts/export-copilot-agents.py", "export_copilot_agents_engine")
+# The exporters put scripts/ on sys.path and import the shared engine from it.
+ENGINE = sys.modules["agent_export_engine"]
+ENGINE_MODE_ALIASES = sys.modules["codex_mode_aliases"]
+
+
+def read_tree(root: Path) -> dict:
+    return {
+        path.relative_to(root).as_posix(): path.read_text(encoding="utf-8")
+        for path in sorted(root.rglob("*"))
+        if path.is_file()
+    }
+
+
+class AgentExportEngineTest(unittest.TestCase):
+    def test_exporters_share_engine_parsing(self) -> None:
+        for module in (CODEX, CLAUDE, COPILOT):
+            with self.subTest(module=module.__name__):
+                self.assertIs(module.AgentSource, ENGINE.AgentSource)
+                self.assertIs(module.compact_markdown, ENGINE.compact_markdown)
+                self.assertIs(
+                    module.KNOWN_SOURCE_FRONTMATTER_KEYS,
+                    ENGINE.KNOWN_SOURCE_FRONTMATTER_KEYS,
+                )
+
+    def test_source_model_memoizes_runtime_bodies_per_variant(self) -> None:
+        model = ENGINE.load_source_model(REPO_ROOT / "agents")
+        agent = next(
+            agent for agent in model.agents if agent.name == "orchestrator-pipeline"
+        )
+
+        codex_body = model.runtime_body(agent)
+        tier2_body = model.runtime_body(agent, optional_status_writer=True)
+
+        self.assertIs(model.runtime_body(agent), codex_body)
+        self.assertIs(model.runtime_body(agent, optional_status_writer=True), tier2_body)
+        self.assertNotIn("$ARGUMENTS", codex_body)
+        self.assertNotIn("When the neutral writer is available", codex_body)
+        self.assertIn("When the neutral writer is available", tier2_body)
+        self.assertEqual(
+            codex_body,
+            CODEX.prepare_runtime_body(agent.name, agent.body),
+        )
+
+    def test_rebased_model_shares_bodies_but_keeps_caller_paths(self) -> None:
+        model = ENGINE.load_source_model(Path(os.path.relpath(REPO_ROOT / "agents")))
+        agent = model.agents[0]
+        body = model.runtime_body(agent)
+
+        absolute = ENGINE.resolve_source_model(REPO_ROOT / "agents", model)
+
+        self.assertIsNot(absolute, model)
+        self.assertEqual(absolute.agents[0].path, REPO_ROOT / "agents" / agent.path.name)
+        self.assertIs(absolute.runtime_body(absolute.agents[0]), body)
+        with tempfile.TemporaryDirectory() as temp_name:
+            other = ENGINE.resolve_source_model(Path(temp_name), model)
+        self.assertIsNot(other, model)
+        self.assertEqual(other.agents, [])
+
+    def test_combined_export_matches_standalone_exporters(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            temp_root = Path(temp_name)
+            for runtime in ("codex", "claude", "copilot"):
+                subprocess.run(
+                    [
+                        sys.executable,
+                        str(SCRIPTS_DIR / f"export-{runtime}-agents.py"),
+                        "--source-agents",
+                        str(REPO_ROOT / "agents"),
+                        "--target-dir",
+                        str(temp_root / "standalone" / runtime),
+                        "--resolve-support-refs-to",
+                        "/opt/agents-pipeline",
+                    ],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                )
+            subprocess.run(
+                [
+                    sys.executable,
+                    str(SCRIPTS_DIR / "export-runtime-agents.py"),
+                    "--source-agents",
+                    str(REPO_ROOT / "agents"),
+                    "--codex-target-dir",
+                    str(temp_root / "combined" / "codex"),
+                    "--claude-target-dir",
+                    str(temp_root / "combined" / "claude"),
+                    "--copilot-target-dir",
+                    str(temp_root / "combined" / "copilot"),
+                    "--resolve-support-refs-to",
+                    "/opt/agents-pipeline",
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+
+            for runtime in ("codex", "claude", "copilot"):
+                with self.subTest(runtime=runtime):
+                    standalone = read_tree(temp_root / "standalone" / runtime)
+                    self.assertTrue(standalone)
+                    self.assertEqual(
+                        read_tree(temp_root / "combined" / runtime), standalone
+                    )
+
+    def test_incremental_export_reuses_unchanged_agent_renders(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            temp_root = Path(temp_name)
+            source_root = temp_root / "source"
+            shutil.copytree(REPO_ROOT / "agents", source_root / "agents")
+            shutil.copy2(REPO_ROOT / "modes.json", source_root / "modes.json")
+            plain_dir = temp_root / "plain"
+            target_dir = temp_root / "incremental"
+
+            def export(*extra: str) -> None:
+                argv = ["--source-agents", str(source_root / "agents"), *extra]
+                with contextlib.redirect_stdout(io.StringIO()):
+                    self.assertEqual(CODEX.main(argv), 0)
+
+            export("--target-dir", str(plain_dir))
+            export("--target-dir", str(target_dir), "--incremental")
+            cache_dir = target_dir / ENGINE.RENDER_CACHE_DIRNAME
+            cache_entries = sorted(cache_dir.glob("*.json"))
+            self.assertEqual(len(cache_entries), len(list((plain_dir / "agents").glob("*.toml"))))
+            outputs = read_tree(target_dir)
+            self.assertEqual(
+                {
+                    name: content
+                    for name, content in outputs.items()
+                    if not name.startswith(ENGINE.RENDER_CACHE_DIRNAME)
+                },
+                read_tree(plain_dir),
+            )
+
+            with mock.patch.object(
+                CODEX, "wrap_runtime_body", wraps=CODEX.wrap_runtime_body
+            ) as wrap:
+                export("--target-dir", str(target_dir), "--incremental")
+            self.assertEqual(wrap.call_count, 0)
+            self.assertEqual(read_tree(target_dir), outputs)
+
+            edited = source_root / "agents" / "reviewer.md"
+            edited.write_text(
+                edited.read_text(encoding="utf-8") + "\nExtra reviewer note.\n",
+                encoding="utf-8",
+            )
+            with mock.patch.object(
+                CODEX, "wrap_runtime_body", wraps=CODEX.wrap_runtime_body
+            ) as wrap:
+                export("--target-dir", str(target_dir), "--incremental")
+            self.assertEqual(
+                [call.args[0] for call in wrap.call_args_list], ["reviewer"]
+            )
+            self.assertIn(
+                "Extra reviewer note.",
+                (target_dir / "agents" / "reviewer.toml").read_text(encoding="utf-8"),
+            )
+            self.assertEqual(len(list(cache_dir.glob("*.json"))), len(cache_entries))
+
+    def test_incremental_export_misses_after_a_render_helper_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            temp_root = Path(temp_name)
+            shutil.copytree(SCRIPTS_DIR, temp_root / "scripts")
+            shutil.copytree(REPO_ROOT / "agents", temp_root / "agents")
+            shutil.copy2(REPO_ROOT / "modes.json", temp_root / "modes.json")
+            target_dir = temp_root / "target"
+            command = [
+                sys.executable,
+                str(temp_root / "scripts" / "export-codex-agents.py"),
+                "--source-agents",
+                str(temp_root / "agents"),
+                "--target-dir",
+                str(target_dir),
+                "--incremental",
+            ]
+            subprocess.run(command, check=True, capture_output=True, text=True)
+            helper = temp_root / "scripts" / "codex_mode_aliases.py"
+            text = helper.read_text(encoding="utf-8")
+            original = ENGINE_MODE_ALIASES.MODE_ALIAS_DO_NOT_SPAWN_LINE
+            edited_line = "Edited do-not-spawn guidance."
+            helper.write_text(
+                text.replace(
+                    "MODE_ALIAS_DO_NOT_SPAWN_LINE = (",
+                    f"MODE_ALIAS_DO_NOT_SPAWN_LINE = {edited_line!r}\n_UNUSED = (",
+                    1,
+                ),
+                encoding="utf-8",
+            )
+
+            subprocess.run(command, check=True, capture_output=True, text=True)
+
+            roles = read_tree(target_dir / "agents")
+            self.assertTrue(any(edited_line in content for content in roles.values()))
+            self.assertFalse(any(original in content for content in roles.values()))
+
+    def test_render_cache_fingerprints_every_sibling_exporter_import(self) -> None:
+        local_modules = {path.stem for path in SCRIPTS_DIR.glob("*.py")}
+        for exporter in (
+            "export-codex-agents.py",
+            "export-claude-agents.py",
+            "export-copilot-agents.py",
+        ):
+            imported = set(
+                re.findall(
+                    r"^from (\w+) import",
+                    (SCRIPTS_DIR / exporter).read_text(encoding="utf-8"),
+                    re.MULTILINE,
+                )
+            )
+            with self.subTest(exporter=exporter):
+                self.assertLessEqual(
+                    {f"{name}.py" for name in imported & local_modules},
+                    set(ENGINE.RENDER_HELPER_MODULES),
+                )
+
+    def test_write_text_skips_identical_content(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            path = Path(temp_name) / "role.toml"
+            self.assertTrue(ENGINE.write_text(path, "name = \"a\"\n"))
+            inode = path.stat().st_ino
+            self.assertFalse(ENGINE.write_text(path, "name = \"a\"\n"))
+            self.assertEqual(path.stat().st_ino, inode)
+            self.assertTrue(ENGINE.write_text(path, "name = \"b\"\n"))
+            self.assertEqual(path.read_text(encoding="utf-8"), "name = \"b\"\n")
+
+    def test_combined_export_requires_a_target(self) -> None:
+        result = subprocess.run(
+            [sys.executable, str(SCRIPTS_DIR / "export-runtime-agents.py")],
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("--codex-target-dir", result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPT_PATH = REPO_ROOT / "scripts" / "agent_profile_catalog.py"
+
+
+def load_module():
+    spec = importlib.util.spec_from_file_location("agent_profile_catalog_under_test", SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+MODULE = load_module()
+
+
+class AgentProfileCatalogTest(unittest.TestCase):
+    def make_asset_root(self, root: Path) -> Path:
+        asset_root = root / "agents-pipeline"
+        shutil.copytree(REPO_ROOT / "tools" / "agent-profiles", asset_root / "tools" / "agent-profiles")
+        for runtime in MODULE.CATALOG_RUNTIMES:
+            shutil.copytree(
+                MODULE.default_model_set_dir(REPO_ROOT, runtime),
+                MODULE.default_model_set_dir(asset_root, runtime),
+            )
+        shutil.copy2(REPO_ROOT / "VERSION", asset_root / "VERSION")
+        return asset_root
+
+    def write_catalog(self, asset_root: Path) -> None:
+        text = MODULE.catalog_text(asset_root)
+        assert text is not None
+        (asset_root / MODULE.CATALOG_RELATIVE_PATH).write_text(text, encoding="utf-8")
+
+    def listing(self, asset_root: Path, runtime: str):
+        return MODULE.load_catalog_listing(
+            asset_root,
+            runtime,
+            asset_root / MODULE.PROFILE_DIR_RELATIVE,
+            MODULE.default_model_set_dir(asset_root, runtime),
+        )
+
+    def test_catalog_listing_matches_a_scan_of_every_runtime(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            asset_root = self.make_asset_root(Path(temp_name))
+            self.assertIsNone(self.listing(asset_root, "codex"))
+            self.write_catalog(asset_root)
+
+            catalog = json.loads(
+                (asset_root / MODULE.CATALOG_RELATIVE_PATH).read_text(encoding="utf-8")
+            )
+            self.assertEqual(catalog["tool"], MODULE.CATALOG_TOOL)
+            self.assertEqual(
+                catalog["pipeline_version"],
+                (REPO_ROOT / "VERSION").read_text(encoding="utf-8").strip(),
+            )
+            profile_dir = asset_root / MODULE.PROFILE_DIR_RELATIVE
+            for runtime in MODULE.CATALOG_RUNTIMES:
+                with self.subTest(runtime=runtime):
+                    model_set_dir = MODULE.default_model_set_dir(asset_root, runtime)
+                    self.assertEqual(
+                        self.listing(asset_root, runtime),
+                        (
+                            MODULE.scan_profiles(profile_dir),
+                            MODULE.scan_model_sets(runtime, model_set_dir),
+                        ),
+                    )
+            self.assertIsNone(
+                MODULE.load_catalog_listing(
+                    asset_root,
+                    "codex",
+                    Path(temp_name) / "custom-profiles",
+                    MODULE.default_model_set_dir(asset_root, "codex"),
+                )
+            )
+
+    def test_stale_or_foreign_catalog_is_ignored(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            asset_root = self.make_asset_root(Path(temp_name))
+            self.write_catalog(asset_root)
+            self.assertIsNotNone(self.listing(asset_root, "claude"))
+
+            # A same-size edit keeps the file's name and size but not its mtime.
+            profile = asset_root / MODULE.PROFILE_DIR_RELATIVE / "balanced.json"
+            original = profile.read_text(encoding="utf-8")
+            info = profile.stat()
+            edited = original.replace('"standard"', '"strong"  ', 1)
+            self.assertNotEqual(edited, original)
+            self.assertEqual(len(edited), len(original))
+            profile.write_text(edited, encoding="utf-8")
+            self.assertEqual(profile.stat().st_size, info.st_size)
+            os.utime(profile, ns=(info.st_atime_ns, info.st_mtime_ns + 1_000_000_000))
+            self.assertIsNone(self.listing(asset_root, "claude"))
+
+            # A replacement by rename is caught by its inode even with the old mtime.
+            self.write_catalog(asset_root)
+            self.assertIsNotNone(self.listing(asset_root, "claude"))
+            info = profile.stat()
+            replacement = profile.with_name("balanced.json.new")
+            replacement.write_text(edited, encoding="utf-8")
+            os.utime(replacement, ns=(info.st_atime_ns, info.st_mtime_ns))
+            os.replace(replacement, profile)
+            self.assertIsNone(self.listing(asset_root, "claude"))
+
+            self.write_catalog(asset_root)
+            extra = Path(MODULE.default_model_set_dir(asset_root, "claude")) / "extra.json"
+            extra.write_text("{}", encoding="utf-8")
+            self.assertIsNone(self.listing(asset_root, "claude"))
+            self.assertIsNotNone(self.listing(asset_root, "codex"))
+            extra.unlink()
+            self.assertIsNotNone(self.listing(asset_root, "claude"))
+
+            (asset_root / "VERSION").write_text("0.0.1\n", encoding="utf-8")
+            self.assertIsNone(self.listing(asset_root, "claude"))
+
+    def test_invalid_source_profile_yields_no_catalog(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            asset_root = self.make_asset_root(Path(temp_name))
+            (asset_root / MODULE.PROFILE_DIR_RELATIVE / "broken.json").write_text(
+                "{", encoding="utf-8"
+            )
+            self.assertIsNone(MODULE.catalog_text(asset_root))
+            with self.assertRaisesRegex(MODULE.CatalogError, "Invalid JSON in agent profile"):
+                MODULE.scan_profiles(asset_root / MODULE.PROFILE_DIR_RELATIVE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import importlib
 import importlib.util
 import io
 import json
 import os
+import shutil
 import subprocess
 import sys
 import tempfile
@@ -15,7 +18,8 @@ from unittest import mock
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 TOOL_PATH = REPO_ROOT / "tools/agent-profile.py"
-SPEC = importlib.util.spec_from_file_location("agent_profile_cli", TOOL_PATH)
+MANAGER_PATH = REPO_ROOT / "scripts/agent_profile_manager.py"
+SPEC = importlib.util.spec_from_file_location("agent_profile_cli", MANAGER_PATH)
 assert SPEC and SPEC.loader
 PROFILE = importlib.util.module_from_spec(SPEC)
 sys.modules[SPEC.name] = PROFILE
@@ -558,6 +562,7 @@ class AgentProfileCommandTests(unittest.TestCase):
             self.assertIn(str((Path(temp_name) / ".copilot/agents").resolve()), command)
 
     def test_codex_global_clear_preserves_manifest_user_skill_root(self) -> None:
+        catalog = importlib.import_module("codex_skill_catalog")
         with tempfile.TemporaryDirectory() as temp_name:
             root = Path(temp_name)
             target = (root / "custom-codex").resolve()
@@ -566,9 +571,9 @@ class AgentProfileCommandTests(unittest.TestCase):
             (target / PROFILE.CODEX_MANIFEST_FILENAME).write_text(
                 json.dumps(
                     {
-                        "managed_skill_marker_version": PROFILE.SKILL_MARKER_VERSION,
-                        "managed_skill_names": sorted(PROFILE.MANAGED_SKILL_NAMES),
-                        "managed_skill_sync_state": PROFILE.SKILL_SYNC_STATE_READY,
+                        "managed_skill_marker_version": catalog.SKILL_MARKER_VERSION,
+                        "managed_skill_names": sorted(catalog.MANAGED_SKILL_NAMES),
+                        "managed_skill_sync_state": catalog.SKILL_SYNC_STATE_READY,
                         "managed_user_skills_root": user_skills.as_posix(),
                         "target_dir": target.as_posix(),
                         "tool": PROFILE.CODEX_MANIFEST_TOOL,
@@ -907,6 +912,107 @@ class AgentProfileManifestTests(unittest.TestCase):
                 [f"global-agents:{target / 'AGENTS.override.md'}:unreadable"],
             )
 
+    def test_codex_role_policy_reparses_only_roles_changed_since_install(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            target = Path(temp_name) / ".codex"
+            (target / "agents").mkdir(parents=True)
+            role = target / "agents" / "executor.toml"
+            role.write_text('name = "executor"\n', encoding="utf-8")
+            verified = {
+                "agents/executor.toml": hashlib.sha256(role.read_bytes()).hexdigest()
+            }
+            with mock.patch("tomllib.loads", side_effect=AssertionError("parsed")):
+                self.assertEqual(
+                    PROFILE._codex_global_model_policy_violations(
+                        target, ["agents/executor.toml"], verified
+                    ),
+                    [],
+                )
+
+            role.write_text('name = "executor"\nmodel = "pinned"\n', encoding="utf-8")
+            self.assertEqual(
+                PROFILE._codex_global_model_policy_violations(
+                    target, ["agents/executor.toml"], verified
+                ),
+                ["policy:global-role-model-override:agents/executor.toml:model"],
+            )
+
+    def test_codex_config_registration_skips_parsing_the_installed_config(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            target = Path(temp_name) / ".codex"
+            (target / "agents").mkdir(parents=True)
+            config = target / "config.toml"
+            config.write_text('[agents.executor]\nconfig_file = "other.toml"\n', encoding="utf-8")
+            installed = hashlib.sha256(config.read_bytes()).hexdigest()
+            with mock.patch("tomllib.loads", side_effect=AssertionError("parsed")):
+                self.assertEqual(
+                    PROFILE._missing_codex_config_registration(target, ["executor"], installed),
+                    [],
+                )
+            self.assertEqual(
+                PROFILE._missing_codex_config_registration(target, ["executor"], "0" * 64),
+                [
+                    "config:agents.executor.config_file",
+                    "config:features.multi_agent",
+                    "config:features.multi_agent_v2",
+                ],
+            )
+
+    def test_list_reads_a_current_installed_catalog_without_scanning(self) -> None:
+        catalog = sys.modules["agent_profile_catalog"]
+        with tempfile.TemporaryDirectory() as temp_name:
+            asset_root = Path(temp_name) / "agents-pipeline"
+            shutil.copytree(REPO_ROOT / "tools" / "agent-profiles", asset_root / "tools" / "agent-profiles")
+            shutil.copytree(
+                REPO_ROOT / "runtimes" / "codex" / "model-sets",
+                asset_root / "runtimes" / "codex" / "model-sets",
+            )
+            shutil.copy2(REPO_ROOT / "VERSION", asset_root / "VERSION")
+            args = parse("list", "--runtime", "codex", "--json", "--asset-root", str(asset_root))
+            request = PROFILE.resolve_request(
+                args, stdin=NonTtyStringIO(), stdout=NonTtyStringIO()
+            )
+            with mock.patch("sys.stdout", new_callable=io.StringIO) as stdout:
+                PROFILE.print_listing(request, as_json=True)
+            scanned = stdout.getvalue()
+
+            for runtime in ("claude", "copilot"):
+                shutil.copytree(
+                    REPO_ROOT / "runtimes" / runtime / "model-sets",
+                    asset_root / "runtimes" / runtime / "model-sets",
+                )
+            (asset_root / catalog.CATALOG_RELATIVE_PATH).write_text(
+                catalog.catalog_text(asset_root), encoding="utf-8"
+            )
+            with mock.patch.object(
+                PROFILE, "scan_profiles", side_effect=AssertionError("scanned")
+            ), mock.patch.object(
+                PROFILE, "scan_model_sets", side_effect=AssertionError("scanned")
+            ), mock.patch("sys.stdout", new_callable=io.StringIO) as stdout:
+                PROFILE.print_listing(request, as_json=True)
+            self.assertEqual(stdout.getvalue(), scanned)
+
+            # The entry point answers a plain list before importing the manager.
+            self.assertEqual(
+                catalog.quick_listing(asset_root, ["list", "--runtime", "CODEX", "--json"]),
+                scanned,
+            )
+            with mock.patch("sys.stdout", new_callable=io.StringIO) as stdout:
+                PROFILE.print_listing(request, as_json=False)
+            self.assertEqual(
+                catalog.quick_listing(asset_root, ["list", "-Runtime", "codex"]),
+                stdout.getvalue(),
+            )
+            for argv in (
+                ["list", "--json"],
+                ["list", "--runtime", "codex", "--profile-dir", str(asset_root)],
+                ["status", "--runtime", "codex", "--json"],
+            ):
+                with self.subTest(argv=argv):
+                    self.assertIsNone(catalog.quick_listing(asset_root, argv))
+            with mock.patch.dict(os.environ, {"AGENTS_PIPELINE_ASSET_ROOT": str(asset_root)}):
+                self.assertIsNone(catalog.quick_listing(asset_root, ["list", "--runtime", "codex"]))
+
     def test_status_accepts_previous_codex_v2_manifest(self) -> None:
         with tempfile.TemporaryDirectory() as temp_name:
             target = Path(temp_name) / ".codex"
@@ -947,6 +1053,7 @@ class AgentProfileSurfaceTests(unittest.TestCase):
         forbidden = "open" + "code"
         for relative in (
             "tools/agent-profile.py",
+            "scripts/agent_profile_manager.py",
             "scripts/agent-profile.sh",
             "scripts/agent-profile.ps1",
         ):
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+TOOL_PATH = REPO_ROOT / "tools/artifact-store.py"
+SPEC = importlib.util.spec_from_file_location("artifact_store_cli", TOOL_PATH)
+assert SPEC and SPEC.loader
+STORE = importlib.util.module_from_spec(SPEC)
+sys.modules[SPEC.name] = STORE
+SPEC.loader.exec_module(STORE)
+
+POINTER_EXAMPLE = REPO_ROOT / "protocols/examples/checkpoint.artifact-pointer.valid.json"
+
+
+def checkpoint(run_id: str, artifacts: dict) -> dict:
+    return {
+        "protocol_version": "1.0",
+        "pipeline_id": run_id,
+        "orchestrator": "orchestrator-pipeline",
+        "user_prompt": "Exercise the artifact store.",
+        "flags": {},
+        "current_stage": 1,
+        "completed_stages": [],
+        "stage_artifacts": artifacts,
+        "created_at": "2026-07-15T00:00:00Z",
+        "updated_at": "2026-07-15T00:00:00Z",
+    }
+
+
+class ArtifactStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        self.output_root = Path(temp.name).resolve() / ".pipeline-output"
+        self.spec = {"title": "Shared spec", "criteria": ["x" * 300]}
+        self.checkpoints = []
+        for run_id in ("run-a", "run-b"):
+            path = self.output_root / run_id / "checkpoint.json"
+            path.parent.mkdir(parents=True)
+            artifacts = {"problem_spec": self.spec, "tiny": {"ok": True}}
+            path.write_text(json.dumps(checkpoint(run_id, artifacts), indent=2), encoding="utf-8")
+            self.checkpoints.append(path)
+
+    def test_migrate_dedupes_identical_artifacts_and_inline_restores_them(self) -> None:
+        original = [path.read_text(encoding="utf-8") for path in self.checkpoints]
+        for path in self.checkpoints:
+            self.assertEqual(STORE.migrate_checkpoint(path), ["problem_spec"])
+
+        store = STORE.ArtifactStore(self.output_root)
+        self.assertEqual(len(list(store.objects())), 1)
+        migrated = json.loads(self.checkpoints[0].read_text(encoding="utf-8"))
+        pointer = migrated["stage_artifacts"]["problem_spec"]
+        self.assertTrue(STORE.is_pointer(pointer))
+        self.assertEqual(migrated["stage_artifacts"]["tiny"], {"ok": True})
+        self.assertEqual(store.read_json(pointer), self.spec)
+        self.assertEqual(STORE.migrate_checkpoint(self.checkpoints[0]), [])
+        self.assertEqual(STORE.verify_store(self.output_root), [])
+
+        for path, text in zip(self.checkpoints, original):
+            self.assertEqual(STORE.inline_checkpoint(path), ["problem_spec"])
+            self.assertEqual(json.loads(path.read_text(encoding="utf-8")), json.loads(text))
+
+    def test_verify_reports_corrupt_objects_and_dangling_pointers(self) -> None:
+        STORE.migrate_checkpoint(self.checkpoints[0])
+        store = STORE.ArtifactStore(self.output_root)
+        ((digest, object_path),) = store.objects()
+        os.chmod(object_path, 0o644)
+        object_path.write_bytes(b"{}")
+
+        problems = STORE.verify_store(self.output_root)
+        self.assertEqual(len(problems), 2)
+        self.assertIn("content hashes to", problems[0])
+        self.assertIn("run-a/checkpoint.json stage_artifacts['problem_spec']", problems[1])
+        with self.assertRaises(STORE.ArtifactStoreError):
+            store.read(store.pointer(digest, len(b"{}")))
+
+        object_path.unlink()
+        self.assertIn("missing or corrupt object", STORE.verify_store(self.output_root)[0])
+
+    def test_gc_keeps_referenced_and_recent_objects(self) -> None:
+        STORE.migrate_checkpoint(self.checkpoints[0])
+        store = STORE.ArtifactStore(self.output_root)
+        orphan = store.put_json({"orphan": True})
+        now = time.time() + 2 * STORE.DEFAULT_GC_GRACE_SECONDS
+
+        self.assertEqual(STORE.collect_garbage(self.output_root), [])
+        self.assertEqual(
+            STORE.collect_garbage(self.output_root, dry_run=True, now=now), [orphan["path"]]
+        )
+        self.assertTrue(store.resolve(orphan).exists())
+        self.assertEqual(STORE.collect_garbage(self.output_root, now=now), [orphan["path"]])
+        self.assertFalse(store.resolve(orphan).exists())
+        self.assertEqual(len(list(store.objects())), 1)
+        self.assertEqual(STORE.verify_store(self.output_root), [])
+
+    def test_gc_grace_restarts_when_a_writer_reuses_an_old_object(self) -> None:
+        store = STORE.ArtifactStore(self.output_root)
+        value = {"reused": True}
+        pointer = store.put_json(value)
+        path = store.resolve(pointer)
+        stale = time.time() - 2 * STORE.DEFAULT_GC_GRACE_SECONDS
+        os.utime(path, (stale, stale))
+        self.assertEqual(store.put_json(value), pointer)
+        self.assertEqual(STORE.collect_garbage(self.output_root), [])
+
+        os.utime(path, (stale, stale))
+        with io.BytesIO(STORE.canonical_json_bytes(value)) as handle:
+            self.assertEqual(store.put_file(handle), pointer)
+        self.assertEqual(STORE.collect_garbage(self.output_root), [])
+        self.assertTrue(path.exists())
+        self.assertEqual(list((store.objects_dir / "tmp").iterdir()), [])
+
+    def test_cli_put_get_round_trip(self) -> None:
+        source = self.output_root / "artifact.bin"
+        source.write_bytes(b"binary\x00payload")
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            self.assertEqual(STORE.main(["put", str(self.output_root), str(source)]), 0)
+        pointer = json.loads(stdout.getvalue())
+        self.assertEqual(pointer["bytes"], len(b"binary\x00payload"))
+        self.assertEqual(
+            STORE.ArtifactStore(self.output_root).resolve(
+                {key: pointer[key] for key in ("path", "sha256", "bytes")}
+            ).read_bytes(),
+            b"binary\x00payload",
+        )
+
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(STORE.main(["get", str(self.output_root), "0" * 64]), 2)
+        self.assertIn("Missing object", stderr.getvalue())
+
+    def test_pointer_example_uses_store_layout(self) -> None:
+        artifacts = json.loads(POINTER_EXAMPLE.read_text(encoding="utf-8"))["stage_artifacts"]
+        pointer = artifacts["problem_spec"]
+        self.assertTrue(STORE.is_pointer(pointer))
+        self.assertFalse(STORE.is_pointer(artifacts["plan_outline"]))
+        self.assertEqual(
+            STORE.ArtifactStore(self.output_root).relative_path(pointer["sha256"]),
+            pointer["path"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
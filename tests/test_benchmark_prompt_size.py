@@ -0,0 +1,110 @@
+import contextlib
+import importlib.util
+import io
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def load_module(relative_path: str, module_name: str):
+    spec = importlib.util.spec_from_file_location(module_name, REPO_ROOT / relative_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+BENCHMARK = load_module("scripts/benchmark-prompt-size.py", "benchmark_prompt_size")
+ENGINE = sys.modules["agent_export_engine"]
+
+
+def run_benchmark(*argv: str):
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        code = BENCHMARK.main(list(argv))
+    return code, stdout.getvalue(), stderr.getvalue()
+
+
+class PromptSizeBenchmarkTest(unittest.TestCase):
+    def test_transform_steps_end_at_the_exported_runtime_body(self) -> None:
+        model = ENGINE.load_source_model(REPO_ROOT / "agents")
+        report = BENCHMARK.transform_report(REPO_ROOT / "agents")
+        self.assertIn("orchestrator-pipeline", report)
+        self.assertNotIn("executor", report)
+        for agent in model.agents:
+            if agent.name not in report:
+                continue
+            for variant, optional_status_writer in BENCHMARK.TRANSFORM_VARIANTS:
+                with self.subTest(agent=agent.name, variant=variant):
+                    entry = report[agent.name][variant]
+                    self.assertEqual(
+                        [step["transform"] for step in entry["steps"]],
+                        [step.__name__ for step, _ in ENGINE.ORCHESTRATOR_MINIFY_STEPS],
+                    )
+                    self.assertEqual(
+                        entry["after"],
+                        BENCHMARK.measure(
+                            model.runtime_body(
+                                agent, optional_status_writer=optional_status_writer
+                            )
+                        ),
+                    )
+
+    def test_growth_past_threshold_fails_against_baseline(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            temp_root = Path(temp_name)
+            source = temp_root / "agents"
+            shutil.copytree(REPO_ROOT / "agents", source)
+            shutil.copy2(REPO_ROOT / "modes.json", temp_root / "modes.json")
+            baseline = temp_root / "baseline.json"
+
+            code, _, stderr = run_benchmark(
+                "--source-agents", str(source), "--baseline", str(baseline), "--update-baseline"
+            )
+            self.assertEqual(code, 0, stderr)
+            stored = json.loads(baseline.read_text(encoding="utf-8"))
+            self.assertIn("agents/peon.toml", stored["outputs"]["codex"])
+            self.assertIn("peon.md", stored["outputs"]["claude"])
+            self.assertIn("peon.agent.md", stored["outputs"]["copilot"])
+            self.assertNotIn(temp_name, baseline.read_text(encoding="utf-8"))
+
+            code, stdout, _ = run_benchmark("--source-agents", str(source), "--baseline", str(baseline))
+            self.assertEqual(code, 0)
+            self.assertIn("No generated file grew", stdout)
+
+            peon = source / "peon.md"
+            peon.write_text(
+                peon.read_text(encoding="utf-8") + "\n" + "Extra guidance line.\n" * 40,
+                encoding="utf-8",
+            )
+            code, stdout, stderr = run_benchmark(
+                "--source-agents", str(source), "--baseline", str(baseline), "--json"
+            )
+            self.assertEqual(code, 1)
+            diff = json.loads(stdout)["baseline_diff"]
+            self.assertEqual(
+                sorted((entry["runtime"], entry["file"]) for entry in diff["regressions"]),
+                [("claude", "peon.md"), ("codex", "agents/peon.toml"), ("copilot", "peon.agent.md")],
+            )
+
+            code, _, _ = run_benchmark(
+                "--source-agents",
+                str(source),
+                "--baseline",
+                str(baseline),
+                "--max-growth-percent",
+                "1000",
+            )
+            self.assertEqual(code, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
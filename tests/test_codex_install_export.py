@@ -1,3 +1,4 @@
+import hashlib
 import importlib.util
 import io
 import json
@@ -747,6 +748,55 @@ class CodexInstallExportTest(unittest.TestCase):
                 target_dir=target_dir,
             )
             self.assertEqual(manifest_path.read_bytes(), first)
+            self.assertNotIn("copy_strategy", manifest)
+
+            pool_settings = {"strategy": "hardlink", "object_pool": "/srv/agents-pool"}
+            INSTALL_MODULE.write_manifest(
+                manifest_path,
+                agent_names=["orchestrator-flow"],
+                agent_files=["agents/orchestrator-flow.toml"],
+                profile="premium",
+                model_set="openai",
+                uniform_model=None,
+                source_agents_dir=REPO_ROOT / "agents",
+                target_dir=target_dir,
+                copy_strategy=pool_settings,
+            )
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            self.assertEqual(manifest["copy_strategy"], pool_settings)
+
+    def test_manifest_records_digests_of_model_free_roles_only(self) -> None:
+        model_free = 'name = "planner"\ndescription = "Plans."\n'
+        digests = INSTALL_MODULE.model_free_role_digests(
+            {
+                "agents/planner.toml": model_free,
+                "agents/executor.toml": 'name = "executor"\nmodel = "gpt-5"\n',
+                "agents/broken.toml": 'name = "broken"\n[',
+            }
+        )
+        self.assertEqual(
+            digests,
+            {"agents/planner.toml": hashlib.sha256(model_free.encode("utf-8")).hexdigest()},
+        )
+        with tempfile.TemporaryDirectory() as temp_dir_name:
+            target_dir = Path(temp_dir_name) / ".codex"
+            manifest_path = target_dir / INSTALL_MODULE.MANIFEST_FILENAME
+            for agent_sha256, config_sha256 in ((None, None), (digests, "a" * 64)):
+                INSTALL_MODULE.write_manifest(
+                    manifest_path,
+                    agent_names=["planner"],
+                    agent_files=["agents/planner.toml"],
+                    profile=None,
+                    model_set=None,
+                    uniform_model=None,
+                    source_agents_dir=REPO_ROOT / "agents",
+                    target_dir=target_dir,
+                    agent_sha256=agent_sha256,
+                    config_sha256=config_sha256,
+                )
+                manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+                self.assertEqual(manifest.get("managed_agent_sha256"), agent_sha256)
+                self.assertEqual(manifest.get("managed_config_sha256"), config_sha256)
 
     def test_manifest_rejects_managed_files_outside_agents_directory(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir_name:
@@ -1273,6 +1323,126 @@ class CodexInstallExportTest(unittest.TestCase):
         self.assertNotIn("max_depth", parsed["agents"])
         self.assertEqual(parsed["agents"]["executor"]["description"], "Execute work.")
 
+    def test_merge_parses_existing_config_once_and_validates_once(self) -> None:
+        existing = (
+            "[features]\nweb_search = true\n\n"
+            "[agents]\nmax_threads = 6\n\n"
+            '[agents.executor]\ndescription = "Old value."\n'
+        )
+        loads = INSTALL_MODULE.tomllib.loads
+        with mock.patch.object(
+            INSTALL_MODULE.tomllib, "loads", side_effect=loads
+        ) as parse:
+            merged = INSTALL_MODULE.merge_config_text(
+                existing,
+                {
+                    "executor": INSTALL_MODULE.Block(
+                        "table",
+                        "agents.executor",
+                        ["[agents.executor]", 'description = "New value."'],
+                    )
+                },
+                previous_agent_names=["executor"],
+                job_max_runtime_seconds=900,
+                manage_agent_runtime_limits=True,
+            )
+        self.assertEqual([call.args[0] for call in parse.call_args_list], [existing, merged])
+
+    def test_config_document_edits_tables_in_place(self) -> None:
+        document = INSTALL_MODULE.ConfigDocument.parse(
+            "# keep me\nmodel = 'gpt'\n\n"
+            "[agents.custom] # user role\ndescription = '''\n[agents]\nmax_depth = 9\n'''\n\n"
+            '[agents."executor"]\ndescription = "Old"\n',
+            "Existing Codex config",
+        )
+        self.assertEqual(document.data["agents"]["executor"]["description"], "Old")
+        self.assertIsNone(document.table("agents"))
+        custom = document.table("agents.custom")
+        self.assertEqual(custom.syntax_flags(), [True, True, False, False, False, True])
+
+        document.remove_tables({"agents.executor"})
+        self.assertIsNone(document.table("agents.executor"))
+        agents = document.ensure_table("agents")
+        self.assertIs(document.ensure_table("agents"), agents)
+        INSTALL_MODULE.upsert_assignment(agents, "max_depth", "1")
+        INSTALL_MODULE.upsert_assignment(custom, "max_depth", "2")
+        self.assertEqual(
+            custom.syntax_flags(), INSTALL_MODULE._syntax_line_flags(custom.lines)
+        )
+        self.assertEqual(
+            document.render(),
+            "# keep me\nmodel = 'gpt'\n\n"
+            "[agents]\nmax_depth = 1\n\n"
+            "[agents.custom] # user role\ndescription = '''\n[agents]\nmax_depth = 9\n'''\n"
+            "max_depth = 2\n",
+        )
+
+    def test_install_fingerprint_detects_input_and_output_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            source = root / "source"
+            (source / "agents").mkdir(parents=True)
+            (source / "agents" / "executor.md").write_text("executor\n", encoding="utf-8")
+            target = root / ".codex"
+            (target / "agents").mkdir(parents=True)
+            (target / "agents-pipeline").mkdir()
+            (target / "agents-pipeline" / "VERSION").write_text("1\n", encoding="utf-8")
+            (target / "agents" / "executor.toml").write_text("role\n", encoding="utf-8")
+            config_path = target / "config.toml"
+            config_path.write_text("[features]\nmulti_agent = true\n", encoding="utf-8")
+            agents_file = target / "AGENTS.md"
+            agents_file.write_text("notes\n", encoding="utf-8")
+            manifest_path = target / INSTALL_MODULE.MANIFEST_FILENAME
+
+            settings = {"strict": True, "job_max_runtime_seconds": None}
+            digest = INSTALL_MODULE.install_input_digest(settings, [source])
+            self.assertEqual(
+                INSTALL_MODULE.install_staleness(manifest_path, digest),
+                "no installer manifest",
+            )
+            INSTALL_MODULE.write_manifest(
+                manifest_path,
+                agent_names=["executor"],
+                agent_files=["agents/executor.toml"],
+                profile=None,
+                model_set=None,
+                uniform_model=None,
+                source_agents_dir=source / "agents",
+                target_dir=target,
+                input_digest=digest,
+                agents_file=agents_file,
+            )
+            self.assertEqual(
+                INSTALL_MODULE.install_staleness(manifest_path, digest),
+                "the previous install did not finish",
+            )
+            INSTALL_MODULE.record_install_outputs(manifest_path)
+            self.assertIsNone(INSTALL_MODULE.install_staleness(manifest_path, digest))
+
+            original = config_path.read_text(encoding="utf-8")
+            config_path.write_text(original + "# local edit\n", encoding="utf-8")
+            self.assertEqual(
+                INSTALL_MODULE.install_staleness(manifest_path, digest),
+                "managed outputs changed since the last install",
+            )
+            config_path.write_text(original, encoding="utf-8")
+            self.assertIsNone(INSTALL_MODULE.install_staleness(manifest_path, digest))
+            (target / "agents-pipeline" / "VERSION").unlink()
+            self.assertIsNotNone(INSTALL_MODULE.install_staleness(manifest_path, digest))
+
+            self.assertNotEqual(
+                INSTALL_MODULE.install_input_digest(
+                    {**settings, "job_max_runtime_seconds": 60}, [source]
+                ),
+                digest,
+            )
+            (source / "agents" / "executor.md").write_text("executor v2\n", encoding="utf-8")
+            changed = INSTALL_MODULE.install_input_digest(settings, [source])
+            self.assertEqual(
+                INSTALL_MODULE.install_staleness(manifest_path, changed),
+                "installer inputs or options changed",
+            )
+
     def test_resolve_temp_root_defaults_to_repo_tmp(self) -> None:
         repo_root = Path("C:/tmp/repo")
         self.assertEqual(
@@ -2119,6 +2289,131 @@ class CodexInstallExportTest(unittest.TestCase):
         )
         self.assertIn("Do not infer a mode alias from later mentions", adapter)
 
+    def test_fleet_target_list_and_staged_export_substitution(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            targets_file = root / "targets.txt"
+            targets_file.write_text(
+                "# fleet\n"
+                f"{root}/one/.codex\n"
+                "\n"
+                f"{root}/ws/.codex\t{root}/ws\n",
+                encoding="utf-8",
+            )
+            self.assertEqual(
+                INSTALL_MODULE.read_target_list(targets_file.as_posix()),
+                [(root / "one" / ".codex", None), (root / "ws" / ".codex", root / "ws")],
+            )
+            targets_file.write_text(f"{root}/one\n{root}/one\n", encoding="utf-8")
+            with self.assertRaisesRegex(ValueError, "duplicate target"):
+                INSTALL_MODULE.read_target_list(targets_file.as_posix())
+            targets_file.write_text("# nothing\n", encoding="utf-8")
+            with self.assertRaisesRegex(ValueError, "Target list is empty"):
+                INSTALL_MODULE.read_target_list(targets_file.as_posix())
+            targets_file.write_text(f"{root}/$HOME\n", encoding="utf-8")
+            with self.assertRaises(ValueError):
+                INSTALL_MODULE.read_target_list(targets_file.as_posix())
+
+            staged = root / "staged"
+            (staged / "agents").mkdir(parents=True)
+            placeholder = INSTALL_MODULE.FLEET_SUPPORT_ROOT_PLACEHOLDER
+            (staged / "config.toml").write_text(
+                f'[agents.a]\nconfig_file = "{placeholder}/x"\n', encoding="utf-8"
+            )
+            (staged / "agents" / "a.toml").write_text(
+                f'developer_instructions = "Read {placeholder}/protocols/P.md"\n',
+                encoding="utf-8",
+            )
+            support = root / "O'Brien ü" / ".codex" / "agents-pipeline"
+            config_text, role_files = INSTALL_MODULE.load_staged_export(staged, support)
+            self.assertNotIn(placeholder, config_text)
+            self.assertIn(f"{support.as_posix()}/x", config_text)
+            self.assertEqual(
+                role_files,
+                {
+                    "agents/a.toml": (
+                        f'developer_instructions = "Read {support.as_posix()}/protocols/P.md"\n'
+                    )
+                },
+            )
+
+    def test_fleet_install_reports_each_target_and_fails_when_one_fails(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            good = root / "good" / ".codex"
+            bad = root / "bad" / ".codex"
+            role = bad / "agents" / "executor.toml"
+            role.parent.mkdir(parents=True)
+            role.write_text('name = "user-owned"\n', encoding="utf-8")
+            targets_file = root / "targets.txt"
+            targets_file.write_text(f"{good}\n{bad}\n", encoding="utf-8")
+            report_path = root / "report.json"
+            command = [
+                sys.executable,
+                INSTALL_SCRIPT_PATH.as_posix(),
+                "--targets-from",
+                targets_file.as_posix(),
+                "--report",
+                report_path.as_posix(),
+                "--jobs",
+                "2",
+                "--strict",
+                "--temp-dir",
+                (root / "tmp").as_posix(),
+            ]
+
+            for expected_good_status in ("installed", "up-to-date"):
+                with self.subTest(run=expected_good_status):
+                    result = subprocess.run(
+                        command,
+                        cwd=REPO_ROOT,
+                        env={**os.environ, "HOME": str(root / "home")},
+                        text=True,
+                        capture_output=True,
+                        check=False,
+                    )
+
+                    self.assertEqual(result.returncode, 2, result.stdout + result.stderr)
+                    self.assertEqual(result.stdout, "")
+                    self.assertIn(f"Codex install failed for {bad.as_posix()}", result.stderr)
+                    report = json.loads(report_path.read_text(encoding="utf-8"))
+                    self.assertEqual(report["counts"], {expected_good_status: 1, "failed": 1})
+                    by_target = {item["target_dir"]: item for item in report["targets"]}
+                    self.assertEqual(
+                        by_target[good.as_posix()]["status"], expected_good_status
+                    )
+                    self.assertEqual(by_target[good.as_posix()]["exit_code"], 0)
+                    self.assertEqual(by_target[bad.as_posix()]["status"], "failed")
+                    self.assertEqual(by_target[bad.as_posix()]["exit_code"], 2)
+                    self.assertIn(
+                        "without the generated ownership marker",
+                        by_target[bad.as_posix()]["error"],
+                    )
+
+            self.assertTrue((good / "config.toml").is_file())
+            self.assertTrue((good / INSTALL_MODULE.MANIFEST_FILENAME).is_file())
+            self.assertEqual(role.read_text(encoding="utf-8"), 'name = "user-owned"\n')
+            self.assertFalse((bad / "config.toml").exists())
+
+    def test_install_rollback_restores_and_removes_tracked_files(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            existing = root / "config.toml"
+            existing.write_bytes(b"model = \"a\"\n")
+            created = root / "agents" / "new.toml"
+            rollback = INSTALL_MODULE.InstallRollback()
+            rollback.track(existing)
+            rollback.track(created)
+            existing.write_text("model = \"b\"\n", encoding="utf-8")
+            rollback.track(existing)
+            created.parent.mkdir()
+            created.write_text("name = \"new\"\n", encoding="utf-8")
+
+            rollback.restore()
+
+            self.assertEqual(existing.read_bytes(), b"model = \"a\"\n")
+            self.assertFalse(created.exists())
+
     def test_input_adapter_covers_allowlisted_mode_aliases(self) -> None:
         mode_agents = EXPORT_MODULE.load_mode_agents(MODES_PATH)
         agent_aliases = EXPORT_MODULE.build_agent_mode_aliases(mode_agents)
@@ -298,6 +298,13 @@ os.execv({sys.executable!r}, [{sys.executable!r}, *sys.argv[1:]])
             root = Path(raw_temp)
             home = root / "home"
             self.run_installer(home, "--no-backup")
+            # A local config edit invalidates the install fingerprint so the
+            # rerun below performs a real install instead of the no-op path.
+            config_path = home / ".codex" / "config.toml"
+            config_path.write_text(
+                "# local edit\n" + config_path.read_text(encoding="utf-8"),
+                encoding="utf-8",
+            )
             fake_bin = root / "bin"
             fake_bin.mkdir()
             python_wrapper = fake_bin / "python3"
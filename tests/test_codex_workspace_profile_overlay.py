@@ -7,6 +7,8 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import threading
+import time
 import tomllib
 import unittest
 from pathlib import Path
@@ -254,7 +256,12 @@ class CodexWorkspaceProfileOverlayTests(unittest.TestCase):
         self.assertTrue(manifest.is_file())
         self.assertEqual(
             {path.name for path in local_codex.iterdir()},
-            {"agents", "config.toml", PROJECT_PROFILE_MANIFEST},
+            {
+                "agents",
+                "config.toml",
+                PROJECT_PROFILE_MANIFEST,
+                PROJECT_PROFILE.PROJECT_LOCK_FILENAME,
+            },
         )
         for forbidden in ("agents-pipeline", "skills", "scripts", "protocols"):
             self.assertFalse((local_codex / forbidden).exists())
@@ -915,6 +922,122 @@ class CodexWorkspaceProfileOverlayTests(unittest.TestCase):
             self.assertTrue(all(path.is_relative_to(frugal) for path in frugal_paths.values()))
             self.assertTrue(all(path.is_relative_to(premium) for path in premium_paths.values()))
 
+    def test_prewarm_builds_missing_profile_caches_in_parallel(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            home = Path(temp_name) / "home"
+            env = self.isolated_environment(home)
+            codex_home, _wrapper = self.install_global_codex(home, env)
+            support_root = codex_home / "agents-pipeline"
+            model_set_cache = self.balanced_cache(codex_home).parent.parent
+            for profile in ("frugal", "premium"):
+                shutil.rmtree(model_set_cache / profile, ignore_errors=True)
+            command = [
+                sys.executable,
+                (support_root / "scripts" / "codex-project-profile.py").as_posix(),
+                "prewarm",
+                "--global-target",
+                codex_home.as_posix(),
+                "--asset-root",
+                support_root.as_posix(),
+                "--jobs",
+                "2",
+                "--json",
+            ]
+
+            first = json.loads(self.run_command(command, env=env).stdout)
+            self.assertEqual(first["failed"], [])
+            self.assertEqual(
+                [(item["profile"], item["model_set"]) for item in first["current"]],
+                [("balanced", "openai")],
+            )
+            self.assertEqual(
+                [(item["profile"], item["model_set"]) for item in first["built"]],
+                [("frugal", "openai"), ("premium", "openai")],
+            )
+            for item in first["built"]:
+                self.assertTrue((Path(item["cache_dir"]) / "agents").is_dir())
+            self.assertEqual(
+                sorted(path.name for path in model_set_cache.iterdir() if path.is_dir()),
+                ["balanced", "frugal", "premium"],
+            )
+
+            second = json.loads(self.run_command(command, env=env).stdout)
+            self.assertEqual(second["built"], [])
+            self.assertEqual(len(second["current"]), 3)
+
+    def test_set_workspaces_from_applies_one_render_to_many_workspaces(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            root = Path(temp_name)
+            home = root / "home"
+            env = self.isolated_environment(home)
+            codex_home, _wrapper = self.install_global_codex(home, env)
+            support_root = codex_home / "agents-pipeline"
+            first = (root / "first").resolve()
+            second = (root / "second").resolve()
+            blocked = (root / "blocked").resolve()
+            unowned_role = blocked / ".codex" / "agents" / "reviewer.toml"
+            unowned_role.parent.mkdir(parents=True)
+            unowned_role.write_text('name = "mine"\n', encoding="utf-8")
+            listing = f"# checkouts\n{first}\n\n{blocked}\n{second}\n{first}\n"
+
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    (support_root / "scripts" / "codex-project-profile.py").as_posix(),
+                    "set",
+                    "--workspaces-from",
+                    "-",
+                    "--global-target",
+                    codex_home.as_posix(),
+                    "--asset-root",
+                    support_root.as_posix(),
+                    "--profile",
+                    "frugal",
+                    "--model-set",
+                    "openai",
+                    "--jobs",
+                    "2",
+                    "--json",
+                ],
+                input=listing,
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+            self.assertEqual(completed.returncode, 2, completed.stderr)
+            result = json.loads(completed.stdout)
+            self.assertEqual(
+                [item["workspace"] for item in result["applied"]],
+                [str(first), str(second)],
+            )
+            self.assertEqual([item["workspace"] for item in result["failed"]], [str(blocked)])
+            self.assertIn("unowned", result["failed"][0]["error"])
+            self.assertEqual(result["profile"], "frugal")
+            for workspace in (first, second):
+                manifest = json.loads(
+                    (workspace / ".codex" / PROJECT_PROFILE_MANIFEST).read_text(encoding="utf-8")
+                )
+                self.assertEqual(manifest["profile"], "frugal")
+                self.assertEqual(manifest["workspace"], str(workspace))
+            first_roles = {
+                path.name: path.read_bytes()
+                for path in (first / ".codex" / "agents").glob("*.toml")
+            }
+            self.assertTrue(first_roles)
+            self.assertEqual(
+                {
+                    path.name: path.read_bytes()
+                    for path in (second / ".codex" / "agents").glob("*.toml")
+                },
+                first_roles,
+            )
+            self.assertEqual(unowned_role.read_text(encoding="utf-8"), 'name = "mine"\n')
+            self.assertFalse((blocked / ".codex" / "config.toml").exists())
+            self.assertEqual(
+                PROJECT_PROFILE._load_workspace_registry(codex_home),
+                sorted([str(first), str(second)]),
+            )
+
     def test_resolve_recovery_returns_bounded_model_without_mutating_workspace_roles(self) -> None:
         with tempfile.TemporaryDirectory() as temp_name:
             root = Path(temp_name)
@@ -1266,5 +1389,387 @@ class CodexWorkspaceProfileOverlayTests(unittest.TestCase):
             self.assertEqual(role_path.read_text(encoding="utf-8"), role_content)
 
 
+class CodexProjectProfileExportTests(unittest.TestCase):
+    def export_roles(self, **selection: str | None) -> dict[str, str]:
+        return PROJECT_PROFILE._export_codex_roles(
+            REPO_ROOT / "scripts" / "export-codex-agents.py",
+            asset_root=REPO_ROOT,
+            global_target=Path("/opt/codex-home"),
+            failure_label="Codex profile cache export failed",
+            **selection,
+        )
+
+    def test_in_process_roles_match_the_exporter_subprocess(self) -> None:
+        selection = {"profile": "balanced", "model_set": "openai", "uniform_model": None}
+        in_process = self.export_roles(**selection)
+        with mock.patch.object(PROJECT_PROFILE, "_load_sibling_exporter", return_value=None):
+            subprocess_roles = self.export_roles(**selection)
+
+        self.assertTrue(in_process)
+        self.assertEqual(in_process, subprocess_roles)
+        for name, content in in_process.items():
+            with self.subTest(role=name):
+                self.assertEqual(tomllib.loads(content)["name"], name)
+
+    def test_in_process_export_errors_keep_the_cli_message(self) -> None:
+        with self.assertRaisesRegex(
+            PROJECT_PROFILE.ProjectProfileError,
+            "^Codex profile cache export failed: .*missing-model-set",
+        ):
+            self.export_roles(
+                profile="balanced", model_set="missing-model-set", uniform_model=None
+            )
+
+
+class CodexProjectProfileDigestIndexTests(unittest.TestCase):
+    def make_asset_root(self, root: Path) -> Path:
+        asset_root = root / ".codex" / "agents-pipeline"
+        for relative in (
+            "VERSION",
+            "modes.json",
+            "scripts/export-codex-agents.py",
+            "scripts/agent_export_engine.py",
+            "scripts/agent_model_profiles.py",
+            "scripts/codex_mode_aliases.py",
+        ):
+            (asset_root / relative).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(REPO_ROOT / relative, asset_root / relative)
+        shutil.copytree(REPO_ROOT / "agents", asset_root / "agents")
+        (asset_root / "AGENTS.md").write_text("| Agent |\n", encoding="utf-8")
+        settled = 1_600_000_000
+        for path in asset_root.rglob("*"):
+            if path.is_file():
+                os.utime(path, (settled, settled))
+        return asset_root
+
+    def test_index_reuses_digest_until_an_input_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            asset_root = self.make_asset_root(Path(temp_name))
+            global_target = asset_root.parent
+            digest = PROJECT_PROFILE._asset_digest(
+                asset_root, profile=None, model_set=None, uniform_model="gpt-test"
+            )
+
+            index = PROJECT_PROFILE.DigestIndex.load(global_target)
+            self.assertEqual(
+                PROJECT_PROFILE._asset_digest(
+                    asset_root,
+                    profile=None,
+                    model_set=None,
+                    uniform_model="gpt-test",
+                    digest_index=index,
+                ),
+                digest,
+            )
+            index.save()
+            index_path = (
+                global_target
+                / "agents-pipeline-profiles"
+                / PROJECT_PROFILE.DIGEST_INDEX_FILENAME
+            )
+            self.assertFalse(index_path.parent.exists())
+            index_path.parent.mkdir()
+            index = PROJECT_PROFILE.DigestIndex.load(global_target)
+            PROJECT_PROFILE._asset_digest(
+                asset_root,
+                profile=None,
+                model_set=None,
+                uniform_model="gpt-test",
+                digest_index=index,
+            )
+            index.save()
+            self.assertTrue(index_path.is_file())
+
+            reloaded = PROJECT_PROFILE.DigestIndex.load(global_target)
+            with mock.patch.object(
+                Path, "read_bytes", side_effect=AssertionError("asset re-read")
+            ):
+                self.assertEqual(
+                    PROJECT_PROFILE._asset_digest(
+                        asset_root,
+                        profile=None,
+                        model_set=None,
+                        uniform_model="gpt-test",
+                        digest_index=reloaded,
+                    ),
+                    digest,
+                )
+
+            edited = asset_root / "agents" / "reviewer.md"
+            edited.write_text(
+                edited.read_text(encoding="utf-8") + "\nEdited.\n", encoding="utf-8"
+            )
+            os.utime(edited, (1_600_000_000, 1_600_000_000))
+            changed = PROJECT_PROFILE._asset_digest(
+                asset_root,
+                profile=None,
+                model_set=None,
+                uniform_model="gpt-test",
+                digest_index=reloaded,
+            )
+            self.assertNotEqual(changed, digest)
+            self.assertEqual(
+                changed,
+                PROJECT_PROFILE._asset_digest(
+                    asset_root, profile=None, model_set=None, uniform_model="gpt-test"
+                ),
+            )
+
+    def test_verify_rehashes_and_recent_files_are_not_recorded(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            root = Path(temp_name)
+            settled = root / "settled.toml"
+            settled.write_text("name = 'a'\n", encoding="utf-8")
+            os.utime(settled, (1_600_000_000, 1_600_000_000))
+            fresh = root / "fresh.toml"
+            fresh.write_text("name = 'b'\n", encoding="utf-8")
+
+            index = PROJECT_PROFILE.DigestIndex(None)
+            expected = PROJECT_PROFILE._sha256_file(settled)
+            self.assertEqual(index.sha256_file(settled), expected)
+            self.assertEqual(index.sha256_file(fresh), PROJECT_PROFILE._sha256_file(fresh))
+            with mock.patch.object(
+                PROJECT_PROFILE, "_sha256_file", side_effect=AssertionError("re-hashed")
+            ):
+                self.assertEqual(index.sha256_file(settled), expected)
+                with self.assertRaisesRegex(AssertionError, "re-hashed"):
+                    index.sha256_file(fresh)
+                index.verify = True
+                with self.assertRaisesRegex(AssertionError, "re-hashed"):
+                    index.sha256_file(settled)
+
+
+class CodexProfileCacheGarbageCollectionTests(unittest.TestCase):
+    def make_cache(self, global_target: Path, relative: str, mtime: int) -> Path:
+        cache_dir = global_target / "agents-pipeline-profiles" / relative
+        (cache_dir / "agents").mkdir(parents=True)
+        (cache_dir / "agents" / "reviewer.toml").write_text("x" * 100, encoding="utf-8")
+        marker = cache_dir / PROJECT_PROFILE.CACHE_MANIFEST_FILENAME
+        marker.write_text(
+            json.dumps({"tool": PROJECT_PROFILE.CACHE_MANIFEST_TOOL, "version": 2}),
+            encoding="utf-8",
+        )
+        os.utime(marker, (mtime, mtime))
+        return cache_dir
+
+    def register_legacy_workspace(
+        self, global_target: Path, workspace: Path, source_version: str
+    ) -> None:
+        project_dir = workspace / ".codex"
+        project_dir.mkdir(parents=True)
+        (project_dir / PROJECT_PROFILE_MANIFEST).write_text(
+            json.dumps(
+                {
+                    "global_target": str(global_target),
+                    "mode": "profile",
+                    "model_set": "openai",
+                    "profile": "balanced",
+                    "runtime": "codex",
+                    "source_version": source_version,
+                    "tool": PROJECT_PROFILE.PROJECT_MANIFEST_TOOL,
+                    "uniform_model": None,
+                    "version": 1,
+                    "workspace": str(workspace),
+                }
+            ),
+            encoding="utf-8",
+        )
+        PROJECT_PROFILE._update_workspace_registry(
+            global_target, workspace, registered=True
+        )
+
+    def test_gc_evicts_least_recently_used_caches_and_old_leftovers(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            root = Path(temp_name).resolve()
+            global_target = root / ".codex"
+            referenced = self.make_cache(global_target, "v0.1.0/codex/openai/balanced", 1000)
+            oldest = self.make_cache(global_target, "v0.2.0/codex/openai/balanced", 2000)
+            newest = self.make_cache(global_target, "v0.3.0/codex/uniform/abc", 3000)
+            unowned = global_target / "agents-pipeline-profiles/v0.3.0/codex/openai/mine"
+            unowned.mkdir(parents=True)
+            group = newest.parent
+            stale_staging = group / ".abc.staging-old"
+            stale_staging.mkdir()
+            os.utime(stale_staging, (1000, 1000))
+            live_staging = group / ".abc.staging-live"
+            live_staging.mkdir()
+            self.register_legacy_workspace(global_target, root / "project", "0.1.0")
+            PROJECT_PROFILE._update_workspace_registry(
+                global_target, root / "gone", registered=True
+            )
+
+            preview = PROJECT_PROFILE.collect_cache_garbage(
+                global_target=global_target, max_caches=2, dry_run=True
+            )
+            self.assertEqual(preview["evicted"], [str(oldest)])
+            self.assertEqual(preview["protected"], [str(referenced)])
+            self.assertEqual(preview["removed_leftovers"], [str(stale_staging)])
+            self.assertTrue(oldest.is_dir())
+
+            result = PROJECT_PROFILE.collect_cache_garbage(
+                global_target=global_target, max_caches=2, dry_run=False
+            )
+            self.assertEqual(result["evicted"], [str(oldest)])
+            self.assertEqual(result["unowned"], [str(unowned)])
+            self.assertFalse(oldest.exists())
+            self.assertFalse(oldest.parent.parent.parent.exists())
+            self.assertFalse(stale_staging.exists())
+            for kept in (referenced, newest, unowned, live_staging):
+                self.assertTrue(kept.is_dir(), kept)
+            self.assertEqual(
+                PROJECT_PROFILE._load_workspace_registry(global_target),
+                [str(root / "project")],
+            )
+
+            by_bytes = PROJECT_PROFILE.collect_cache_garbage(
+                global_target=global_target, max_caches=None, max_bytes=0, dry_run=False
+            )
+            self.assertEqual(by_bytes["evicted"], [str(newest)])
+            self.assertTrue(referenced.is_dir())
+
+    def test_gc_skips_eviction_when_a_registered_workspace_is_unreadable(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            root = Path(temp_name).resolve()
+            global_target = root / ".codex"
+            cache = self.make_cache(global_target, "v0.1.0/codex/openai/balanced", 1000)
+            broken = root / "broken"
+            (broken / ".codex").mkdir(parents=True)
+            (broken / ".codex" / PROJECT_PROFILE_MANIFEST).write_text("{", encoding="utf-8")
+            PROJECT_PROFILE._update_workspace_registry(global_target, broken, registered=True)
+
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    str(REPO_ROOT / "scripts" / "codex-project-profile.py"),
+                    "gc",
+                    "--global-target",
+                    str(global_target),
+                    "--asset-root",
+                    str(global_target / "agents-pipeline"),
+                    "--max-caches",
+                    "0",
+                    "--json",
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            result = json.loads(completed.stdout)
+            self.assertEqual(result["evicted"], [])
+            self.assertEqual(result["unreadable_workspaces"], [str(broken)])
+            self.assertTrue(cache.is_dir())
+
+
+@unittest.skipIf(PROJECT_PROFILE.fcntl is None, "advisory locks require fcntl")
+class CodexProjectProfileLockTests(unittest.TestCase):
+    def test_writers_wait_boundedly_and_readers_share_the_project_lock(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            workspace = Path(temp_name).resolve() / "project"
+            lock_path = workspace / ".codex" / PROJECT_PROFILE.PROJECT_LOCK_FILENAME
+
+            with PROJECT_PROFILE._advisory_lock(lock_path, shared=False, persistent=True):
+                self.assertTrue(lock_path.is_file())
+                with mock.patch.dict(
+                    os.environ, {PROJECT_PROFILE.LOCK_TIMEOUT_ENV: "0.2"}
+                ), self.assertRaisesRegex(PROJECT_PROFILE.ProjectProfileError, "Timed out"):
+                    PROJECT_PROFILE.clear_profile(workspace=workspace, dry_run=False)
+            self.assertTrue(lock_path.is_file())
+            self.assertEqual(
+                PROJECT_PROFILE.clear_profile(workspace=workspace, dry_run=False)["changed"],
+                False,
+            )
+
+            # A reader creates a missing persistent lock file and holds it.
+            lock_path.unlink()
+            with PROJECT_PROFILE._advisory_lock(lock_path, shared=True, persistent=True):
+                self.assertTrue(lock_path.is_file())
+                with self.assertRaisesRegex(PROJECT_PROFILE.ProjectProfileError, "exclusive"):
+                    with PROJECT_PROFILE._advisory_lock(
+                        lock_path, shared=False, timeout=0, persistent=True
+                    ):
+                        pass
+
+            # A lock file removed while held is reopened, never skipped.
+            with PROJECT_PROFILE._advisory_lock(lock_path, shared=False, persistent=True):
+                lock_path.unlink()
+                with PROJECT_PROFILE._advisory_lock(
+                    lock_path, shared=True, timeout=0, persistent=True
+                ):
+                    self.assertTrue(lock_path.is_file())
+                    with self.assertRaisesRegex(PROJECT_PROFILE.ProjectProfileError, "exclusive"):
+                        with PROJECT_PROFILE._advisory_lock(
+                            lock_path, shared=False, timeout=0, persistent=True
+                        ):
+                            pass
+
+            with PROJECT_PROFILE._advisory_lock(lock_path, shared=True):
+                with PROJECT_PROFILE._advisory_lock(lock_path, shared=True, timeout=0):
+                    pass
+                with self.assertRaisesRegex(PROJECT_PROFILE.ProjectProfileError, "exclusive"):
+                    with PROJECT_PROFILE._advisory_lock(lock_path, shared=False, timeout=0):
+                        pass
+
+    def test_gc_keeps_a_cache_whose_lock_is_held(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            global_target = Path(temp_name).resolve() / ".codex"
+            helper = CodexProfileCacheGarbageCollectionTests()
+            busy = helper.make_cache(global_target, "v0.1.0/codex/openai/balanced", 1000)
+            idle = helper.make_cache(global_target, "v0.1.0/codex/openai/frugal", 2000)
+            busy_lock = PROJECT_PROFILE._cache_lock_path(busy)
+            idle_lock = PROJECT_PROFILE._cache_lock_path(idle)
+            busy_lock.touch()
+            idle_lock.touch()
+
+            with PROJECT_PROFILE._advisory_lock(busy_lock, shared=True):
+                result = PROJECT_PROFILE.collect_cache_garbage(
+                    global_target=global_target, max_caches=0, dry_run=False
+                )
+            self.assertEqual(result["evicted"], [str(idle)])
+            self.assertEqual(result["kept"], [str(busy)])
+            self.assertTrue(busy.is_dir())
+            self.assertFalse(idle.exists())
+            self.assertFalse(idle_lock.exists())
+
+    def test_workspace_registry_updates_and_gc_share_one_lock(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            root = Path(temp_name).resolve()
+            global_target = root / ".codex"
+            PROJECT_PROFILE._cache_root(global_target).mkdir(parents=True)
+            workspaces = [root / f"project-{index}" for index in range(8)]
+            load = PROJECT_PROFILE._load_workspace_registry
+
+            def slow_load(target: Path) -> list[str]:
+                current = load(target)
+                time.sleep(0.02)  # Widen the read-modify-write window.
+                return current
+
+            with mock.patch.object(
+                PROJECT_PROFILE, "_load_workspace_registry", side_effect=slow_load
+            ):
+                threads = [
+                    threading.Thread(
+                        target=PROJECT_PROFILE._update_workspace_registry,
+                        args=(global_target, workspace),
+                        kwargs={"registered": True},
+                    )
+                    for workspace in workspaces
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            self.assertEqual(
+                PROJECT_PROFILE._load_workspace_registry(global_target),
+                sorted(str(workspace) for workspace in workspaces),
+            )
+
+            with PROJECT_PROFILE._workspace_registry_lock(global_target, shared=False):
+                with mock.patch.dict(os.environ, {PROJECT_PROFILE.LOCK_TIMEOUT_ENV: "0"}):
+                    with self.assertRaisesRegex(PROJECT_PROFILE.ProjectProfileError, "shared"):
+                        PROJECT_PROFILE.collect_cache_garbage(
+                            global_target=global_target, max_caches=0, dry_run=True
+                        )
+
+
 if __name__ == "__main__":
     unittest.main()
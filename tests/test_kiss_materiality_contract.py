@@ -69,11 +69,8 @@ class KissMaterialityContractTest(unittest.TestCase):
                 )
 
     def test_exporters_preserve_materiality_admission_when_compacting(self) -> None:
-        for relative_path in (
-            "scripts/export-codex-agents.py",
-            "scripts/export-claude-agents.py",
-            "scripts/export-copilot-agents.py",
-        ):
+        # The Codex, Claude, and Copilot exporters share this compaction engine.
+        for relative_path in ("scripts/agent_export_engine.py",):
             text = read(relative_path)
             with self.subTest(relative_path=relative_path):
                 self.assertIn("adequate targeted evidence is sufficient", text)
@@ -0,0 +1,131 @@
+import importlib.util
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPT_PATH = REPO_ROOT / "scripts" / "object_pool.py"
+
+
+def load_module():
+    scripts_dir = SCRIPT_PATH.parent.as_posix()
+    if scripts_dir not in sys.path:
+        sys.path.insert(0, scripts_dir)
+    spec = importlib.util.spec_from_file_location("object_pool_under_test", SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+MODULE = load_module()
+
+
+class ObjectPoolTest(unittest.TestCase):
+    def test_strategy_and_pool_selection_is_validated(self) -> None:
+        self.assertIsNone(MODULE.open_object_pool(None, None))
+        self.assertIsNone(MODULE.open_object_pool(None, "copy"))
+        with self.assertRaisesRegex(MODULE.ObjectPoolError, "requires --copy-strategy"):
+            MODULE.open_object_pool("/tmp/pool", "copy")
+        with self.assertRaisesRegex(MODULE.ObjectPoolError, "requires --object-pool"):
+            MODULE.open_object_pool(None, "hardlink")
+        with self.assertRaisesRegex(MODULE.ObjectPoolError, "Unknown copy strategy"):
+            MODULE.open_object_pool("/tmp/pool", "symlink")
+        with mock.patch.object(MODULE.sys, "platform", "win32"):
+            with self.assertRaisesRegex(MODULE.ObjectPoolError, "not supported on Windows"):
+                MODULE.open_object_pool("/tmp/pool", "hardlink")
+
+    def test_pool_is_claimed_once_and_refuses_foreign_or_linked_roots(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            root = Path(temp_name)
+            missing = root / "dry-run-pool"
+            MODULE.open_object_pool(missing, "reflink", create=False)
+            self.assertFalse(missing.exists())
+
+            pool = MODULE.open_object_pool(root / "pool", "hardlink")
+            self.assertTrue((root / "pool" / MODULE.POOL_MARKER_FILE).is_file())
+            self.assertEqual(
+                MODULE.open_object_pool(root / "pool", "reflink").root, pool.root
+            )
+
+            foreign = root / "foreign"
+            foreign.mkdir()
+            (foreign / "notes.txt").write_text("mine\n", encoding="utf-8")
+            with self.assertRaisesRegex(MODULE.ObjectPoolError, "must be empty"):
+                MODULE.open_object_pool(foreign, "hardlink")
+
+            linked = root / "linked"
+            linked.symlink_to(root / "pool", target_is_directory=True)
+            with self.assertRaisesRegex(MODULE.ObjectPoolError, "symbolic link"):
+                MODULE.open_object_pool(linked, "hardlink")
+
+            if os.name == "posix":
+                shared = root / "shared"
+                shared.mkdir()
+                shared.chmod(0o777)
+                with self.assertRaisesRegex(MODULE.ObjectPoolError, "world-writable"):
+                    MODULE.open_object_pool(shared, "hardlink")
+
+    def test_hardlink_installs_share_one_read_only_object(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            root = Path(temp_name)
+            source = root / "tool.sh"
+            source.write_text("#!/bin/sh\necho ok\n", encoding="utf-8")
+            source.chmod(0o755)
+            pool = MODULE.open_object_pool(root / "pool", "hardlink")
+
+            first = root / "one" / "tool.sh"
+            second = root / "two" / "tool.sh"
+            for destination in (first, second):
+                destination.parent.mkdir()
+                self.assertEqual(pool.install_file(source, destination), "hardlink")
+
+            self.assertTrue(first.samefile(second))
+            self.assertEqual(stat.S_IMODE(first.stat().st_mode), 0o555)
+            self.assertEqual(pool.installed_mode(0o755), 0o555)
+            self.assertEqual(first.read_bytes(), source.read_bytes())
+            objects = [path for path in pool.objects.rglob("*") if path.is_file()]
+            self.assertEqual(len(objects), 1)
+            self.assertTrue(objects[0].name.endswith(".555"))
+
+            data_target = root / "one" / "role.toml"
+            pool.install_bytes(b'name = "role"\n', data_target)
+            self.assertEqual(stat.S_IMODE(data_target.stat().st_mode), 0o444)
+
+    def test_altered_object_is_replaced_and_fallback_copies_keep_strategy_mode(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_name:
+            root = Path(temp_name)
+            source = root / "data.json"
+            source.write_text('{"ok": true}\n', encoding="utf-8")
+            source.chmod(0o644)
+            pool = MODULE.open_object_pool(root / "pool", "hardlink")
+            stored = pool.store_file(source, 0o644)
+            stored.chmod(0o644)
+            stored.write_text('{"ok": false}\n', encoding="utf-8")
+            stored.chmod(0o444)
+
+            replaced = pool.store_file(source, 0o644)
+            self.assertEqual(replaced, stored)
+            self.assertEqual(replaced.read_bytes(), source.read_bytes())
+
+            destination = root / "copy.json"
+            with mock.patch.object(MODULE.os, "link", side_effect=OSError("EXDEV")):
+                self.assertEqual(pool.install_file(source, destination), "copy")
+            self.assertEqual(destination.read_bytes(), source.read_bytes())
+            self.assertEqual(stat.S_IMODE(destination.stat().st_mode), 0o444)
+
+            reflink_pool = MODULE.ObjectPool(pool.root, "reflink")
+            cloned = root / "clone.json"
+            with mock.patch.object(MODULE, "reflink_file", return_value=False):
+                self.assertEqual(reflink_pool.install_file(source, cloned), "copy")
+            self.assertEqual(stat.S_IMODE(cloned.stat().st_mode), 0o644)
+            self.assertFalse(cloned.samefile(replaced))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import contextlib
+import copy
+import importlib.util
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def load_tool(relative_path: str, module_name: str):
+    spec = importlib.util.spec_from_file_location(module_name, REPO_ROOT / relative_path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+ANALYTICS = load_tool("tools/reasoning-analytics.py", "reasoning_analytics_cli")
+RUN_INDEX = load_tool("tools/run-index.py", "run_index_for_analytics")
+EXAMPLE = json.loads(
+    (REPO_ROOT / "protocols/examples/reasoning-observation.valid.json").read_text(encoding="utf-8")
+)
+
+# run, agent, role, tier, effort, outcome, attempt, wall time, degraded
+OBSERVATIONS = (
+    ("run-a", "exec-1", "executor", "standard", "high", "done", 1, 1000, False),
+    ("run-a", "exec-2", "executor", "standard", "high", "failed", 2, 3000, False),
+    ("run-a", "review-1", "reviewer", "strong", "xhigh", "done", 1, None, False),
+    ("run-b", "exec-1", "executor", "strong", "high", "done", 2, 2000, True),
+    ("run-b", "exec-2", "executor", "standard", "high", "blocked", 1, 500, False),
+    ("run-b", "peon-1", "peon", "mini", None, "done", 1, 100, False),
+)
+
+
+def write_observations(output_root: Path) -> None:
+    for run_id, agent_id, role, tier, effort, outcome, attempt, wall_time, degraded in OBSERVATIONS:
+        data = copy.deepcopy(EXAMPLE)
+        data.update(run_id=run_id, agent_id=agent_id, outcome=outcome, attempt=attempt)
+        if wall_time is None:
+            data.pop("wall_time_ms")
+        else:
+            data["wall_time_ms"] = wall_time
+        data["reasoning"].update(
+            role=role, selected_model_tier=tier, effective_effort=effort, degraded=degraded
+        )
+        path = output_root / run_id / "observations" / "reasoning" / f"{agent_id}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data), encoding="utf-8")
+
+
+class ReasoningAnalyticsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        self.root = Path(temp.name)
+        self.output_root = self.root / ".pipeline-output"
+        write_observations(self.output_root)
+
+    def test_group_stats_count_outcomes_retries_and_wall_time(self) -> None:
+        table = ANALYTICS.load_output_roots([self.output_root])
+        groups = ANALYTICS.group_stats(table, ("role", "model_tier"))
+
+        self.assertEqual(
+            list(groups),
+            [("executor", "standard"), ("executor", "strong"), ("peon", "mini"), ("reviewer", "strong")],
+        )
+        executor = groups[("executor", "standard")]
+        self.assertEqual(executor["count"], 3)
+        self.assertEqual(executor["outcomes"], {"blocked": 1, "done": 1, "failed": 1})
+        self.assertEqual(executor["success_rate"], 0.3333)
+        self.assertEqual(executor["retry_rate"], 0.3333)
+        self.assertEqual(executor["mean_wall_time_ms"], 1500.0)
+        self.assertEqual(groups[("executor", "strong")]["degraded_rate"], 1.0)
+        self.assertIsNone(groups[("reviewer", "strong")]["mean_wall_time_ms"])
+        self.assertEqual(ANALYTICS.group_stats(table, ())[()]["count"], len(OBSERVATIONS))
+
+    def test_merged_worker_tables_match_a_single_scan(self) -> None:
+        single = ANALYTICS.load_output_roots([self.output_root])
+        run_dirs = ANALYTICS.run_directories([self.output_root])
+        merged = ANALYTICS.load_run_directories(run_dirs[1:])
+        merged.extend(ANALYTICS.load_run_directories(run_dirs[:1]))
+
+        for dims in ((), ("role",), ANALYTICS.DEFAULT_GROUP_BY):
+            with self.subTest(dims=dims):
+                self.assertEqual(
+                    ANALYTICS.group_stats(merged, dims), ANALYTICS.group_stats(single, dims)
+                )
+
+    def test_run_index_source_matches_scan_and_reviews_profile_tiers(self) -> None:
+        index_path = self.root / "index.sqlite"
+        connection = RUN_INDEX.connect(index_path)
+        RUN_INDEX.update_index(connection, [self.output_root])
+        connection.close()
+
+        profile = ANALYTICS.load_profile("balanced")
+        scanned = ANALYTICS.summarize(ANALYTICS.load_output_roots([self.output_root]), profile=profile)
+        indexed = ANALYTICS.summarize(ANALYTICS.load_run_index(index_path), profile=profile)
+        scanned.pop("generated_at")
+        indexed.pop("generated_at")
+        self.assertEqual(indexed, scanned)
+
+        review = scanned["profile_review"]
+        self.assertEqual(review["profile"], "balanced")
+        executor = review["roles"]["executor"]
+        self.assertEqual(executor["profile_tier"], "standard")
+        self.assertEqual(executor["at_profile_tier"]["count"], 3)
+        self.assertEqual(set(executor["observed_tiers"]), {"standard", "strong"})
+        self.assertEqual(scanned["by_effort"]["unknown"]["count"], 1)
+
+    def test_cli_writes_summary_and_rejects_unknown_group_column(self) -> None:
+        summary_path = self.root / "summary.json"
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            code = ANALYTICS.main([str(self.output_root), "--output", str(summary_path)])
+        self.assertEqual(code, 0)
+        self.assertIn("6 observation(s) across 2 run(s)", stdout.getvalue())
+        self.assertEqual(json.loads(summary_path.read_text(encoding="utf-8"))["observations"], 6)
+
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            code = ANALYTICS.main([str(self.output_root), "--group-by", "role,prompt"])
+        self.assertEqual(code, 2)
+        self.assertIn("Cannot group by 'prompt'", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+TOOL_PATH = REPO_ROOT / "tools/run-index.py"
+SPEC = importlib.util.spec_from_file_location("run_index_cli", TOOL_PATH)
+assert SPEC and SPEC.loader
+RUN_INDEX = importlib.util.module_from_spec(SPEC)
+sys.modules[SPEC.name] = RUN_INDEX
+SPEC.loader.exec_module(RUN_INDEX)
+
+STATUS_EXAMPLE = REPO_ROOT / "protocols/examples/status-layout.expanded.valid"
+OBSERVATION_EXAMPLE = REPO_ROOT / "protocols/examples/reasoning-observation.valid.json"
+
+
+def run_cli(*argv: str) -> tuple[int, str, str]:
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        code = RUN_INDEX.main(list(argv))
+    return code, stdout.getvalue(), stderr.getvalue()
+
+
+class RunIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        self.root = Path(temp.name)
+        self.output_root = self.root / ".pipeline-output"
+        self.index = self.root / "index.sqlite"
+        for run_id in ("run-a", "run-b"):
+            shutil.copytree(STATUS_EXAMPLE, self.output_root / run_id / "status")
+        observations = self.output_root / "run-a" / "observations" / "reasoning"
+        observations.mkdir(parents=True)
+        shutil.copy2(OBSERVATION_EXAMPLE, observations / "agent-doc-01.json")
+
+    def query(self, *argv: str) -> list:
+        code, stdout, stderr = run_cli("--index", str(self.index), "query", *argv, "--json")
+        self.assertEqual(code, 0, stderr)
+        return json.loads(stdout)
+
+    def test_update_indexes_runs_and_queries_filter_by_status(self) -> None:
+        code, stdout, stderr = run_cli("--index", str(self.index), "update", str(self.output_root))
+        self.assertEqual(code, 0, stderr)
+        self.assertIn("Indexed 2 run(s)", stdout)
+
+        runs = self.query("runs")
+        self.assertEqual(len(runs), 2)
+        self.assertEqual({run["status"] for run in runs}, {"waiting_for_user"})
+        blocked = self.query("tasks", "--status", "blocked", "--orchestrator", "orchestrator-pipeline")
+        self.assertEqual([task["task_id"] for task in blocked], ["task-local-server-smoke"] * 2)
+        self.assertEqual(
+            self.query("tasks", "--count-by", "status"),
+            [
+                {"status": "done", "count": 4},
+                {"status": "blocked", "count": 2},
+                {"status": "stale", "count": 2},
+            ],
+        )
+        self.assertEqual(self.query("tasks", "--since", "7d"), [])
+        self.assertEqual(len(self.query("tasks", "--since", "2026-03-17T15:20:00Z")), 4)
+        self.assertEqual(len(self.query("observations")), 1)
+
+    def test_update_reparses_only_changed_files_and_drops_removed_runs(self) -> None:
+        connection = RUN_INDEX.connect(self.index)
+        self.addCleanup(connection.close)
+        first = RUN_INDEX.update_index(connection, [self.output_root])
+        self.assertEqual(first["unchanged"], 0)
+
+        task_path = self.output_root / "run-a" / "status" / "tasks" / "task-doc-summary.json"
+        task = json.loads(task_path.read_text(encoding="utf-8"))
+        task["status"] = "failed"
+        task_path.write_text(json.dumps(task), encoding="utf-8")
+        os.utime(task_path, ns=(task_path.stat().st_atime_ns, task_path.stat().st_mtime_ns + 10**9))
+        shutil.rmtree(self.output_root / "run-b")
+
+        second = RUN_INDEX.update_index(connection, [self.output_root])
+        self.assertEqual(second["parsed"], 1)
+        self.assertEqual(second["unchanged"], first["parsed"] // 2)
+        self.assertEqual(second["removed"], 1)
+        failed = RUN_INDEX.query_index(connection, "tasks", statuses=["failed"])
+        self.assertEqual([row["task_id"] for row in failed], ["task-doc-summary"])
+        self.assertEqual(
+            [row["run_dir"] for row in RUN_INDEX.query_index(connection, "runs")],
+            [(self.output_root / "run-a").resolve().as_posix()],
+        )
+
+    def test_runs_without_a_run_file_still_list_their_tasks_and_agents(self) -> None:
+        run_dir = self.output_root / "run-c"
+        copied = {}
+        for table, key in (("tasks", "task_id"), ("agents", "agent_id")):
+            source = sorted((STATUS_EXAMPLE / table).glob("*.json"))[0]
+            (run_dir / "status" / table).mkdir(parents=True)
+            shutil.copy2(source, run_dir / "status" / table / source.name)
+            copied[table] = (key, json.loads(source.read_text(encoding="utf-8"))[key])
+
+        code, stdout, stderr = run_cli("--index", str(self.index), "update", str(self.output_root))
+        self.assertEqual(code, 0, stderr)
+        self.assertIn("Indexed 3 run(s)", stdout)
+
+        self.assertEqual(len(self.query("runs")), 2)
+        for table, (key, value) in copied.items():
+            with self.subTest(table=table):
+                runless = [row for row in self.query(table) if row["run_id"] is None]
+                self.assertEqual([row[key] for row in runless], [value])
+                self.assertIsNone(runless[0]["orchestrator"])
+                rooted = self.query(table, "--root", str(self.output_root))
+                self.assertEqual(len(rooted), len(self.query(table)))
+                self.assertEqual(self.query(table, "--root", str(self.root / "elsewhere")), [])
+
+    def test_query_rejects_unknown_count_column_and_bad_since(self) -> None:
+        self.assertEqual(run_cli("--index", str(self.index), "update", str(self.output_root))[0], 0)
+        code, _, stderr = run_cli("--index", str(self.index), "query", "tasks", "--count-by", "nope")
+        self.assertEqual(code, 2)
+        self.assertIn("Cannot count tasks by 'nope'", stderr)
+        code, _, stderr = run_cli("--index", str(self.index), "query", "runs", "--since", "soon")
+        self.assertEqual(code, 2)
+        self.assertIn("Invalid time 'soon'", stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
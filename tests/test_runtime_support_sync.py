@@ -1,6 +1,7 @@
 import importlib.util
 import io
 import json
+import shutil
 import tempfile
 import unittest
 from pathlib import Path
@@ -138,6 +139,182 @@ class RuntimeSupportSyncTest(unittest.TestCase):
             self.assertIn("python3 scripts/local-helper.py", skill)
             self.assertNotIn(f"{target.as_posix()}/scripts/local-helper.py", skill)
 
+    def test_delta_sync_matches_full_sync_and_restages_only_changed_files(self) -> None:
+        def snapshot(tree: Path) -> dict[str, tuple[bytes, int]]:
+            return {
+                path.relative_to(tree).as_posix(): (
+                    path.read_bytes() if path.is_file() else b"",
+                    path.stat().st_mode,
+                )
+                for path in sorted(tree.rglob("*"))
+            }
+
+        with tempfile.TemporaryDirectory() as temp_dir_name:
+            root = Path(temp_dir_name)
+            source = self.make_source(root)
+            (source / "runtimes" / "empty").mkdir()
+            helper = source / "scripts" / "helper.sh"
+            helper.write_text("#!/bin/sh\n", encoding="utf-8")
+            helper.chmod(0o755)
+            target = root / "runtime" / "agents-pipeline"
+            full = root / "full" / "agents-pipeline"
+
+            MODULE.sync_support_tree(source, target, dry_run=False, delta=True)
+            self.assert_valid_installed_target(target)
+            with mock.patch.object(MODULE.os, "replace") as replace, mock.patch.object(
+                MODULE.sys, "stdout", new_callable=io.StringIO
+            ) as stdout:
+                MODULE.sync_support_tree(source, target, dry_run=False, delta=True)
+            replace.assert_not_called()
+            self.assertIn("already current", stdout.getvalue())
+
+            unchanged = target / "tools" / "reasoning-policy.js"
+            unchanged_inode = unchanged.stat().st_ino
+            (source / "protocols" / "PIPELINE_PROTOCOL.md").write_text(
+                "Updated `protocols/schemas/example.json`.\n", encoding="utf-8"
+            )
+            (source / "tools" / "codex-child-trace.js").unlink()
+            with mock.patch.object(MODULE.sys, "stdout", new_callable=io.StringIO) as stdout:
+                MODULE.sync_support_tree(source, target, dry_run=True, delta=True)
+            self.assertIn("would update 1 and remove 1 file(s)", stdout.getvalue())
+            MODULE.sync_support_tree(source, target, dry_run=False, delta=True)
+            MODULE.sync_support_tree(source, full, dry_run=False)
+
+            self.assert_valid_installed_target(target)
+            self.assertEqual(unchanged.stat().st_ino, unchanged_inode)
+            self.assertFalse((target / "tools" / "codex-child-trace.js").exists())
+            self.assertIn(
+                f"Updated `{target.as_posix()}/protocols/schemas/example.json`.",
+                (target / "protocols" / "PIPELINE_PROTOCOL.md").read_text(encoding="utf-8"),
+            )
+            target_tree = snapshot(target)
+            full_tree = snapshot(full)
+            self.assertEqual(target_tree.keys(), full_tree.keys())
+            for relative, (content, mode) in full_tree.items():
+                with self.subTest(path=relative):
+                    if relative.endswith(".md") or relative == MODULE.MARKER_FILE:
+                        content = content.replace(
+                            full.as_posix().encode("utf-8"), target.as_posix().encode("utf-8")
+                        )
+                    self.assertEqual(target_tree[relative], (content, mode))
+
+    def test_hardlink_pool_shares_verbatim_files_across_targets(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir_name:
+            root = Path(temp_dir_name)
+            source = self.make_source(root)
+            pool = MODULE.open_object_pool(root / "pool", "hardlink")
+
+            targets = [root / "one" / "agents-pipeline", root / "two" / "agents-pipeline"]
+            for target in targets:
+                MODULE.sync_support_tree(
+                    source, target, dry_run=False, delta=True, pool=pool
+                )
+            first, second = targets
+            shared = first / "tools" / "reasoning-policy.js"
+            self.assertTrue(shared.samefile(second / "tools" / "reasoning-policy.js"))
+            self.assertFalse(shared.stat().st_mode & 0o222)
+            self.assertFalse((first / "AGENTS.md").samefile(second / "AGENTS.md"))
+            self.assertEqual((first / "AGENTS.md").stat().st_nlink, 1)
+            for target in targets:
+                self.assert_valid_installed_target(target)
+                self.assertIn(
+                    target.as_posix(),
+                    (target / "agents" / "orchestrator-flow.md").read_text(encoding="utf-8"),
+                )
+
+            with mock.patch.object(MODULE.sys, "stdout", new_callable=io.StringIO) as stdout:
+                MODULE.sync_support_tree(
+                    source, first, dry_run=False, delta=True, pool=pool
+                )
+            self.assertIn("already current", stdout.getvalue())
+
+    def test_copy_falls_back_when_copy_file_range_stops_short(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir_name:
+            root = Path(temp_dir_name)
+            source = root / "source.bin"
+            source.write_bytes(b"payload" * 1024)
+            destination = root / "destination.bin"
+
+            with mock.patch.object(
+                MODULE.os, "copy_file_range", return_value=0, create=True
+            ) as copy_file_range:
+                MODULE._copy_file(source, destination)
+
+            copy_file_range.assert_called_once()
+            self.assertEqual(destination.read_bytes(), source.read_bytes())
+
+    def test_sync_generates_the_agent_profile_catalog_for_each_install(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir_name:
+            root = Path(temp_dir_name)
+            source = self.make_source(root)
+            shutil.copytree(
+                REPO_ROOT / "tools" / "agent-profiles", source / "tools" / "agent-profiles"
+            )
+            for runtime in ("codex", "claude", "copilot"):
+                shutil.copytree(
+                    REPO_ROOT / "runtimes" / runtime / "model-sets",
+                    source / "runtimes" / runtime / "model-sets",
+                )
+            first = root / "first" / "agents-pipeline"
+            second = root / "second" / "agents-pipeline"
+
+            MODULE.sync_support_tree(source, first, dry_run=False, delta=True)
+            catalog = first / MODULE.CATALOG_RELATIVE_PATH
+            self.assertEqual(
+                json.loads(catalog.read_text(encoding="utf-8"))["pipeline_version"], "0.28.0"
+            )
+            self.assertTrue(MODULE.catalog_is_current(first))
+            with mock.patch.object(MODULE.sys, "stdout", new_callable=io.StringIO) as stdout:
+                MODULE.sync_support_tree(source, first, dry_run=False, delta=True)
+            self.assertIn("already current", stdout.getvalue())
+
+            catalog.write_text("stale\n", encoding="utf-8")
+            MODULE.sync_support_tree(first, second, dry_run=False)
+            self.assertEqual(
+                (second / MODULE.CATALOG_RELATIVE_PATH).read_bytes(),
+                MODULE.catalog_text(second).encode("utf-8"),
+            )
+            self.assertTrue(MODULE.catalog_is_current(second))
+
+            with mock.patch.object(MODULE.sys, "stdout", new_callable=io.StringIO) as stdout:
+                MODULE.sync_support_tree(source, first, dry_run=True, delta=True)
+            self.assertIn("would update 1 and remove 0 file(s)", stdout.getvalue())
+
+    def test_single_pass_rewriter_matches_sequential_replacements(self) -> None:
+        target = Path("/opt/agents pipeline")
+        previous = Path("/old/agents-pipeline")
+        text = (
+            "Parse `$ARGUMENTS` via `node tools/status-event.js`; read "
+            "`./protocols/PIPELINE_PROTOCOL.md`, `/old/agents-pipeline/skills/a/SKILL.md`, "
+            "`agents/x//old/agents-pipeline/tools/y.js`, and run `scripts/check.py` "
+            "but not `my-tools/z.js` or `https://host/agents/a.md`.\n"
+        )
+
+        def sequential(relative: Path) -> str:
+            root = target.as_posix()
+            result = text.replace(previous.as_posix(), root)
+            result = MODULE.re.sub(
+                MODULE.NODE_TOOL_PATTERN,
+                lambda match: f'node "{root}/tools/{match.group("node_tool")}.js"',
+                result,
+            ).replace("$ARGUMENTS", "raw_input")
+            result = MODULE.SUPPORT_REF_RE.sub(
+                lambda match: f"{root}/{match.group(1).removeprefix('./')}", result
+            )
+            if relative.parts[0] in {"agents", "protocols"}:
+                result = MODULE.ROOT_SCRIPT_REF_RE.sub(
+                    lambda match: f'"{root}/{match.group(1).removeprefix("./")}"',
+                    result,
+                )
+            return result
+
+        rewriter = MODULE.SupportRefRewriter(target, previous_root=previous)
+        for relative in (Path("agents/a.md"), Path("skills/a/SKILL.md")):
+            with self.subTest(relative=relative):
+                self.assertEqual(
+                    rewriter.rewrite(text, relative_path=relative), sequential(relative)
+                )
+
     def test_sync_rejects_shell_active_target_before_mutation(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir_name:
             root = Path(temp_dir_name)
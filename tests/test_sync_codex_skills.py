@@ -3,6 +3,7 @@ from __future__ import annotations
 import importlib.util
 import json
 import os
+import sys
 import tempfile
 import unittest
 from pathlib import Path
@@ -540,6 +541,69 @@ class CodexSkillSyncTest(unittest.TestCase):
                 modified_text,
             )
 
+    def test_skill_digest_index_skips_rehashing_unchanged_skills(self) -> None:
+        catalog = sys.modules["codex_skill_catalog"]
+        with tempfile.TemporaryDirectory() as raw_temp:
+            root = Path(raw_temp)
+            source = self.make_source(root)
+            target = root / "user-skills"
+            support = root / "support"
+            MODULE.sync_managed_skills(source, target, support, dry_run=False)
+            for path in target.rglob("*"):
+                os.utime(path, (1_000_000_000, 1_000_000_000))
+            names = list(MODULE.MANAGED_SKILL_NAMES)
+
+            index = catalog.SkillDigestIndex.for_skill_root(target)
+            self.assertEqual(
+                catalog.skill_collection_issues(target, names, digest_index=index), []
+            )
+            index.save()
+            self.assertTrue(
+                (root / ".user-skills.agents-pipeline-digest-index.json").is_file()
+            )
+
+            # A same-size, same-mtime rewrite is trusted from the index and only
+            # caught by a full hash, which is what the index trades away.
+            tampered = target / "run-ci" / "agents" / "openai.yaml"
+            original = tampered.read_bytes()
+            tampered.write_bytes(original.upper())
+            os.utime(tampered, (1_000_000_000, 1_000_000_000))
+            reloaded = catalog.SkillDigestIndex.for_skill_root(target)
+            self.assertEqual(
+                catalog.skill_collection_issues(target, names, digest_index=reloaded), []
+            )
+            self.assertEqual(
+                catalog.skill_collection_issues(target, names), ["skills:run-ci/integrity"]
+            )
+
+            tampered.write_bytes(original + b"# edited\n")
+            self.assertEqual(
+                catalog.skill_collection_issues(target, names, digest_index=reloaded),
+                ["skills:run-ci/integrity"],
+            )
+
+    def test_hardlink_pool_shares_skill_files_but_not_markdown(self) -> None:
+        catalog = sys.modules["codex_skill_catalog"]
+        with tempfile.TemporaryDirectory() as raw_temp:
+            root = Path(raw_temp)
+            source = self.make_source(root)
+            pool = MODULE.open_object_pool(root / "pool", "hardlink")
+            targets = [root / "one" / "skills", root / "two" / "skills"]
+            for target in targets:
+                MODULE.sync_managed_skills(
+                    source, target, root / "support", dry_run=False, pool=pool
+                )
+
+            first, second = targets
+            shared = first / "run-ci" / "agents" / "openai.yaml"
+            self.assertTrue(shared.samefile(second / "run-ci" / "agents" / "openai.yaml"))
+            self.assertFalse(shared.stat().st_mode & 0o222)
+            self.assertEqual((first / "run-ci" / "SKILL.md").stat().st_nlink, 1)
+            self.assertEqual((first / "run-ci" / MODULE.MARKER_FILE).stat().st_nlink, 1)
+            names = list(MODULE.MANAGED_SKILL_NAMES)
+            for target in targets:
+                self.assertEqual(catalog.skill_collection_issues(target, names), [])
+
 
 if __name__ == "__main__":
     unittest.main()
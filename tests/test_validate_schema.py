@@ -1,16 +1,29 @@
+import contextlib
 import importlib.util
+import io
 import json
+import socket
 import subprocess
 import sys
 import tempfile
+import threading
 import unittest
 from pathlib import Path
+from unittest import mock
 
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 VALIDATOR = REPO_ROOT / "tools" / "validate-schema.py"
 
 
+def load_validator():
+    spec = importlib.util.spec_from_file_location("validate_schema", VALIDATOR)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
 @unittest.skipUnless(importlib.util.find_spec("jsonschema"), "jsonschema is not installed")
 class ValidateSchemaFormatTest(unittest.TestCase):
     def test_capability_recovery_policy_and_fixtures(self) -> None:
@@ -1131,5 +1144,413 @@ class ValidateSchemaFormatTest(unittest.TestCase):
             self.assertEqual(invalid.returncode, 1)
 
 
+class FallbackValidatorTest(unittest.TestCase):
+    def test_compiled_validator_is_cached_until_the_schema_changes(self) -> None:
+        module = load_validator()
+        schema = {
+            "type": "object",
+            "required": ["id", "tags"],
+            "additionalProperties": False,
+            "properties": {
+                "id": {"type": "string", "pattern": "^[a-z]+-[0-9]+$", "minLength": 3},
+                "tags": {"type": "array", "minItems": 1, "items": {"enum": ["a", "b"]}},
+            },
+        }
+        payload = {"id": "Task-1", "tags": ["a", "c"], "extra": True}
+        self.assertEqual(
+            module.validate(schema, payload),
+            [
+                "$.id: pattern '^[a-z]+-[0-9]+$' not matched",
+                "$.tags[1]: value 'c' not in enum ['a', 'b']",
+                "$: additional properties not allowed: ['extra']",
+            ],
+        )
+        with tempfile.TemporaryDirectory() as temp_dir_name:
+            schema_path = Path(temp_dir_name) / "item.schema.json"
+            schema_path.write_text(json.dumps(schema), encoding="utf-8")
+            loaded, validator = module.load_compiled_schema(schema_path.as_posix())
+            self.assertEqual(loaded, schema)
+            self.assertEqual(validator(payload), module.validate(schema, payload))
+            self.assertIs(
+                module.load_compiled_schema(schema_path.as_posix())[1], validator
+            )
+
+            schema["required"] = ["id", "tags", "owner"]
+            schema_path.write_text(json.dumps(schema, indent=2), encoding="utf-8")
+            _, refreshed = module.load_compiled_schema(schema_path.as_posix())
+            self.assertIsNot(refreshed, validator)
+            self.assertIn("$: missing required property 'owner'", refreshed(payload))
+            self.assertEqual(
+                refreshed({"id": "ab-1"}),
+                [
+                    "$: missing required property 'tags'",
+                    "$: missing required property 'owner'",
+                ],
+            )
+
+
+    def test_fallback_resolves_sibling_refs_and_combinators(self) -> None:
+        module = load_validator()
+        with tempfile.TemporaryDirectory() as temp_dir_name:
+            temp_dir = Path(temp_dir_name)
+            (temp_dir / "common.schema.json").write_text(
+                json.dumps(
+                    {
+                        "$defs": {
+                            "stamp": {"type": "string", "format": "date-time"},
+                            "level": {"enum": ["low", "high"]},
+                        }
+                    }
+                ),
+                encoding="utf-8",
+            )
+            schema_path = temp_dir / "event.schema.json"
+            schema_path.write_text(
+                json.dumps(
+                    {
+                        "$schema": "https://json-schema.org/draft/2020-12/schema",
+                        "type": "object",
+                        "required": ["kind", "at"],
+                        "properties": {
+                            "kind": {"oneOf": [{"const": "start"}, {"const": "stop"}]},
+                            "at": {"$ref": "common.schema.json#/$defs/stamp"},
+                            "level": {"$ref": "common.schema.json#/$defs/level"},
+                            "count": {"type": ["integer", "null"], "maximum": 3},
+                            "tags": {"type": "array", "maxItems": 2, "uniqueItems": True},
+                            "child": {"$ref": "#"},
+                        },
+                        "allOf": [
+                            {
+                                "if": {"properties": {"kind": {"const": "stop"}}},
+                                "then": {"required": ["level"]},
+                            }
+                        ],
+                        "not": {"required": ["forbidden"]},
+                    }
+                ),
+                encoding="utf-8",
+            )
+            _, validator = module.load_compiled_schema(schema_path.as_posix())
+
+            self.assertEqual(
+                validator(
+                    {
+                        "kind": "start",
+                        "at": "2026-01-02T03:04:05Z",
+                        "count": None,
+                        "child": {"kind": "stop", "at": "2026-01-02T03:04:06Z", "level": "low"},
+                    }
+                ),
+                [],
+            )
+            self.assertEqual(
+                validator(
+                    {
+                        "kind": "stop",
+                        "at": "2026-02-30T00:00:00Z",
+                        "count": 4,
+                        "tags": ["a", "a", "b"],
+                        "child": {"kind": "pause", "at": "2026-01-02T03:04:05Z"},
+                        "forbidden": True,
+                    }
+                ),
+                [
+                    "$.at: '2026-02-30T00:00:00Z' is not a valid date-time",
+                    "$.count: maximum 3 exceeded",
+                    "$.tags: maxItems 2 exceeded",
+                    "$.tags: items are not unique",
+                    "$.child.kind: matches 0 oneOf schemas, expected exactly 1",
+                    "$: missing required property 'level'",
+                    "$: must not match the 'not' schema",
+                ],
+            )
+            self.assertEqual(
+                validator({"kind": True, "at": "2026-01-02T03:04:05Z"}),
+                ["$.kind: matches 0 oneOf schemas, expected exactly 1"],
+            )
+
+    def test_error_cap_only_reports_truncation_when_an_error_is_dropped(self) -> None:
+        module = load_validator()
+        with tempfile.TemporaryDirectory() as temp_dir_name:
+            root = Path(temp_dir_name)
+            schema_path = root / "schema.json"
+            schema_path.write_text(
+                json.dumps({"type": "object", "required": ["a", "b"]}), encoding="utf-8"
+            )
+            input_path = root / "input.json"
+            input_path.write_text("{}", encoding="utf-8")
+            task = (schema_path.as_posix(), "input.json", input_path.as_posix(), None)
+
+            for limit, truncated in ((2, False), (1, True)):
+                with self.subTest(limit=limit):
+                    errors, stream_truncated = module.stream_validate(
+                        schema_path.as_posix(), input_path.as_posix(), max_errors=limit
+                    )
+                    self.assertEqual(len(errors), limit)
+                    self.assertIs(stream_truncated, truncated)
+                    for stream in (False, True):
+                        result = module.validate_task(task, stream=stream, max_errors=limit)
+                        self.assertEqual(len(result["errors"]), limit)
+                        self.assertIs(result["truncated"], truncated)
+                    for mode in ([], ["--stream"]):
+                        argv = [
+                            "validate-schema.py",
+                            "--schema",
+                            schema_path.as_posix(),
+                            "--input",
+                            input_path.as_posix(),
+                            "--max-errors",
+                            str(limit),
+                            *mode,
+                        ]
+                        stdout = io.StringIO()
+                        with mock.patch.object(sys, "argv", argv), mock.patch.object(
+                            module, "import_jsonschema", return_value=None
+                        ), contextlib.redirect_stdout(stdout):
+                            self.assertEqual(module.main(), 1)
+                        self.assertEqual(
+                            "Stopped after" in stdout.getvalue(), truncated, stdout.getvalue()
+                        )
+
+    def test_stream_validation_matches_full_validation_with_error_cap(self) -> None:
+        module = load_validator()
+        schema_path = REPO_ROOT / "protocols" / "schemas" / "task-list.schema.json"
+        payload = json.loads(
+            (
+                REPO_ROOT / "protocols" / "examples" / "task-list.trace.valid.json"
+            ).read_text(encoding="utf-8")
+        )
+        payload["tasks"] = payload["tasks"] * 40
+        payload["tasks"][3] = dict(payload["tasks"][3], unexpected=1.5)
+        payload["tasks"][7] = {}
+        _, validator = module.load_compiled_schema(schema_path.as_posix())
+        expected = validator(payload)
+        self.assertTrue(expected)
+
+        with tempfile.TemporaryDirectory() as temp_dir_name:
+            input_path = Path(temp_dir_name) / "task-list.json"
+            input_path.write_text(json.dumps(payload, indent=1), encoding="utf-8")
+            with mock.patch.object(module, "STREAM_CHUNK_CHARS", 5):
+                errors, truncated = module.stream_validate(
+                    schema_path.as_posix(), input_path.as_posix()
+                )
+            self.assertFalse(truncated)
+            self.assertEqual(sorted(errors), sorted(expected))
+
+            capped, truncated = module.stream_validate(
+                schema_path.as_posix(), input_path.as_posix(), max_errors=2
+            )
+            self.assertTrue(truncated)
+            self.assertEqual(len(capped), 2)
+
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    VALIDATOR.as_posix(),
+                    "--schema",
+                    schema_path.as_posix(),
+                    "--input",
+                    input_path.as_posix(),
+                    "--stream",
+                    "--max-errors",
+                    "1",
+                ],
+                text=True,
+                capture_output=True,
+                check=False,
+            )
+            self.assertEqual(result.returncode, 1, result.stderr)
+            self.assertIn("Stopped after 1 error(s)", result.stdout)
+
+            input_path.write_text('{"tasks": [1, 2', encoding="utf-8")
+            with self.assertRaisesRegex(ValueError, "Invalid JSON"):
+                module.stream_validate(schema_path.as_posix(), input_path.as_posix())
+
+    def test_watcher_revalidates_only_changed_run_artifacts(self) -> None:
+        module = load_validator()
+        examples = REPO_ROOT / "protocols" / "examples" / "status-layout.expanded.valid"
+        with tempfile.TemporaryDirectory() as temp_dir_name:
+            output_root = Path(temp_dir_name)
+            status_dir = output_root / "run-1" / "status"
+            (status_dir / "tasks").mkdir(parents=True)
+            run_status = status_dir / "run-status.json"
+            run_status.write_bytes((examples / "run-status.json").read_bytes())
+            task = next((examples / "tasks").glob("*.json"))
+            task_copy = status_dir / "tasks" / task.name
+            task_copy.write_bytes(task.read_bytes())
+            (output_root / "run-1" / "notes.json").write_text("{}", encoding="utf-8")
+            watcher = module.RunWatcher(output_root)
+
+            first = watcher.scan()
+            self.assertEqual(
+                sorted((Path(r["input"]).name, Path(r["schema"]).name, r["status"]) for r in first),
+                sorted(
+                    [
+                        (task.name, "task-status.schema.json", "ok"),
+                        ("run-status.json", "run-status.schema.json", "ok"),
+                    ]
+                ),
+            )
+            self.assertEqual(watcher.scan(), [])
+
+            payload = json.loads(task_copy.read_text(encoding="utf-8"))
+            payload["status"] = "not-a-status"
+            task_copy.write_text(json.dumps(payload), encoding="utf-8")
+            changed = watcher.scan()
+            self.assertEqual([Path(r["input"]).name for r in changed], [task.name])
+            self.assertEqual(changed[0]["status"], "invalid")
+
+    def test_checkpoint_stage_artifacts_accept_only_store_pointers(self) -> None:
+        module = load_validator()
+        schema_path = REPO_ROOT / "protocols" / "schemas" / "checkpoint.schema.json"
+        _, validator = module.load_compiled_schema(schema_path.as_posix())
+        examples = REPO_ROOT / "protocols" / "examples"
+        valid = json.loads(
+            (examples / "checkpoint.artifact-pointer.valid.json").read_text(encoding="utf-8")
+        )
+        invalid = json.loads(
+            (examples / "checkpoint.artifact-pointer.invalid.json").read_text(encoding="utf-8")
+        )
+
+        self.assertEqual(validator(valid), [])
+        self.assertEqual(
+            validator(invalid),
+            [
+                "$.stage_artifacts.problem_spec.path: pattern "
+                "'^\\\\.objects/sha256/[0-9a-f]{2}/[0-9a-f]{62}$' not matched"
+            ],
+        )
+        valid["stage_artifacts"]["problem_spec"]["note"] = "extra"
+        self.assertEqual(len(validator(valid)), 1)
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets are unavailable")
+    def test_validation_server_answers_json_line_requests(self) -> None:
+        module = load_validator()
+        with tempfile.TemporaryDirectory() as temp_dir_name:
+            socket_path = Path(temp_dir_name) / "validate.sock"
+            server = module.ValidationServer(str(socket_path))
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                    client.connect(str(socket_path))
+                    stream = client.makefile("rwb")
+                    requests = (
+                        {
+                            "schema": "run-status.schema.json",
+                            "input": (
+                                REPO_ROOT
+                                / "protocols"
+                                / "examples"
+                                / "status-layout.run-only.valid"
+                                / "run-status.json"
+                            ).as_posix(),
+                        },
+                        {"schema": "run-status.schema.json", "instance": {"run_id": 1}},
+                        {"instance": {}},
+                    )
+                    results = []
+                    for request in requests:
+                        stream.write(json.dumps(request).encode("utf-8") + b"\n")
+                        stream.flush()
+                        results.append(json.loads(stream.readline()))
+            finally:
+                server.shutdown()
+                server.server_close()
+
+            self.assertEqual(
+                [result["status"] for result in results], ["ok", "invalid", "error"]
+            )
+            self.assertIn("$.run_id: expected string", results[1]["errors"])
+
+    def test_batch_modes_emit_one_result_per_input(self) -> None:
+        schema = {
+            "type": "object",
+            "required": ["id"],
+            "properties": {"id": {"type": "string"}},
+        }
+        with tempfile.TemporaryDirectory() as temp_dir_name:
+            temp_dir = Path(temp_dir_name)
+            (temp_dir / "item.schema.json").write_text(
+                json.dumps(schema), encoding="utf-8"
+            )
+            artifacts = temp_dir / "run" / "status"
+            artifacts.mkdir(parents=True)
+            for index in range(6):
+                (artifacts / f"task-{index}.json").write_text(
+                    json.dumps({"id": f"t{index}"} if index % 3 else {"id": index}),
+                    encoding="utf-8",
+                )
+            manifest = temp_dir / "manifest.json"
+            manifest.write_text(
+                json.dumps(
+                    {
+                        "item.schema.json": [
+                            "run/**/task-*.json",
+                            "run/status/task-0.json",
+                            "run/status/missing.json",
+                        ]
+                    }
+                ),
+                encoding="utf-8",
+            )
+
+            batch = subprocess.run(
+                [
+                    sys.executable,
+                    VALIDATOR.as_posix(),
+                    "--manifest",
+                    manifest.as_posix(),
+                    "--jobs",
+                    "2",
+                ],
+                text=True,
+                capture_output=True,
+                check=False,
+            )
+            self.assertEqual(batch.returncode, 2, batch.stderr)
+            results = [json.loads(line) for line in batch.stdout.splitlines()]
+            self.assertEqual(
+                [
+                    (Path(result["input"]).name, result["status"])
+                    for result in results
+                ],
+                [
+                    ("task-0.json", "invalid"),
+                    ("task-1.json", "ok"),
+                    ("task-2.json", "ok"),
+                    ("task-3.json", "invalid"),
+                    ("task-4.json", "ok"),
+                    ("task-5.json", "ok"),
+                    ("missing.json", "error"),
+                ],
+            )
+            self.assertEqual(len(results[0]["errors"]), 1)
+            self.assertIn("7 input(s): 4 ok, 2 invalid, 1 error(s)", batch.stderr)
+
+            stream = subprocess.run(
+                [
+                    sys.executable,
+                    VALIDATOR.as_posix(),
+                    "--schema",
+                    (temp_dir / "item.schema.json").as_posix(),
+                    "--jsonl",
+                    "-",
+                ],
+                input='{"id": "a"}\n\n{"name": "b"}\n',
+                text=True,
+                capture_output=True,
+                check=False,
+            )
+            self.assertEqual(stream.returncode, 1, stream.stderr)
+            self.assertEqual(
+                [
+                    (result["input"], result["status"], len(result["errors"]))
+                    for result in map(json.loads, stream.stdout.splitlines())
+                ],
+                [("<stdin>:1", "ok", 0), ("<stdin>:3", "invalid", 1)],
+            )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""Content-addressed artifact store for pipeline output roots.
+
+Blobs live under ``<output_root>/.objects/sha256/<aa>/<rest-of-digest>`` and
+are referenced from checkpoints by pointers of the form
+``{"path": ".objects/sha256/aa/...", "sha256": "<hex>", "bytes": <size>}``,
+with ``path`` relative to the output root.  Identical artifacts written by
+retries, resumes, or different runs under the same root are stored once.
+
+``migrate`` replaces inline ``stage_artifacts`` entries in checkpoints with
+pointers, ``inline`` reverses it, ``verify`` re-hashes objects and checks
+checkpoint pointers, and ``gc`` removes objects no checkpoint references.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator, Sequence
+
+
+OBJECTS_DIRNAME = ".objects"
+HASH_NAME = "sha256"
+HASH_CHUNK_BYTES = 1024 * 1024
+POINTER_KEYS = frozenset(("path", "sha256", "bytes"))
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+# Inline artifacts smaller than this stay in the checkpoint; a pointer costs ~130 bytes.
+DEFAULT_MIN_BYTES = 256
+# Objects stored or reused more recently than this are never collected, so a
+# writer that has not yet saved the checkpoint referencing a blob cannot lose it.
+DEFAULT_GC_GRACE_SECONDS = 3600
+
+
+class ArtifactStoreError(ValueError):
+    """Raised for malformed pointers, missing objects, or hash mismatches."""
+
+
+def canonical_json_bytes(value: Any) -> bytes:
+    """Serialize ``value`` deterministically so equal JSON hashes equally."""
+
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode(
+        "utf-8"
+    )
+
+
+def is_pointer(value: Any) -> bool:
+    return (
+        isinstance(value, dict)
+        and value.keys() == POINTER_KEYS
+        and isinstance(value["sha256"], str)
+        and DIGEST_RE.match(value["sha256"]) is not None
+        and isinstance(value["path"], str)
+        and isinstance(value["bytes"], int)
+        and not isinstance(value["bytes"], bool)
+    )
+
+
+def _hash_stream(handle: BinaryIO) -> tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in iter(lambda: handle.read(HASH_CHUNK_BYTES), b""):
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+class ArtifactStore:
+    """Blob store rooted at ``<output_root>/.objects``."""
+
+    def __init__(self, output_root: Path) -> None:
+        self.output_root = output_root
+        self.objects_dir = output_root / OBJECTS_DIRNAME
+
+    def relative_path(self, digest: str) -> str:
+        return f"{OBJECTS_DIRNAME}/{HASH_NAME}/{digest[:2]}/{digest[2:]}"
+
+    def object_path(self, digest: str) -> Path:
+        if DIGEST_RE.match(digest) is None:
+            raise ArtifactStoreError(f"Invalid sha256 digest: {digest!r}")
+        return self.output_root / self.relative_path(digest)
+
+    def pointer(self, digest: str, size: int) -> dict[str, Any]:
+        return {"path": self.relative_path(digest), "sha256": digest, "bytes": size}
+
+    def _tmp_dir(self) -> Path:
+        tmp_dir = self.objects_dir / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        return tmp_dir
+
+    def _reuse(self, destination: Path) -> bool:
+        """Refresh an existing object's mtime so a reuse restarts its GC grace."""
+
+        try:
+            os.utime(destination)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _publish(self, temp_path: Path, digest: str) -> None:
+        destination = self.object_path(digest)
+        if self._reuse(destination):
+            temp_path.unlink()
+            return
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.chmod(temp_path, 0o444)
+        os.replace(temp_path, destination)
+
+    def put_bytes(self, data: bytes) -> dict[str, Any]:
+        digest = hashlib.sha256(data).hexdigest()
+        if not self._reuse(self.object_path(digest)):
+            fd, temp_name = tempfile.mkstemp(dir=self._tmp_dir(), prefix="put-")
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+                handle.flush()
+                os.fsync(handle.fileno())
+            self._publish(Path(temp_name), digest)
+        return self.pointer(digest, len(data))
+
+    def put_file(self, handle: BinaryIO) -> dict[str, Any]:
+        """Store a stream in one pass, hashing while copying to a temp file."""
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_name = tempfile.mkstemp(dir=self._tmp_dir(), prefix="put-")
+        try:
+            with os.fdopen(fd, "wb") as temp:
+                for chunk in iter(lambda: handle.read(HASH_CHUNK_BYTES), b""):
+                    digest.update(chunk)
+                    size += len(chunk)
+                    temp.write(chunk)
+                temp.flush()
+                os.fsync(temp.fileno())
+            self._publish(Path(temp_name), digest.hexdigest())
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+        return self.pointer(digest.hexdigest(), size)
+
+    def put_json(self, value: Any) -> dict[str, Any]:
+        return self.put_bytes(canonical_json_bytes(value))
+
+    def resolve(self, pointer: dict[str, Any]) -> Path:
+        """Return the object path for ``pointer`` after checking its shape."""
+
+        if not is_pointer(pointer):
+            raise ArtifactStoreError(f"Not an artifact pointer: {pointer!r}")
+        if pointer["path"] != self.relative_path(pointer["sha256"]):
+            raise ArtifactStoreError(
+                f"Pointer path {pointer['path']!r} does not match sha256 {pointer['sha256']}"
+            )
+        return self.object_path(pointer["sha256"])
+
+    def read(self, pointer: dict[str, Any]) -> bytes:
+        path = self.resolve(pointer)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            raise ArtifactStoreError(f"Missing object for sha256 {pointer['sha256']}") from None
+        if len(data) != pointer["bytes"] or hashlib.sha256(data).hexdigest() != pointer["sha256"]:
+            raise ArtifactStoreError(f"Object for sha256 {pointer['sha256']} is corrupt")
+        return data
+
+    def read_json(self, pointer: dict[str, Any]) -> Any:
+        return json.loads(self.read(pointer))
+
+    def objects(self) -> Iterator[tuple[str, Path]]:
+        """Yield ``(digest, path)`` for every stored object."""
+
+        hash_dir = self.objects_dir / HASH_NAME
+        try:
+            prefixes = sorted(os.scandir(hash_dir), key=lambda entry: entry.name)
+        except FileNotFoundError:
+            return
+        for prefix in prefixes:
+            if not prefix.is_dir(follow_symlinks=False):
+                continue
+            for entry in sorted(os.scandir(prefix.path), key=lambda entry: entry.name):
+                yield prefix.name + entry.name, Path(entry.path)
+
+
+def checkpoint_paths(output_root: Path) -> list[Path]:
+    paths = []
+    try:
+        entries = sorted(os.scandir(output_root), key=lambda entry: entry.name)
+    except FileNotFoundError:
+        return paths
+    for entry in entries:
+        if entry.name.startswith(".") or not entry.is_dir(follow_symlinks=False):
+            continue
+        candidate = Path(entry.path) / "checkpoint.json"
+        if candidate.is_file():
+            paths.append(candidate)
+    return paths
+
+
+def checkpoint_output_root(checkpoint_path: Path) -> Path:
+    """Checkpoints live at ``<output_root>/<run_id>/checkpoint.json``."""
+
+    return checkpoint_path.resolve().parent.parent
+
+
+def load_checkpoint(path: Path) -> dict[str, Any]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise ArtifactStoreError(f"Unable to read checkpoint {path}: {exc}") from exc
+    if not isinstance(data, dict):
+        raise ArtifactStoreError(f"Checkpoint {path} is not a JSON object")
+    artifacts = data.get("stage_artifacts", {})
+    if not isinstance(artifacts, dict):
+        raise ArtifactStoreError(f"Checkpoint {path} has a non-object stage_artifacts")
+    return data
+
+
+def write_checkpoint(path: Path, data: dict[str, Any]) -> None:
+    # Same layout and temp-file + rename discipline as the status writer.
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(json.dumps(data, indent=2, ensure_ascii=False) + "\n")
+        os.replace(temp_name, path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+
+
+def migrate_checkpoint(
+    path: Path, min_bytes: int = DEFAULT_MIN_BYTES, dry_run: bool = False
+) -> list[str]:
+    """Move inline stage artifacts into the store; return the converted keys."""
+
+    data = load_checkpoint(path)
+    store = ArtifactStore(checkpoint_output_root(path))
+    artifacts = data.get("stage_artifacts", {})
+    converted = []
+    for key, value in artifacts.items():
+        if is_pointer(value):
+            continue
+        payload = canonical_json_bytes(value)
+        if len(payload) < min_bytes:
+            continue
+        converted.append(key)
+        if not dry_run:
+            artifacts[key] = store.put_bytes(payload)
+    if converted and not dry_run:
+        write_checkpoint(path, data)
+    return converted
+
+
+def inline_checkpoint(path: Path, dry_run: bool = False) -> list[str]:
+    """Replace pointers with their stored JSON; return the inlined keys."""
+
+    data = load_checkpoint(path)
+    store = ArtifactStore(checkpoint_output_root(path))
+    artifacts = data.get("stage_artifacts", {})
+    inlined = []
+    for key, value in artifacts.items():
+        if not is_pointer(value):
+            continue
+        content = store.read_json(value)
+        inlined.append(key)
+        if not dry_run:
+            artifacts[key] = content
+    if inlined and not dry_run:
+        write_checkpoint(path, data)
+    return inlined
+
+
+def checkpoint_pointers(output_root: Path) -> Iterator[tuple[Path, str, dict[str, Any]]]:
+    for path in checkpoint_paths(output_root):
+        data = load_checkpoint(path)
+        for key, value in data.get("stage_artifacts", {}).items():
+            if is_pointer(value):
+                yield path, key, value
+
+
+def verify_store(output_root: Path) -> list[str]:
+    """Return human-readable problems; an empty list means the store is sound."""
+
+    store = ArtifactStore(output_root)
+    problems = []
+    sizes: dict[str, int] = {}
+    for digest, path in store.objects():
+        relative = path.relative_to(output_root).as_posix()
+        if DIGEST_RE.match(digest) is None:
+            problems.append(f"{relative}: not an object name")
+            continue
+        with path.open("rb") as handle:
+            actual, size = _hash_stream(handle)
+        if actual != digest:
+            problems.append(f"{relative}: content hashes to {actual}")
+            continue
+        sizes[digest] = size
+    for checkpoint, key, pointer in checkpoint_pointers(output_root):
+        where = f"{checkpoint.relative_to(output_root).as_posix()} stage_artifacts[{key!r}]"
+        if pointer["path"] != store.relative_path(pointer["sha256"]):
+            problems.append(f"{where}: path does not match sha256")
+        elif pointer["sha256"] not in sizes:
+            problems.append(f"{where}: missing or corrupt object {pointer['sha256']}")
+        elif sizes[pointer["sha256"]] != pointer["bytes"]:
+            problems.append(
+                f"{where}: bytes {pointer['bytes']} does not match object size {sizes[pointer['sha256']]}"
+            )
+    return problems
+
+
+def collect_garbage(
+    output_root: Path,
+    grace_seconds: float = DEFAULT_GC_GRACE_SECONDS,
+    dry_run: bool = False,
+    now: float | None = None,
+) -> list[str]:
+    """Remove unreferenced objects and stale temp files older than the grace period."""
+
+    store = ArtifactStore(output_root)
+    referenced = {pointer["sha256"] for _, _, pointer in checkpoint_pointers(output_root)}
+    cutoff = (time.time() if now is None else now) - grace_seconds
+    removed = []
+    candidates: list[Path] = [
+        path for digest, path in store.objects() if digest not in referenced
+    ]
+    tmp_dir = store.objects_dir / "tmp"
+    if tmp_dir.is_dir():
+        candidates.extend(sorted(tmp_dir.iterdir()))
+    for path in candidates:
+        try:
+            if path.lstat().st_mtime > cutoff:
+                continue
+            if not dry_run:
+                path.unlink()
+        except FileNotFoundError:
+            continue
+        removed.append(path.relative_to(output_root).as_posix())
+    if not dry_run:
+        for prefix in (store.objects_dir / HASH_NAME).glob("??"):
+            try:
+                prefix.rmdir()
+            except OSError:
+                pass
+    return removed
+
+
+def _existing_dir(value: str) -> Path:
+    path = Path(value).expanduser()
+    if not path.is_dir():
+        raise ArtifactStoreError(f"Output root not found: {path}")
+    return path.resolve()
+
+
+def _checkpoints(values: Iterable[str]) -> list[Path]:
+    paths = []
+    for value in values:
+        path = Path(value).expanduser()
+        if path.is_dir():
+            paths.extend(checkpoint_paths(path.resolve()))
+        elif path.is_file():
+            paths.append(path.resolve())
+        else:
+            raise ArtifactStoreError(f"Checkpoint or output root not found: {path}")
+    return paths
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Content-addressed artifact store under <output_root>/.objects."
+    )
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    put = subparsers.add_parser("put", help="Store files (or stdin) and print their pointers.")
+    put.add_argument("output_root")
+    put.add_argument("files", nargs="+", help="Files to store; '-' reads stdin.")
+
+    get = subparsers.add_parser("get", help="Write a stored object to stdout after verifying it.")
+    get.add_argument("output_root")
+    get.add_argument("sha256")
+
+    verify = subparsers.add_parser("verify", help="Re-hash objects and check checkpoint pointers.")
+    verify.add_argument("output_root")
+
+    gc = subparsers.add_parser("gc", help="Remove objects no checkpoint references.")
+    gc.add_argument("output_root")
+    gc.add_argument(
+        "--grace-seconds",
+        type=float,
+        default=DEFAULT_GC_GRACE_SECONDS,
+        help=f"Keep unreferenced objects newer than this (default: {DEFAULT_GC_GRACE_SECONDS}).",
+    )
+    gc.add_argument("--dry-run", action="store_true", help="List removals without deleting.")
+
+    migrate = subparsers.add_parser(
+        "migrate", help="Replace inline stage_artifacts with pointers into the store."
+    )
+    migrate.add_argument("checkpoints", nargs="+", help="checkpoint.json files or output roots.")
+    migrate.add_argument(
+        "--min-bytes",
+        type=int,
+        default=DEFAULT_MIN_BYTES,
+        help=f"Keep artifacts smaller than this inline (default: {DEFAULT_MIN_BYTES}).",
+    )
+    migrate.add_argument("--dry-run", action="store_true", help="Report without writing.")
+
+    inline = subparsers.add_parser(
+        "inline", help="Replace stage_artifacts pointers with their stored JSON."
+    )
+    inline.add_argument("checkpoints", nargs="+", help="checkpoint.json files or output roots.")
+    inline.add_argument("--dry-run", action="store_true", help="Report without writing.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        if args.action == "put":
+            store = ArtifactStore(_existing_dir(args.output_root))
+            for name in args.files:
+                if name == "-":
+                    pointer = store.put_file(sys.stdin.buffer)
+                else:
+                    with open(name, "rb") as handle:
+                        pointer = store.put_file(handle)
+                print(json.dumps({"input": name, **pointer}))
+            return 0
+        if args.action == "get":
+            store = ArtifactStore(_existing_dir(args.output_root))
+            path = store.object_path(args.sha256)
+            if not path.is_file():
+                raise ArtifactStoreError(f"Missing object for sha256 {args.sha256}")
+            data = store.read(store.pointer(args.sha256, path.stat().st_size))
+            sys.stdout.buffer.write(data)
+            return 0
+        if args.action == "verify":
+            problems = verify_store(_existing_dir(args.output_root))
+            for problem in problems:
+                print(problem)
+            if problems:
+                print(f"{len(problems)} problem(s) found", file=sys.stderr)
+                return 1
+            print("Artifact store OK")
+            return 0
+        if args.action == "gc":
+            removed = collect_garbage(
+                _existing_dir(args.output_root), args.grace_seconds, args.dry_run
+            )
+            for path in removed:
+                print(path)
+            verb = "Would remove" if args.dry_run else "Removed"
+            print(f"{verb} {len(removed)} unreferenced file(s)", file=sys.stderr)
+            return 0
+        if args.action == "migrate" and args.min_bytes < 0:
+            raise ArtifactStoreError("--min-bytes must be non-negative")
+        verb = "migrated" if args.action == "migrate" else "inlined"
+        for checkpoint in _checkpoints(args.checkpoints):
+            if args.action == "migrate":
+                keys = migrate_checkpoint(checkpoint, args.min_bytes, args.dry_run)
+            else:
+                keys = inline_checkpoint(checkpoint, args.dry_run)
+            print(f"{checkpoint}: {verb} {len(keys)} artifact(s){' (dry run)' if args.dry_run else ''}")
+        return 0
+    except (ArtifactStoreError, OSError) as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""Aggregate reasoning observations into calibration statistics.
+
+Loads ``<output_root>/<run_id>/observations/reasoning/*.json`` across runs (or
+the ``observations`` table of a ``tools/run-index.py`` index) into
+dictionary-encoded columns, then computes outcome, retry, degradation, and
+wall-time statistics per role, model tier, and effort.  Group-bys combine the
+integer code columns into one composite key and count it with C-level
+iteration, so hundreds of thousands of observations aggregate in well under a
+second once loaded.
+
+The summary is evidence for deliberate profile and policy reviews (see
+``docs/adaptive-reasoning-and-model-routing-roadmap.md``); it never changes
+``tools/agent-profiles/*.json`` itself.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import sqlite3
+import sys
+from array import array
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress, repeat
+from operator import add, ge, gt, mul
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+
+SUMMARY_SCHEMA_VERSION = "1.0"
+OBSERVATION_DIR = Path("observations") / "reasoning"
+PROFILE_DIR = Path(__file__).resolve().parent / "agent-profiles"
+# Dictionary-encoded columns; ``None`` is encoded like any other label.
+CATEGORICAL_COLUMNS = (
+    "orchestrator",
+    "role",
+    "model_tier",
+    "effort",
+    "reasoning_class",
+    "outcome",
+)
+DEFAULT_GROUP_BY = ("role", "model_tier", "effort")
+
+
+class AnalyticsError(ValueError):
+    """Raised for unreadable inputs or invalid grouping arguments."""
+
+
+class ObservationTable:
+    """Columnar, dictionary-encoded store of reasoning observations."""
+
+    def __init__(self) -> None:
+        self.labels: dict[str, list[str | None]] = {name: [] for name in CATEGORICAL_COLUMNS}
+        self._lookup: dict[str, dict[str | None, int]] = {name: {} for name in CATEGORICAL_COLUMNS}
+        self.codes: dict[str, array] = {name: array("I") for name in CATEGORICAL_COLUMNS}
+        self.attempt = array("I")
+        # -1 marks a missing wall time so the column stays a flat integer array.
+        self.wall_time_ms = array("q")
+        self.degraded = array("B")
+        self.runs: set[str] = set()
+        self._columns = tuple(
+            (name, self.codes[name], self._lookup[name], self.labels[name])
+            for name in CATEGORICAL_COLUMNS
+        )
+
+    def __len__(self) -> int:
+        return len(self.attempt)
+
+    def _encode(self, name: str, value: str | None) -> int:
+        lookup = self._lookup[name]
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(self.labels[name])
+            self.labels[name].append(value)
+        return code
+
+    def append(self, run_key: str, values: dict[str, Any]) -> None:
+        for name, codes, lookup, labels in self._columns:
+            value = values.get(name)
+            if value.__class__ is not str:
+                value = None
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(labels)
+                labels.append(value)
+            codes.append(code)
+        attempt = values.get("attempt")
+        self.attempt.append(attempt if isinstance(attempt, int) and attempt > 0 else 1)
+        wall_time = values.get("wall_time_ms")
+        self.wall_time_ms.append(
+            wall_time if isinstance(wall_time, int) and not isinstance(wall_time, bool) and wall_time >= 0 else -1
+        )
+        self.degraded.append(1 if values.get("degraded") is True or values.get("degraded") == 1 else 0)
+        self.runs.add(run_key)
+
+    def extend(self, other: "ObservationTable") -> None:
+        """Append ``other``'s rows, remapping its codes onto this table's labels."""
+
+        for name in CATEGORICAL_COLUMNS:
+            remap = [self._encode(name, label) for label in other.labels[name]]
+            self.codes[name].extend(map(remap.__getitem__, other.codes[name]))
+        self.attempt.extend(other.attempt)
+        self.wall_time_ms.extend(other.wall_time_ms)
+        self.degraded.extend(other.degraded)
+        self.runs.update(other.runs)
+
+
+def observation_values(data: dict[str, Any]) -> dict[str, Any]:
+    reasoning = data.get("reasoning") if isinstance(data.get("reasoning"), dict) else {}
+    return {
+        "orchestrator": data.get("orchestrator"),
+        "role": reasoning.get("role"),
+        "model_tier": reasoning.get("selected_model_tier") or reasoning.get("model_tier"),
+        "effort": reasoning.get("effective_effort"),
+        "reasoning_class": reasoning.get("effective_class"),
+        "outcome": data.get("outcome"),
+        "attempt": data.get("attempt"),
+        "wall_time_ms": data.get("wall_time_ms"),
+        "degraded": reasoning.get("degraded"),
+    }
+
+
+def load_run_directories(run_dirs: Sequence[str]) -> ObservationTable:
+    table = ObservationTable()
+    for run_dir in run_dirs:
+        directory = os.path.join(run_dir, OBSERVATION_DIR)
+        try:
+            entries = os.scandir(directory)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        with entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    with open(entry.path, "rb") as handle:
+                        data = json.loads(handle.read())
+                except (OSError, ValueError):
+                    continue
+                if isinstance(data, dict):
+                    table.append(run_dir, observation_values(data))
+    return table
+
+
+def run_directories(output_roots: Iterable[Path]) -> list[str]:
+    run_dirs: list[str] = []
+    for output_root in output_roots:
+        if not output_root.is_dir():
+            raise AnalyticsError(f"Output root not found: {output_root}")
+        with os.scandir(output_root) as entries:
+            run_dirs.extend(
+                entry.path
+                for entry in entries
+                if not entry.name.startswith(".") and entry.is_dir(follow_symlinks=False)
+            )
+    return sorted(run_dirs)
+
+
+def load_output_roots(output_roots: Iterable[Path], jobs: int = 1) -> ObservationTable:
+    run_dirs = run_directories(output_roots)
+    if jobs <= 1 or len(run_dirs) < 2:
+        return load_run_directories(run_dirs)
+    batches = [run_dirs[index::jobs] for index in range(jobs)]
+    table = ObservationTable()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for part in executor.map(load_run_directories, [batch for batch in batches if batch]):
+            table.extend(part)
+    return table
+
+
+def load_run_index(index_path: Path) -> ObservationTable:
+    if not index_path.is_file():
+        raise AnalyticsError(f"Run index not found: {index_path}")
+    table = ObservationTable()
+    connection = sqlite3.connect(f"file:{index_path.as_posix()}?mode=ro", uri=True)
+    try:
+        rows = connection.execute(
+            "SELECT o.run_dir, COALESCE(o.orchestrator, r.orchestrator), o.role, o.model_tier, "
+            "o.effective_effort, o.effective_class, o.outcome, o.attempt, o.wall_time_ms, o.degraded "
+            "FROM observations AS o LEFT JOIN runs AS r ON r.run_dir = o.run_dir"
+        )
+        fields = ("orchestrator", "role", "model_tier", "effort", "reasoning_class", "outcome", "attempt", "wall_time_ms", "degraded")
+        for row in rows:
+            table.append(row[0], dict(zip(fields, row[1:])))
+    except sqlite3.Error as exc:
+        raise AnalyticsError(f"Unable to read run index {index_path}: {exc}") from exc
+    finally:
+        connection.close()
+    return table
+
+
+def _rate(numerator: int, denominator: int) -> float | None:
+    return round(numerator / denominator, 4) if denominator else None
+
+
+def group_stats(table: ObservationTable, dims: Sequence[str]) -> dict[tuple, dict[str, Any]]:
+    """Return per-group statistics keyed by the tuple of ``dims`` labels."""
+
+    for name in dims:
+        if name not in CATEGORICAL_COLUMNS:
+            raise AnalyticsError(
+                f"Cannot group by {name!r}; choose from {', '.join(CATEGORICAL_COLUMNS)}"
+            )
+    if not len(table):
+        return {}
+    sizes = [max(len(table.labels[name]), 1) for name in dims]
+    if dims:
+        keys: Sequence[int] = table.codes[dims[0]]
+        for name, size in zip(dims[1:], sizes[1:]):
+            keys = list(map(add, map(mul, keys, repeat(size)), table.codes[name]))
+    else:
+        keys = [0] * len(table)
+
+    counts = Counter(keys)
+    outcome_width = len(table.labels["outcome"])
+    outcome_counts = Counter(
+        map(add, map(mul, keys, repeat(outcome_width)), table.codes["outcome"])
+    )
+    retries = Counter(compress(keys, map(gt, table.attempt, repeat(1))))
+    degraded = Counter(compress(keys, table.degraded))
+    has_wall_time = array("B", map(ge, table.wall_time_ms, repeat(0)))
+    timed = Counter(compress(keys, has_wall_time))
+    wall_time_sum: defaultdict[int, int] = defaultdict(int)
+    for key, wall_time in zip(compress(keys, has_wall_time), compress(table.wall_time_ms, has_wall_time)):
+        wall_time_sum[key] += wall_time
+
+    outcomes_by_key: defaultdict[int, dict[str, int]] = defaultdict(dict)
+    for combined, count in outcome_counts.items():
+        key, outcome_code = divmod(combined, outcome_width)
+        label = table.labels["outcome"][outcome_code]
+        outcomes_by_key[key][label if label is not None else "unknown"] = count
+
+    result: dict[tuple, dict[str, Any]] = {}
+    for key, count in counts.items():
+        labels: list[str | None] = []
+        remainder = key
+        for name, size in zip(reversed(dims), reversed(sizes)):
+            remainder, code = divmod(remainder, size)
+            labels.append(table.labels[name][code])
+        outcomes = dict(sorted(outcomes_by_key[key].items()))
+        result[tuple(reversed(labels))] = {
+            "count": count,
+            "outcomes": outcomes,
+            "success_rate": _rate(outcomes.get("done", 0), count),
+            "retry_rate": _rate(retries[key], count),
+            "degraded_rate": _rate(degraded[key], count),
+            "mean_wall_time_ms": (
+                round(wall_time_sum[key] / timed[key], 1) if timed[key] else None
+            ),
+        }
+    return dict(sorted(result.items(), key=lambda item: tuple("" if label is None else label for label in item[0])))
+
+
+def load_profile(value: str) -> tuple[str, dict[str, Any]]:
+    path = Path(value).expanduser()
+    if not path.suffix:
+        path = PROFILE_DIR / f"{value}.json"
+    try:
+        profile = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise AnalyticsError(f"Unable to read agent profile {path}: {exc}") from exc
+    if not isinstance(profile, dict) or not isinstance(profile.get("models"), dict):
+        raise AnalyticsError(f"Agent profile {path} has no models mapping")
+    return str(profile.get("name") or path.stem), profile
+
+
+def profile_review(
+    profile: dict[str, Any], role_tiers: dict[tuple, dict[str, Any]]
+) -> dict[str, Any]:
+    """Line each profile role's configured tier up with the observed tiers."""
+
+    observed: defaultdict[str, dict[str, Any]] = defaultdict(dict)
+    for (role, tier), stats in role_tiers.items():
+        if role is not None:
+            observed[role]["unknown" if tier is None else tier] = stats
+    review: dict[str, Any] = {}
+    for role, tier in sorted(profile["models"].items()):
+        if role not in observed:
+            continue
+        review[role] = {
+            "profile_tier": tier,
+            "at_profile_tier": observed[role].get(tier),
+            "observed_tiers": observed[role],
+        }
+    return review
+
+
+def _group_list(dims: Sequence[str], groups: dict[tuple, dict[str, Any]]) -> list[dict[str, Any]]:
+    return [{**dict(zip(dims, labels)), **stats} for labels, stats in groups.items()]
+
+
+def summarize(
+    table: ObservationTable,
+    group_by: Sequence[str] = DEFAULT_GROUP_BY,
+    profile: tuple[str, dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    totals = group_stats(table, ())
+    summary: dict[str, Any] = {
+        "schema_version": SUMMARY_SCHEMA_VERSION,
+        "generated_at": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "observations": len(table),
+        "runs": len(table.runs),
+        "totals": totals.get((), {"count": 0}),
+    }
+    for name, column in (("by_role", "role"), ("by_tier", "model_tier"), ("by_effort", "effort")):
+        summary[name] = {
+            "unknown" if labels[0] is None else labels[0]: stats
+            for labels, stats in group_stats(table, (column,)).items()
+        }
+    summary["groups"] = {
+        "dimensions": list(group_by),
+        "rows": _group_list(group_by, group_stats(table, group_by)),
+    }
+    if profile is not None:
+        name, data = profile
+        summary["profile_review"] = {
+            "profile": name,
+            "roles": profile_review(data, group_stats(table, ("role", "model_tier"))),
+        }
+    return summary
+
+
+def _percent(value: float | None) -> str:
+    return "-" if value is None else f"{value * 100:.1f}%"
+
+
+def print_groups(summary: dict[str, Any]) -> None:
+    dims = summary["groups"]["dimensions"]
+    rows = summary["groups"]["rows"]
+    print(f"{summary['observations']} observation(s) across {summary['runs']} run(s)")
+    if not rows:
+        return
+    headers = [*dims, "count", "success", "retry", "degraded", "mean_ms"]
+    lines = [
+        [
+            *("-" if row[name] is None else str(row[name]) for name in dims),
+            str(row["count"]),
+            _percent(row["success_rate"]),
+            _percent(row["retry_rate"]),
+            _percent(row["degraded_rate"]),
+            "-" if row["mean_wall_time_ms"] is None else f"{row['mean_wall_time_ms']:.0f}",
+        ]
+        for row in rows
+    ]
+    widths = [max(len(header), *(len(line[index]) for line in lines)) for index, header in enumerate(headers)]
+    print("  ".join(header.ljust(width) for header, width in zip(headers, widths)).rstrip())
+    for line in lines:
+        print("  ".join(value.ljust(width) for value, width in zip(line, widths)).rstrip())
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Aggregate reasoning observations into per-role, per-tier, and per-effort statistics."
+    )
+    parser.add_argument(
+        "output_roots",
+        nargs="*",
+        help="Output roots containing <run_id>/observations/reasoning/*.json.",
+    )
+    parser.add_argument(
+        "--from-index",
+        default=None,
+        help="Read observations from a tools/run-index.py SQLite index instead of scanning roots.",
+    )
+    parser.add_argument(
+        "--group-by",
+        default=",".join(DEFAULT_GROUP_BY),
+        help=f"Comma-separated grouping columns (default: {','.join(DEFAULT_GROUP_BY)}; choose from {', '.join(CATEGORICAL_COLUMNS)}).",
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        help="Agent profile name or JSON path to review against observed tiers.",
+    )
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes used to load run directories.")
+    parser.add_argument("--output", default=None, help="Write the JSON summary to this path.")
+    parser.add_argument("--json", action="store_true", help="Print the JSON summary instead of a table.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if bool(args.output_roots) == bool(args.from_index):
+        print("Pass output roots or --from-index, but not both", file=sys.stderr)
+        return 2
+    if args.jobs < 1:
+        print("--jobs must be at least 1", file=sys.stderr)
+        return 2
+    group_by = tuple(name.strip() for name in args.group_by.split(",") if name.strip())
+    try:
+        profile = load_profile(args.profile) if args.profile else None
+        if args.from_index:
+            table = load_run_index(Path(args.from_index).expanduser())
+        else:
+            table = load_output_roots([Path(root).expanduser() for root in args.output_roots], args.jobs)
+        summary = summarize(table, group_by, profile)
+    except (AnalyticsError, OSError) as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+    if args.output:
+        output = Path(args.output).expanduser()
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_groups(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
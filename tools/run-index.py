@@ -0,0 +1,662 @@
+#!/usr/bin/env python3
+"""Index pipeline run outputs into SQLite and query them.
+
+``update`` scans one or more output roots (for example ``.pipeline-output``)
+and records every ``<run_id>/`` directory's run status, tasks, agents, and
+reasoning observations.  Only files whose size or mtime changed since the
+previous scan are re-parsed, and runs or files that disappeared are dropped.
+``query`` answers filtered questions such as "failed tasks in the last 7 days
+by orchestrator" from the index without walking run directories.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Sequence
+
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_ENV = "AGENTS_PIPELINE_RUN_INDEX"
+DEFAULT_INDEX_FILENAME = "run-index.sqlite"
+
+# kind, directory relative to the run, and whether it holds one file per entry.
+RUN_ARTIFACTS = (
+    ("checkpoint", "", "checkpoint.json"),
+    ("run", "status", "run-status.json"),
+    ("task", "status/tasks", None),
+    ("agent", "status/agents", None),
+    ("observation", "observations/reasoning", None),
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS roots (
+    root TEXT PRIMARY KEY,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    run_dir TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_run_dir ON files (run_dir);
+CREATE TABLE IF NOT EXISTS runs (
+    run_dir TEXT PRIMARY KEY,
+    output_root TEXT NOT NULL,
+    run_id TEXT,
+    orchestrator TEXT,
+    status TEXT,
+    waiting_on TEXT,
+    current_stage INTEGER,
+    created_at TEXT,
+    updated_at TEXT,
+    updated_epoch REAL,
+    last_error TEXT,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_updated ON runs (updated_epoch);
+CREATE TABLE IF NOT EXISTS tasks (
+    run_dir TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    status TEXT,
+    summary TEXT,
+    assigned_agent_id TEXT,
+    assigned_executor TEXT,
+    resource_class TEXT,
+    resource_status TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    updated_epoch REAL,
+    completed_at TEXT,
+    PRIMARY KEY (run_dir, task_id)
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, updated_epoch);
+CREATE INDEX IF NOT EXISTS tasks_path ON tasks (path);
+CREATE TABLE IF NOT EXISTS agents (
+    run_dir TEXT NOT NULL,
+    agent_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    agent TEXT,
+    task_id TEXT,
+    status TEXT,
+    attempt INTEGER,
+    resource_status TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    updated_epoch REAL,
+    error TEXT,
+    PRIMARY KEY (run_dir, agent_id)
+);
+CREATE INDEX IF NOT EXISTS agents_status ON agents (status, updated_epoch);
+CREATE INDEX IF NOT EXISTS agents_path ON agents (path);
+CREATE TABLE IF NOT EXISTS observations (
+    run_dir TEXT NOT NULL,
+    agent_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    task_id TEXT,
+    orchestrator TEXT,
+    role TEXT,
+    attempt INTEGER,
+    outcome TEXT,
+    effective_class TEXT,
+    model_tier TEXT,
+    effective_effort TEXT,
+    degraded INTEGER,
+    wall_time_ms INTEGER,
+    observed_at TEXT,
+    updated_epoch REAL,
+    PRIMARY KEY (run_dir, agent_id)
+);
+CREATE INDEX IF NOT EXISTS observations_path ON observations (path);
+"""
+
+# Queryable tables, their natural-key columns, and the columns shown by default.
+QUERY_TABLES = {
+    "runs": (
+        "run_id",
+        "orchestrator",
+        "status",
+        "waiting_on",
+        "current_stage",
+        "updated_at",
+        "run_dir",
+    ),
+    "tasks": (
+        "run_id",
+        "orchestrator",
+        "task_id",
+        "status",
+        "assigned_agent_id",
+        "resource_status",
+        "updated_at",
+    ),
+    "agents": (
+        "run_id",
+        "orchestrator",
+        "agent_id",
+        "agent",
+        "task_id",
+        "status",
+        "attempt",
+        "updated_at",
+    ),
+    "observations": (
+        "run_id",
+        "orchestrator",
+        "agent_id",
+        "role",
+        "outcome",
+        "effective_class",
+        "model_tier",
+        "effective_effort",
+        "observed_at",
+    ),
+}
+RUN_COLUMNS = ("run_id", "orchestrator", "output_root")
+DURATION_RE = re.compile(r"^(\d+(?:\.\d+)?)([smhdw])$")
+DURATION_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+class RunIndexError(ValueError):
+    """Raised for invalid index arguments or unreadable index files."""
+
+
+def default_index_path() -> Path:
+    configured = os.environ.get(DEFAULT_INDEX_ENV)
+    if configured:
+        return Path(configured).expanduser()
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join("~", ".cache")
+    return Path(cache_home).expanduser() / "agents-pipeline" / DEFAULT_INDEX_FILENAME
+
+
+def parse_timestamp(value: Any) -> float | None:
+    """Return epoch seconds for an RFC 3339 timestamp, or None."""
+
+    if not isinstance(value, str) or not value:
+        return None
+    text = value[:-1] + "+00:00" if value[-1:] in ("Z", "z") else value
+    try:
+        parsed = datetime.datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.timestamp()
+
+
+def parse_since(value: str, now: float | None = None) -> float:
+    """Parse ``7d``/``12h``-style durations or an RFC 3339 timestamp."""
+
+    match = DURATION_RE.fullmatch(value.strip())
+    if match:
+        now = datetime.datetime.now(datetime.timezone.utc).timestamp() if now is None else now
+        return now - float(match.group(1)) * DURATION_SECONDS[match.group(2)]
+    parsed = parse_timestamp(value.strip())
+    if parsed is None:
+        raise RunIndexError(
+            f"Invalid time {value!r}; use a duration such as 7d or 12h, or an RFC 3339 timestamp"
+        )
+    return parsed
+
+
+def connect(index_path: Path) -> sqlite3.Connection:
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(index_path)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version not in (0, INDEX_VERSION):
+        connection.close()
+        raise RunIndexError(
+            f"Unsupported run index version {version} in {index_path}; remove it to rebuild"
+        )
+    connection.executescript(SCHEMA)
+    connection.execute(f"PRAGMA user_version={INDEX_VERSION}")
+    return connection
+
+
+def _run_directories(output_root: Path) -> Iterator[Path]:
+    try:
+        entries = sorted(os.scandir(output_root), key=lambda entry: entry.name)
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry.name.startswith(".") or not entry.is_dir(follow_symlinks=False):
+            continue
+        yield Path(entry.path)
+
+
+def _run_artifacts(run_dir: Path) -> Iterator[tuple[str, Path, os.stat_result]]:
+    for kind, relative, filename in RUN_ARTIFACTS:
+        directory = run_dir / relative if relative else run_dir
+        if filename is not None:
+            path = directory / filename
+            try:
+                info = path.stat()
+            except OSError:
+                continue
+            yield kind, path, info
+            continue
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        for entry in entries:
+            if not entry.name.endswith(".json") or not entry.is_file(follow_symlinks=False):
+                continue
+            try:
+                yield kind, Path(entry.path), entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+
+
+def _load(path: Path) -> dict[str, Any] | None:
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _text(value: Any) -> str | None:
+    return value if isinstance(value, str) else None
+
+
+def _integer(value: Any) -> int | None:
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+def _run_row(run_dir: Path, output_root: Path, data: dict[str, Any], source: str) -> tuple:
+    updated_at = _text(data.get("updated_at"))
+    return (
+        run_dir.as_posix(),
+        output_root.as_posix(),
+        _text(data.get("run_id")) or _text(data.get("pipeline_id")) or run_dir.name,
+        _text(data.get("orchestrator")),
+        _text(data.get("status")),
+        _text(data.get("waiting_on")),
+        _integer(data.get("current_stage")),
+        _text(data.get("created_at")),
+        updated_at,
+        parse_timestamp(updated_at),
+        _text(data.get("last_error")),
+        source,
+    )
+
+
+def _task_row(run_dir: Path, path: Path, data: dict[str, Any]) -> tuple:
+    updated_at = _text(data.get("updated_at"))
+    return (
+        run_dir.as_posix(),
+        _text(data.get("task_id")) or path.stem,
+        path.as_posix(),
+        _text(data.get("status")),
+        _text(data.get("summary")),
+        _text(data.get("assigned_agent_id")),
+        _text(data.get("assigned_executor")),
+        _text(data.get("resource_class")),
+        _text(data.get("resource_status")),
+        _text(data.get("created_at")),
+        updated_at,
+        parse_timestamp(updated_at),
+        _text(data.get("completed_at")),
+    )
+
+
+def _agent_row(run_dir: Path, path: Path, data: dict[str, Any]) -> tuple:
+    updated_at = _text(data.get("updated_at"))
+    return (
+        run_dir.as_posix(),
+        _text(data.get("agent_id")) or path.stem,
+        path.as_posix(),
+        _text(data.get("agent")),
+        _text(data.get("task_id")),
+        _text(data.get("status")),
+        _integer(data.get("attempt")),
+        _text(data.get("resource_status")),
+        _text(data.get("created_at")),
+        updated_at,
+        parse_timestamp(updated_at),
+        _text(data.get("error")),
+    )
+
+
+def _observation_row(run_dir: Path, path: Path, data: dict[str, Any]) -> tuple:
+    reasoning = data.get("reasoning") if isinstance(data.get("reasoning"), dict) else {}
+    observed_at = _text(data.get("observed_at"))
+    degraded = reasoning.get("degraded")
+    return (
+        run_dir.as_posix(),
+        _text(data.get("agent_id")) or path.stem,
+        path.as_posix(),
+        _text(data.get("task_id")),
+        _text(data.get("orchestrator")),
+        _text(reasoning.get("role")),
+        _integer(data.get("attempt")),
+        _text(data.get("outcome")),
+        _text(reasoning.get("effective_class")),
+        _text(reasoning.get("selected_model_tier")) or _text(reasoning.get("model_tier")),
+        _text(reasoning.get("effective_effort")),
+        int(degraded) if isinstance(degraded, bool) else None,
+        _integer(data.get("wall_time_ms")),
+        observed_at,
+        parse_timestamp(observed_at),
+    )
+
+
+ROW_TABLES = {
+    "task": ("tasks", _task_row, 13),
+    "agent": ("agents", _agent_row, 12),
+    "observation": ("observations", _observation_row, 15),
+}
+
+
+def _delete_run(connection: sqlite3.Connection, run_dir: str) -> None:
+    for table in ("runs", "tasks", "agents", "observations", "files"):
+        connection.execute(f"DELETE FROM {table} WHERE run_dir = ?", (run_dir,))
+
+
+def _refresh_run_row(
+    connection: sqlite3.Connection, run_dir: Path, output_root: Path
+) -> None:
+    # run-status.json is authoritative; a checkpoint alone still makes a run.
+    for kind, relative in (("run", "status/run-status.json"), ("checkpoint", "checkpoint.json")):
+        data = _load(run_dir / relative)
+        if data is not None:
+            connection.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+                _run_row(run_dir, output_root, data, kind),
+            )
+            return
+    connection.execute("DELETE FROM runs WHERE run_dir = ?", (run_dir.as_posix(),))
+
+
+def update_index(
+    connection: sqlite3.Connection, output_roots: Iterable[Path]
+) -> dict[str, int]:
+    """Bring the index up to date with ``output_roots`` and return counters."""
+
+    counts = {"runs": 0, "parsed": 0, "unchanged": 0, "removed": 0}
+    now = datetime.datetime.now(datetime.timezone.utc).timestamp()
+    with connection:
+        for output_root in output_roots:
+            output_root = output_root.expanduser().resolve()
+            root_text = output_root.as_posix()
+            connection.execute(
+                "INSERT OR REPLACE INTO roots VALUES (?, ?)", (root_text, now)
+            )
+            known_runs = {
+                row[0]
+                for row in connection.execute(
+                    "SELECT run_dir FROM runs WHERE output_root = ?", (root_text,)
+                )
+            }
+            prefix = root_text.rstrip("/") + "/"
+            known_runs.update(
+                row[0]
+                for row in connection.execute(
+                    "SELECT DISTINCT run_dir FROM files WHERE substr(run_dir, 1, ?) = ?",
+                    (len(prefix), prefix),
+                )
+                if "/" not in row[0][len(prefix) :]
+            )
+            for run_dir in _run_directories(output_root):
+                run_text = run_dir.as_posix()
+                known_runs.discard(run_text)
+                stored = {
+                    row["path"]: (row["mtime_ns"], row["size"], row["kind"])
+                    for row in connection.execute(
+                        "SELECT path, mtime_ns, size, kind FROM files WHERE run_dir = ?",
+                        (run_text,),
+                    )
+                }
+                run_changed = False
+                seen = False
+                for kind, path, info in _run_artifacts(run_dir):
+                    seen = True
+                    path_text = path.as_posix()
+                    previous = stored.pop(path_text, None)
+                    if previous is not None and previous[:2] == (info.st_mtime_ns, info.st_size):
+                        counts["unchanged"] += 1
+                        continue
+                    counts["parsed"] += 1
+                    connection.execute(
+                        "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                        (path_text, run_text, kind, info.st_mtime_ns, info.st_size),
+                    )
+                    if kind in ("run", "checkpoint"):
+                        run_changed = True
+                        continue
+                    table, build_row, width = ROW_TABLES[kind]
+                    connection.execute(f"DELETE FROM {table} WHERE path = ?", (path_text,))
+                    data = _load(path)
+                    if data is not None:
+                        connection.execute(
+                            f"INSERT OR REPLACE INTO {table} VALUES ({','.join('?' * width)})",
+                            build_row(run_dir, path, data),
+                        )
+                for path_text, (_, _, kind) in stored.items():
+                    counts["removed"] += 1
+                    connection.execute("DELETE FROM files WHERE path = ?", (path_text,))
+                    if kind in ("run", "checkpoint"):
+                        run_changed = True
+                    else:
+                        table = ROW_TABLES[kind][0]
+                        connection.execute(f"DELETE FROM {table} WHERE path = ?", (path_text,))
+                if not seen:
+                    _delete_run(connection, run_text)
+                    continue
+                if run_changed:
+                    _refresh_run_row(connection, run_dir, output_root)
+                counts["runs"] += 1
+            for run_text in known_runs:
+                counts["removed"] += 1
+                _delete_run(connection, run_text)
+    return counts
+
+
+def indexed_roots(connection: sqlite3.Connection) -> list[Path]:
+    return [Path(row[0]) for row in connection.execute("SELECT root FROM roots ORDER BY root")]
+
+
+def query_index(
+    connection: sqlite3.Connection,
+    table: str,
+    *,
+    statuses: Sequence[str] = (),
+    orchestrators: Sequence[str] = (),
+    run_ids: Sequence[str] = (),
+    roots: Sequence[Path] = (),
+    since: float | None = None,
+    until: float | None = None,
+    count_by: str | None = None,
+    limit: int | None = None,
+) -> list[dict[str, Any]]:
+    """Return matching rows (or grouped counts) as dictionaries."""
+
+    if table not in QUERY_TABLES:
+        raise RunIndexError(f"Unknown table {table!r}")
+    if table == "runs":
+        source = "runs AS item"
+        columns = {name: f"item.{name}" for name in QUERY_TABLES["runs"] + ("output_root",)}
+    else:
+        # Task, agent, and observation files are indexed even when their run has
+        # no run-status.json or checkpoint.json; those rows get NULL run fields.
+        source = f"{table} AS item LEFT JOIN runs AS run ON run.run_dir = item.run_dir"
+        columns = {name: f"item.{name}" for name in QUERY_TABLES[table]}
+        columns.update({name: f"run.{name}" for name in RUN_COLUMNS})
+        columns["run_dir"] = "item.run_dir"
+        # Runs are direct children of an indexed root, so --root still applies.
+        columns["output_root"] = (
+            "COALESCE(run.output_root, (SELECT root.root FROM roots AS root"
+            " WHERE substr(item.run_dir, 1, length(rtrim(root.root, '/')) + 1)"
+            " = rtrim(root.root, '/') || '/' ORDER BY length(root.root) DESC LIMIT 1))"
+        )
+        if table == "observations":
+            columns["orchestrator"] = "COALESCE(item.orchestrator, run.orchestrator)"
+            columns["status"] = "item.outcome"
+        for name in ("updated_at", "observed_at"):
+            if name in QUERY_TABLES[table]:
+                columns.setdefault(name, f"item.{name}")
+    clauses: list[str] = []
+    params: list[Any] = []
+
+    def add_in(column: str, values: Sequence[Any]) -> None:
+        if values:
+            clauses.append(f"{column} IN ({','.join('?' * len(values))})")
+            params.extend(values)
+
+    add_in(columns.get("status", "item.status"), list(statuses))
+    add_in(columns["orchestrator"], list(orchestrators))
+    add_in(columns["run_id"], list(run_ids))
+    add_in(columns["output_root"], [root.expanduser().resolve().as_posix() for root in roots])
+    if since is not None:
+        clauses.append("item.updated_epoch >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("item.updated_epoch < ?")
+        params.append(until)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    if count_by is not None:
+        if count_by not in columns:
+            raise RunIndexError(
+                f"Cannot count {table} by {count_by!r}; choose from {', '.join(sorted(columns))}"
+            )
+        sql = (
+            f"SELECT {columns[count_by]} AS {count_by}, COUNT(*) AS count FROM {source}{where} "
+            f"GROUP BY 1 ORDER BY count DESC, 1"
+        )
+    else:
+        selected = ", ".join(f"{columns[name]} AS {name}" for name in QUERY_TABLES[table])
+        sql = f"SELECT {selected} FROM {source}{where} ORDER BY item.updated_epoch DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return [dict(row) for row in connection.execute(sql, params)]
+
+
+def _print_table(rows: list[dict[str, Any]]) -> None:
+    if not rows:
+        print("No matching entries.")
+        return
+    headers = list(rows[0])
+    values = [["" if row[name] is None else str(row[name]) for name in headers] for row in rows]
+    widths = [max(len(name), *(len(line[index]) for line in values)) for index, name in enumerate(headers)]
+    print("  ".join(name.ljust(width) for name, width in zip(headers, widths)).rstrip())
+    for line in values:
+        print("  ".join(value.ljust(width) for value, width in zip(line, widths)).rstrip())
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Index pipeline output roots into SQLite and query runs, tasks, agents, and observations."
+    )
+    parser.add_argument(
+        "--index",
+        default=None,
+        help=(
+            f"SQLite index path (default: ${DEFAULT_INDEX_ENV} or "
+            f"~/.cache/agents-pipeline/{DEFAULT_INDEX_FILENAME})."
+        ),
+    )
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    update = subparsers.add_parser("update", help="Index or incrementally refresh output roots.")
+    update.add_argument(
+        "output_roots",
+        nargs="*",
+        help="Output roots such as .pipeline-output (default: every previously indexed root).",
+    )
+
+    query = subparsers.add_parser("query", help="Query indexed runs, tasks, agents, or observations.")
+    query.add_argument("table", choices=tuple(QUERY_TABLES))
+    query.add_argument("--status", action="append", default=[], help="Filter by status (repeatable).")
+    query.add_argument(
+        "--orchestrator", action="append", default=[], help="Filter by orchestrator (repeatable)."
+    )
+    query.add_argument("--run-id", action="append", default=[], help="Filter by run id (repeatable).")
+    query.add_argument(
+        "--root", action="append", default=[], help="Filter by output root (repeatable)."
+    )
+    query.add_argument("--since", help="Only entries updated since a duration ago (7d, 12h) or timestamp.")
+    query.add_argument("--until", help="Only entries updated before a duration ago or timestamp.")
+    query.add_argument("--count-by", help="Return counts grouped by this column instead of rows.")
+    query.add_argument("--limit", type=int, default=None, help="Maximum rows to return.")
+    query.add_argument(
+        "--refresh", action="store_true", help="Refresh every indexed root before querying."
+    )
+    query.add_argument("--json", action="store_true", help="Print rows as JSON.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    index_path = Path(args.index).expanduser() if args.index else default_index_path()
+    try:
+        connection = connect(index_path)
+    except (OSError, sqlite3.Error, RunIndexError) as exc:
+        print(f"Unable to open run index {index_path}: {exc}", file=sys.stderr)
+        return 2
+    try:
+        if args.action == "update":
+            roots = [Path(root) for root in args.output_roots] or indexed_roots(connection)
+            if not roots:
+                print("No output roots given and none indexed yet.", file=sys.stderr)
+                return 2
+            for root in roots:
+                if not root.expanduser().is_dir():
+                    print(f"Output root not found: {root}", file=sys.stderr)
+                    return 2
+            counts = update_index(connection, roots)
+            print(
+                f"Indexed {counts['runs']} run(s) in {len(roots)} root(s): "
+                f"{counts['parsed']} file(s) parsed, {counts['unchanged']} unchanged, "
+                f"{counts['removed']} removed"
+            )
+            return 0
+
+        if args.limit is not None and args.limit < 1:
+            print("--limit must be at least 1", file=sys.stderr)
+            return 2
+        if args.refresh:
+            update_index(
+                connection, [root for root in indexed_roots(connection) if root.is_dir()]
+            )
+        rows = query_index(
+            connection,
+            args.table,
+            statuses=args.status,
+            orchestrators=args.orchestrator,
+            run_ids=args.run_id,
+            roots=[Path(root) for root in args.root],
+            since=parse_since(args.since) if args.since else None,
+            until=parse_since(args.until) if args.until else None,
+            count_by=args.count_by,
+            limit=args.limit,
+        )
+    except (RunIndexError, sqlite3.Error) as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+    finally:
+        connection.close()
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        _print_table(rows)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
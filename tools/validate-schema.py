@@ -1,11 +1,19 @@
 #!/usr/bin/env python3
 import argparse
+import concurrent.futures
 import datetime
+import functools
+import glob
 import json
 import os
 import pathlib
 import re
+import signal
+import socket
+import socketserver
 import sys
+import threading
+import urllib.parse
 
 
 RFC3339_RE = re.compile(
@@ -33,98 +41,1296 @@ def load_json(path):
         return json.load(handle)
 
 
+TYPE_CHECKS = {
+    "string": lambda value: isinstance(value, str),
+    "array": lambda value: isinstance(value, list),
+    "object": lambda value: isinstance(value, dict),
+    "boolean": lambda value: isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float))
+    and not isinstance(value, bool),
+    "integer": lambda value: (isinstance(value, int) and not isinstance(value, bool))
+    or (isinstance(value, float) and value.is_integer()),
+    "null": lambda value: value is None,
+}
+FORMAT_CHECKS = {"date-time": is_rfc3339_datetime}
+
+_COMPILED_SCHEMAS = {}
+
+
 def type_ok(expected, value):
-    if expected == "string":
-        return isinstance(value, str)
-    if expected == "array":
-        return isinstance(value, list)
-    if expected == "object":
-        return isinstance(value, dict)
-    if expected == "boolean":
-        return isinstance(value, bool)
-    if expected == "number":
-        return isinstance(value, (int, float)) and not isinstance(value, bool)
-    if expected == "integer":
-        return isinstance(value, int) and not isinstance(value, bool)
+    is_type = TYPE_CHECKS.get(expected) if isinstance(expected, str) else None
+    return True if is_type is None else is_type(value)
+
+
+def json_equal(left, right):
+    """Compare JSON values the way JSON Schema does (``true`` is not ``1``)."""
+    if isinstance(left, bool) or isinstance(right, bool):
+        return left is right
+    if isinstance(left, list) and isinstance(right, list):
+        return len(left) == len(right) and all(map(json_equal, left, right))
+    if isinstance(left, dict) and isinstance(right, dict):
+        return left.keys() == right.keys() and all(
+            json_equal(value, right[key]) for key, value in left.items()
+        )
+    if isinstance(left, (list, dict)) or isinstance(right, (list, dict)):
+        return False
+    return left == right
+
+
+def _items_unique(items):
+    if all(isinstance(item, str) for item in items):
+        return len(set(items)) == len(items)
+    return not any(
+        json_equal(items[index], items[other])
+        for index in range(len(items))
+        for other in range(index)
+    )
+
+
+class _Invalid(Exception):
+    pass
+
+
+class _FailFast(list):
+    def append(self, error):
+        raise _Invalid
+
+
+def _is_valid(check, data, path):
+    try:
+        check(data, path, _FailFast())
+    except _Invalid:
+        return False
     return True
 
 
-def validate(schema, data, path="$"):
-    errors = []
+def _check_nothing(data, path, errors):
+    return None
 
-    expected_type = schema.get("type")
-    if expected_type and not type_ok(expected_type, data):
-        errors.append(f"{path}: expected {expected_type}")
-        return errors
 
-    enum = schema.get("enum")
-    if enum is not None and data not in enum:
-        errors.append(f"{path}: value {data!r} not in enum {enum!r}")
-        return errors
+class SchemaCompiler:
+    """Compile the draft 2020-12 subset used by ``protocols/schemas``.
+
+    Each schema node becomes a ``check(data, path, errors)`` closure; keyword
+    lookups, regex compilation, and child compilation happen once.  ``$ref``
+    resolves JSON pointers within a document and relative references to
+    sibling schema files, which are recorded in ``documents``.
+    """
+
+    def __init__(self, schema, base_path=None):
+        self.documents = {base_path: schema}
+        self._refs = {}
+        self.check = self.compile(schema, base_path)
+
+    def _ref_target(self, ref, base_path):
+        target, _, fragment = ref.partition("#")
+        path = base_path
+        if target:
+            if ":" in target.split("/", 1)[0]:
+                raise ValueError(f"unsupported $ref {ref!r}")
+            directory = os.path.dirname(base_path) if base_path else os.getcwd()
+            path = os.path.normpath(
+                os.path.join(directory, urllib.parse.unquote(target))
+            )
+        if fragment and not fragment.startswith("/"):
+            raise ValueError(f"unsupported $ref {ref!r}")
+        return path, fragment
+
+    def resolve_ref(self, ref, base_path):
+        """Return the schema node a ``$ref`` points at and its document path."""
+        path, fragment = self._ref_target(ref, base_path)
+        if path not in self.documents:
+            self.documents[path] = load_json(path)
+        node = self.documents[path]
+        try:
+            for part in fragment.split("/")[1:]:
+                part = urllib.parse.unquote(part).replace("~1", "/").replace("~0", "~")
+                node = node[int(part)] if isinstance(node, list) else node[part]
+        except (KeyError, IndexError, TypeError, ValueError):
+            raise ValueError(f"unresolvable $ref {ref!r}") from None
+        return node, path
+
+    def _resolve_ref(self, ref, base_path):
+        key = self._ref_target(ref, base_path)
+        check = self._refs.get(key)
+        if check is not None:
+            return check
+        resolved = []
+        # Recursive references see this proxy until compilation finishes.
+        self._refs[key] = lambda data, at, errors: resolved[0](data, at, errors)
+        node, path = self.resolve_ref(ref, base_path)
+        resolved.append(self.compile(node, path))
+        self._refs[key] = resolved[0]
+        return resolved[0]
+
+    def compile(self, schema, base_path):
+        if schema is True:
+            return _check_nothing
+        if schema is False:
+            return lambda data, path, errors: errors.append(
+                f"{path}: no value is allowed"
+            )
+        if not isinstance(schema, dict):
+            raise ValueError(f"invalid schema: {schema!r}")
 
-    if expected_type == "string":
+        expected_type = schema.get("type")
+        is_type = None
+        if isinstance(expected_type, str) and expected_type in TYPE_CHECKS:
+            is_type = TYPE_CHECKS[expected_type]
+        elif isinstance(expected_type, list):
+            type_checks = tuple(
+                TYPE_CHECKS[name] for name in expected_type if name in TYPE_CHECKS
+            )
+            is_type = lambda value: any(check(value) for check in type_checks)  # noqa: E731
+            expected_type = " or ".join(expected_type)
+        enum = schema.get("enum")
+        in_enum = None
+        if enum is not None:
+            if all(isinstance(value, str) for value in enum):
+                string_enum = frozenset(enum)
+                in_enum = lambda value: isinstance(value, str) and value in string_enum  # noqa: E731
+            else:
+                in_enum = lambda value: any(json_equal(value, item) for item in enum)  # noqa: E731
+
+        string_checks = self._string_checks(schema)
+        number_checks = self._number_checks(schema)
+        array_checks = self._array_checks(schema, base_path)
+        object_checks = self._object_checks(schema, base_path)
+        any_checks = self._applicator_checks(schema, base_path)
+
+        def check(data, path, errors):
+            if is_type is not None and not is_type(data):
+                errors.append(f"{path}: expected {expected_type}")
+                return
+            if in_enum is not None and not in_enum(data):
+                errors.append(f"{path}: value {data!r} not in enum {enum!r}")
+                return
+            if isinstance(data, str):
+                node_checks = string_checks
+            elif isinstance(data, dict):
+                node_checks = object_checks
+            elif isinstance(data, list):
+                node_checks = array_checks
+            elif isinstance(data, (int, float)) and not isinstance(data, bool):
+                node_checks = number_checks
+            else:
+                node_checks = ()
+            for node_check in node_checks:
+                node_check(data, path, errors)
+            for node_check in any_checks:
+                node_check(data, path, errors)
+
+        return check
+
+    def _string_checks(self, schema):
+        checks = []
         min_length = schema.get("minLength")
-        if min_length is not None and isinstance(data, str) and len(data) < min_length:
-            errors.append(f"{path}: minLength {min_length} not met")
+        if min_length is not None:
+
+            def check_min_length(data, path, errors):
+                if len(data) < min_length:
+                    errors.append(f"{path}: minLength {min_length} not met")
+
+            checks.append(check_min_length)
+        max_length = schema.get("maxLength")
+        if max_length is not None:
+
+            def check_max_length(data, path, errors):
+                if len(data) > max_length:
+                    errors.append(f"{path}: maxLength {max_length} exceeded")
+
+            checks.append(check_max_length)
         pattern = schema.get("pattern")
-        if pattern and isinstance(data, str):
-            if re.fullmatch(pattern, data) is None:
-                errors.append(f"{path}: pattern {pattern!r} not matched")
+        if pattern:
+            search = re.compile(pattern).search
+
+            def check_pattern(data, path, errors):
+                if search(data) is None:
+                    errors.append(f"{path}: pattern {pattern!r} not matched")
+
+            checks.append(check_pattern)
+        format_name = schema.get("format")
+        is_format = FORMAT_CHECKS.get(format_name)
+        if is_format is not None:
+
+            def check_format(data, path, errors):
+                if not is_format(data):
+                    errors.append(f"{path}: {data!r} is not a valid {format_name}")
+
+            checks.append(check_format)
+        return tuple(checks)
+
+    def _number_checks(self, schema):
+        checks = []
+        minimum = schema.get("minimum")
+        if minimum is not None:
+
+            def check_minimum(data, path, errors):
+                if data < minimum:
+                    errors.append(f"{path}: minimum {minimum} not met")
 
-    if expected_type == "array":
+            checks.append(check_minimum)
+        maximum = schema.get("maximum")
+        if maximum is not None:
+
+            def check_maximum(data, path, errors):
+                if data > maximum:
+                    errors.append(f"{path}: maximum {maximum} exceeded")
+
+            checks.append(check_maximum)
+        return tuple(checks)
+
+    def _array_checks(self, schema, base_path):
+        checks = []
         min_items = schema.get("minItems")
-        if min_items is not None and isinstance(data, list) and len(data) < min_items:
-            errors.append(f"{path}: minItems {min_items} not met")
+        if min_items is not None:
+
+            def check_min_items(data, path, errors):
+                if len(data) < min_items:
+                    errors.append(f"{path}: minItems {min_items} not met")
+
+            checks.append(check_min_items)
+        max_items = schema.get("maxItems")
+        if max_items is not None:
+
+            def check_max_items(data, path, errors):
+                if len(data) > max_items:
+                    errors.append(f"{path}: maxItems {max_items} exceeded")
+
+            checks.append(check_max_items)
+        if schema.get("uniqueItems") is True:
+
+            def check_unique(data, path, errors):
+                if not _items_unique(data):
+                    errors.append(f"{path}: items are not unique")
+
+            checks.append(check_unique)
         items_schema = schema.get("items")
-        if items_schema is not None and isinstance(data, list):
-            for idx, item in enumerate(data):
-                errors.extend(validate(items_schema, item, f"{path}[{idx}]"))
-
-    if expected_type == "object":
-        required = schema.get("required", [])
-        if isinstance(data, dict):
-            for key in required:
-                if key not in data:
-                    errors.append(f"{path}: missing required property {key!r}")
-            properties = schema.get("properties", {})
-            for key, value in data.items():
-                if key in properties:
-                    errors.extend(validate(properties[key], value, f"{path}.{key}"))
-            if schema.get("additionalProperties") is False and properties:
-                extras = [k for k in data.keys() if k not in properties]
+        if isinstance(items_schema, list):
+            # Draft-07 tuple form: one schema per leading position.
+            position_checks = tuple(
+                self.compile(item, base_path) for item in items_schema
+            )
+
+            def check_positions(data, path, errors):
+                for idx, (item, check_item) in enumerate(zip(data, position_checks)):
+                    check_item(item, f"{path}[{idx}]", errors)
+
+            checks.append(check_positions)
+        elif items_schema is not None:
+            check_item = self.compile(items_schema, base_path)
+
+            def check_items(data, path, errors):
+                for idx, item in enumerate(data):
+                    check_item(item, f"{path}[{idx}]", errors)
+
+            checks.append(check_items)
+        if "contains" in schema:
+            check_contained = self.compile(schema["contains"], base_path)
+
+            def check_contains(data, path, errors):
+                if not any(
+                    _is_valid(check_contained, item, f"{path}[{idx}]")
+                    for idx, item in enumerate(data)
+                ):
+                    errors.append(f"{path}: no item matches contains")
+
+            checks.append(check_contains)
+        return tuple(checks)
+
+    def _object_checks(self, schema, base_path):
+        checks = []
+        required = tuple(schema.get("required", []))
+        if required:
+
+            def check_required(data, path, errors):
+                for key in required:
+                    if key not in data:
+                        errors.append(f"{path}: missing required property {key!r}")
+
+            checks.append(check_required)
+        min_properties = schema.get("minProperties")
+        if min_properties is not None:
+
+            def check_min_properties(data, path, errors):
+                if len(data) < min_properties:
+                    errors.append(f"{path}: minProperties {min_properties} not met")
+
+            checks.append(check_min_properties)
+        dependent_required = dict(schema.get("dependentRequired", {}))
+        dependent_schemas = {}
+        for key, dependency in schema.get("dependencies", {}).items():
+            if isinstance(dependency, list):
+                dependent_required[key] = dependency
+            else:
+                dependent_schemas[key] = self.compile(dependency, base_path)
+        if dependent_required:
+
+            def check_dependent_required(data, path, errors):
+                for key, dependencies in dependent_required.items():
+                    if key in data:
+                        for dependency in dependencies:
+                            if dependency not in data:
+                                errors.append(
+                                    f"{path}: property {key!r} requires {dependency!r}"
+                                )
+
+            checks.append(check_dependent_required)
+        if dependent_schemas:
+
+            def check_dependent_schemas(data, path, errors):
+                for key, check_dependent in dependent_schemas.items():
+                    if key in data:
+                        check_dependent(data, path, errors)
+
+            checks.append(check_dependent_schemas)
+        properties = {
+            key: self.compile(value, base_path)
+            for key, value in schema.get("properties", {}).items()
+        }
+        if properties:
+
+            def check_properties(data, path, errors):
+                for key, value in data.items():
+                    check_property = properties.get(key)
+                    if check_property is not None:
+                        check_property(value, f"{path}.{key}", errors)
+
+            checks.append(check_properties)
+        additional = schema.get("additionalProperties")
+        allowed = frozenset(properties)
+        if additional is False:
+
+            def check_additional(data, path, errors):
+                extras = [k for k in data.keys() if k not in allowed]
                 if extras:
                     errors.append(
                         f"{path}: additional properties not allowed: {extras!r}"
                     )
 
-    return errors
+            checks.append(check_additional)
+        elif additional is not None and additional is not True:
+            check_extra = self.compile(additional, base_path)
+
+            def check_additional_schema(data, path, errors):
+                for key, value in data.items():
+                    if key not in allowed:
+                        check_extra(value, f"{path}.{key}", errors)
+
+            checks.append(check_additional_schema)
+        if "propertyNames" in schema:
+            check_name = self.compile(schema["propertyNames"], base_path)
+
+            def check_property_names(data, path, errors):
+                for key in data:
+                    check_name(key, f"{path}.{key}", errors)
+
+            checks.append(check_property_names)
+        return tuple(checks)
+
+    def _applicator_checks(self, schema, base_path):
+        checks = []
+        if "const" in schema:
+            const = schema["const"]
+            same = const.__eq__ if isinstance(const, str) else (
+                lambda data: json_equal(data, const)
+            )
+
+            def check_const(data, path, errors):
+                if same(data) is not True:
+                    errors.append(f"{path}: value {data!r} is not {const!r}")
+
+            checks.append(check_const)
+        if "$ref" in schema:
+            checks.append(self._resolve_ref(schema["$ref"], base_path))
+        for subschema in schema.get("allOf", []):
+            checks.append(self.compile(subschema, base_path))
+        if "anyOf" in schema:
+            any_of = tuple(self.compile(sub, base_path) for sub in schema["anyOf"])
+
+            def check_any_of(data, path, errors):
+                if not any(_is_valid(sub, data, path) for sub in any_of):
+                    errors.append(f"{path}: does not match any anyOf schema")
+
+            checks.append(check_any_of)
+        if "oneOf" in schema:
+            one_of = tuple(self.compile(sub, base_path) for sub in schema["oneOf"])
+
+            def check_one_of(data, path, errors):
+                matched = sum(1 for sub in one_of if _is_valid(sub, data, path))
+                if matched != 1:
+                    errors.append(
+                        f"{path}: matches {matched} oneOf schemas, expected exactly 1"
+                    )
+
+            checks.append(check_one_of)
+        if "not" in schema:
+            check_not = self.compile(schema["not"], base_path)
+
+            def check_negated(data, path, errors):
+                if _is_valid(check_not, data, path):
+                    errors.append(f"{path}: must not match the 'not' schema")
+
+            checks.append(check_negated)
+        if "if" in schema and ("then" in schema or "else" in schema):
+            check_if = self.compile(schema["if"], base_path)
+            check_then = self.compile(schema.get("then", True), base_path)
+            check_else = self.compile(schema.get("else", True), base_path)
+
+            def check_conditional(data, path, errors):
+                if _is_valid(check_if, data, path):
+                    check_then(data, path, errors)
+                else:
+                    check_else(data, path, errors)
+
+            checks.append(check_conditional)
+        return tuple(checks)
+
+
+def compile_schema(schema, base_path=None):
+    """Return ``validator(data, path="$") -> errors`` for a schema.
+
+    ``base_path`` is the schema's own file, used to resolve ``$ref`` to
+    sibling schema files.
+    """
+    return _validator(SchemaCompiler(schema, base_path).check)
+
+
+class _ErrorCapReached(Exception):
+    pass
+
+
+class _CappedErrors(list):
+    """Error list that keeps ``limit`` errors and stops validation at the next.
+
+    ``truncated`` is only set once an error is actually dropped, so an input
+    with exactly ``limit`` errors is reported in full.
+    """
+
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+        self.truncated = False
+
+    def append(self, error):
+        if len(self) >= self.limit:
+            self.truncated = True
+            raise _ErrorCapReached
+        super().append(error)
+
+
+def _collect(run, max_errors):
+    """Run ``run(errors)`` and return ``(errors, truncated)``."""
+    errors = [] if max_errors is None else _CappedErrors(max_errors)
+    try:
+        run(errors)
+    except _ErrorCapReached:
+        pass
+    return list(errors), getattr(errors, "truncated", False)
+
+
+def _validator(check):
+    def validator(data, path="$", max_errors=None):
+        errors, _ = _collect(lambda sink: check(data, path, sink), max_errors)
+        return errors
+
+    return validator
+
+
+STREAM_CHUNK_CHARS = 1 << 20
+DEFAULT_STREAM_MAX_ERRORS = 100
+ANNOTATION_KEYWORDS = frozenset(
+    (
+        "$comment",
+        "$defs",
+        "$id",
+        "$schema",
+        "default",
+        "definitions",
+        "description",
+        "examples",
+        "title",
+    )
+)
+STREAMABLE_KEYWORDS = ANNOTATION_KEYWORDS | {
+    "additionalProperties",
+    "items",
+    "maxItems",
+    "minItems",
+    "minProperties",
+    "properties",
+    "required",
+    "type",
+}
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_JSON_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+_JSON_DECODER = json.JSONDecoder()
+
+
+class _JsonStream:
+    """Incremental reader over JSON text that decodes one value at a time."""
+
+    def __init__(self, handle, chunk_size=None):
+        self.handle = handle
+        self.chunk_size = chunk_size or STREAM_CHUNK_CHARS
+        self.buffer = ""
+        self.pos = 0
+        self.offset = 0
+        self.eof = False
+
+    def _fill(self, size):
+        if self.pos:
+            self.offset += self.pos
+            self.buffer = self.buffer[self.pos :]
+            self.pos = 0
+        chunk = self.handle.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer += chunk
+        return True
+
+    def _error(self, message, pos=None):
+        at = self.offset + (self.pos if pos is None else pos)
+        return ValueError(f"Invalid JSON at character {at}: {message}")
+
+    def peek(self):
+        while True:
+            self.pos = _JSON_WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill(self.chunk_size):
+                return ""
+
+    def take(self, expected):
+        char = self.peek()
+        if not char or char not in expected:
+            raise self._error(f"expected one of {expected!r}")
+        self.pos += 1
+        return char
+
+    def read_value(self):
+        """Decode the next complete value, reading more text only as needed."""
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = _JSON_DECODER.raw_decode(self.buffer, self.pos)
+                # A number cut at the buffer edge ("1." or "12") may continue.
+                tail = _JSON_NUMBER_TAIL.match(self.buffer, end).end()
+                if tail < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError as exc:
+                if self.eof:
+                    raise self._error(exc.msg, exc.pos) from None
+            self._fill(size)
+            size = max(size, len(self.buffer))
+
+
+class StreamValidator:
+    """Validate a JSON file incrementally against a compiled schema.
+
+    Objects and arrays whose schemas only use member-local keywords
+    (``STREAMABLE_KEYWORDS``) are walked member by member; every other value
+    is decoded on its own and checked by the compiled fallback, so memory is
+    bounded by the largest such value rather than by the document.
+    """
+
+    def __init__(self, compiler, base_path):
+        self.compiler = compiler
+        self.base_path = base_path
+        self._plans = {}
+        self._checks = {}
+
+    def _plan(self, schema, base_path):
+        key = id(schema)
+        if key in self._plans:
+            return self._plans[key]
+        plan = None
+        if isinstance(schema, dict) or schema is True:
+            schema = {} if schema is True else schema
+            if "$ref" in schema and set(schema) - {"$ref"} <= ANNOTATION_KEYWORDS:
+                node, path = self.compiler.resolve_ref(schema["$ref"], base_path)
+                plan = self._plan(node, path)
+            elif set(schema) <= STREAMABLE_KEYWORDS:
+                expected = schema.get("type")
+                plan = {
+                    "type": expected,
+                    "properties": schema.get("properties", {}),
+                    "additional": schema.get("additionalProperties", True),
+                    "required": tuple(schema.get("required", [])),
+                    "min_properties": schema.get("minProperties"),
+                    "items": schema.get("items", True),
+                    "min_items": schema.get("minItems"),
+                    "max_items": schema.get("maxItems"),
+                    "base": base_path,
+                }
+        self._plans[key] = plan
+        return plan
+
+    def _check(self, schema, base_path):
+        key = id(schema)
+        check = self._checks.get(key)
+        if check is None:
+            check = self._checks[key] = self.compiler.compile(schema, base_path)
+        return check
+
+    def validate(self, handle, path="$", max_errors=None):
+        """Return ``(errors, truncated)`` for the JSON text in ``handle``."""
+        stream = _JsonStream(handle)
+
+        def run(errors):
+            root = self.compiler.documents[self.base_path]
+            self._value(root, self.base_path, stream, path, errors)
+            if stream.peek():
+                raise stream._error("extra data after the top-level value")
+
+        return _collect(run, max_errors)
+
+    def _value(self, schema, base_path, stream, path, errors):
+        plan = self._plan(schema, base_path)
+        char = stream.peek()
+        if plan is None or char not in ("{", "["):
+            self._check(schema, base_path)(stream.read_value(), path, errors)
+            return
+        expected = plan["type"]
+        names = expected if isinstance(expected, list) else [expected]
+        sample = {} if char == "{" else []
+        if expected is not None and not any(type_ok(name, sample) for name in names):
+            errors.append(f"{path}: expected {' or '.join(names)}")
+            self._value(True, base_path, stream, path, [])
+            return
+        if char == "{":
+            self._object(plan, stream, path, errors)
+        else:
+            self._array(plan, stream, path, errors)
+
+    def _object(self, plan, stream, path, errors):
+        base_path = plan["base"]
+        properties = plan["properties"]
+        additional = plan["additional"]
+        seen = set()
+        extras = []
+        stream.take("{")
+        if stream.peek() == "}":
+            stream.take("}")
+        else:
+            while True:
+                if stream.peek() != '"':
+                    raise stream._error("expected a property name")
+                key = stream.read_value()
+                stream.take(":")
+                seen.add(key)
+                subschema = properties.get(key)
+                if subschema is None:
+                    if additional is False:
+                        extras.append(key)
+                        subschema = True
+                    else:
+                        subschema = additional
+                self._value(subschema, base_path, stream, f"{path}.{key}", errors)
+                if stream.take(",}") == "}":
+                    break
+        for key in plan["required"]:
+            if key not in seen:
+                errors.append(f"{path}: missing required property {key!r}")
+        min_properties = plan["min_properties"]
+        if min_properties is not None and len(seen) < min_properties:
+            errors.append(f"{path}: minProperties {min_properties} not met")
+        if extras:
+            errors.append(f"{path}: additional properties not allowed: {extras!r}")
+
+    def _array(self, plan, stream, path, errors):
+        base_path = plan["base"]
+        items = plan["items"]
+        count = 0
+        stream.take("[")
+        if stream.peek() == "]":
+            stream.take("]")
+        else:
+            while True:
+                if isinstance(items, list):
+                    subschema = items[count] if count < len(items) else True
+                else:
+                    subschema = items
+                self._value(subschema, base_path, stream, f"{path}[{count}]", errors)
+                count += 1
+                if stream.take(",]") == "]":
+                    break
+        min_items = plan["min_items"]
+        if min_items is not None and count < min_items:
+            errors.append(f"{path}: minItems {min_items} not met")
+        max_items = plan["max_items"]
+        if max_items is not None and count > max_items:
+            errors.append(f"{path}: maxItems {max_items} exceeded")
+
+
+def stream_validate(schema_path, input_path, max_errors=None):
+    """Stream-validate one JSON file; returns ``(errors, truncated)``."""
+    entry = _schema_entry(schema_path)
+    validator = StreamValidator(entry["compiler"], entry["path"])
+    with open(input_path, "r", encoding="utf-8") as handle:
+        return validator.validate(handle, max_errors=max_errors)
+
+
+def _file_key(path):
+    stat_result = os.stat(path)
+    return (stat_result.st_mtime_ns, stat_result.st_size)
+
+
+def _schema_entry(path):
+    resolved = os.path.realpath(os.path.expanduser(path))
+    cached = _COMPILED_SCHEMAS.get(resolved)
+    if cached is not None:
+        try:
+            if all(_file_key(doc) == key for doc, key in cached["key"]):
+                return cached
+        except OSError:
+            pass
+    key = _file_key(resolved)
+    schema = load_json(resolved)
+    compiler = SchemaCompiler(schema, resolved)
+    documents = [(resolved, key)] + [
+        (doc, _file_key(doc)) for doc in compiler.documents if doc != resolved
+    ]
+    cached = {
+        "key": documents,
+        "path": resolved,
+        "schema": schema,
+        "compiler": compiler,
+        "fallback": _validator(compiler.check),
+        "jsonschema": None,
+    }
+    _COMPILED_SCHEMAS[resolved] = cached
+    return cached
+
+
+def load_compiled_schema(path):
+    """Load and compile a schema file, cached by resolved path, mtime, and size."""
+    entry = _schema_entry(path)
+    return entry["schema"], entry["fallback"]
+
+
+def import_jsonschema():
+    try:
+        import jsonschema  # type: ignore
+    except Exception:
+        return None
+    return jsonschema
+
+
+def jsonschema_validator(jsonschema, path):
+    """Return a cached ``jsonschema`` validator for a schema file."""
+    entry = _schema_entry(path)
+    if entry["jsonschema"] is None:
+        schema = entry["schema"]
+        format_checker = jsonschema.FormatChecker()
+        format_checker.checks("date-time")(is_rfc3339_datetime)
+        resolver = jsonschema.RefResolver(
+            base_uri=pathlib.Path(entry["path"]).as_uri(),
+            referrer=schema,
+        )
+        cls = jsonschema.validators.validator_for(schema)
+        cls.check_schema(schema)
+        entry["jsonschema"] = cls(
+            schema, resolver=resolver, format_checker=format_checker
+        )
+    return entry["jsonschema"]
+
+
+def validate(schema, data, path="$"):
+    return compile_schema(schema)(data, path)
+
+
+def _manifest_tasks(manifest):
+    """Expand a ``{schema: input-or-glob | [inputs-or-globs]}`` manifest."""
+    if manifest == "-":
+        base_dir = os.getcwd()
+        mapping = json.load(sys.stdin)
+    else:
+        manifest = os.path.expanduser(manifest)
+        base_dir = os.path.dirname(os.path.abspath(manifest))
+        mapping = load_json(manifest)
+    if not isinstance(mapping, dict):
+        raise ValueError("manifest must be a JSON object mapping schemas to inputs")
+    tasks = []
+    seen = set()
+    for schema_path, patterns in mapping.items():
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        if not isinstance(patterns, list) or not all(
+            isinstance(pattern, str) for pattern in patterns
+        ):
+            raise ValueError(f"manifest inputs for {schema_path!r} must be strings")
+        schema_path = os.path.join(base_dir, os.path.expanduser(schema_path))
+        for pattern in patterns:
+            pattern = os.path.join(base_dir, os.path.expanduser(pattern))
+            matches = sorted(glob.glob(pattern, recursive=True))
+            if not glob.has_magic(pattern) and not matches:
+                matches = [pattern]
+            for input_path in matches:
+                if (schema_path, input_path) not in seen:
+                    seen.add((schema_path, input_path))
+                    tasks.append((schema_path, input_path, input_path, None))
+    return tasks
+
+
+def _jsonl_tasks(schema_path, source):
+    label = "<stdin>" if source == "-" else source
+    handle = sys.stdin if source == "-" else open(
+        os.path.expanduser(source), "r", encoding="utf-8"
+    )
+    try:
+        for lineno, line in enumerate(handle, start=1):
+            if line.strip():
+                yield (schema_path, f"{label}:{lineno}", None, line)
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def validate_task(task, use_jsonschema=False, stream=False, max_errors=None):
+    """Validate one batch task and return its machine-readable result."""
+    schema_path, label, input_path, text = task
+    result = {"input": label, "schema": schema_path, "truncated": False}
+    if stream and text is None and not use_jsonschema:
+        try:
+            errors, truncated = stream_validate(schema_path, input_path, max_errors)
+        except (OSError, ValueError) as exc:
+            result.update(status="error", errors=[f"Failed to load JSON: {exc}"])
+            return result
+        result.update(
+            status="invalid" if errors else "ok",
+            errors=errors,
+            truncated=truncated,
+            validator="stream",
+        )
+        return result
+    try:
+        entry = _schema_entry(schema_path)
+        data = load_json(input_path) if text is None else json.loads(text)
+    except (OSError, ValueError) as exc:
+        result.update(status="error", errors=[f"Failed to load JSON: {exc}"])
+        return result
+    jsonschema = import_jsonschema() if use_jsonschema else None
+    if jsonschema is not None:
+        try:
+            validator = jsonschema_validator(jsonschema, schema_path)
+            errors = [
+                f"{getattr(error, 'json_path', '$')}: {error.message}"
+                for error in sorted(
+                    validator.iter_errors(data),
+                    key=lambda error: (getattr(error, "json_path", "$"), error.message),
+                )
+            ]
+        except Exception as exc:
+            result.update(status="error", errors=[f"Schema error: {exc}"])
+            return result
+        result["validator"] = "jsonschema"
+    else:
+        errors, truncated = _collect(
+            lambda sink: entry["compiler"].check(data, "$", sink), max_errors
+        )
+        result.update(validator="fallback", truncated=truncated)
+    result.update(status="invalid" if errors else "ok", errors=errors)
+    return result
+
+
+def run_batch(tasks, jobs, use_jsonschema, stream=False, max_errors=None):
+    """Validate tasks across a process pool, printing one JSON result per line.
+
+    Each worker loads and compiles every schema at most once.  Returns 0 when
+    all inputs pass, 1 when any input is invalid, and 2 when any fails to load.
+    """
+    worker = functools.partial(
+        validate_task,
+        use_jsonschema=use_jsonschema,
+        stream=stream,
+        max_errors=max_errors,
+    )
+    tasks = list(tasks)
+    counts = {"ok": 0, "invalid": 0, "error": 0}
+    if jobs <= 1 or len(tasks) <= 1:
+        results = map(worker, tasks)
+        executor = None
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=jobs)
+        results = executor.map(
+            worker, tasks, chunksize=max(1, len(tasks) // (jobs * 4))
+        )
+    try:
+        for result in results:
+            counts[result["status"]] += 1
+            print(json.dumps(result, sort_keys=True))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    print(
+        f"Validated {len(tasks)} input(s): {counts['ok']} ok, "
+        f"{counts['invalid']} invalid, {counts['error']} error(s)",
+        file=sys.stderr,
+    )
+    if counts["error"]:
+        return 2
+    return 1 if counts["invalid"] else 0
+
+
+DEFAULT_SCHEMA_DIR = pathlib.Path(__file__).resolve().parent.parent / "protocols" / "schemas"
+# Run artifact layout under <output_root>/<run_id>/ mapped to canonical schemas.
+RUN_ARTIFACT_SCHEMAS = (
+    ("checkpoint.json", "checkpoint.schema.json"),
+    ("status/run-status.json", "run-status.schema.json"),
+    ("status/tasks/*.json", "task-status.schema.json"),
+    ("status/agents/*.json", "agent-status.schema.json"),
+    ("observations/reasoning/*.json", "reasoning-observation.schema.json"),
+    ("flow/task-list.json", "flow-task-list.schema.json"),
+    ("*/task-list.json", "task-list.schema.json"),
+    ("*/problem-spec.json", "problem-spec.schema.json"),
+    ("*/dev-spec.json", "dev-spec.schema.json"),
+    ("*/plan-outline.json", "plan-outline.schema.json"),
+    ("*/handoff-pack.json", "handoff-pack.schema.json"),
+    ("*/repo-findings.json", "repo-findings.schema.json"),
+    ("*/review-report.json", "review-report.schema.json"),
+    ("*/test-report.json", "test-report.schema.json"),
+    ("*/dispatch-plan.json", "dispatch-plan.schema.json"),
+    ("*/context-pack.json", "context-pack.schema.json"),
+    ("modernize/*handoff.json", "modernize-exec-handoff.schema.json"),
+)
+
+
+def artifact_schema(relative, schema_dir=DEFAULT_SCHEMA_DIR):
+    """Return the schema path for a run-relative artifact path, or None."""
+    parts = pathlib.PurePosixPath(relative).parts
+    for candidate in (parts, parts[1:]):
+        if not candidate:
+            continue
+        path = pathlib.PurePosixPath(*candidate)
+        for pattern, schema_name in RUN_ARTIFACT_SCHEMAS:
+            if len(pathlib.PurePosixPath(pattern).parts) == len(candidate) and path.match(
+                pattern
+            ):
+                return os.path.join(schema_dir, schema_name)
+    return None
+
+
+class RunWatcher:
+    """Revalidate known run artifacts under a directory when they change.
+
+    ``root`` is either one run directory or an output root holding
+    ``<run_id>/`` directories.  Each ``scan`` stats the tree and validates
+    only files whose size or mtime changed since the previous scan.
+    """
+
+    def __init__(self, root, schema_dir=DEFAULT_SCHEMA_DIR, stream=False, max_errors=None):
+        self.root = os.path.abspath(os.path.expanduser(root))
+        self.schema_dir = schema_dir
+        self.stream = stream
+        self.max_errors = max_errors
+        self._seen = {}
+
+    def _artifacts(self):
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            # Skip dot directories such as the .objects artifact store.
+            dirnames[:] = sorted(name for name in dirnames if not name.startswith("."))
+            for filename in sorted(filenames):
+                if not filename.endswith(".json"):
+                    continue
+                path = os.path.join(dirpath, filename)
+                relative = pathlib.Path(path).relative_to(self.root).as_posix()
+                schema_path = artifact_schema(relative, self.schema_dir)
+                if schema_path is not None:
+                    yield path, schema_path
+
+    def scan(self):
+        """Return results for artifacts that are new or changed since the last scan."""
+        results = []
+        current = {}
+        for path, schema_path in self._artifacts():
+            try:
+                key = _file_key(path)
+            except OSError:
+                continue
+            current[path] = key
+            if self._seen.get(path) == key:
+                continue
+            results.append(
+                validate_task(
+                    (schema_path, path, path, None),
+                    stream=self.stream,
+                    max_errors=self.max_errors,
+                )
+            )
+        self._seen = current
+        return results
+
+    def watch(self, interval=1.0, stop=None):
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            for result in self.scan():
+                print(json.dumps(result, sort_keys=True), flush=True)
+            stop.wait(interval)
+
+
+def _request_schema(schema, schema_dir):
+    if not isinstance(schema, str) or not schema:
+        raise ValueError("request needs a 'schema' path or schema file name")
+    schema = os.path.expanduser(schema)
+    return schema if os.path.isabs(schema) else os.path.join(schema_dir, schema)
+
+
+def handle_request(line, schema_dir=DEFAULT_SCHEMA_DIR):
+    """Answer one JSON request line from the validation server.
+
+    A request names a ``schema`` (absolute, or a file name under the schema
+    directory) and either an ``input`` path or an inline ``instance``; it may
+    also set ``stream`` and ``max_errors``.
+    """
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError("request must be a JSON object")
+        schema_path = _request_schema(request.get("schema"), schema_dir)
+        max_errors = request.get("max_errors")
+        if max_errors is not None and (
+            not isinstance(max_errors, int) or isinstance(max_errors, bool) or max_errors < 1
+        ):
+            raise ValueError("'max_errors' must be a positive integer")
+        if "instance" in request:
+            task = (schema_path, "<instance>", None, json.dumps(request["instance"]))
+        elif isinstance(request.get("input"), str):
+            input_path = os.path.expanduser(request["input"])
+            task = (schema_path, input_path, input_path, None)
+        else:
+            raise ValueError("request needs an 'input' path or an inline 'instance'")
+    except ValueError as exc:
+        return {"status": "error", "errors": [f"Bad request: {exc}"]}
+    return validate_task(
+        task, stream=bool(request.get("stream")), max_errors=max_errors
+    )
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+
+    class _ValidationHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                result = handle_request(line, self.server.schema_dir)
+                self.wfile.write(json.dumps(result, sort_keys=True).encode("utf-8") + b"\n")
+                self.wfile.flush()
+
+    class ValidationServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+        def __init__(self, socket_path, schema_dir=DEFAULT_SCHEMA_DIR):
+            self.schema_dir = schema_dir
+            super().__init__(socket_path, _ValidationHandler)
+            os.chmod(socket_path, 0o600)
+
+
+def serve(socket_path, schema_dir=DEFAULT_SCHEMA_DIR):
+    """Serve JSON-lines validation requests on a local Unix socket until stopped."""
+    if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+        raise ValueError("--serve requires Unix domain socket support")
+    socket_path = os.path.abspath(os.path.expanduser(socket_path))
+    if os.path.exists(socket_path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            os.unlink(socket_path)  # Stale socket from a server that exited.
+        else:
+            raise ValueError(f"a validation server is already listening on {socket_path}")
+        finally:
+            probe.close()
+    server = ValidationServer(socket_path, schema_dir)
+    stopped = threading.Event()
+    previous_handler = signal.signal(signal.SIGTERM, lambda signum, frame: stopped.set())
+    print(f"Validation server listening on {socket_path}", file=sys.stderr, flush=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        stopped.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
+        server.shutdown()
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+    return 0
 
 
 def main():
     parser = argparse.ArgumentParser(description="Validate JSON against a schema.")
-    parser.add_argument("--schema", required=True, help="Path to JSON schema file.")
-    parser.add_argument("--input", required=True, help="Path to JSON input file.")
+    parser.add_argument("--schema", help="Path to JSON schema file.")
+    parser.add_argument("--input", help="Path to JSON input file.")
     parser.add_argument(
         "--require-jsonschema",
         action="store_true",
         help="Require jsonschema package; fail if unavailable.",
     )
+    parser.add_argument(
+        "--manifest",
+        help=(
+            "Batch mode: JSON object mapping schema paths to input paths or globs "
+            "(relative to the manifest; '-' reads stdin). Prints JSONL results."
+        ),
+    )
+    parser.add_argument(
+        "--jsonl",
+        help="Batch mode: validate each line of a JSONL file ('-' for stdin) against --schema.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "Validate input files incrementally with the built-in validator, "
+            "keeping memory bounded for large arrays and object maps."
+        ),
+    )
+    parser.add_argument(
+        "--max-errors",
+        type=int,
+        default=None,
+        help="Stop validating an input after this many errors (default: 100 with --stream, else unlimited).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for batch mode (default: CPU count).",
+    )
+    parser.add_argument(
+        "--watch",
+        metavar="DIR",
+        help=(
+            "Watch a run directory or output root and revalidate run artifacts "
+            "as they change, printing JSONL results."
+        ),
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="Polling interval in seconds for --watch (default: 1.0).",
+    )
+    parser.add_argument(
+        "--serve",
+        metavar="SOCKET",
+        help="Serve JSON-lines validation requests on a local Unix socket.",
+    )
+    parser.add_argument(
+        "--schema-dir",
+        default=str(DEFAULT_SCHEMA_DIR),
+        help="Schema directory used by --watch and --serve (default: protocols/schemas).",
+    )
     args = parser.parse_args()
 
+    modes = [
+        flag
+        for flag, value in (
+            ("--manifest", args.manifest),
+            ("--jsonl", args.jsonl),
+            ("--watch", args.watch),
+            ("--serve", args.serve),
+        )
+        if value is not None
+    ]
+    if len(modes) > 1:
+        parser.error(f"{' and '.join(modes)} are mutually exclusive")
+    if args.stream and args.require_jsonschema:
+        parser.error("--stream uses the built-in validator and cannot be combined with --require-jsonschema")
+    if args.max_errors is not None and args.max_errors < 1:
+        parser.error("--max-errors must be at least 1")
+    max_errors = args.max_errors
+    if max_errors is None and args.stream:
+        max_errors = DEFAULT_STREAM_MAX_ERRORS
+    if args.watch is not None or args.serve is not None:
+        if args.schema is not None or args.input is not None or args.require_jsonschema:
+            parser.error(
+                "--watch and --serve pick schemas themselves and use the built-in validator"
+            )
+        schema_dir = os.path.expanduser(args.schema_dir)
+        if args.serve is not None:
+            try:
+                return serve(args.serve, schema_dir)
+            except (OSError, ValueError) as exc:
+                print(f"Failed to start validation server: {exc}", file=sys.stderr)
+                return 2
+        if not os.path.isdir(os.path.expanduser(args.watch)):
+            print(f"Watch directory not found: {args.watch}", file=sys.stderr)
+            return 2
+        if args.interval <= 0:
+            parser.error("--interval must be positive")
+        watcher = RunWatcher(args.watch, schema_dir, args.stream, max_errors)
+        try:
+            watcher.watch(args.interval)
+        except KeyboardInterrupt:
+            pass
+        return 0
+    if args.manifest is not None or args.jsonl is not None:
+        if args.input is not None:
+            parser.error("--input cannot be combined with --manifest or --jsonl")
+        if args.manifest is not None and args.schema is not None:
+            parser.error("--schema cannot be combined with --manifest")
+        if args.jsonl is not None and args.schema is None:
+            parser.error("--jsonl requires --schema")
+        if args.jobs < 1:
+            parser.error("--jobs must be at least 1")
+        # Batch mode uses the compiled fallback unless jsonschema is required.
+        use_jsonschema = args.require_jsonschema
+        if use_jsonschema and import_jsonschema() is None:
+            print(
+                "ERROR: --require-jsonschema was set, but the 'jsonschema' package is not installed.",
+                file=sys.stderr,
+            )
+            print("Install it with: python3 -m pip install jsonschema", file=sys.stderr)
+            return 2
+        try:
+            if args.manifest is not None:
+                tasks = _manifest_tasks(args.manifest)
+            else:
+                tasks = _jsonl_tasks(os.path.expanduser(args.schema), args.jsonl)
+            return run_batch(
+                tasks, args.jobs, use_jsonschema, args.stream, max_errors
+            )
+        except (OSError, ValueError) as exc:
+            print(f"Failed to load batch: {exc}", file=sys.stderr)
+            return 2
+    if args.schema is None or args.input is None:
+        parser.error("--schema and --input are required outside batch mode")
+
     schema_path = os.path.expanduser(args.schema)
     input_path = os.path.expanduser(args.input)
 
+    if args.stream:
+        try:
+            errors, truncated = stream_validate(schema_path, input_path, max_errors)
+        except (OSError, ValueError) as exc:
+            print(f"Failed to load JSON: {exc}", file=sys.stderr)
+            return 2
+        if errors:
+            print("FAIL: validation failed")
+            for err in errors:
+                print(f"- {err}")
+            if truncated:
+                print(f"Stopped after {len(errors)} error(s) (--max-errors).")
+            return 1
+        print("OK: streaming validation passed")
+        return 0
+
     try:
-        schema = load_json(schema_path)
+        entry = _schema_entry(schema_path)
+        schema = entry["schema"]
         data = load_json(input_path)
-    except (OSError, json.JSONDecodeError) as exc:
+    except (OSError, ValueError) as exc:
         print(f"Failed to load JSON: {exc}", file=sys.stderr)
         return 2
 
-    try:
-        import jsonschema  # type: ignore
-    except Exception:
-        jsonschema = None
+    jsonschema = import_jsonschema()
 
     if args.require_jsonschema and jsonschema is None:
         print(
@@ -154,11 +1360,15 @@ def main():
             print(f"FAIL: schema validation failed: {exc}", file=sys.stderr)
             return 1
 
-    errors = validate(schema, data)
+    errors, truncated = _collect(
+        lambda sink: entry["compiler"].check(data, "$", sink), max_errors
+    )
     if errors:
         print("FAIL: validation failed")
         for err in errors:
             print(f"- {err}")
+        if truncated:
+            print(f"Stopped after {len(errors)} error(s) (--max-errors).")
         print(
             "Tip: install jsonschema for full validation: python3 -m pip install jsonschema"
         )